@@ -1,17 +1,30 @@
 # ai/ai_matcher.py
 
 import os
-import sqlite3
+import threading
 import pandas as pd
-from google import genai
 
-# --- Initialize AI AI Client ---
-client = None
-try:
-    # The API key is automatically picked up from the GEMINI_API_KEY environment variable.
-    client = genai.Client()
-except Exception as e:
-    print(f"Warning: Failed to initialize AI AI client: {e}. AI suggestions will be unavailable.")
+from database import query_stats
+
+# --- AI Client (created on first use, so importing listing pages stays cheap) ---
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the shared AI client, or None if it cannot be initialized."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                try:
+                    from google import genai
+                    # The API key is automatically picked up from the GEMINI_API_KEY environment variable.
+                    _client = genai.Client()
+                except Exception as e:
+                    print(f"Warning: Failed to initialize AI AI client: {e}. AI suggestions will be unavailable.")
+                    return None
+    return _client
 
 DB_NAME = "farmermarket.db"
 
@@ -21,7 +34,7 @@ def fetch_recent_data():
     Fetch recent data from the SQLite database.
     Returns a dictionary containing 'tools' and 'crops' DataFrames.
     """
-    conn = sqlite3.connect(DB_NAME)
+    conn = query_stats.connect(DB_NAME)
     try:
         tools_df = pd.read_sql_query("SELECT * FROM tools ORDER BY rowid DESC LIMIT 10", conn)
         crops_df = pd.read_sql_query("SELECT * FROM crops ORDER BY rowid DESC LIMIT 10", conn)
@@ -45,6 +58,7 @@ def get_recommendations(context: dict):
     
     :param context: Dictionary containing user context or preferences.
     """
+    client = get_client()
     if not client:
         return "(AI suggestion unavailable: AI AI client not initialized.)"
 
@@ -0,0 +1,125 @@
+# ai/market_digest.py
+"""
+Market Intelligence Digests
+Builds a compact, source-attributed news/price digest per (crop, state) on a
+schedule, so price predictions read a stored digest instead of running a
+Google-Search-grounded AI call while the farmer waits.
+"""
+
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import db_functions, query_stats
+from database.cache_manager import CacheManager
+
+# Digests count as fresh for this long; older ones are still served, marked stale
+DIGEST_FRESH_HOURS = 12
+MAX_SOURCES = 5
+
+
+def state_from_location(location):
+    """'Pune, Maharashtra' -> 'Maharashtra'; a bare place name is used as-is."""
+    if not location:
+        return "India"
+
+    parts = [part.strip() for part in location.split(',') if part.strip()]
+    if len(parts) > 1 and parts[-1].lower() == 'india':
+        parts = parts[:-1]
+    return parts[-1] if parts else "India"
+
+
+def discover_digest_targets():
+    """(crop, state) pairs the app is likely to be asked about."""
+    targets = set()
+    conn = query_stats.connect(db_functions.DB_NAME)
+    c = conn.cursor()
+    queries = [
+        "SELECT DISTINCT Crop, Location FROM crops WHERE Crop IS NOT NULL",
+        """SELECT DISTINCT a.commodity, f.location FROM price_alerts a
+           LEFT JOIN farmers f ON LOWER(f.name) = LOWER(a.farmer_name)
+           WHERE a.is_active = 1""",
+        "SELECT DISTINCT crop_name, state FROM mandi_price_history",
+    ]
+    for query in queries:
+        try:
+            for crop, location in c.execute(query):
+                if crop:
+                    targets.add((crop.strip().title(), state_from_location(location)))
+        except sqlite3.OperationalError:
+            # Table not created yet on this install
+            continue
+    conn.close()
+    return targets
+
+
+class MarketDigestBuilder:
+    """Refreshes stale market digests using the grounded search in PricePredictor."""
+
+    def __init__(self, predictor=None):
+        if predictor is None:
+            from ai.price_predictor import PricePredictor
+            predictor = PricePredictor()
+        self.predictor = predictor
+        self.cache = CacheManager()
+
+    def build_digest(self, crop_name, state):
+        """Run one grounded search and store the compact digest. Returns it."""
+        start = time.time()
+        result = self.predictor.get_online_news_and_prices(crop_name, state, use_cache=False)
+
+        if result.get('error'):
+            self.cache.record_market_digest_error(crop_name, state, result['error'])
+            return None
+
+        digest = {
+            'current_price': result.get('current_price'),
+            'news_summary': result.get('news_summary', ''),
+            'market_conditions': result.get('market_conditions', ''),
+            'policy_updates': result.get('policy_updates', ''),
+            'sources': result.get('sources', [])[:MAX_SOURCES],
+            'search_queries': result.get('search_queries', []),
+            'crop_name': crop_name,
+            'state': state
+        }
+        self.cache.set_market_digest(crop_name, state, digest, hours=DIGEST_FRESH_HOURS,
+                                     build_seconds=round(time.time() - start, 2))
+        return digest
+
+    def refresh(self, limit=20, max_workers=2, discover=True):
+        """
+        Rebuild digests that are missing or past their freshness window.
+
+        Args:
+            limit: Maximum digests to rebuild in this run
+            max_workers: Concurrent grounded searches
+            discover: Also queue crops seen in listings, alerts and mandi history
+
+        Returns:
+            dict with counts of built and failed digests
+        """
+        if discover:
+            for crop_name, state in discover_digest_targets():
+                self.cache.request_market_digest(crop_name, state)
+
+        targets = self.cache.get_stale_market_digests(limit=limit)
+        built = 0
+        failed = 0
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(self.build_digest, crop, state) for crop, state in targets]
+            for (crop_name, state), future in zip(targets, futures):
+                try:
+                    if future.result():
+                        built += 1
+                    else:
+                        failed += 1
+                except Exception as e:
+                    print(f"Digest build failed: {e}")
+                    self.cache.record_market_digest_error(crop_name, state, str(e))
+                    failed += 1
+
+        return {'targets': len(targets), 'built': built, 'failed': failed}
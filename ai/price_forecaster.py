@@ -0,0 +1,292 @@
+# ai/price_forecaster.py
+"""
+Local Price Forecasting Engine
+Gradient-boosted quantile models trained on historical mandi prices.
+Produces 7/15/30-day forecasts with 80% intervals without any API call.
+"""
+
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingRegressor
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import db_functions
+
+HORIZONS = (7, 15, 30)
+QUANTILES = (0.1, 0.5, 0.9)
+
+# Need enough daily points for 30-day lags, a 30-day target and training rows
+MIN_HISTORY_DAYS = 120
+# Retrain once the history has grown this many days past the trained model
+RETRAIN_AFTER_DAYS = 7
+# Gaps between mandi reports longer than this are not filled
+MAX_GAP_DAYS = 7
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+
+FEATURES = ['ret_1', 'ret_7', 'ret_15', 'ret_30', 'dev_7', 'dev_30',
+            'vol_30', 'doy_sin', 'doy_cos']
+
+# (crop, market) -> trained model bundle, shared by every predictor in the process.
+# _registry_lock only guards the dicts; training holds the lock of its own key.
+_MODEL_REGISTRY = {}
+_registry_lock = threading.Lock()
+_key_locks = {}
+
+# Stale models are retrained here, one at a time, while requests keep the old one
+_retrain_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='price-retrain')
+_retraining = set()
+
+
+def _slug(text):
+    return re.sub(r'[^a-z0-9]+', '_', text.lower()).strip('_') or 'all'
+
+
+def _daily_series(history):
+    """Turn irregular mandi reports into a daily price series."""
+    if history is None or history.empty:
+        return pd.Series(dtype=float)
+
+    series = pd.Series(
+        history['modal_price'].astype(float).values,
+        index=pd.to_datetime(history['price_date'], errors='coerce')
+    )
+    series = series[series.index.notna() & (series > 0)]
+    series = series.groupby(level=0).mean().sort_index()
+    if series.empty:
+        return series
+
+    return series.asfreq('D').ffill(limit=MAX_GAP_DAYS).dropna()
+
+
+def _build_features(series):
+    """Lag, momentum, volatility and seasonal features for each day."""
+    log_price = np.log(series)
+    daily_ret = log_price.diff()
+
+    frame = pd.DataFrame(index=series.index)
+    frame['ret_1'] = daily_ret
+    frame['ret_7'] = log_price - log_price.shift(7)
+    frame['ret_15'] = log_price - log_price.shift(15)
+    frame['ret_30'] = log_price - log_price.shift(30)
+    frame['dev_7'] = log_price - np.log(series.rolling(7).mean())
+    frame['dev_30'] = log_price - np.log(series.rolling(30).mean())
+    frame['vol_30'] = daily_ret.rolling(30).std()
+    day_of_year = series.index.dayofyear
+    frame['doy_sin'] = np.sin(2 * np.pi * day_of_year / 365.25)
+    frame['doy_cos'] = np.cos(2 * np.pi * day_of_year / 365.25)
+    return frame
+
+
+def _train_bundle(series, crop, market):
+    """Fit one quantile model per (horizon, quantile) on log price changes."""
+    features = _build_features(series)
+    log_price = np.log(series)
+
+    models = {}
+    for horizon in HORIZONS:
+        target = log_price.shift(-horizon) - log_price
+        data = features.assign(target=target).dropna()
+        for quantile in QUANTILES:
+            model = GradientBoostingRegressor(
+                loss='quantile', alpha=quantile,
+                n_estimators=100, max_depth=3, learning_rate=0.05,
+                subsample=0.8, random_state=42
+            )
+            model.fit(data[FEATURES].values, data['target'].values)
+            models[(horizon, quantile)] = model
+
+    return {
+        'crop': crop,
+        'market': market,
+        'models': models,
+        'last_date': series.index[-1],
+        'n_observations': len(series),
+        'trained_at': datetime.now().isoformat()
+    }
+
+
+class PriceForecaster:
+    """Per-crop, per-market forecaster with models loaded once per process."""
+
+    def __init__(self, model_dir=MODEL_DIR):
+        self.model_dir = model_dir
+
+    def _model_path(self, crop, market):
+        return os.path.join(self.model_dir, f"{_slug(crop)}__{_slug(market)}.joblib")
+
+    def _load_history(self, crop, market):
+        """Market series if it is long enough, otherwise the all-market average."""
+        if market:
+            series = _daily_series(db_functions.get_mandi_price_history(crop, market))
+            if len(series) >= MIN_HISTORY_DAYS:
+                return series, market
+        series = _daily_series(db_functions.get_mandi_price_history(crop))
+        return series, '*'
+
+    @staticmethod
+    def _is_stale(bundle, series):
+        return (series.index[-1] - bundle['last_date']).days >= RETRAIN_AFTER_DAYS
+
+    def _train(self, key, crop, market, series):
+        """Train, persist and publish a bundle; callers hold the key's lock."""
+        bundle = _train_bundle(series, crop, market)
+        try:
+            os.makedirs(self.model_dir, exist_ok=True)
+            joblib.dump(bundle, self._model_path(crop, market))
+        except OSError as e:
+            print(f"Could not save price model for {crop}/{market}: {e}")
+        with _registry_lock:
+            _MODEL_REGISTRY[key] = bundle
+        return bundle
+
+    def _retrain_in_background(self, key, crop, market, series):
+        with _registry_lock:
+            if key in _retraining:
+                return
+            _retraining.add(key)
+
+        def retrain():
+            try:
+                with _key_lock(key):
+                    bundle = _MODEL_REGISTRY.get(key)
+                    if bundle is None or self._is_stale(bundle, series):
+                        self._train(key, crop, market, series)
+            except Exception as e:
+                print(f"Could not retrain price model for {crop}/{market}: {e}")
+            finally:
+                with _registry_lock:
+                    _retraining.discard(key)
+
+        _retrain_pool.submit(retrain)
+
+    def _get_bundle(self, crop, market, series, wait=False):
+        """
+        Return a memoized model, loading it from disk or training it.
+
+        Only a model that does not exist yet is trained on the caller's thread,
+        holding the lock of this (crop, market) alone. A stale model is served
+        as is while a background thread retrains it, unless wait is set.
+        """
+        key = (crop.lower(), market.lower())
+        bundle = _MODEL_REGISTRY.get(key)
+
+        if bundle is None:
+            with _key_lock(key):
+                bundle = _MODEL_REGISTRY.get(key)
+                if bundle is None:
+                    try:
+                        bundle = joblib.load(self._model_path(crop, market))
+                    except Exception:
+                        bundle = None
+                    if bundle is None:
+                        return self._train(key, crop, market, series)
+                    with _registry_lock:
+                        _MODEL_REGISTRY[key] = bundle
+
+        if self._is_stale(bundle, series):
+            if wait:
+                with _key_lock(key):
+                    bundle = _MODEL_REGISTRY[key]
+                    if self._is_stale(bundle, series):
+                        bundle = self._train(key, crop, market, series)
+            else:
+                self._retrain_in_background(key, crop, market, series)
+        return bundle
+
+    def train_models(self, min_days=MIN_HISTORY_DAYS):
+        """
+        Train every missing or stale model with enough history (worker job),
+        so requests find a current model in place.
+
+        Returns:
+            dict with the number of models checked and trained
+        """
+        started = datetime.now().isoformat()
+        pairs = db_functions.get_mandi_series(min_days)
+        # Each crop's all-market model serves markets without enough history
+        pairs += [(crop, '') for crop in dict.fromkeys(crop for crop, _ in pairs)]
+
+        checked = trained = 0
+        for crop, market in pairs:
+            series, used_market = self._load_history(crop, market)
+            if len(series) < MIN_HISTORY_DAYS or (market and used_market != market):
+                continue
+            checked += 1
+            if self._get_bundle(crop, used_market, series, wait=True)['trained_at'] >= started:
+                trained += 1
+        return {'models_checked': checked, 'models_trained': trained}
+
+    def latest_price(self, crop_name, location="India"):
+        """Last recorded mandi modal price for a crop/market (None if unknown)."""
+        market = location.split(',')[0].strip() if location else ''
+        price = db_functions.get_latest_mandi_price(crop_name, market or None)
+        if price is None and market:
+            price = db_functions.get_latest_mandi_price(crop_name)
+        return round(float(price), 2) if price is not None else None
+
+    def forecast(self, crop_name, location="India", current_price=None):
+        """
+        Forecast prices 7, 15 and 30 days ahead.
+
+        Args:
+            crop_name: Name of the crop
+            location: "Market, State" string; the first part is used as the market
+            current_price: Price to anchor the forecast on (default: last mandi price)
+
+        Returns:
+            dict with per-horizon price and 80% interval, or None when there is
+            not enough history for this crop
+        """
+        market = location.split(',')[0].strip() if location else ''
+        series, used_market = self._load_history(crop_name, market)
+        if len(series) < MIN_HISTORY_DAYS:
+            return None
+
+        bundle = self._get_bundle(crop_name, used_market, series)
+        latest = _build_features(series)[FEATURES].iloc[[-1]]
+        if latest.isna().any(axis=None):
+            return None
+
+        last_price = float(series.iloc[-1])
+        base_price = float(current_price) if current_price else last_price
+
+        forecasts = {}
+        for horizon in HORIZONS:
+            changes = sorted(
+                float(bundle['models'][(horizon, q)].predict(latest.values)[0])
+                for q in QUANTILES
+            )
+            low, mid, high = (round(float(base_price * np.exp(c)), 2) for c in changes)
+            forecasts[f'day_{horizon}'] = {'price': mid, 'low': low, 'high': high}
+
+        return {
+            'crop': crop_name,
+            'market': used_market,
+            'as_of': series.index[-1].strftime('%Y-%m-%d'),
+            'last_mandi_price': round(last_price, 2),
+            'base_price': round(base_price, 2),
+            'forecasts': forecasts,
+            'n_observations': bundle['n_observations'],
+            'trained_at': bundle['trained_at'],
+            'model': 'gradient_boosting_quantile'
+        }
+
+
+def _key_lock(key):
+    with _registry_lock:
+        return _key_locks.setdefault(key, threading.Lock())
+
+
+def clear_model_registry():
+    """Drop memoized models (used after bulk history imports and in tests)."""
+    with _registry_lock:
+        _MODEL_REGISTRY.clear()
@@ -7,16 +7,55 @@ Enhanced with weather data, online news, and current market prices
 
 import os
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import pandas as pd
 from google import genai
 from google.genai import types
+from pydantic import BaseModel, Field
+from typing import List, Literal
 from dotenv import load_dotenv
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database.cache_manager import CacheManager
+from ai.price_forecaster import PriceForecaster
+from ai.market_digest import state_from_location
 
 load_dotenv()
 
+# Pydantic models for structured output
+class PricePrediction(BaseModel):
+    """Multi-horizon price forecast"""
+    day_7_price: float = Field(description="Predicted price in rupees per quintal 7 days from today", gt=0)
+    day_15_price: float = Field(description="Predicted price in rupees per quintal 15 days from today", gt=0)
+    day_30_price: float = Field(description="Predicted price in rupees per quintal 30 days from today", gt=0)
+    trend: Literal['UPWARD', 'DOWNWARD', 'STABLE'] = Field(description="Overall price direction")
+    confidence: Literal['HIGH', 'MEDIUM', 'LOW'] = Field(description="Confidence in the forecast")
+    peak_day: int = Field(description="Day (1-30) with the highest expected price", ge=1, le=30)
+    lowest_day: int = Field(description="Day (1-30) with the lowest expected price", ge=1, le=30)
+    key_factors: List[str] = Field(description="3-5 factors with specific data and price impact")
+    recommendation: str = Field(description="2-3 sentences: specific action, reasoning with data, risk warning")
+
+class SellingAdvice(BaseModel):
+    """Best time to sell recommendation"""
+    best_month: str = Field(description="Specific month name that is best for selling")
+    best_reason: str = Field(description="2-3 sentences with specific data/percentages why this month is optimal")
+    sell_now_score: int = Field(description="How good selling now is, 0-10", ge=0, le=10)
+    wait_score: int = Field(description="How good waiting is, 0-10", ge=0, le=10)
+    storage_advice: str = Field(description="Practical steps: temperature, humidity, pest control, duration limit")
+    expected_peak_price: float = Field(description="Expected peak price in rupees per quintal", ge=0)
+    risk_factors: List[str] = Field(description="3 specific risks with probability, timing or mitigation")
+    action: Literal['SELL_NOW', 'WAIT_FOR_BETTER_PRICE', 'SELL_PARTIALLY'] = Field(description="Recommended action")
+    timeline: str = Field(description="Precise recommendation, e.g. 'Sell 60% now, hold 40% until <date/event>'")
+
+class ProfitAnalysis(BaseModel):
+    """Review of a completed sale"""
+    verdict: Literal['EXCELLENT_DEAL', 'GOOD_DEAL', 'FAIR_DEAL', 'POOR_DEAL', 'SIGNIFICANT_LOSS'] = Field(
+        description="Overall verdict on the sale")
+    analysis: str = Field(description="2-3 sentences: market timing, price vs regional average, market context")
+    market_context: str = Field(description="1-2 sentences on what was happening in the market")
+    learning: str = Field(description="One specific, actionable lesson for the next sale")
+
 class PricePredictor:
     """AI-powered crop price prediction and analysis system with smart caching."""
     
@@ -39,6 +78,9 @@ class PricePredictor:
         # Initialize cache manager
         self.cache = CacheManager()
         print("📦 Cache system initialized")
+        
+        # Local ML forecaster (trained on mandi price history, no API cost)
+        self.forecaster = PriceForecaster()
     
     def get_weather_data(self, location):
         """
@@ -145,19 +187,53 @@ class PricePredictor:
         
         return daily_forecasts[:5]  # Return 5 days
     
-    def get_online_news_and_prices(self, crop_name, location):
+    def get_market_digest(self, crop_name, location):
+        """
+        Read the pre-built market intelligence digest for a crop in the location's state.
+        
+        Never searches the web: a missing digest is queued for the digest builder
+        (scripts/build_market_digests.py) and a placeholder is returned.
+        
+        Args:
+            crop_name: Name of the crop
+            location: Location string (e.g., "Pune, Maharashtra")
+        
+        Returns:
+            dict: Same shape as get_online_news_and_prices
+        """
+        state = state_from_location(location)
+        digest = self.cache.get_market_digest(crop_name, state)
+        if digest:
+            print(f"   ✅ Using market digest for {crop_name} in {state} (built {digest['digest_built_at']})")
+            return digest
+        
+        self.cache.request_market_digest(crop_name, state)
+        return {
+            'current_price': None,
+            'news_summary': 'Market digest not built yet for this crop and state',
+            'market_conditions': 'No specific information found',
+            'policy_updates': 'No recent policy updates found',
+            'sources': [],
+            'search_queries': []
+        }
+    
+    def get_online_news_and_prices(self, crop_name, location, use_cache=True):
         """
         Use AI with Google Search grounding to find current news and market prices with caching.
         
+        Slow (a grounded search per call) - used by the market digest builder,
+        predictions read get_market_digest instead.
+        
         Args:
             crop_name: Name of the crop
             location: Location for context
+            use_cache: Return a cached result when available (default: True)
         
         Returns:
             dict: News and current price information with citations
         """
         # Check cache first
-        cached_price = self.cache.get_market_price_cache(crop_name, location)
+        cached_price = self.cache.get_market_price_cache(crop_name, location) if use_cache else None
         if cached_price:
             print(f"   ✅ Using cached market data for {crop_name} in {location}")
             return cached_price
@@ -305,25 +381,30 @@ Date all information clearly."""
                 'error': str(e)
             }
     
-    def predict_future_prices(self, crop_name, current_price, location="India", days_ahead=30):
+    def predict_future_prices(self, crop_name, current_price, location="India", days_ahead=30,
+                              use_local_model=True, narrative=False):
         """
         Predict future crop prices using AI analysis with weather, news, and market data (with smart caching).
         
+        When enough mandi price history exists, the local forecasting engine answers
+        in milliseconds and the AI is only used (optionally) to write the recommendation.
+        
         Args:
             crop_name: Name of the crop (e.g., "Wheat", "Rice", "Tomato")
             current_price: Current market price per quintal/kg
             location: Location for context (default: India)
             days_ahead: Number of days to predict ahead (default: 30)
+            use_local_model: Try the local forecasting engine first (default: True)
+            narrative: Ask AI to write the recommendation for local forecasts (default: False)
         
         Returns:
             dict: Prediction results with prices and confidence
         """
         
-        # Check prediction cache first
-        cached_prediction = self.cache.get_prediction_cache(crop_name, location, current_price, tolerance=100.0)
-        if cached_prediction:
-            print(f"✅ Using cached prediction for {crop_name} in {location} (₹{current_price})")
-            return cached_prediction
+        prediction = self._predict_without_search(crop_name, current_price, location,
+                                                  use_local_model, narrative)
+        if prediction:
+            return prediction
         
         # Gather comprehensive data
         print(f"📊 Gathering data for {crop_name} in {location}...")
@@ -332,9 +413,49 @@ Date all information clearly."""
         print("🌤️  Fetching weather data...")
         weather_data = self.get_weather_data(location)
         
-        # 2. Get online news and current prices
-        print("🔍 Searching online news and current prices...")
-        online_data = self.get_online_news_and_prices(crop_name, location)
+        # 2. Get pre-built market intelligence (no inline web search)
+        print("📰 Reading market intelligence digest...")
+        online_data = self.get_market_digest(crop_name, location)
+        
+        return self._predict_with_ai(crop_name, current_price, location, days_ahead,
+                                     weather_data, online_data)
+    
+    def _predict_without_search(self, crop_name, current_price, location,
+                                use_local_model=True, narrative=False):
+        """Answer from the prediction cache or the local forecaster, or return None."""
+        
+        # Check prediction cache first
+        cached_prediction = self.cache.get_prediction_cache(crop_name, location, current_price, tolerance=100.0)
+        if cached_prediction:
+            print(f"✅ Using cached prediction for {crop_name} in {location} (₹{current_price})")
+            return cached_prediction
+        
+        if not use_local_model:
+            return None
+        
+        # Local forecasting engine - no weather/search/AI calls needed
+        try:
+            local_forecast = self.forecaster.forecast(crop_name, location, current_price)
+        except Exception as e:
+            print(f"Local forecaster unavailable: {str(e)}")
+            local_forecast = None
+        
+        if not local_forecast:
+            return None
+        
+        print(f"⚡ Local forecast for {crop_name} ({local_forecast['n_observations']} days of mandi history)")
+        prediction = self._build_local_prediction(local_forecast, current_price)
+        
+        if narrative:
+            story = self._narrate_local_forecast(crop_name, location, prediction)
+            if story:
+                prediction['recommendation'] = story
+        
+        self.cache.set_prediction_cache(crop_name, location, current_price, prediction, hours=24)
+        return prediction
+    
+    def _predict_with_ai(self, crop_name, current_price, location, days_ahead, weather_data, online_data):
+        """Generate an AI prediction from already-gathered weather and market data."""
         
         # Build comprehensive context
         weather_context = ""
@@ -363,7 +484,7 @@ CURRENT WEATHER IN {location}:
                 sources_info += f"  {i}. {source.get('title', 'Source')}: {source.get('url', 'N/A')}\n"
         
         market_intelligence = f"""
-ONLINE MARKET INTELLIGENCE (Real-time Google Search):
+ONLINE MARKET INTELLIGENCE (Google Search digest):
 - Latest Market Price Found: {f"₹{online_data['current_price']:.2f} per quintal" if online_data['current_price'] else "Price information not found online"}
 - Recent Market Updates: {online_data.get('news_summary', 'N/A')}
 - Market Conditions: {online_data.get('market_conditions', 'N/A')}
@@ -430,42 +551,19 @@ Factor 5: PERISHABILITY & STORAGE ECONOMICS
 - Quality degradation rate (daily % loss)
 - Farmer's urgency vs market conditions
 
-REQUIRED OUTPUT FORMAT (use exact structure):
-
-DAY_7_PRICE: [₹ amount]
-DAY_15_PRICE: [₹ amount]
-DAY_30_PRICE: [₹ amount]
-TREND: [UPWARD/DOWNWARD/STABLE]
-CONFIDENCE: [HIGH/MEDIUM/LOW]
-PEAK_DAY: [1-30]
-LOWEST_DAY: [1-30]
-
-KEY_FACTORS:
-- Factor 1: [Weather] - [Specific data and ₹ impact]
-- Factor 2: [Supply/Season] - [Specific data and % change]
-- Factor 3: [Demand/Policy] - [Specific evidence and direction]
-- Factor 4: [Storage/Quality] - [Timeline and urgency level]
-- Factor 5: [Risk/Uncertainty] - [Main risk to forecast]
-
-RECOMMENDATION: [2-3 sentences: specific action (sell X% on day Y), reasoning with data, risk warning]
+OUTPUT:
+Fill every field of the response schema. Prices are ₹ per quintal.
 
 EXAMPLE (Tomato in harvest season):
-DAY_7_PRICE: 2200
-DAY_15_PRICE: 1900
-DAY_30_PRICE: 1600
-TREND: DOWNWARD
-CONFIDENCE: HIGH
-PEAK_DAY: 3
-LOWEST_DAY: 28
-
-KEY_FACTORS:
-- Factor 1: Rain on Days 2-4 (70% probability) will disrupt mandi transport, creating temporary 12-15% price spike to ₹2300-2400
-- Factor 2: Harvest season peak starting Day 8 - historical data shows 35% supply increase in Week 2-3 drops prices 20-25% 
-- Factor 3: Online market price ₹2100 already 18% below last month, confirming oversupply; no government MSP support for tomatoes
-- Factor 4: Tomatoes perishable - 15% quality loss per 3 days without cold storage; forces sales within 5-7 days
-- Factor 5: Main risk is weather - unexpected rain extension beyond Day 5 could keep prices elevated longer
-
-RECOMMENDATION: Sell 70% immediately on Days 2-4 during rain-induced price spike (₹2300-2400 range) to capture 10-15% premium. Store remaining 30% only with refrigeration, sell by Day 7. Do not wait beyond Day 10 - harvest flood will push prices below ₹2000 with high certainty.
+{{"day_7_price": 2200, "day_15_price": 1900, "day_30_price": 1600, "trend": "DOWNWARD",
+ "confidence": "HIGH", "peak_day": 3, "lowest_day": 28,
+ "key_factors": [
+  "Weather: Rain on Days 2-4 (70% probability) will disrupt mandi transport, creating temporary 12-15% price spike to ₹2300-2400",
+  "Supply/Season: Harvest season peak starting Day 8 - historical data shows 35% supply increase in Week 2-3 drops prices 20-25%",
+  "Demand/Policy: Online market price ₹2100 already 18% below last month, confirming oversupply; no government MSP support for tomatoes",
+  "Storage/Quality: Tomatoes perishable - 15% quality loss per 3 days without cold storage; forces sales within 5-7 days",
+  "Risk: Unexpected rain extension beyond Day 5 could keep prices elevated longer"],
+ "recommendation": "Sell 70% immediately on Days 2-4 during rain-induced price spike (₹2300-2400 range) to capture 10-15% premium. Store remaining 30% only with refrigeration, sell by Day 7. Do not wait beyond Day 10 - harvest flood will push prices below ₹2000 with high certainty."}}
 
 Now generate prediction for {crop_name}:"""
 
@@ -476,11 +574,14 @@ Now generate prediction for {crop_name}:"""
                 contents=task_prompt,
                 config=types.GenerateContentConfig(
                     system_instruction=system_instruction,
+                    response_mime_type="application/json",
+                    response_json_schema=PricePrediction.model_json_schema(),
                     temperature=0.2,  # Low for consistent, reliable predictions
-                    max_output_tokens=800
+                    max_output_tokens=1024
                 )
             )
-            prediction = self._parse_prediction_response(response.text, current_price)
+            result = PricePrediction.model_validate_json(response.text)
+            prediction = self._prediction_from_schema(result, current_price)
             
             # Add weather and market data to prediction
             prediction['weather_data'] = weather_data
@@ -501,99 +602,210 @@ Now generate prediction for {crop_name}:"""
                 'message': 'Unable to generate price prediction'
             }
     
-    def _parse_prediction_response(self, response_text, current_price):
-        """Parse AI's prediction response into structured data."""
-        
-        lines = response_text.strip().split('\n')
-        prediction = {
+    def _prediction_from_schema(self, result, current_price):
+        """Turn a validated PricePrediction into the prediction dict used by the UI."""
+        return {
             'success': True,
             'current_price': current_price,
-            'predictions': {},
-            'trend': 'STABLE',
-            'confidence': 'MEDIUM',
-            'peak_day': 30,
-            'lowest_day': 1,
-            'key_factors': [],
-            'recommendation': '',
-            'raw_response': response_text
+            'predictions': {
+                'day_7': result.day_7_price,
+                'day_15': result.day_15_price,
+                'day_30': result.day_30_price
+            },
+            'trend': result.trend,
+            'confidence': result.confidence,
+            'peak_day': result.peak_day,
+            'lowest_day': result.lowest_day,
+            'key_factors': result.key_factors[:5],
+            'recommendation': result.recommendation,
+            'price_change_30d': round(((result.day_30_price - current_price) / current_price) * 100, 2) if current_price else 0.0,
+            'engine': 'ai',
+            'structured': result.model_dump()
         }
+    
+    def predict_batch(self, requests_list, days_ahead=30, max_workers=4, use_local_model=True):
+        """
+        Predict prices for many crops/markets in one call.
         
-        for line in lines:
-            line = line.strip()
-            
-            if line.startswith('DAY_7_PRICE:'):
-                price = self._extract_price(line)
-                prediction['predictions']['day_7'] = price
-            
-            elif line.startswith('DAY_15_PRICE:'):
-                price = self._extract_price(line)
-                prediction['predictions']['day_15'] = price
-            
-            elif line.startswith('DAY_30_PRICE:'):
-                price = self._extract_price(line)
-                prediction['predictions']['day_30'] = price
-            
-            elif line.startswith('TREND:'):
-                trend = line.split(':', 1)[1].strip().upper()
-                if trend in ['UPWARD', 'DOWNWARD', 'STABLE']:
-                    prediction['trend'] = trend
-            
-            elif line.startswith('CONFIDENCE:'):
-                confidence = line.split(':', 1)[1].strip().upper()
-                if confidence in ['HIGH', 'MEDIUM', 'LOW']:
-                    prediction['confidence'] = confidence
-            
-            elif line.startswith('PEAK_DAY:'):
-                try:
-                    peak = int(self._extract_number(line))
-                    prediction['peak_day'] = peak
-                except:
-                    pass
-            
-            elif line.startswith('LOWEST_DAY:'):
-                try:
-                    lowest = int(self._extract_number(line))
-                    prediction['lowest_day'] = lowest
-                except:
-                    pass
-            
-            elif line.startswith('KEY_FACTORS:'):
-                # Next few lines are factors
-                continue
-            
-            elif line.startswith('-') or line.startswith('•'):
-                # Factor bullet point
-                factor = line.lstrip('-•').strip()
-                if factor and len(prediction['key_factors']) < 5:
-                    prediction['key_factors'].append(factor)
-            
-            elif line.startswith('RECOMMENDATION:'):
-                prediction['recommendation'] = line.split(':', 1)[1].strip()
+        Identical requests are answered once, cached and local-model answers need no
+        network, and the remaining requests share one weather lookup per location and
+        one market digest read per (crop, location) before AI predictions run with at
+        most max_workers calls in flight.
         
-        # Calculate price change percentages
-        if 'day_30' in prediction['predictions']:
-            prediction['price_change_30d'] = round(
-                ((prediction['predictions']['day_30'] - current_price) / current_price) * 100, 2
-            )
+        Args:
+            requests_list: Iterable of dicts with crop_name, location and current_price
+                (current_price may be None to use the latest recorded mandi price)
+            days_ahead: Number of days to predict ahead (default: 30)
+            max_workers: Maximum concurrent network/AI calls (default: 4)
+            use_local_model: Try the local forecasting engine first (default: True)
         
-        return prediction
+        Returns:
+            DataFrame with one row per request (in input order) and the full
+            prediction dict in the 'prediction' column
+        """
+        rows = []
+        latest_prices = {}
+        for req in requests_list:
+            location = req.get('location') or "India"
+            current_price = req.get('current_price')
+            if current_price is None:
+                # Many alerts share a crop and location: one price lookup each
+                price_key = (req['crop_name'].strip().lower(), location.strip().lower())
+                if price_key not in latest_prices:
+                    latest_prices[price_key] = self.forecaster.latest_price(req['crop_name'], location)
+                current_price = latest_prices[price_key]
+            rows.append({
+                'crop_name': req['crop_name'],
+                'location': location,
+                'current_price': current_price,
+                'key': (req['crop_name'].strip().lower(), location.strip().lower(), current_price)
+            })
+        
+        results = {}
+        pending = {}
+        for row in rows:
+            key = row['key']
+            if key in results or key in pending:
+                continue
+            if row['current_price'] is None:
+                results[key] = {'success': False, 'message': 'No current price available',
+                                'error': 'missing current_price'}
+                continue
+            prediction = self._predict_without_search(row['crop_name'], row['current_price'],
+                                                      row['location'], use_local_model)
+            if prediction:
+                results[key] = prediction
+            else:
+                pending[key] = row
+        
+        if pending:
+            locations = {row['location'] for row in pending.values()}
+            searches = {(row['crop_name'], row['location']) for row in pending.values()}
+            print(f"📦 Batch: {len(pending)} AI predictions, {len(locations)} weather lookups, "
+                  f"{len(searches)} market digests")
+            
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                weather_futures = {loc: pool.submit(self.get_weather_data, loc) for loc in locations}
+                news_futures = {pair: pool.submit(self.get_market_digest, *pair) for pair in searches}
+                weather_by_location = {loc: f.result() for loc, f in weather_futures.items()}
+                news_by_pair = {pair: f.result() for pair, f in news_futures.items()}
+                
+                prediction_futures = {
+                    key: pool.submit(
+                        self._predict_with_ai, row['crop_name'], row['current_price'], row['location'],
+                        days_ahead, weather_by_location[row['location']],
+                        news_by_pair[(row['crop_name'], row['location'])]
+                    )
+                    for key, row in pending.items()
+                }
+                for key, future in prediction_futures.items():
+                    try:
+                        results[key] = future.result()
+                    except Exception as e:
+                        results[key] = {'success': False, 'error': str(e),
+                                        'message': 'Unable to generate price prediction'}
+        
+        table = []
+        for row in rows:
+            prediction = results[row['key']]
+            predictions = prediction.get('predictions', {})
+            table.append({
+                'crop_name': row['crop_name'],
+                'location': row['location'],
+                'current_price': row['current_price'],
+                'success': prediction.get('success', False),
+                'engine': prediction.get('engine', 'ai') if prediction.get('success') else None,
+                'day_7': predictions.get('day_7'),
+                'day_15': predictions.get('day_15'),
+                'day_30': predictions.get('day_30'),
+                'trend': prediction.get('trend'),
+                'confidence': prediction.get('confidence'),
+                'recommendation': prediction.get('recommendation'),
+                'error': prediction.get('error'),
+                'prediction': prediction
+            })
+        
+        return pd.DataFrame(table)
     
-    def _extract_price(self, text):
-        """Extract numeric price from text."""
-        import re
-        # Find numbers in the text
-        numbers = re.findall(r'[\d,]+\.?\d*', text.replace('₹', '').replace(',', ''))
-        if numbers:
-            return float(numbers[0])
-        return 0.0
+    def _build_local_prediction(self, forecast, current_price):
+        """Shape a local engine forecast like an AI prediction for the UI."""
+        horizons = forecast['forecasts']
+        predictions = {key: value['price'] for key, value in horizons.items()}
+        intervals = {key: {'low': value['low'], 'high': value['high']} for key, value in horizons.items()}
+        
+        day_30 = predictions['day_30']
+        change_30d = ((day_30 - current_price) / current_price) * 100 if current_price else 0.0
+        if change_30d > 3:
+            trend = 'UPWARD'
+        elif change_30d < -3:
+            trend = 'DOWNWARD'
+        else:
+            trend = 'STABLE'
+        
+        # Average 80% interval width relative to price decides confidence
+        widths = [(v['high'] - v['low']) / v['price'] for v in horizons.values() if v['price']]
+        avg_width = sum(widths) / len(widths) if widths else 1.0
+        confidence = 'HIGH' if avg_width < 0.10 else 'MEDIUM' if avg_width < 0.25 else 'LOW'
+        
+        path = {1: current_price}
+        path.update({int(key.split('_')[1]): price for key, price in predictions.items()})
+        peak_day = max(path, key=path.get)
+        lowest_day = min(path, key=path.get)
+        
+        market_label = 'all markets' if forecast['market'] == '*' else forecast['market']
+        key_factors = [
+            f"History: {forecast['n_observations']} days of {market_label} mandi prices up to {forecast['as_of']}",
+            f"Latest mandi modal price: ₹{forecast['last_mandi_price']:.2f} per quintal",
+            f"Day 7 range (80%): ₹{intervals['day_7']['low']:.0f} - ₹{intervals['day_7']['high']:.0f}",
+            f"Day 30 range (80%): ₹{intervals['day_30']['low']:.0f} - ₹{intervals['day_30']['high']:.0f}",
+        ]
+        
+        if trend == 'UPWARD':
+            recommendation = (f"Prices are expected to rise about {change_30d:.1f}% over 30 days. "
+                              f"If you can store safely, consider holding part of your crop until around day {peak_day}.")
+        elif trend == 'DOWNWARD':
+            recommendation = (f"Prices are expected to fall about {abs(change_30d):.1f}% over 30 days. "
+                              f"Selling soon is safer than waiting.")
+        else:
+            recommendation = "Prices are expected to stay steady. Sell when it suits your cash needs and storage."
+        
+        return {
+            'success': True,
+            'current_price': current_price,
+            'predictions': predictions,
+            'intervals': intervals,
+            'trend': trend,
+            'confidence': confidence,
+            'peak_day': peak_day,
+            'lowest_day': lowest_day,
+            'key_factors': key_factors,
+            'recommendation': recommendation,
+            'price_change_30d': round(change_30d, 2),
+            'engine': 'local',
+            'forecast': forecast,
+            'cached': False,
+            'generated_at': datetime.now().isoformat()
+        }
     
-    def _extract_number(self, text):
-        """Extract first number from text."""
-        import re
-        numbers = re.findall(r'\d+', text)
-        if numbers:
-            return numbers[0]
-        return '0'
+    def _narrate_local_forecast(self, crop_name, location, prediction):
+        """Ask AI for a short farmer-friendly recommendation about a local forecast."""
+        intervals = prediction['intervals']
+        prompt = f"""Write a 2-3 sentence selling recommendation for an Indian farmer.
+Crop: {crop_name}, Location: {location}
+Current price: ₹{prediction['current_price']} per quintal
+Forecast (80% range): Day 7 ₹{prediction['predictions']['day_7']} ({intervals['day_7']['low']}-{intervals['day_7']['high']}), Day 15 ₹{prediction['predictions']['day_15']} ({intervals['day_15']['low']}-{intervals['day_15']['high']}), Day 30 ₹{prediction['predictions']['day_30']} ({intervals['day_30']['low']}-{intervals['day_30']['high']})
+Trend: {prediction['trend']}, Confidence: {prediction['confidence']}
+Give a specific action and one risk. Plain text only."""
+        try:
+            response = self.client.models.generate_content(
+                model=self.model,
+                contents=prompt,
+                config=types.GenerateContentConfig(temperature=0.3, max_output_tokens=200)
+            )
+            return response.text.strip()
+        except Exception as e:
+            print(f"Forecast narrative unavailable: {str(e)}")
+            return None
     
     def get_best_selling_time(self, crop_name, current_price, harvest_date=None):
         """
@@ -649,24 +861,8 @@ Evaluate 5 key timing factors:
    - Trade-off: Immediate cash vs waiting for better price
    - Partial sale strategy to balance both needs
 
-RESPONSE FORMAT (use exact structure):
-
-BEST_MONTH: [specific month name]
-BEST_REASON: [2-3 clear sentences with specific data/percentages why this month is optimal]
-
-SELL_NOW_SCORE: [0-10 numeric score]
-WAIT_SCORE: [0-10 numeric score]
-
-STORAGE_ADVICE: [Specific practical steps: temperature, humidity, pest control, duration limit]
-EXPECTED_PEAK_PRICE: ₹[specific amount] per quintal
-
-RISK_FACTORS:
-- Risk 1: [Specific risk with probability/impact]
-- Risk 2: [Specific risk with timing]
-- Risk 3: [Specific risk with mitigation]
-
-ACTION: [Choose one: SELL_NOW / WAIT_FOR_BETTER_PRICE / SELL_PARTIALLY]
-TIMELINE: [Precise recommendation: "Sell 60% now, hold 40% until [specific date/event]" OR "Wait until [specific month/week] for [specific reason]"]
+OUTPUT:
+Fill every field of the response schema. Prices are ₹ per quintal.
 
 Consider farmer's real constraints: storage costs, cash urgency, perishability.
 Be specific with dates, percentages, and monetary estimates."""
@@ -674,10 +870,27 @@ Be specific with dates, percentages, and monetary estimates."""
         try:
             response = self.client.models.generate_content(
                 model=self.model,
-                contents=prompt
+                contents=prompt,
+                config=types.GenerateContentConfig(
+                    response_mime_type="application/json",
+                    response_json_schema=SellingAdvice.model_json_schema(),
+                    temperature=0.2
+                )
             )
-            advice = self._parse_selling_advice(response.text)
-            return advice
+            result = SellingAdvice.model_validate_json(response.text)
+            return {
+                'success': True,
+                'best_month': result.best_month,
+                'reason': result.best_reason,
+                'sell_now_score': result.sell_now_score,
+                'wait_score': result.wait_score,
+                'storage_advice': result.storage_advice,
+                'expected_peak_price': result.expected_peak_price,
+                'risk_factors': result.risk_factors[:5],
+                'action': result.action,
+                'timeline': result.timeline,
+                'structured': result.model_dump()
+            }
         except Exception as e:
             return {
                 'success': False,
@@ -685,71 +898,6 @@ Be specific with dates, percentages, and monetary estimates."""
                 'message': 'Unable to generate selling advice'
             }
     
-    def _parse_selling_advice(self, response_text):
-        """Parse selling time advice from AI response."""
-        
-        lines = response_text.strip().split('\n')
-        advice = {
-            'success': True,
-            'best_month': '',
-            'reason': '',
-            'sell_now_score': 5,
-            'wait_score': 5,
-            'storage_advice': '',
-            'expected_peak_price': 0.0,
-            'risk_factors': [],
-            'action': 'WAIT_FOR_BETTER_PRICE',
-            'timeline': '',
-            'raw_response': response_text
-        }
-        
-        for line in lines:
-            line = line.strip()
-            
-            if line.startswith('BEST_MONTH:'):
-                advice['best_month'] = line.split(':', 1)[1].strip()
-            
-            elif line.startswith('BEST_REASON:'):
-                advice['reason'] = line.split(':', 1)[1].strip()
-            
-            elif line.startswith('SELL_NOW_SCORE:'):
-                try:
-                    score = int(self._extract_number(line))
-                    advice['sell_now_score'] = min(10, max(0, score))
-                except:
-                    pass
-            
-            elif line.startswith('WAIT_SCORE:'):
-                try:
-                    score = int(self._extract_number(line))
-                    advice['wait_score'] = min(10, max(0, score))
-                except:
-                    pass
-            
-            elif line.startswith('STORAGE_ADVICE:'):
-                advice['storage_advice'] = line.split(':', 1)[1].strip()
-            
-            elif line.startswith('EXPECTED_PEAK_PRICE:'):
-                advice['expected_peak_price'] = self._extract_price(line)
-            
-            elif line.startswith('RISK_FACTORS:'):
-                continue
-            
-            elif line.startswith('-') or line.startswith('•'):
-                factor = line.lstrip('-•').strip()
-                if factor and len(advice['risk_factors']) < 5:
-                    advice['risk_factors'].append(factor)
-            
-            elif line.startswith('ACTION:'):
-                action = line.split(':', 1)[1].strip().upper()
-                if action in ['SELL_NOW', 'WAIT_FOR_BETTER_PRICE', 'SELL_PARTIALLY']:
-                    advice['action'] = action
-            
-            elif line.startswith('TIMELINE:'):
-                advice['timeline'] = line.split(':', 1)[1].strip()
-        
-        return advice
-    
     def calculate_profit(self, crop_name, expected_price, actual_price, quantity, unit="quintal"):
         """
         Calculate profit/loss comparing expected vs actual prices.
@@ -789,39 +937,29 @@ Variance: {profit_percentage:.2f}%
 TASK:
 Evaluate this transaction and provide learning insights for future sales.
 
-OUTPUT FORMAT (exact structure required):
-
-VERDICT: [Choose one: EXCELLENT_DEAL / GOOD_DEAL / FAIR_DEAL / POOR_DEAL / SIGNIFICANT_LOSS]
-
-ANALYSIS: [2-3 sentences explaining: Did farmer time the market well? Was price above/below regional average? What was the market context?]
-
-MARKET_CONTEXT: [1-2 sentences: What was happening in market - harvest season/festival demand/weather impact/policy change that affected this price?]
-
-LEARNING: [One specific, actionable lesson for next transaction - e.g., "Wait for festival demand in October" or "Sell 50% early, hold 50% for monsoon shortage"]
+OUTPUT:
+Fill every field of the response schema.
+- verdict: EXCELLENT_DEAL / GOOD_DEAL / FAIR_DEAL / POOR_DEAL / SIGNIFICANT_LOSS
+- market_context: harvest season/festival demand/weather impact/policy change that affected this price
+- learning: e.g. "Wait for festival demand in October" or "Sell 50% early, hold 50% for monsoon shortage"
 
 Be constructive and educational, not judgmental. Focus on decisions farmer can control."""
 
         try:
             response = self.client.models.generate_content(
                 model=self.model,
-                contents=prompt
+                contents=prompt,
+                config=types.GenerateContentConfig(
+                    response_mime_type="application/json",
+                    response_json_schema=ProfitAnalysis.model_json_schema(),
+                    temperature=0.2
+                )
             )
-            analysis_lines = response.text.strip().split('\n')
-            
-            verdict = 'FAIR_DEAL'
-            analysis = ''
-            market_context = ''
-            learning = ''
-            
-            for line in analysis_lines:
-                if line.startswith('VERDICT:'):
-                    verdict = line.split(':', 1)[1].strip()
-                elif line.startswith('ANALYSIS:'):
-                    analysis = line.split(':', 1)[1].strip()
-                elif line.startswith('MARKET_CONTEXT:'):
-                    market_context = line.split(':', 1)[1].strip()
-                elif line.startswith('LEARNING:'):
-                    learning = line.split(':', 1)[1].strip()
+            result = ProfitAnalysis.model_validate_json(response.text)
+            verdict = result.verdict
+            analysis = result.analysis
+            market_context = result.market_context
+            learning = result.learning
             
         except:
             verdict = 'GOOD_DEAL' if profit_loss >= 0 else 'LOSS'
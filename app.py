@@ -1,6 +1,5 @@
 import streamlit as st
 import pandas as pd
-from datetime import date
 from dotenv import load_dotenv
 import os
 
@@ -13,32 +12,15 @@ if os.getenv("STREAMLIT_RUNTIME") is None:
 # ----------------------------------------
 # --- 0. MODULE IMPORTS ---
 # ----------------------------------------
-from database.db_functions import (
-    init_db, get_data, add_data, get_farmer_profile, verify_farmer_login,
-    get_onboarding_progress, update_onboarding_progress
-)
-from components.auth_page import render_auth_page
-from components.home_page import render_home_page, render_db_check
-from components.tool_listings import render_tool_listing, render_tool_management
-from components.crop_listings import render_crop_listing, render_crop_management
-from components.labor_board import render_labor_board
-from components.profiles_page import render_profiles_page
-from components.view_profile_page import render_view_profile_page
-from components.weather_component import render_weather_component
-from components.market_price_scraper import render_market_price
-from components.simple_price_advisor import render_simple_price_advisor
-from components.cache_admin_page import render_cache_admin_page
-from components.government_schemes_page import render_government_schemes_page
-from components.simple_finance_page import render_simple_finance_page
+# Only the shell every page needs is imported here; page modules (and the
+# AI/speech/scraping SDKs they pull in) load on first visit via page_registry.
+from database.db_functions import init_db, get_dataset
+from database import tracing
 from components.translation_utils import render_language_selector, t
 from components.pwa_component import inject_pwa_code
-from components.offline_manager import render_offline_status
 from components.performance_optimizer import init_performance_optimizations
 from components.notification_manager import init_notifications
-from components.voice_chatbot import render_voice_chatbot
-from calender.calendar_component import render_calendar
-from calender.config import TRANSLATIONS
-from calender.utils import get_events_for_date
+from components import page_registry
 
 # ----------------------------------------
 # --- CONFIGURATION AND SETUP ---
@@ -263,9 +245,10 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# 4. Persistent Database Loading
-st.session_state.tools = get_data("tools")
-st.session_state.crops = get_data("crops")
+# 4. Listings: one shared, read-only frame per table for all sessions,
+# re-read only after a write
+st.session_state.tools = get_dataset("tools")
+st.session_state.crops = get_dataset("crops")
 
 
 # ----------------------------------------
@@ -274,6 +257,7 @@ st.session_state.crops = get_data("crops")
 # Check if user is logged in
 if 'logged_in' not in st.session_state or not st.session_state.logged_in:
     # Show authentication page
+    from components.auth_page import render_auth_page
     render_auth_page()
     st.stop()  # Stop execution here if not logged in
 
@@ -349,7 +333,8 @@ else:
         ("👨‍💼 ADMIN TOOLS", [
             "👥 Manage Farmers", 
             "🗄️ Database Viewer", 
-            "💾 Cache Management"
+            "💾 Cache Management",
+            "⏱️ Page Performance"
         ]),
         ("🛍️ MARKETPLACE", [
             "🛍️ Browse Listings",
@@ -484,170 +469,127 @@ st.markdown("---")
 # --- PAGE ROUTING ---
 # ----------------------------------------
 
-if menu == "🏠 Home":
-    render_home_page()
-
-elif menu == "👤 My Profile":
-    render_view_profile_page()
+# Each rerun of the selected page is traced (sampled) for the page
+# performance dashboard; an admin can ask for one rerun to be profiled
+profile_rerun = st.session_state.get("profile_page") == menu
 
-elif menu == "📦 My Listings":
-    st.header("📦 My Listings")
-    st.markdown("View and manage all your listings in one place")
+with tracing.trace_rerun(menu, profile=profile_rerun):
+    if menu == "📦 My Listings":
+        st.header("📦 My Listings")
+        st.markdown("View and manage all your listings in one place")
     
-    farmer_name = st.session_state.get("farmer_name", "")
-    tools_df = st.session_state.get('tools', pd.DataFrame())
-    crops_df = st.session_state.get('crops', pd.DataFrame())
+        farmer_name = st.session_state.get("farmer_name", "")
+        tools_df = st.session_state.get('tools', pd.DataFrame())
+        crops_df = st.session_state.get('crops', pd.DataFrame())
     
-    # Filter only user's listings (database uses 'Farmer' column, not 'owner')
-    if not tools_df.empty and 'Farmer' in tools_df.columns:
-        my_tools = tools_df[tools_df['Farmer'] == farmer_name]
-    else:
-        my_tools = pd.DataFrame()
+        # Filter only user's listings (database uses 'Farmer' column, not 'owner')
+        if not tools_df.empty and 'Farmer' in tools_df.columns:
+            my_tools = tools_df[tools_df['Farmer'] == farmer_name]
+        else:
+            my_tools = pd.DataFrame()
     
-    if not crops_df.empty and 'Farmer' in crops_df.columns:
-        my_crops = crops_df[crops_df['Farmer'] == farmer_name]
-    else:
-        my_crops = pd.DataFrame()
+        if not crops_df.empty and 'Farmer' in crops_df.columns:
+            my_crops = crops_df[crops_df['Farmer'] == farmer_name]
+        else:
+            my_crops = pd.DataFrame()
     
-    tab1, tab2 = st.tabs(["🔧 My Tools", "🌾 My Crops"])
+        tab1, tab2 = st.tabs(["🔧 My Tools", "🌾 My Crops"])
     
-    with tab1:
-        if not my_tools.empty:
-            st.dataframe(my_tools, width="stretch")
-            st.success(f"✅ You have {len(my_tools)} tool(s) listed")
-        else:
-            st.info("📝 You haven't listed any tools yet.")
-            if st.button("➕ List Your First Tool"):
-                # Add to navigation history
-                if not st.session_state.nav_history or st.session_state.nav_history[-1] != st.session_state.selected_menu:
-                    st.session_state.nav_history.append(st.session_state.selected_menu)
-                st.session_state.nav_forward = []
-                st.session_state.selected_menu = "➕ Post Listing"
-                st.rerun()
+        with tab1:
+            if not my_tools.empty:
+                st.dataframe(my_tools, width="stretch")
+                st.success(f"✅ You have {len(my_tools)} tool(s) listed")
+            else:
+                st.info("📝 You haven't listed any tools yet.")
+                if st.button("➕ List Your First Tool"):
+                    # Add to navigation history
+                    if not st.session_state.nav_history or st.session_state.nav_history[-1] != st.session_state.selected_menu:
+                        st.session_state.nav_history.append(st.session_state.selected_menu)
+                    st.session_state.nav_forward = []
+                    st.session_state.selected_menu = "➕ Post Listing"
+                    st.rerun()
     
-    with tab2:
-        if not my_crops.empty:
-            st.dataframe(my_crops, width="stretch")
-            st.success(f"✅ You have {len(my_crops)} crop(s) listed")
-        else:
-            st.info("📝 You haven't listed any crops yet.")
-            if st.button("➕ List Your First Crop"):
-                # Add to navigation history
-                if not st.session_state.nav_history or st.session_state.nav_history[-1] != st.session_state.selected_menu:
-                    st.session_state.nav_history.append(st.session_state.selected_menu)
-                st.session_state.nav_forward = []
-                st.session_state.selected_menu = "➕ Post Listing"
-                st.rerun()
-
-elif menu == "👷 Worker Board":
-    render_labor_board()
-
-elif menu == "🛍️ Browse Listings":
-    # Check if showing detail view
-    if st.session_state.get('show_listing_detail', False) and st.session_state.get('selected_listing'):
-        from components.listing_detail_page import render_listing_detail
+        with tab2:
+            if not my_crops.empty:
+                st.dataframe(my_crops, width="stretch")
+                st.success(f"✅ You have {len(my_crops)} crop(s) listed")
+            else:
+                st.info("📝 You haven't listed any crops yet.")
+                if st.button("➕ List Your First Crop"):
+                    # Add to navigation history
+                    if not st.session_state.nav_history or st.session_state.nav_history[-1] != st.session_state.selected_menu:
+                        st.session_state.nav_history.append(st.session_state.selected_menu)
+                    st.session_state.nav_forward = []
+                    st.session_state.selected_menu = "➕ Post Listing"
+                    st.rerun()
+
+    elif menu == "🛍️ Browse Listings":
+        # Check if showing detail view
+        if st.session_state.get('show_listing_detail', False) and st.session_state.get('selected_listing'):
+            from components.listing_detail_page import render_listing_detail
         
-        listing_info = st.session_state.selected_listing
-        render_listing_detail(listing_info['type'], listing_info['data'])
+            listing_info = st.session_state.selected_listing
+            render_listing_detail(listing_info['type'], listing_info['data'])
         
-        # Reset detail view flag when done
-        if st.button("⬅️ Back to Listings", key="back_to_listings"):
-            st.session_state.show_listing_detail = False
-            st.session_state.selected_listing = None
-            st.rerun()
-    else:
-        st.header("🛍️ Browse Marketplace")
-        st.markdown("Explore tools and crops available in your area")
+            # Reset detail view flag when done
+            if st.button("⬅️ Back to Listings", key="back_to_listings"):
+                st.session_state.show_listing_detail = False
+                st.session_state.selected_listing = None
+                st.rerun()
+        else:
+            st.header("🛍️ Browse Marketplace")
+            st.markdown("Explore tools and crops available in your area")
         
-        tab1, tab2 = st.tabs(["🔧 Tools for Rent", "🌾 Crops for Sale"])
+            render_tool_management = page_registry.load("components.tool_listings:render_tool_management")
+            render_crop_management = page_registry.load("components.crop_listings:render_crop_management")
         
-        with tab1:
-            render_tool_management(st.session_state.tools, st.session_state.get("farmer_name", None))
-        with tab2:
-            render_crop_management(st.session_state.crops, st.session_state.get("farmer_name", None))
-
-elif menu == "➕ Create New Listing" or menu == "➕ Post Listing":
-    st.header("➕ Create a New Listing")
-    st.markdown("List your tools or crops to connect with other farmers")
+            tab1, tab2 = st.tabs(["🔧 Tools for Rent", "🌾 Crops for Sale"])
+        
+            with tab1:
+                render_tool_management(st.session_state.tools, st.session_state.get("farmer_name", None))
+            with tab2:
+                render_crop_management(st.session_state.crops, st.session_state.get("farmer_name", None))
+
+    elif menu == "➕ Create New Listing" or menu == "➕ Post Listing":
+        st.header("➕ Create a New Listing")
+        st.markdown("List your tools or crops to connect with other farmers")
     
-    tab_tool, tab_crop = st.tabs(["🔧 List a Tool", "🌾 List a Crop"])
+        render_tool_listing = page_registry.load("components.tool_listings:render_tool_listing")
+        render_crop_listing = page_registry.load("components.crop_listings:render_crop_listing")
     
-    with tab_tool:
-        render_tool_listing(st.session_state.get("farmer_name", ""))
-    with tab_crop:
-        render_crop_listing(st.session_state.get("farmer_name", ""))
-
-elif menu == "🎤 Voice Listing (NEW)":
-    from components.voice_listing_creator import render_voice_listing_creator
-    render_voice_listing_creator(st.session_state.get("farmer_name", ""))
-
-elif menu == "📅 Farming Calendar" or menu == "📅 My Calendar":
-    from components.calendar_integration import render_integrated_calendar
+        tab_tool, tab_crop = st.tabs(["🔧 List a Tool", "🌾 List a Crop"])
     
-    if st.session_state.get("logged_in") and st.session_state.get("farmer_name"):
-        render_integrated_calendar(st.session_state.farmer_name)
-    else:
-        st.warning("⚠️ Please login as a Farmer to access the calendar feature.")
-        st.info("💡 The calendar integrates with your profile location to show weather alerts and forecasts.")
-
-elif menu == "🌤️ Weather Forecast":
-    render_weather_component()
-
-elif menu == "💰 Market Prices" or menu == "💰 Today's Market Price":
-    render_market_price()
-
-elif menu == "🤖 AI Price Prediction" or menu == "🤔 Should I Sell?":
-    render_simple_price_advisor()
-
-elif menu == "🌡️ Climate Risk Dashboard":
-    from components.climate_risk_dashboard import render_climate_risk_dashboard
-    render_climate_risk_dashboard()
-
-elif menu == "🌾 Climate-Smart Crops":
-    from components.climate_smart_crops import render_climate_smart_crops
-    render_climate_smart_crops()
+        with tab_tool:
+            render_tool_listing(st.session_state.get("farmer_name", ""))
+        with tab_crop:
+            render_crop_listing(st.session_state.get("farmer_name", ""))
 
-elif menu == "💧 Water & Carbon Tracker":
-    from components.sustainability_tracker import render_sustainability_tracker
-    render_sustainability_tracker()
+    elif menu == "🎤 Voice Listing (NEW)":
+        from components.voice_listing_creator import render_voice_listing_creator
+        render_voice_listing_creator(st.session_state.get("farmer_name", ""))
 
-elif menu == "🗺️ Nearby Places & Services":
-    from components.location_services_page import render_location_services_page
-    render_location_services_page()
-
-elif menu == "👥 Manage Farmers":
-    render_profiles_page()
-
-elif menu == "🗄️ Database Viewer":
-    render_db_check()
-
-elif menu == "💾 Cache Management":
-    render_cache_admin_page()
-
-elif menu == "🏛️ Government Schemes":
-    render_government_schemes_page()
-
-elif menu == "🏛️ Schemes & Financial Tools":
-    render_government_schemes_page()
-
-elif menu == "💰 Farm Finance Management" or menu == "💰 My Money Diary":
-    render_simple_finance_page()
+    elif menu == "📅 Farming Calendar" or menu == "📅 My Calendar":
+        from components.calendar_integration import render_integrated_calendar
+    
+        if st.session_state.get("logged_in") and st.session_state.get("farmer_name"):
+            render_integrated_calendar(st.session_state.farmer_name)
+        else:
+            st.warning("⚠️ Please login as a Farmer to access the calendar feature.")
+            st.info("💡 The calendar integrates with your profile location to show weather alerts and forecasts.")
 
-elif menu == "🤖 AI Chatbot":
-    from components.ai_chatbot_page import render_ai_chatbot_page
-    render_ai_chatbot_page()
+    # Voice Assistant removed due to microphone compatibility issues
+    # elif menu == "🎤 Voice Assistant":
+    #     from components.voice_assistant import render_voice_assistant_page
+    #     render_voice_assistant_page()
 
-elif menu == "🗣️ Ask Advisor":
-    render_voice_chatbot()
+    else:
+        # Single-function pages, imported on first visit
+        page_registry.render_page(menu)
 
-# Voice Assistant removed due to microphone compatibility issues
-# elif menu == "🎤 Voice Assistant":
-#     from components.voice_assistant import render_voice_assistant_page
-#     render_voice_assistant_page()
 
-elif menu == "🔔 Notifications & Alerts":
-    from components.notifications_page import render_notifications_page
-    render_notifications_page()
+if profile_rerun:
+    # Reached only when the page finished without st.stop()/st.rerun()
+    st.session_state.profile_page = None
 
 
 # ----------------------------------------
@@ -2,7 +2,7 @@
 
 import streamlit as st
 import calendar as cal
-from calender.utils import localize_number, get_events_for_date, truncate_text
+from calender.utils import localize_number, index_events_by_date, truncate_text
 from calender.config import MONTH_NAMES, DAY_NAMES, TRANSLATIONS
 
 
@@ -231,6 +231,7 @@ def render_calendar(year, month, events, lang):
     st.markdown("<br>", unsafe_allow_html=True)
     
     # Display calendar days
+    events_by_date = index_events_by_date(events)
     has_events = False
     for week_num, week in enumerate(month_calendar):
         cols = st.columns(7)
@@ -238,7 +239,7 @@ def render_calendar(year, month, events, lang):
             if day == 0:
                 cols[i].write("")
             else:
-                day_events = get_events_for_date(events, year, month, day)
+                day_events = events_by_date.get(f"{year}-{month:02d}-{day:02d}", [])
                 day_localized = localize_number(day, lang)
                 
                 with cols[i]:
@@ -1,7 +1,17 @@
 """Translation service using deep-translator"""
 
+import re
+
 from deep_translator import GoogleTranslator
 
+from database import tracing
+
+# Texts are packed into as few requests as possible, separated by a marker
+# the translator leaves alone; requests stay under Google's 5000 char limit
+BATCH_SEPARATOR = "\n###\n"
+BATCH_SPLIT = re.compile(r"\s*###\s*")
+MAX_BATCH_CHARS = 4500
+
 
 class TranslationService:
     """Handle text translation for farming plans"""
@@ -20,31 +30,58 @@ class TranslationService:
             
         try:
             translator = GoogleTranslator(source=source_lang, target=self.language_codes[target_lang])
-            translated = translator.translate(text)
+            with tracing.span('translation', f"{source_lang}->{target_lang}"):
+                translated = translator.translate(text)
             return translated
         except Exception as e:
             print(f"Translation error: {e}")
             return text  # Return original text if translation fails
     
+    def translate_batch(self, texts, target_lang, source_lang='auto'):
+        """Translate a list of texts in as few requests as possible"""
+        results = list(texts)
+        chunks, chunk, size = [], [], 0
+        for idx, text in enumerate(texts):
+            if not text:
+                continue
+            if chunk and size + len(text) + len(BATCH_SEPARATOR) > MAX_BATCH_CHARS:
+                chunks.append(chunk)
+                chunk, size = [], 0
+            chunk.append(idx)
+            size += len(text) + len(BATCH_SEPARATOR)
+        if chunk:
+            chunks.append(chunk)
+        
+        for chunk in chunks:
+            joined = BATCH_SEPARATOR.join(texts[idx] for idx in chunk)
+            parts = BATCH_SPLIT.split(self.translate_text(joined, target_lang, source_lang).strip())
+            if len(parts) != len(chunk):
+                # Separator got mangled - translate this chunk text by text
+                parts = [self.translate_text(texts[idx], target_lang, source_lang) for idx in chunk]
+            for idx, part in zip(chunk, parts):
+                results[idx] = part
+        return results
+    
+    def translate_steps(self, heading, steps, target_lang, source_lang):
+        """Translate a heading and plan steps with one batch, returning (heading, steps)"""
+        texts = [heading] + [field for step in steps for field in (step['title'], step['description'])]
+        translated = self.translate_batch(texts, target_lang, source_lang)
+        translated_steps = [
+            {
+                'step_number': step['step_number'],
+                'title': translated[1 + 2 * idx],
+                'description': translated[2 + 2 * idx]
+            }
+            for idx, step in enumerate(steps)
+        ]
+        return translated[0], translated_steps
+    
     def translate_plan(self, plan_data, target_lang, source_lang='auto'):
         """Translate entire plan data structure"""
         try:
-            # Translate heading
-            translated_plan = {
-                'heading': self.translate_text(plan_data['heading'], target_lang, source_lang),
-                'plan': []
-            }
-            
-            # Translate each step
-            for step in plan_data['plan']:
-                translated_step = {
-                    'step_number': step['step_number'],
-                    'title': self.translate_text(step['title'], target_lang, source_lang),
-                    'description': self.translate_text(step['description'], target_lang, source_lang)
-                }
-                translated_plan['plan'].append(translated_step)
-            
-            return translated_plan
+            heading, steps = self.translate_steps(plan_data['heading'], plan_data['plan'],
+                                                   target_lang, source_lang)
+            return {'heading': heading, 'plan': steps}
         except Exception as e:
             print(f"Plan translation error: {e}")
             return plan_data  # Return original if translation fails
@@ -56,27 +93,16 @@ class TranslationService:
             import copy
             translated_event = copy.deepcopy(event)
             
-            # Translate heading
+            # Translate heading and plan steps together
             if 'extendedProps' in translated_event:
-                translated_event['extendedProps']['heading'] = self.translate_text(
-                    event['extendedProps']['heading'], 
+                heading, translated_steps = self.translate_steps(
+                    event['extendedProps']['heading'],
+                    event['extendedProps']['plan'],
                     target_lang,
                     source_lang
                 )
-                
-                # Translate title
-                translated_event['title'] = f"{translated_event['extendedProps']['heading']} 📝"
-                
-                # Translate plan steps
-                translated_steps = []
-                for step in event['extendedProps']['plan']:
-                    translated_step = {
-                        'step_number': step['step_number'],
-                        'title': self.translate_text(step['title'], target_lang, source_lang),
-                        'description': self.translate_text(step['description'], target_lang, source_lang)
-                    }
-                    translated_steps.append(translated_step)
-                
+                translated_event['extendedProps']['heading'] = heading
+                translated_event['title'] = f"{heading} 📝"
                 translated_event['extendedProps']['plan'] = translated_steps
             
             return translated_event
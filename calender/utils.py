@@ -34,6 +34,14 @@ def get_events_for_date(events, year, month, day):
     return [e for e in events if e["start"].startswith(day_date)]
 
 
+def index_events_by_date(events):
+    """Group events by their 'YYYY-MM-DD' date, so each day cell is one lookup"""
+    by_date = {}
+    for event in events:
+        by_date.setdefault(event["start"][:10], []).append(event)
+    return by_date
+
+
 def truncate_text(text, max_length=15):
     """Truncate text to max length with ellipsis"""
     if len(text) > max_length:
@@ -2,7 +2,7 @@
 
 import streamlit as st
 from datetime import datetime, timedelta
-from calender.utils import localize_number, get_events_for_date
+from calender.utils import localize_number, index_events_by_date
 from calender.config import MONTH_NAMES, DAY_NAMES, TRANSLATIONS
 from weather.combined_forecast import get_weather_forecast
 from database.db_functions import get_farmer_profile
@@ -127,6 +127,7 @@ def render_week_view(year, month, day, events, lang):
     st.divider()
     
     # Display week in columns
+    events_by_date = index_events_by_date(events)
     cols = st.columns(7)
     
     today = datetime.now().date()
@@ -142,7 +143,7 @@ def render_week_view(year, month, day, events, lang):
             
             # Get events for this date
             date_str = date_obj.strftime('%Y-%m-%d')
-            day_events = [e for e in events if e['start'].startswith(date_str)]
+            day_events = events_by_date.get(date_str, [])
             
             # Get weather for this day
             day_weather = weather_dict.get(date_str)
@@ -270,7 +271,7 @@ def render_week_view(year, month, day, events, lang):
     st.divider()
     
     # Week summary
-    total_events = sum(1 for e in events if any(e['start'].startswith(d.strftime('%Y-%m-%d')) for d in week_dates))
+    total_events = sum(len(events_by_date.get(d.strftime('%Y-%m-%d'), [])) for d in week_dates)
     
     if total_events > 0:
         st.info(f"📊 Total events this week: **{total_events}**")
@@ -0,0 +1,270 @@
+# components/asr_backends.py
+"""
+Pluggable Speech Recognition Backends
+Cloud recognition (Google Web Speech through SpeechRecognition) and CPU-only
+local models (Vosk, faster-whisper) behind one interface. Local models are
+loaded once per process. The router picks local or cloud from connectivity
+and each backend's observed latency against the caller's latency budget.
+"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+import socket
+import threading
+import time
+
+import speech_recognition as sr
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# One Vosk model directory per language: models/vosk/en, models/vosk/hi, models/vosk/mr
+VOSK_MODEL_DIR = os.getenv("VOSK_MODEL_DIR", os.path.join(ROOT_DIR, 'models', 'vosk'))
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+
+CONNECTIVITY_TTL_SECONDS = 30
+DEFAULT_LATENCY_BUDGET_SECONDS = 8.0
+# Weight of the newest observation in the running real-time-factor average
+RTF_SMOOTHING = 0.3
+
+LANGUAGE_TAGS = {'en': 'en-IN', 'hi': 'hi-IN', 'mr': 'mr-IN'}
+
+# model key -> loaded model, shared by every session in the process
+_MODELS = {}
+_models_lock = threading.Lock()
+
+_connectivity = {'online': None, 'checked_at': 0.0}
+
+
+def is_online(timeout=1.5):
+    """Cheap connectivity probe, cached for CONNECTIVITY_TTL_SECONDS."""
+    now = time.time()
+    if _connectivity['online'] is not None and now - _connectivity['checked_at'] < CONNECTIVITY_TTL_SECONDS:
+        return _connectivity['online']
+
+    try:
+        socket.create_connection(("www.google.com", 443), timeout=timeout).close()
+        online = True
+    except OSError:
+        online = False
+
+    _connectivity.update(online=online, checked_at=now)
+    return online
+
+
+def _load_model(key, loader):
+    """Load a model once per process."""
+    with _models_lock:
+        if key not in _MODELS:
+            _MODELS[key] = loader()
+        return _MODELS[key]
+
+
+class ASRBackend(ABC):
+    """Base interface: transcribe 16-bit mono PCM to text."""
+
+    name = 'base'
+    is_local = False
+    # Prior estimates used until real timings are observed
+    overhead_seconds = 0.0
+    rtf = 1.0
+
+    def supports(self, language):
+        return language in LANGUAGE_TAGS
+
+    def available(self, language):
+        return self.supports(language)
+
+    @abstractmethod
+    def transcribe(self, raw_pcm, sample_rate, sample_width, language):
+        """Return the recognized text, or None when the speech was not understood."""
+
+    def expected_latency(self, duration_seconds):
+        return self.overhead_seconds + self.rtf * duration_seconds
+
+    def observe(self, elapsed_seconds, duration_seconds):
+        """Fold a measured run into the running real-time factor."""
+        if duration_seconds <= 0:
+            return
+        measured = max(elapsed_seconds - self.overhead_seconds, 0) / duration_seconds
+        self.rtf = (1 - RTF_SMOOTHING) * self.rtf + RTF_SMOOTHING * measured
+
+
+class GoogleWebASR(ASRBackend):
+    """Google Web Speech API through SpeechRecognition (needs network)."""
+
+    name = 'google'
+    overhead_seconds = 1.0
+    rtf = 0.3
+
+    def __init__(self):
+        self.recognizer = sr.Recognizer()
+
+    def available(self, language):
+        return self.supports(language) and is_online()
+
+    def transcribe(self, raw_pcm, sample_rate, sample_width, language):
+        audio = sr.AudioData(raw_pcm, sample_rate, sample_width)
+        try:
+            return self.recognizer.recognize_google(audio, language=LANGUAGE_TAGS[language])
+        except sr.UnknownValueError:
+            return None
+
+
+class VoskASR(ASRBackend):
+    """Offline Kaldi models via Vosk; small models run faster than real time on CPU."""
+
+    name = 'vosk'
+    is_local = True
+    rtf = 0.4
+
+    def __init__(self, model_dir=VOSK_MODEL_DIR):
+        self.model_dir = model_dir
+
+    def _model_path(self, language):
+        return os.path.join(self.model_dir, language)
+
+    def available(self, language):
+        try:
+            import vosk  # noqa: F401
+        except ImportError:
+            return False
+        return self.supports(language) and os.path.isdir(self._model_path(language))
+
+    def transcribe(self, raw_pcm, sample_rate, sample_width, language):
+        import vosk
+        vosk.SetLogLevel(-1)
+        model = _load_model(('vosk', language), lambda: vosk.Model(self._model_path(language)))
+
+        recognizer = vosk.KaldiRecognizer(model, sample_rate)
+        recognizer.AcceptWaveform(raw_pcm)
+        text = json.loads(recognizer.FinalResult()).get('text', '').strip()
+        return text or None
+
+
+class WhisperASR(ASRBackend):
+    """Offline multilingual Whisper through faster-whisper (CTranslate2, int8 on CPU)."""
+
+    name = 'whisper'
+    is_local = True
+    rtf = 0.8
+
+    def __init__(self, model_name=WHISPER_MODEL):
+        self.model_name = model_name
+        self._model_cached = False
+
+    def _model_is_local(self):
+        """True when the model is a local directory or already in the hub cache (no download)."""
+        if not self._model_cached:
+            from faster_whisper.utils import download_model
+            try:
+                self._model_cached = (os.path.isdir(self.model_name) or
+                                      bool(download_model(self.model_name, local_files_only=True)))
+            except Exception:
+                return False
+        return self._model_cached
+
+    def available(self, language):
+        try:
+            import faster_whisper  # noqa: F401
+        except ImportError:
+            return False
+        return self.supports(language) and self._model_is_local()
+
+    def transcribe(self, raw_pcm, sample_rate, sample_width, language):
+        import numpy as np
+        from faster_whisper import WhisperModel
+
+        model = _load_model(('whisper', self.model_name),
+                            lambda: WhisperModel(self.model_name, device='cpu', compute_type='int8',
+                                                 local_files_only=True))
+        samples = np.frombuffer(raw_pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        segments, _ = model.transcribe(samples, language=language, beam_size=1)
+        text = ' '.join(segment.text.strip() for segment in segments).strip()
+        return text or None
+
+
+class ASRRouter:
+    """Chooses a backend per request and falls back when one fails."""
+
+    def __init__(self, backends=None):
+        self.backends = backends if backends is not None else [GoogleWebASR(), VoskASR(), WhisperASR()]
+
+    def candidates(self, language, duration_seconds, latency_budget=DEFAULT_LATENCY_BUDGET_SECONDS):
+        """
+        Usable backends in the order they should be tried.
+
+        Cloud is preferred (better Hindi/Marathi accuracy) when it is reachable
+        and expected to finish within the budget; otherwise the fastest local
+        model goes first.
+        """
+        usable = [b for b in self.backends if b.available(language)]
+        within_budget = [b for b in usable if b.expected_latency(duration_seconds) <= latency_budget]
+        preferred = sorted(within_budget, key=lambda b: (b.is_local, b.expected_latency(duration_seconds)))
+        rest = sorted((b for b in usable if b not in within_budget),
+                      key=lambda b: b.expected_latency(duration_seconds))
+        return preferred + rest
+
+    def transcribe(self, raw_pcm, sample_rate, sample_width, language='en',
+                   latency_budget=DEFAULT_LATENCY_BUDGET_SECONDS):
+        """
+        Transcribe PCM audio with the best available backend.
+
+        Returns:
+            (text or None, backend name or None); (None, None) when no backend
+            is available
+
+        Raises:
+            The last backend's error (e.g. sr.RequestError) when every backend
+            tried failed, so the caller can tell the user why
+        """
+        duration = len(raw_pcm) / float(sample_rate * sample_width)
+
+        last_error = None
+        for backend in self.candidates(language, duration, latency_budget):
+            start = time.perf_counter()
+            try:
+                text = backend.transcribe(raw_pcm, sample_rate, sample_width, language)
+            except Exception as e:
+                # Network dropped mid-request or model failed: try the next one
+                print(f"ASR backend {backend.name} failed: {e}")
+                if not backend.is_local:
+                    _connectivity.update(online=False, checked_at=time.time())
+                last_error = e
+                continue
+            backend.observe(time.perf_counter() - start, duration)
+            return text, backend.name
+
+        if last_error is not None:
+            raise last_error
+        return None, None
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_asr_router():
+    """Process-wide router, so latency estimates and loaded models are shared."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ASRRouter()
+    return _router
+
+
+def word_error_rate(reference, hypothesis):
+    """Word-level Levenshtein distance divided by the reference length."""
+    ref = (reference or '').lower().split()
+    hyp = (hypothesis or '').lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / len(ref)
@@ -0,0 +1,178 @@
+# components/audio_pipeline.py
+"""
+Audio Preprocessing Pipeline
+Shrinks mic recordings before they are sent for transcription: trims leading
+and trailing silence, downmixes to mono 16 kHz 16-bit and optionally encodes
+to Opus or FLAC. Everything happens in memory - no temp files.
+"""
+
+import io
+import shutil
+import subprocess
+from dataclasses import dataclass
+
+from pydub import AudioSegment
+from pydub.silence import detect_leading_silence
+
+TARGET_SAMPLE_RATE = 16000
+TARGET_SAMPLE_WIDTH = 2  # 16-bit PCM
+
+# Silence is anything quieter than the clip's average loudness minus this
+SILENCE_MARGIN_DB = 16
+SILENCE_FLOOR_DBFS = -50.0
+# Speech kept on each side of the detected voice so word edges are not clipped
+KEEP_PADDING_MS = 200
+OPUS_BITRATE = '24k'
+
+CODECS = {
+    # codec -> (ffmpeg args, mime type)
+    'opus': (['-c:a', 'libopus', '-b:a', OPUS_BITRATE, '-application', 'voip', '-f', 'ogg'], 'audio/ogg'),
+    'flac': (['-c:a', 'flac', '-f', 'flac'], 'audio/flac'),
+}
+
+# Leading bytes of the containers browsers record into -> pydub/ffmpeg format name
+MAGIC_FORMATS = (
+    (b'RIFF', 'wav'),
+    (b'\x1aE\xdf\xa3', 'webm'),  # EBML header (WebM / Matroska)
+    (b'OggS', 'ogg'),
+)
+
+
+@dataclass
+class ProcessedAudio:
+    """Result of preprocessing one recording."""
+    data: bytes
+    mime_type: str
+    duration_ms: int
+    sample_rate: int
+    original_bytes: int
+    trimmed_ms: int = 0
+
+    @property
+    def reduction(self) -> float:
+        """How many times smaller the payload is than the original recording."""
+        return self.original_bytes / len(self.data) if self.data else 0.0
+
+
+def _ffmpeg():
+    return shutil.which('ffmpeg') or shutil.which('avconv')
+
+
+def detect_format(audio_bytes):
+    """Container of a recording from its leading bytes, or None if unrecognised."""
+    for magic, fmt in MAGIC_FORMATS:
+        if audio_bytes[:len(magic)] == magic:
+            return fmt
+    return None
+
+
+def load_audio(audio_bytes, fmt=None):
+    """Decode recording bytes into an AudioSegment (format sniffed when not given)."""
+    fmt = fmt or detect_format(audio_bytes)
+    return AudioSegment.from_file(io.BytesIO(audio_bytes), format=fmt)
+
+
+def trim_silence(segment, padding_ms=KEEP_PADDING_MS):
+    """
+    Drop leading and trailing silence (energy-based voice activity detection).
+
+    The threshold follows the clip's own loudness, so quiet phones and loud
+    ones are trimmed alike. A clip that is silent throughout is returned as-is.
+    """
+    if len(segment) == 0 or segment.dBFS == float('-inf'):
+        return segment
+
+    threshold = max(segment.dBFS - SILENCE_MARGIN_DB, SILENCE_FLOOR_DBFS)
+    start = detect_leading_silence(segment, silence_threshold=threshold)
+    end = len(segment) - detect_leading_silence(segment.reverse(), silence_threshold=threshold)
+    if end <= start:
+        return segment
+
+    return segment[max(start - padding_ms, 0):min(end + padding_ms, len(segment))]
+
+
+def normalize_format(segment):
+    """Downmix to mono and resample to 16 kHz 16-bit, what speech models expect."""
+    return (segment.set_channels(1)
+                   .set_frame_rate(TARGET_SAMPLE_RATE)
+                   .set_sample_width(TARGET_SAMPLE_WIDTH))
+
+
+def _to_wav(segment):
+    buffer = io.BytesIO()
+    segment.export(buffer, format='wav')
+    return buffer.getvalue()
+
+
+def _encode(wav_bytes, codec):
+    """Pipe WAV through ffmpeg into the requested codec. Returns None on failure."""
+    ffmpeg = _ffmpeg()
+    if not ffmpeg:
+        return None
+
+    args, _ = CODECS[codec]
+    try:
+        result = subprocess.run(
+            [ffmpeg, '-hide_banner', '-loglevel', 'error', '-f', 'wav', '-i', 'pipe:0', *args, 'pipe:1'],
+            input=wav_bytes, capture_output=True, timeout=30, check=True
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"Audio encode to {codec} failed: {e}")
+        return None
+    return result.stdout or None
+
+
+def preprocess_audio(audio_bytes, codec='opus', trim=True, source_format=None):
+    """
+    Prepare a recording for transcription.
+
+    Args:
+        audio_bytes: Raw recording (WAV, or WebM from mic_recorder's default format)
+        codec: 'opus', 'flac' or 'wav'; falls back to WAV when ffmpeg is missing
+        trim: Remove leading/trailing silence
+        source_format: Container of audio_bytes; detected from the bytes when None
+
+    Returns:
+        ProcessedAudio; the original bytes are passed through if decoding fails
+    """
+    source_format = source_format or detect_format(audio_bytes) or 'wav'
+    try:
+        segment = load_audio(audio_bytes, source_format)
+    except Exception as e:
+        print(f"Audio preprocessing skipped: {e}")
+        return ProcessedAudio(audio_bytes, f'audio/{source_format}', 0, 0, len(audio_bytes))
+
+    original_ms = len(segment)
+    if trim:
+        segment = trim_silence(segment)
+    segment = normalize_format(segment)
+    wav_bytes = _to_wav(segment)
+
+    data, mime_type = wav_bytes, 'audio/wav'
+    if codec in CODECS:
+        encoded = _encode(wav_bytes, codec)
+        if encoded:
+            data, mime_type = encoded, CODECS[codec][1]
+
+    return ProcessedAudio(
+        data=data,
+        mime_type=mime_type,
+        duration_ms=len(segment),
+        sample_rate=TARGET_SAMPLE_RATE,
+        original_bytes=len(audio_bytes),
+        trimmed_ms=original_ms - len(segment)
+    )
+
+
+def preprocess_pcm(audio_bytes, trim=True, source_format=None):
+    """
+    Trimmed mono 16 kHz audio as raw PCM for SpeechRecognition.
+
+    Returns:
+        (raw_pcm_bytes, sample_rate, sample_width)
+    """
+    segment = load_audio(audio_bytes, source_format)
+    if trim:
+        segment = trim_silence(segment)
+    segment = normalize_format(segment)
+    return segment.raw_data, segment.frame_rate, segment.sample_width
@@ -6,7 +6,6 @@ Phase 1: Complete Login & Authentication Overhaul
 
 import streamlit as st
 from database.db_functions import verify_farmer_login, add_data, get_farmer_profile
-from weather.ai_client import AIClient
 from datetime import datetime
 from components.translation_utils import t, render_language_selector
 
@@ -578,6 +577,7 @@ def render_auth_page():
                     if location and location.strip():
                         with st.spinner("🔍 Finding your location..."):
                             try:
+                                from weather.ai_client import AIClient
                                 ai_client = AIClient()
                                 coords = ai_client.get_coordinates_from_google_search(location.strip())
                                 
@@ -688,6 +688,7 @@ def render_auth_page():
                         if st.button("✅ Use These Coordinates to Find My Address", width="stretch", type="primary", key="use_gps_btn"):
                             with st.spinner("🔍 Finding your location address..."):
                                 try:
+                                    from weather.ai_client import AIClient
                                     ai_client = AIClient()
                                     location_info = ai_client.get_location_from_coordinates(
                                         st.session_state.gps_detected_lat, 
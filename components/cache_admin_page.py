@@ -5,7 +5,9 @@ Allows admins to view and manage the prediction cache
 """
 
 import streamlit as st
+import pandas as pd
 from database.cache_manager import CacheManager
+from database import query_stats
 
 def render_cache_admin_page():
     """Render cache administration interface."""
@@ -150,6 +152,10 @@ def render_cache_admin_page():
     
     st.markdown("---")
     
+    render_query_performance(cache.db_path)
+    
+    st.markdown("---")
+    
     # Cache Benefits Info
     st.subheader("💡 Cache System Benefits")
     
@@ -176,3 +182,43 @@ def render_cache_admin_page():
     st.info("💡 **Tip:** Cache is automatically managed. Weather data cached for 6 hours, market prices and predictions for 24 hours.")
 
 
+def render_query_performance(db_path):
+    """Top SQL statements by time in this process, and the slow query log."""
+    st.subheader("🐢 Query Performance")
+    
+    stats = query_stats.get_query_stats(limit=15)
+    if stats:
+        st.markdown("**Top statements by total time** (since the server started)")
+        stats_df = pd.DataFrame([
+            {
+                'Statement': s['statement'][:120],
+                'Module': s['module'],
+                'Calls': s['calls'],
+                'Total ms': s['total_ms'],
+                'Avg ms': s['avg_ms'],
+                'Max ms': s['max_ms'],
+                'Rows': s['rows'],
+                **s['histogram'],
+            }
+            for s in stats
+        ])
+        st.dataframe(stats_df, width="stretch", hide_index=True)
+    else:
+        st.info("No queries recorded yet")
+    
+    slow = query_stats.get_slow_queries(db_path)
+    st.markdown(f"**Slow queries** (over {query_stats.SLOW_QUERY_MS} ms)")
+    if slow:
+        for entry in slow:
+            with st.expander(f"{entry['max_ms']:.0f} ms max · {entry['count']}× · {entry['module']} · "
+                             f"{entry['statement'][:80]}"):
+                st.code(entry['statement'], language="sql")
+                st.caption(f"Avg {entry['avg_ms']} ms · last seen {entry['last_seen']}")
+                if entry['query_plan']:
+                    st.code(entry['query_plan'], language="text")
+    else:
+        st.success("No slow queries logged")
+    
+    if st.button("🔄 Reset Query Statistics", width="stretch"):
+        query_stats.reset_query_stats()
+        st.rerun()
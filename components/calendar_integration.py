@@ -1,8 +1,10 @@
 """Enhanced calendar with weather integration"""
 
 import streamlit as st
-from datetime import datetime, timedelta
-from database.db_functions import get_farmer_profile, add_data, get_farmer_events, delete_event, update_event
+import calendar
+from datetime import date, datetime, timedelta
+from database.db_functions import (get_farmer_profile, add_data, add_calendar_events, get_events_in_range,
+                                   get_event_counts, delete_event, update_event, detach_occurrence)
 from weather.weather_assistant import get_weather_forecast_for_query
 from weather.combined_forecast import get_weather_forecast
 from calender.ai_service import AIService
@@ -25,41 +27,84 @@ def parse_event_date(event_date_str):
         # Just date
         return datetime.strptime(event_date_str, '%Y-%m-%d').date()
 
-def get_weather_for_event(farmer_profile, event_date):
-    """Get weather forecast for a specific date and farmer location"""
+def get_farmer_forecast(farmer_profile):
+    """Daily forecast for the farmer's weather location, or None"""
     if not farmer_profile or 'weather_location' not in farmer_profile:
         return None
     
-    location = farmer_profile['weather_location']
-    lat = farmer_profile.get('latitude')
-    lon = farmer_profile.get('longitude')
-    
     try:
-        # Get forecast for the location
-        forecast = get_weather_forecast(location, lat=lat, lon=lon)
-        
-        if forecast:
-            # Find forecast for the specific date - handle both formats
-            event_date_obj = parse_event_date(event_date) if isinstance(event_date, str) else event_date
-            
-            for day in forecast:
-                if isinstance(day['date'], str):
-                    forecast_date = datetime.strptime(day['date'], '%Y-%m-%d').date()
-                elif isinstance(day['date'], datetime):
-                    forecast_date = day['date'].date()
-                else:
-                    forecast_date = day['date']
-                
-                if forecast_date == event_date_obj:
-                    return {
-                        'temperature': day.get('temperature'),
-                        'rainfall': day.get('rainfall'),
-                        'wind_speed': day.get('wind_speed')
-                    }
+        return get_weather_forecast(farmer_profile['weather_location'],
+                                    lat=farmer_profile.get('latitude'),
+                                    lon=farmer_profile.get('longitude'))
     except Exception as e:
         print(f"Error getting weather for event: {e}")
+        return None
+
+def forecast_by_date(forecast):
+    """Map each forecast day's date to its temperature, rainfall and wind speed"""
+    by_date = {}
+    for day in forecast or []:
+        if isinstance(day['date'], str):
+            forecast_date = datetime.strptime(day['date'], '%Y-%m-%d').date()
+        elif isinstance(day['date'], datetime):
+            forecast_date = day['date'].date()
+        else:
+            forecast_date = day['date']
+        
+        by_date[forecast_date] = {
+            'temperature': day.get('temperature'),
+            'rainfall': day.get('rainfall'),
+            'wind_speed': day.get('wind_speed')
+        }
+    return by_date
+
+def get_weather_for_event(farmer_profile, event_date):
+    """Get weather forecast for a specific date and farmer location"""
+    # Handle both "YYYY-MM-DD" and "YYYY-MM-DD HH:MM"
+    event_date_obj = parse_event_date(event_date) if isinstance(event_date, str) else event_date
+    return forecast_by_date(get_farmer_forecast(farmer_profile)).get(event_date_obj)
+
+def add_plan_to_calendar(farmer_name, farmer_profile, steps, target_lang=None, source_lang='auto'):
+    """
+    Save plan steps as calendar events.
     
-    return None
+    Each stage runs once for the whole plan: one translation batch (when
+    target_lang is given), one forecast lookup for the weather alerts and one
+    executemany insert.
+    
+    Args:
+        steps: dicts with title, description, date (date/datetime) and time ('HH:MM')
+    
+    Returns:
+        Number of events added
+    """
+    if target_lang:
+        from calender.translation_service import TranslationService
+        _, translated = TranslationService().translate_steps(
+            '', [dict(step, step_number=idx) for idx, step in enumerate(steps)], target_lang, source_lang)
+        steps = [dict(step, title=t['title'], description=t['description'])
+                 for step, t in zip(steps, translated)]
+    
+    weather_by_date = forecast_by_date(get_farmer_forecast(farmer_profile))
+    created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    rows = []
+    for step in steps:
+        step_date = step['date'].date() if isinstance(step['date'], datetime) else step['date']
+        rows.append((
+            farmer_name,
+            step_date.strftime('%Y-%m-%d'),
+            step['time'],
+            step['title'],
+            step['description'],
+            create_weather_alert(weather_by_date.get(step_date)),
+            created_at,
+            0,
+            None
+        ))
+    
+    add_calendar_events(rows)
+    return len(rows)
 
 def create_weather_alert(weather_data):
     """Create weather alert message based on weather conditions"""
@@ -93,6 +138,38 @@ def create_weather_alert(weather_data):
     
     return " | ".join(alerts)
 
+def get_view_window(view, year, month, day):
+    """First and last date (inclusive) shown by the month, week or day view."""
+    # Month navigation keeps the old day, which may not exist in the new month
+    day = min(day, calendar.monthrange(year, month)[1])
+    if view == "day":
+        current = date(year, month, day)
+        return current, current
+    if view == "week":
+        current = date(year, month, day)
+        monday = current - timedelta(days=current.weekday())
+        return monday, monday + timedelta(days=6)
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+def to_calendar_events(events):
+    """Convert event rows to the dicts the calendar views render."""
+    calendar_events = []
+    for event in events:
+        event_time = event.get('event_time') or '09:00'
+        calendar_events.append({
+            "id": event['id'],
+            "start": f"{event['event_date']}T{event_time}:00",
+            "extendedProps": {
+                "heading": event['event_title'],
+                "description": event['event_description'],
+                "weather_alert": event.get('weather_alert', ''),
+                "time": event_time,
+                "repeat_every_days": event.get('repeat_every_days') or 0,
+                "series_start": event.get('series_start') or event['event_date']
+            }
+        })
+    return calendar_events
+
 def render_integrated_calendar(farmer_name):
     """Render calendar with weather integration for logged-in farmer"""
     
@@ -187,6 +264,13 @@ def render_integrated_calendar(farmer_name):
                 height=100
             )
             
+            col1, col2 = st.columns(2)
+            with col1:
+                repeat_every = st.number_input("🔁 Repeat every (days, 0 = once)", min_value=0, max_value=365,
+                                               value=0, step=1)
+            with col2:
+                repeat_until = st.date_input("Repeat until", value=None)
+            
             col1, col2 = st.columns(2)
             with col1:
                 submit = st.form_submit_button("✅ Add Task", width="stretch", type="primary")
@@ -207,7 +291,9 @@ def render_integrated_calendar(farmer_name):
                     task_title,
                     task_description,
                     weather_alert,
-                    datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    int(repeat_every),
+                    repeat_until.strftime('%Y-%m-%d') if repeat_every and repeat_until else None
                 )
                 add_data("calendar_events", event_data)
                 st.success(f"✅ Task '{task_title}' added successfully!")
@@ -306,28 +392,7 @@ def render_integrated_calendar(farmer_name):
         col1, col2 = st.columns(2)
         with col1:
             if st.button("📅 Add All to Calendar with Weather Alerts", type="primary", width="stretch"):
-                added = 0
-                
-                for step in st.session_state.editable_plan:
-                    event_date = step['date'].strftime('%Y-%m-%d')
-                    event_time = step['time']
-                    
-                    # Get weather for this date
-                    weather_data = get_weather_for_event(farmer_profile, event_date)
-                    weather_alert = create_weather_alert(weather_data)
-                    
-                    # Save to database
-                    event_data = (
-                        farmer_name,
-                        event_date,
-                        event_time,
-                        step['title'],
-                        step['description'],
-                        weather_alert,
-                        datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    )
-                    add_data("calendar_events", event_data)
-                    added += 1
+                added = add_plan_to_calendar(farmer_name, farmer_profile, st.session_state.editable_plan)
                 
                 st.success(f"✅ Added {added} events with weather alerts!")
                 del st.session_state.ai_plan
@@ -343,71 +408,27 @@ def render_integrated_calendar(farmer_name):
     
     st.divider()
     
-    # Load farmer's events from database
-    events_df = get_farmer_events(farmer_name)
-    
-    # Convert to calendar format
-    calendar_events = []
-    for _, row in events_df.iterrows():
-        # Parse event_date which might be "2025-11-09" or "2025-11-09 09:00"
-        event_date_str = row['event_date']
-        
-        # Extract date and time
-        if ' ' in event_date_str:
-            # Has time: "2025-11-09 09:00"
-            date_part, time_part = event_date_str.split(' ', 1)
-            event_time = time_part if time_part else row.get('event_time', '09:00')
-        else:
-            # Just date: "2025-11-09"
-            date_part = event_date_str
-            event_time = row.get('event_time', '09:00')
-        
-        if not event_time:
-            event_time = '09:00'
-        
-        calendar_events.append({
-            "id": row['id'],
-            "start": f"{date_part}T{event_time}:00",
-            "extendedProps": {
-                "heading": row['event_title'],
-                "description": row['event_description'],
-                "weather_alert": row.get('weather_alert', ''),
-                "time": event_time
-            }
-        })
-    
     # Task Statistics and Upcoming Tasks
     st.subheader("📊 Quick Overview")
     
-    # Get upcoming tasks (next 7 days)
     today = datetime.now().date()
-    upcoming_tasks = []
-    overdue_tasks = []
-    
-    for _, row in events_df.iterrows():
-        event_date = parse_event_date(row['event_date'])
-        
-        if event_date >= today and event_date <= today + timedelta(days=7):
-            upcoming_tasks.append(row)
-        elif event_date < today:
-            overdue_tasks.append(row)
+    counts = get_event_counts(farmer_name, today)
     
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("📅 Total Tasks", len(events_df))
+        st.metric("📅 Total Tasks", counts['total'])
     with col2:
-        st.metric("⏰ Upcoming (7 days)", len(upcoming_tasks))
+        st.metric("⏰ Upcoming (7 days)", counts['upcoming'])
     with col3:
-        st.metric("⚠️ Overdue", len(overdue_tasks))
+        st.metric("⚠️ Overdue", counts['overdue'])
     with col4:
-        today_tasks = len([t for t in upcoming_tasks if parse_event_date(t['event_date']) == today])
-        st.metric("📌 Today", today_tasks)
+        st.metric("📌 Today", counts['today'])
     
     # Show today's tasks if any
-    if today_tasks > 0:
+    if counts['today'] > 0:
         st.info("**Today's Tasks:**")
-        for task in [t for t in upcoming_tasks if parse_event_date(t['event_date']) == today]:
-            task_time = task.get('event_time', '09:00')
+        for task in get_events_in_range(farmer_name, today, today):
+            task_time = task.get('event_time') or '09:00'
             st.markdown(f"- 🕐 **{task_time}** - {task['event_title']}")
     
     st.divider()
@@ -522,6 +543,15 @@ def render_integrated_calendar(farmer_name):
     
     st.markdown("<br>", unsafe_allow_html=True)
     
+    # Load only the events the selected view shows
+    window_start, window_end = get_view_window(
+        st.session_state.calendar_view,
+        st.session_state.current_year,
+        st.session_state.current_month,
+        st.session_state.current_day
+    )
+    calendar_events = to_calendar_events(get_events_in_range(farmer_name, window_start, window_end))
+    
     # Render appropriate calendar view
     if st.session_state.calendar_view == "day":
         render_day_view(
@@ -563,6 +593,20 @@ def render_integrated_calendar(farmer_name):
         with col1:
             st.markdown(f"### {event['extendedProps']['heading']}")
         
+        # Every occurrence of a recurring task carries the series row id, so say which one changes
+        repeat_every = event['extendedProps'].get('repeat_every_days', 0)
+        occurrence_date = event['start'].split('T')[0]
+        series_start = event['extendedProps'].get('series_start', occurrence_date)
+        whole_series = False
+        if repeat_every:
+            scope = st.radio(
+                f"🔁 Repeats every {repeat_every} days from {series_start}. Apply changes to:",
+                ["This occurrence", "Whole series"],
+                horizontal=True,
+                key="event_scope"
+            )
+            whole_series = scope == "Whole series"
+        
         with col2:
             if not st.session_state.edit_mode:
                 if st.button("✏️ Edit", width="stretch", type="primary"):
@@ -570,8 +614,12 @@ def render_integrated_calendar(farmer_name):
                     st.rerun()
         
         with col3:
-            if st.button("🗑️ Delete", width="stretch", type="secondary"):
-                delete_event(event['id'])
+            delete_label = "🗑️ Delete Series" if whole_series else "🗑️ Delete"
+            if st.button(delete_label, width="stretch", type="secondary"):
+                if repeat_every and not whole_series:
+                    detach_occurrence(event['id'], occurrence_date)
+                else:
+                    delete_event(event['id'])
                 st.session_state.selected_event = None
                 st.success("✅ Event deleted!")
                 st.rerun()
@@ -583,9 +631,11 @@ def render_integrated_calendar(farmer_name):
             col1, col2 = st.columns(2)
             
             with col1:
-                event_date_str = event['start'].split('T')[0]
+                # A series is edited from its first date; moving it moves every occurrence
+                event_date_str = series_start if whole_series else occurrence_date
                 event_date = datetime.strptime(event_date_str, '%Y-%m-%d').date()
-                new_date = st.date_input("📅 Event Date", value=event_date, key="edit_date")
+                date_label = "📅 Series Start Date" if whole_series else "📅 Event Date"
+                new_date = st.date_input(date_label, value=event_date, key="edit_date")
             
             with col2:
                 event_time = event['extendedProps'].get('time', '09:00')
@@ -612,15 +662,27 @@ def render_integrated_calendar(farmer_name):
             col1, col2 = st.columns(2)
             with col1:
                 if st.button("💾 Save Changes", width="stretch", type="primary"):
-                    # Combine date and time into event_date field
-                    combined_datetime = f"{new_date.strftime('%Y-%m-%d')} {new_time.strftime('%H:%M')}"
-                    update_event(
-                        event['id'],
-                        combined_datetime,
-                        new_title,
-                        new_description,
-                        weather_alert_to_save
-                    )
+                    if repeat_every and not whole_series:
+                        # Split this occurrence out of the series as a one-off task
+                        detach_occurrence(event['id'], occurrence_date)
+                        add_data("calendar_events", (
+                            farmer_name,
+                            new_date.strftime('%Y-%m-%d'),
+                            new_time.strftime('%H:%M'),
+                            new_title,
+                            new_description,
+                            weather_alert_to_save,
+                            datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                        ))
+                    else:
+                        update_event(
+                            event['id'],
+                            new_date.strftime('%Y-%m-%d'),
+                            new_title,
+                            new_description,
+                            weather_alert_to_save,
+                            event_time=new_time.strftime('%H:%M')
+                        )
                     st.session_state.edit_mode = False
                     st.session_state.selected_event = None
                     if 'temp_weather_alert' in st.session_state:
@@ -1,6 +1,7 @@
 # components/crop_listings.py
 import streamlit as st
-from database.db_functions import add_data, get_data
+from database.db_functions import add_data, get_dataset
+from database.photo_store import PHOTO_TYPES, save_uploaded_photo, photo_path
 from datetime import date
 import pandas as pd
 try:
@@ -56,6 +57,7 @@ def render_crop_listing(farmer_name):
         with col3:
             expected_price = st.number_input(t("Expected Price (per unit)"), min_value=0.0, format="%.2f", key="crop_price_input")
             contact = st.text_input(t("Contact Number"), value=contact_value, key="crop_contact_input")
+        photo_file = st.file_uploader(t("Photo (optional)"), type=PHOTO_TYPES, key="crop_photo_input")
         
         submitted = st.form_submit_button(t("Add Crop Listing"))
         
@@ -63,10 +65,15 @@ def render_crop_listing(farmer_name):
             if name and location and crop_name and quantity > 0 and expected_price > 0 and contact:
                 listing_date = date.today().strftime("%Y-%m-%d")
                 quantity_str = f"{quantity} {unit}"
-                crop_data = (name, location, crop_name, quantity_str, expected_price, contact, listing_date)
+                try:
+                    photo_hash = save_uploaded_photo(photo_file)
+                except ValueError as e:
+                    photo_hash = None
+                    st.warning(f"{t('Listing saved without the photo')}: {e}")
+                crop_data = (name, location, crop_name, quantity_str, expected_price, contact, listing_date, photo_hash)
                 
                 add_data("crops", crop_data)
-                st.session_state.crops = get_data("crops")
+                st.session_state.crops = get_dataset("crops")
                 
                 recs = get_recommendations({
                     "type": "crop",
@@ -165,6 +172,11 @@ def render_crop_management(crops_df, farmer_name):
             col1, col2 = st.columns([4, 1])
             
             with col1:
+                # Cards use the small thumbnail rendition; legacy inline photos only show in details
+                thumb = photo_path(crop.get('Photo'), 'thumb')
+                if thumb:
+                    st.image(thumb, width=120)
+                
                 # Rating stars display
                 rating_display = "⭐" * int(crop['avg_rating']) + "☆" * (5 - int(crop['avg_rating']))
                 rating_text = f"{rating_display} {crop['avg_rating']:.1f}/5" if crop['total_ratings'] > 0 else "⭐ No ratings yet"
@@ -204,13 +216,13 @@ def render_crop_management(crops_df, farmer_name):
         if not editable_crops.empty:
             editable_for_display = editable_crops.drop(columns=['rowid'])
             
-            updated_crops_df = st.data_editor(
+            # Edits stay in the editor; the shared listings frame is read-only
+            st.data_editor(
                 editable_for_display,
                 key="crop_editor",
                 use_container_width=True,
                 num_rows="dynamic"
             )
-            st.session_state.crops.loc[updated_crops_df.index, updated_crops_df.columns] = updated_crops_df.values
             
         else:
             st.info(t("You have no crop listings yet."))
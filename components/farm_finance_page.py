@@ -10,10 +10,11 @@ from google import genai
 from google.genai import types
 import os
 from datetime import datetime, timedelta
-import sqlite3
 import json
 import pandas as pd
 from components.translation_utils import t
+from database.migrations import ensure_schema
+from database import query_stats
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -22,60 +23,68 @@ load_dotenv()
 DB_NAME = 'farmermarket.db'
 
 def init_finance_db():
-    """Initialize finance tables."""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    
-    # Income/Expense table
-    c.execute("""CREATE TABLE IF NOT EXISTS farm_transactions (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        farmer_id INTEGER NOT NULL,
-        type TEXT NOT NULL,
-        category TEXT NOT NULL,
-        amount REAL NOT NULL,
-        description TEXT,
-        date TEXT NOT NULL,
-        payment_mode TEXT,
-        receipt_number TEXT,
-        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (farmer_id) REFERENCES farmers(id)
-    )""")
-    
-    # Investment Planning table
-    c.execute("""CREATE TABLE IF NOT EXISTS farm_investments (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        farmer_id INTEGER NOT NULL,
-        item_name TEXT NOT NULL,
-        category TEXT NOT NULL,
-        estimated_cost REAL NOT NULL,
-        target_date TEXT,
-        priority TEXT,
-        status TEXT DEFAULT 'Planned',
-        notes TEXT,
-        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (farmer_id) REFERENCES farmers(id)
-    )""")
-    
-    # Insurance Tracker table
-    c.execute("""CREATE TABLE IF NOT EXISTS farm_insurance (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        farmer_id INTEGER NOT NULL,
-        insurance_type TEXT NOT NULL,
-        provider TEXT,
-        policy_number TEXT,
-        coverage_amount REAL,
-        premium_amount REAL,
-        start_date TEXT,
-        end_date TEXT,
-        reminder_days INTEGER DEFAULT 30,
-        status TEXT DEFAULT 'Active',
-        notes TEXT,
-        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (farmer_id) REFERENCES farmers(id)
-    )""")
-    
-    conn.commit()
-    conn.close()
+    """Initialize finance tables (once per process)."""
+    ensure_schema(DB_NAME)
+
+def _shift_month(month, delta):
+    """'YYYY-MM' moved by delta months."""
+    year, mon = divmod(int(month[:4]) * 12 + int(month[5:7]) - 1 + delta, 12)
+    return f"{year:04d}-{mon + 1:02d}"
+
+def get_category_totals(conn, farmer_id, start_date, end_date):
+    """
+    Income/expense totals per category between two dates (inclusive).
+    
+    Whole months come from finance_month_rollup; only the partial months at
+    either end of the range are summed from farm_transactions.
+    
+    Returns:
+        {(type, category): (total, transaction_count)}
+    """
+    start = start_date.isoformat()[:10]
+    end = end_date.isoformat()[:10]
+    first_full = start[:7] if start[8:] == '01' else _shift_month(start[:7], 1)
+    last_full = end[:7] if (end_date + timedelta(days=1)).day == 1 else _shift_month(end[:7], -1)
+    # Upper bound just past every 'YYYY-MM-DD...' string on the end date
+    end_bound = end + '~'
+    
+    rows = []
+    if first_full <= last_full:
+        rows += conn.execute("""SELECT type, category, SUM(total), SUM(entries)
+                                FROM finance_month_rollup
+                                WHERE farmer_id = ? AND month BETWEEN ? AND ?
+                                GROUP BY type, category""",
+                             (farmer_id, first_full, last_full)).fetchall()
+        edges = [(start, first_full + '-01'), (_shift_month(last_full, 1) + '-01', end_bound)]
+    else:
+        edges = [(start, end_bound)]
+    
+    for low, high in edges:
+        if low < high:
+            rows += conn.execute("""SELECT type, category, SUM(amount), COUNT(*)
+                                    FROM farm_transactions
+                                    WHERE farmer_id = ? AND date >= ? AND date < ?
+                                    GROUP BY type, category""",
+                                 (farmer_id, low, high)).fetchall()
+    
+    totals = {}
+    for txn_type, category, total, count in rows:
+        old_total, old_count = totals.get((txn_type, category), (0, 0))
+        totals[(txn_type, category)] = (old_total + total, old_count + count)
+    return totals
+
+def get_monthly_totals(conn, farmer_id, years):
+    """Income and expense per month for the given years, from the rollup."""
+    placeholders = ', '.join('?' * len(years))
+    return pd.read_sql_query(f"""
+        SELECT month,
+               SUM(CASE WHEN type = 'Income' THEN total ELSE 0 END) AS income,
+               SUM(CASE WHEN type = 'Expense' THEN total ELSE 0 END) AS expense
+        FROM finance_month_rollup
+        WHERE farmer_id = ? AND substr(month, 1, 4) IN ({placeholders})
+        GROUP BY month
+        ORDER BY month
+    """, conn, params=(farmer_id, *[str(y) for y in years]))
 
 class FinanceAI:
     """AI-powered financial assistant using AI."""
@@ -118,9 +127,16 @@ class FinanceAI:
             return ""
     
     def analyze_profit_loss(self, income_data, expense_data, period):
-        """Analyze profit/loss with AI insights."""
+        """
+        Analyze profit/loss with AI insights.
+        
+        income_data/expense_data are {'amount', 'category'} dicts, either one
+        per transaction or one per category with a 'count' of transactions.
+        """
         total_income = sum([t['amount'] for t in income_data])
         total_expense = sum([t['amount'] for t in expense_data])
+        income_count = sum([t.get('count', 1) for t in income_data])
+        expense_count = sum([t.get('count', 1) for t in expense_data])
         profit = total_income - total_expense
         
         language_instruction = self.get_language_instruction()
@@ -131,11 +147,11 @@ PERIOD: {period}
 
 FINANCIAL SUMMARY:
 Income:
-- Total: ₹{total_income:,.2f} from {len(income_data)} transactions
+- Total: ₹{total_income:,.2f} from {income_count} transactions
 - Sources: {', '.join(set([t['category'] for t in income_data]))}
 
 Expenses:
-- Total: ₹{total_expense:,.2f} from {len(expense_data)} transactions  
+- Total: ₹{total_expense:,.2f} from {expense_count} transactions  
 - Categories: {', '.join(set([t['category'] for t in expense_data]))}
 
 Net Profit/Loss: ₹{profit:,.2f} ({'+' if profit >= 0 else ''}{(profit/total_income*100):.1f}% margin)
@@ -353,15 +369,15 @@ def render_finance_dashboard(farmer_id):
     """Display financial dashboard."""
     st.subheader("📊 Financial Overview")
     
-    conn = sqlite3.connect(DB_NAME)
+    conn = query_stats.connect(DB_NAME)
     c = conn.cursor()
     
     # Get current month data
     current_month = datetime.now().strftime('%Y-%m')
     
-    c.execute("""SELECT type, SUM(amount) FROM farm_transactions 
-                 WHERE farmer_id = ? AND date LIKE ? 
-                 GROUP BY type""", (farmer_id, f"{current_month}%"))
+    c.execute("""SELECT type, SUM(total) FROM finance_month_rollup 
+                 WHERE farmer_id = ? AND month = ? 
+                 GROUP BY type""", (farmer_id, current_month))
     monthly_data = c.fetchall()
     
     income = sum([row[1] for row in monthly_data if row[0] == 'Income'])
@@ -382,6 +398,18 @@ def render_finance_dashboard(farmer_id):
         margin = (profit / income * 100) if income > 0 else 0
         st.metric("Profit Margin", f"{margin:.1f}%")
     
+    # Year over year, from the month rollup
+    this_year = datetime.now().year
+    monthly_df = get_monthly_totals(conn, farmer_id, [this_year - 1, this_year])
+    if not monthly_df.empty:
+        st.markdown("---")
+        st.subheader(f"📅 Profit by Month: {this_year} vs {this_year - 1}")
+        monthly_df['year'] = monthly_df['month'].str[:4]
+        monthly_df['month_no'] = monthly_df['month'].str[5:7]
+        monthly_df['profit'] = monthly_df['income'] - monthly_df['expense']
+        st.bar_chart(monthly_df.pivot_table(index='month_no', columns='year',
+                                            values='profit', aggfunc='sum', fill_value=0))
+    
     st.markdown("---")
     
     # Recent transactions
@@ -474,7 +502,7 @@ def render_add_transaction(farmer_id):
     
     if st.button("💾 Save Transaction", type="primary"):
         if amount > 0:
-            conn = sqlite3.connect(DB_NAME)
+            conn = query_stats.connect(DB_NAME)
             c = conn.cursor()
             
             c.execute("""INSERT INTO farm_transactions 
@@ -525,27 +553,20 @@ def render_profit_loss_analysis(farmer_id):
         with col3:
             end_date = st.date_input("End Date", value=datetime.now())
     
-    # Fetch data
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    
-    c.execute("""SELECT * FROM farm_transactions 
-                 WHERE farmer_id = ? AND date BETWEEN ? AND ?
-                 ORDER BY date DESC""",
-             (farmer_id, start_date.isoformat(), end_date.isoformat()))
-    
-    transactions = c.fetchall()
+    # Fetch per-category totals
+    conn = query_stats.connect(DB_NAME)
+    totals = get_category_totals(conn, farmer_id, start_date, end_date)
     conn.close()
     
-    if not transactions:
+    if not totals:
         st.info("No transactions found for this period")
         return
     
-    # Process data
-    income_data = [{'amount': t[3], 'category': t[2], 'date': t[5]} 
-                   for t in transactions if t[1] == 'Income']
-    expense_data = [{'amount': t[3], 'category': t[2], 'date': t[5]} 
-                    for t in transactions if t[1] == 'Expense']
+    # Process data: one entry per category
+    income_data = [{'amount': total, 'category': cat, 'count': count}
+                   for (txn_type, cat), (total, count) in totals.items() if txn_type == 'Income']
+    expense_data = [{'amount': total, 'category': cat, 'count': count}
+                    for (txn_type, cat), (total, count) in totals.items() if txn_type == 'Expense']
     
     total_income = sum([t['amount'] for t in income_data])
     total_expense = sum([t['amount'] for t in expense_data])
@@ -557,10 +578,10 @@ def render_profit_loss_analysis(farmer_id):
     
     with col1:
         st.metric("Total Income", f"₹{total_income:,.2f}", 
-                 help=f"{len(income_data)} transactions")
+                 help=f"{sum(t['count'] for t in income_data)} transactions")
     with col2:
         st.metric("Total Expenses", f"₹{total_expense:,.2f}",
-                 help=f"{len(expense_data)} transactions")
+                 help=f"{sum(t['count'] for t in expense_data)} transactions")
     with col3:
         profit_delta = "📈" if net_profit >= 0 else "📉"
         st.metric("Net Profit/Loss", f"₹{net_profit:,.2f}", delta=profit_delta)
@@ -571,9 +592,7 @@ def render_profit_loss_analysis(farmer_id):
     
     with col1:
         st.subheader("💚 Income Breakdown")
-        income_by_category = {}
-        for t in income_data:
-            income_by_category[t['category']] = income_by_category.get(t['category'], 0) + t['amount']
+        income_by_category = {t['category']: t['amount'] for t in income_data}
         
         for cat, amt in sorted(income_by_category.items(), key=lambda x: x[1], reverse=True):
             pct = (amt / total_income * 100) if total_income > 0 else 0
@@ -581,9 +600,7 @@ def render_profit_loss_analysis(farmer_id):
     
     with col2:
         st.subheader("💸 Expense Breakdown")
-        expense_by_category = {}
-        for t in expense_data:
-            expense_by_category[t['category']] = expense_by_category.get(t['category'], 0) + t['amount']
+        expense_by_category = {t['category']: t['amount'] for t in expense_data}
         
         for cat, amt in sorted(expense_by_category.items(), key=lambda x: x[1], reverse=True):
             pct = (amt / total_expense * 100) if total_expense > 0 else 0
@@ -627,7 +644,7 @@ def render_investment_planning(farmer_id):
         
         if st.button("💾 Save Investment Plan", type="primary"):
             if item_name and estimated_cost > 0:
-                conn = sqlite3.connect(DB_NAME)
+                conn = query_stats.connect(DB_NAME)
                 c = conn.cursor()
                 
                 c.execute("""INSERT INTO farm_investments 
@@ -645,7 +662,7 @@ def render_investment_planning(farmer_id):
     
     # TAB 2: My Investment Plans
     with tab2:
-        conn = sqlite3.connect(DB_NAME)
+        conn = query_stats.connect(DB_NAME)
         c = conn.cursor()
         
         c.execute("""SELECT * FROM farm_investments 
@@ -669,7 +686,7 @@ def render_investment_planning(farmer_id):
                         st.write(f"**Status:** {inv[8]}")
                     with col3:
                         if st.button("✅ Mark Complete", key=f"complete_{inv[0]}"):
-                            conn = sqlite3.connect(DB_NAME)
+                            conn = query_stats.connect(DB_NAME)
                             c = conn.cursor()
                             c.execute("UPDATE farm_investments SET status = 'Completed' WHERE id = ?", (inv[0],))
                             conn.commit()
@@ -734,7 +751,7 @@ def render_insurance_tracker(farmer_id):
         
         if st.button("💾 Save Insurance Policy", type="primary"):
             if insurance_type and policy_number:
-                conn = sqlite3.connect(DB_NAME)
+                conn = query_stats.connect(DB_NAME)
                 c = conn.cursor()
                 
                 c.execute("""INSERT INTO farm_insurance 
@@ -753,7 +770,7 @@ def render_insurance_tracker(farmer_id):
     
     # TAB 2: My Policies
     with tab2:
-        conn = sqlite3.connect(DB_NAME)
+        conn = query_stats.connect(DB_NAME)
         c = conn.cursor()
         
         c.execute("""SELECT * FROM farm_insurance 
@@ -830,7 +847,7 @@ def render_receipt_generator(farmer_id):
     st.subheader("🧾 Receipt Generator")
     
     # Get farmer details
-    conn = sqlite3.connect(DB_NAME)
+    conn = query_stats.connect(DB_NAME)
     c = conn.cursor()
     c.execute("SELECT name, location, contact FROM farmers WHERE ROWID = ?", (farmer_id,))
     farmer = c.fetchone()
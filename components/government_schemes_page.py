@@ -10,6 +10,7 @@ from google.genai import types
 import os
 from datetime import datetime, timedelta
 from database.cache_manager import CacheManager
+from database import query_stats
 import json
 
 class GovernmentSchemesHelper:
@@ -297,8 +298,7 @@ Search for the latest {scheme_name} guidelines and eligibility criteria."""
         try:
             conn = self.cache._CacheManager__get_connection() if hasattr(self.cache, '_CacheManager__get_connection') else None
             if not conn:
-                import sqlite3
-                conn = sqlite3.connect('farmermarket.db')
+                conn = query_stats.connect('farmermarket.db')
             
             c = conn.cursor()
             c.execute("""SELECT data, expires_at FROM schemes_cache 
@@ -316,19 +316,9 @@ Search for the latest {scheme_name} guidelines and eligibility criteria."""
     def _save_to_cache(self, key, data, hours=2):
         """Save data to custom cache."""
         try:
-            import sqlite3
-            conn = sqlite3.connect('farmermarket.db')
+            conn = query_stats.connect('farmermarket.db')
             c = conn.cursor()
             
-            # Create table if not exists
-            c.execute("""CREATE TABLE IF NOT EXISTS schemes_cache (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                cache_key TEXT UNIQUE,
-                data TEXT,
-                cached_at TEXT,
-                expires_at TEXT
-            )""")
-            
             cached_at = datetime.now()
             expires_at = cached_at + timedelta(hours=hours)
             
@@ -345,8 +335,7 @@ Search for the latest {scheme_name} guidelines and eligibility criteria."""
     def _get_cache_age(self, key):
         """Get how old the cache is."""
         try:
-            import sqlite3
-            conn = sqlite3.connect('farmermarket.db')
+            conn = query_stats.connect('farmermarket.db')
             c = conn.cursor()
             c.execute("SELECT cached_at FROM schemes_cache WHERE cache_key = ?", (key,))
             result = c.fetchone()
@@ -361,6 +350,44 @@ Search for the latest {scheme_name} guidelines and eligibility criteria."""
             return None
 
 
+# Languages the page can ask for (get_current_language_name); the worker pre-warms each
+SCHEME_LANGUAGES = ('English', 'Hindi', 'Marathi')
+
+SCHEME_STATES = ['maharashtra', 'karnataka', 'punjab', 'gujarat', 'tamil nadu', 'kerala', 'rajasthan',
+                 'madhya pradesh', 'uttar pradesh', 'bihar', 'west bengal', 'andhra pradesh', 'telangana',
+                 'odisha', 'haryana']
+SCHEME_CITIES = ['pune', 'mumbai', 'nashik', 'bangalore', 'delhi', 'ahmedabad', 'hyderabad', 'chennai',
+                 'kolkata', 'jaipur', 'lucknow', 'kanpur', 'nagpur', 'indore', 'bhopal', 'patna', 'surat',
+                 'vadodara']
+
+
+def schemes_location(farmer_location):
+    """
+    The location a farmer's schemes are searched (and cached) for.
+
+    Returns:
+        "City, State" when the address names a major city, otherwise the state
+    """
+    location_parts = [part.strip() for part in farmer_location.split(',')]
+    state_name = "Maharashtra"
+    
+    # Find state name
+    for part in location_parts:
+        if any(state in part.lower() for state in SCHEME_STATES):
+            state_name = part
+            break
+    else:
+        # Use second-to-last part as likely state
+        if len(location_parts) >= 2:
+            state_name = location_parts[-2]
+    
+    # Find city name (look for major cities)
+    for part in location_parts:
+        if any(city in part.lower() for city in SCHEME_CITIES):
+            return f"{part}, {state_name}"
+    return state_name
+
+
 def render_government_schemes_page():
     """Render the government schemes and financial tools page."""
     
@@ -387,39 +414,12 @@ def render_government_schemes_page():
         # Get farmer's location from profile
         farmer_name = st.session_state.get("farmer_name")
         default_location = "Maharashtra"
-        city_name = None
-        state_name = "Maharashtra"
         
         if farmer_name:
             from database.db_functions import get_farmer_profile
             farmer_profile = get_farmer_profile(farmer_name)
-            if farmer_profile:
-                farmer_location = farmer_profile.get('location', '')
-                if farmer_location:
-                    # Extract city and state from address
-                    location_parts = [part.strip() for part in farmer_location.split(',')]
-                    
-                    # Find state name
-                    for part in location_parts:
-                        if any(state in part.lower() for state in ['maharashtra', 'karnataka', 'punjab', 'gujarat', 'tamil nadu', 'kerala', 'rajasthan', 'madhya pradesh', 'uttar pradesh', 'bihar', 'west bengal', 'andhra pradesh', 'telangana', 'odisha', 'haryana']):
-                            state_name = part
-                            break
-                    else:
-                        # Use second-to-last part as likely state
-                        if len(location_parts) >= 2:
-                            state_name = location_parts[-2]
-                    
-                    # Find city name (look for major cities)
-                    for part in location_parts:
-                        if any(city in part.lower() for city in ['pune', 'mumbai', 'nashik', 'bangalore', 'delhi', 'ahmedabad', 'hyderabad', 'chennai', 'kolkata', 'jaipur', 'lucknow', 'kanpur', 'nagpur', 'indore', 'bhopal', 'patna', 'surat', 'vadodara']):
-                            city_name = part
-                            break
-                    
-                    # Build location string: "City, State" or just "State"
-                    if city_name:
-                        default_location = f"{city_name}, {state_name}"
-                    else:
-                        default_location = state_name
+            if farmer_profile and farmer_profile.get('location'):
+                default_location = schemes_location(farmer_profile['location'])
         
         # Show immediate loading message
         loading_placeholder = st.empty()
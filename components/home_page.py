@@ -3,9 +3,8 @@
 import streamlit as st
 import pandas as pd
 import os
-from database.db_functions import get_data
+from database.db_functions import get_data, get_events_in_range
 from datetime import datetime
-from calender.utils import get_events_for_date
 from components.translation_utils import t
 
 def render_home_page():
@@ -196,7 +195,9 @@ def render_home_page():
     
     if api_key:
         from google import genai
+        from google.genai import types
         from streamlit_mic_recorder import mic_recorder
+        from components.audio_pipeline import preprocess_audio
         
         client = genai.Client(api_key=api_key)
         farmer_name = st.session_state.get("farmer_name", "Farmer")
@@ -212,6 +213,7 @@ def render_home_page():
                 stop_prompt="⏹️",
                 just_once=True,
                 use_container_width=True,
+                format="wav",
                 key="hero_mic"
             )
         
@@ -228,10 +230,11 @@ def render_home_page():
         if audio:
             with st.spinner("🔄 Processing voice..."):
                 try:
-                    audio_file = client.files.upload(path_or_bytes=audio['bytes'], mime_type="audio/wav")
+                    processed = preprocess_audio(audio['bytes'])
+                    audio_part = types.Part.from_bytes(data=processed.data, mime_type=processed.mime_type)
                     response = client.models.generate_content(
                         model="gemini-2.5-flash",
-                        contents=[f"Transcribe this {lang} audio accurately:", audio_file]
+                        contents=[f"Transcribe this {lang} audio accurately:", audio_part]
                     )
                     if response and response.text:
                         transcribed = response.text.strip()
@@ -316,7 +319,7 @@ def render_home_page():
     # Get quick stats data
     try:
         today = datetime.now().date()
-        events = get_events_for_date(farmer_name, today)
+        events = get_events_in_range(farmer_name, today, today)
         tasks_count = len(events) if events else 0
     except:
         tasks_count = 0
@@ -542,12 +545,12 @@ def render_home_page():
     
     try:
         today = datetime.now().date()
-        events = get_events_for_date(farmer_name, today)
+        events = get_events_in_range(farmer_name, today, today)
         
         if events and len(events) > 0:
             for event in events[:3]:  # Show only 3 tasks
-                event_time = event.get('time', 'All day')
-                event_title = event.get('title', 'Untitled task')
+                event_time = event.get('event_time') or 'All day'
+                event_title = event.get('event_title') or 'Untitled task'
                 
                 # Choose emoji based on event type
                 if 'irrigation' in event_title.lower() or 'water' in event_title.lower():
@@ -0,0 +1,254 @@
+# components/intent_router.py
+"""
+Fast-Path Voice Intent Router
+Resolves navigation and simple commands locally in English, Hindi and
+Marathi - keyword/phonetic matching first, then a small character TF-IDF
+linear model - and only escalates open-ended questions to Gemini.
+Hit counts per intent show how much LLM traffic is avoided.
+"""
+
+import re
+import threading
+import time
+from collections import Counter
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+# Escalation intent: open-ended questions answered by Gemini
+ASK_AI = 'ask_ai'
+
+# The model's top intent must be at least this probable to skip the LLM
+MODEL_CONFIDENCE = 0.45
+# Longer utterances with a question word are treated as questions, not commands
+QUESTION_MIN_WORDS = 6
+# Phonetic keys shorter than this collide too easily ('money' and 'main')
+MIN_PHONETIC_KEY = 3
+
+# intent -> menu item in app.py's menu_structure, keywords and training phrases
+INTENTS = {
+    'weather': {
+        'menu': "🌤️ Weather Forecast",
+        'keywords': ['weather', 'forecast', 'rain', 'mausam', 'barish', 'मौसम', 'बारिश', 'हवामान', 'पाऊस'],
+        'examples': ['show weather', 'weather forecast', 'will it rain', 'open weather',
+                     'mausam dikhao', 'मौसम दिखाओ', 'आज का मौसम', 'हवामान दाखवा', 'पाऊस येईल का'],
+    },
+    'price': {
+        'menu': "💰 Today's Market Price",
+        'keywords': ['price', 'rate', 'market', 'mandi', 'bhav', 'कीमत', 'भाव', 'मंडी', 'किंमत', 'बाजार'],
+        'examples': ['open market prices', 'mandi rate', 'today market price', 'show prices',
+                     'aaj ka bhav', 'मंडी भाव', 'आज का भाव', 'बाजार भाव दाखवा', 'आजचा दर'],
+    },
+    'sell_advice': {
+        'menu': "🤔 Should I Sell?",
+        'keywords': ['should i sell', 'when to sell', 'bechu', 'बेचूं', 'बेचना', 'विकू', 'विकावे'],
+        'examples': ['should i sell now', 'when to sell my crop', 'kya abhi bechu',
+                     'क्या अभी बेचूं', 'कब बेचना चाहिए', 'आता विकू का', 'कधी विकावे'],
+    },
+    'calendar': {
+        'menu': "📅 My Calendar",
+        'keywords': ['calendar', 'schedule', 'task', 'कैलेंडर', 'काम', 'दिनदर्शिका', 'कामे'],
+        'examples': ['open calendar', 'show my schedule', 'add task to calendar', 'my tasks',
+                     'कैलेंडर खोलो', 'आज के काम', 'दिनदर्शिका उघडा', 'आजची कामे'],
+    },
+    'finance': {
+        'menu': "📒 My Money Diary",
+        'keywords': ['money', 'expense', 'income', 'diary', 'kharcha', 'खर्च', 'पैसे', 'हिसाब'],
+        'examples': ['open money diary', 'add expense', 'my income', 'kharcha likho',
+                     'खर्च लिखो', 'पैसे का हिसाब', 'खर्च नोंदवा', 'पैशांचा हिशोब'],
+    },
+    'profile': {
+        'menu': "👤 My Profile",
+        'keywords': ['profile', 'प्रोफाइल', 'प्रोफाईल'],
+        'examples': ['show my profile', 'open profile', 'edit my details',
+                     'मेरी प्रोफाइल', 'प्रोफाइल दिखाओ', 'माझी प्रोफाइल'],
+    },
+    'list_tool': {
+        'menu': "➕ Post Listing",
+        'keywords': ['list tool', 'rent tool', 'tractor on rent', 'औजार', 'किराए', 'साधन', 'भाड्याने'],
+        'examples': ['list my tool', 'rent out my tractor', 'add tool listing',
+                     'औजार किराए पर दो', 'ट्रैक्टर किराए पर', 'साधन भाड्याने द्या'],
+    },
+    'list_crop': {
+        'menu': "➕ Post Listing",
+        'keywords': ['list crop', 'sell crop', 'add crop listing', 'फसल बेच', 'पीक विक'],
+        'examples': ['add crop listing', 'sell my crop', 'list my wheat for sale',
+                     'फसल बेचनी है', 'गेहूं बेचना है', 'पीक विकायचे आहे'],
+    },
+    'browse': {
+        'menu': "🛍️ Browse Listings",
+        'keywords': ['browse', 'marketplace', 'listings', 'खरीद', 'खरेदी'],
+        'examples': ['browse listings', 'open marketplace', 'show listings near me',
+                     'सामान खरीदना है', 'लिस्टिंग दिखाओ', 'खरेदी करायची आहे'],
+    },
+    'schemes': {
+        'menu': "🏛️ Government Schemes",
+        'keywords': ['scheme', 'subsidy', 'yojana', 'योजना', 'सब्सिडी', 'अनुदान'],
+        'examples': ['government schemes', 'show subsidy', 'sarkari yojana',
+                     'सरकारी योजना', 'सब्सिडी की जानकारी', 'शासकीय योजना'],
+    },
+    'help': {
+        'menu': None,
+        'keywords': ['help', 'मदद', 'मदत', 'सहायता'],
+        'examples': ['help', 'what can you do', 'मदद करो', 'मदत करा'],
+    },
+}
+
+_QUESTION_WORDS = {
+    'what', 'why', 'how', 'which', 'kya', 'kaise', 'kyon', 'kaun',
+    'क्या', 'कैसे', 'क्यों', 'कौन', 'कितना', 'काय', 'कसे', 'कोणते', 'किती',
+}
+
+_TOKEN = re.compile(r'[\wऀ-ॿ]+')
+
+_model = None
+_model_lock = threading.Lock()
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _normalize(text):
+    return ' '.join(_TOKEN.findall((text or '').lower()))
+
+
+def phonetic_key(word):
+    """
+    Collapse romanized spelling variants: 'mausam', 'mosam' and 'mousum' share
+    a key. Vowels after the first letter are dropped and repeats collapsed.
+    Devanagari words are returned unchanged.
+    """
+    if not word.isascii():
+        return word
+    word = word.replace('ph', 'f').replace('bh', 'b').replace('kh', 'k').replace('w', 'v')
+    key = word[:1] + re.sub(r'[aeiouyh]', '', word[1:])
+    return re.sub(r'(.)\1+', r'\1', key)
+
+
+def _word_key(word):
+    key = phonetic_key(word)
+    return key if len(key) >= MIN_PHONETIC_KEY else word
+
+
+def _keyword_index():
+    """Single-word keywords keyed by phonetic form; multi-word ones kept as phrases."""
+    words, phrases = {}, []
+    for intent, spec in INTENTS.items():
+        for keyword in spec['keywords']:
+            normalized = _normalize(keyword)
+            if ' ' in normalized:
+                phrases.append((normalized, intent))
+            else:
+                words.setdefault(_word_key(normalized), intent)
+    # Longest phrase first so 'should i sell' beats a single-word match
+    phrases.sort(key=lambda item: -len(item[0]))
+    return words, phrases
+
+
+_KEYWORD_WORDS, _KEYWORD_PHRASES = _keyword_index()
+
+
+def _get_model():
+    """Character n-gram TF-IDF + logistic regression, trained once per process."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                texts, labels = [], []
+                for intent, spec in INTENTS.items():
+                    for phrase in spec['examples'] + spec['keywords']:
+                        texts.append(_normalize(phrase))
+                        labels.append(intent)
+                vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=(2, 4), sublinear_tf=True)
+                classifier = LogisticRegression(max_iter=1000, C=10)
+                classifier.fit(vectorizer.fit_transform(texts), labels)
+                _model = (vectorizer, classifier)
+    return _model
+
+
+def _is_open_question(words):
+    return len(words) >= QUESTION_MIN_WORDS and any(w in _QUESTION_WORDS for w in words)
+
+
+def _match_keywords(normalized, words):
+    for phrase, intent in _KEYWORD_PHRASES:
+        if phrase in normalized:
+            return intent
+    for word in words:
+        intent = _KEYWORD_WORDS.get(_word_key(word))
+        if intent:
+            return intent
+    # Devanagari keywords may carry suffixes ('मौसम' in 'मौसमी')
+    for key, intent in _KEYWORD_WORDS.items():
+        if not key.isascii() and key in normalized:
+            return intent
+    return None
+
+
+def _record(intent, source):
+    with _stats_lock:
+        _stats[(intent, source)] += 1
+
+
+def route_intent(text, language='en'):
+    """
+    Classify a voice command locally.
+
+    Args:
+        text: Transcribed command
+        language: Language code ('en', 'hi', 'mr'); all three are matched either way
+
+    Returns:
+        dict with action, menu (app page or None), source ('keyword', 'model'
+        or 'llm'), confidence and latency_ms
+    """
+    start = time.perf_counter()
+    normalized = _normalize(text)
+    words = normalized.split()
+    intent, source, confidence = None, 'llm', 0.0
+
+    if words and not _is_open_question(words):
+        intent = _match_keywords(normalized, words)
+        if intent:
+            source, confidence = 'keyword', 1.0
+        else:
+            vectorizer, classifier = _get_model()
+            probabilities = classifier.predict_proba(vectorizer.transform([normalized]))[0]
+            best = probabilities.argmax()
+            if probabilities[best] >= MODEL_CONFIDENCE:
+                intent, source, confidence = str(classifier.classes_[best]), 'model', float(probabilities[best])
+
+    action = intent or ASK_AI
+    _record(action, source)
+    return {
+        'action': action,
+        'text': text,
+        'menu': INTENTS[intent]['menu'] if intent else None,
+        'source': source,
+        'confidence': round(confidence, 3),
+        'latency_ms': round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+def get_router_stats():
+    """Per-intent hit counts by source and the share of commands kept off the LLM."""
+    with _stats_lock:
+        snapshot = dict(_stats)
+
+    per_intent = {}
+    for (intent, source), count in snapshot.items():
+        per_intent.setdefault(intent, Counter())[source] += count
+
+    total = sum(snapshot.values())
+    escalated = sum(count for (_, source), count in snapshot.items() if source == 'llm')
+    return {
+        'total': total,
+        'local': total - escalated,
+        'escalated': escalated,
+        'local_hit_rate': (total - escalated) / total if total else 0.0,
+        'per_intent': {intent: dict(counts) for intent, counts in per_intent.items()},
+    }
+
+
+def reset_router_stats():
+    with _stats_lock:
+        _stats.clear()
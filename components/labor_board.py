@@ -1,6 +1,7 @@
 # components/labor_board.py
 import streamlit as st
 from database.db_functions import add_data, get_data
+from database import query_stats
 import pandas as pd
 from datetime import date, timedelta
 from components.translation_utils import t
@@ -88,8 +89,7 @@ def render_job_postings():
         conn = st.connection('database', type='sql')
         jobs_df = conn.query("SELECT rowid, * FROM labor_jobs ORDER BY created_date DESC")
     except:
-        import sqlite3
-        conn = sqlite3.connect('farmermarket.db')
+        conn = query_stats.connect('farmermarket.db')
         jobs_df = pd.read_sql_query("SELECT rowid, * FROM labor_jobs ORDER BY created_date DESC", conn)
         conn.close()
     
@@ -180,8 +180,7 @@ def render_worker_listings():
         conn = st.connection('database', type='sql')
         workers_df = conn.query("SELECT rowid, * FROM worker_availability ORDER BY created_date DESC")
     except:
-        import sqlite3
-        conn = sqlite3.connect('farmermarket.db')
+        conn = query_stats.connect('farmermarket.db')
         workers_df = pd.read_sql_query("SELECT rowid, * FROM worker_availability ORDER BY created_date DESC", conn)
         conn.close()
     
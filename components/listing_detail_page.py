@@ -9,6 +9,7 @@ import pandas as pd
 from datetime import datetime
 from database.db_functions import get_ratings_for_seller, add_rating, has_user_rated_listing, get_farmer_profile
 from components.translation_utils import t
+from database.photo_store import photo_source
 import urllib.parse
 
 
@@ -37,7 +38,7 @@ def render_listing_detail(listing_type, listing_data):
     location = listing_data.get('Location', 'N/A')
     contact = listing_data.get('Contact', 'N/A')
     seller_name = listing_data.get('Farmer', 'Unknown')
-    photo = listing_data.get('Photo', None)
+    photo = photo_source(listing_data.get('Photo'), 'detail')
     listing_id = listing_data.get('id', 0)
     
     # Header with back button
@@ -1,24 +1,39 @@
 import streamlit as st
 import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
-from google import genai
 import pandas as pd
 import os
+import threading
+
+# Only prices this recent trigger price alerts (history imports should not)
+ALERT_MAX_AGE_DAYS = 3
+
+_ai_client = None
+_ai_client_lock = threading.Lock()
+
+
+def get_ai_client():
+    """AI client, created on first use so importing this page stays cheap"""
+    global _ai_client
+    if _ai_client is None:
+        api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            return None
+        with _ai_client_lock:
+            if _ai_client is None:
+                try:
+                    from google import genai
+                    _ai_client = genai.Client(api_key=api_key)
+                except Exception:
+                    return None
+    return _ai_client
 
-# Initialize AI Client
-try:
-    api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
-    if api_key:
-        ai_client = genai.Client(api_key=api_key)
-    else:
-        ai_client = None
-except Exception as e:
-    ai_client = None
 
 @st.cache_data(ttl=3600, show_spinner=False)
 def fetch_agmarknet_prices(state="Maharashtra", commodity="Tomato"):
     """Fetch live prices from Agmarknet website"""
+    from bs4 import BeautifulSoup
+    
     try:
         base_url = "https://agmarknet.gov.in/PriceAndArrivals/CommodityDailyStateWise.aspx"
         response = requests.get(base_url, timeout=30)
@@ -55,6 +70,9 @@ def fetch_agmarknet_prices(state="Maharashtra", commodity="Tomato"):
 
         df = pd.DataFrame(data)
         
+        # Keep every scraped row as training history for the local price forecaster
+        record_price_history(df)
+        
         # Filter by state and commodity
         if not df.empty:
             df = df[
@@ -69,6 +87,53 @@ def fetch_agmarknet_prices(state="Maharashtra", commodity="Tomato"):
     except Exception as e:
         return None, f"Error: {str(e)}"
 
+def record_price_history(df):
+    """Store scraped Agmarknet rows in mandi_price_history (best effort)."""
+    if df is None or df.empty:
+        return 0
+    
+    try:
+        from database.db_functions import add_mandi_prices
+        
+        dates = pd.to_datetime(df["Date"], dayfirst=True, errors="coerce")
+        prices = df[["Min Price", "Max Price", "Modal Price"]].apply(
+            lambda col: pd.to_numeric(col.astype(str).str.replace(",", ""), errors="coerce")
+        )
+        rows = []
+        for idx, row in df.iterrows():
+            if pd.isna(dates.at[idx]) or pd.isna(prices.at[idx, "Modal Price"]):
+                continue
+            rows.append((row["Commodity"], row["Market"], row["State"],
+                         dates.at[idx].strftime("%Y-%m-%d"),
+                         prices.at[idx, "Min Price"], prices.at[idx, "Max Price"],
+                         prices.at[idx, "Modal Price"]))
+        written = add_mandi_prices(rows)
+        evaluate_price_alerts(rows)
+        return written
+    except Exception as e:
+        print(f"Could not record mandi price history: {e}")
+        return 0
+
+def evaluate_price_alerts(rows, max_age_days=ALERT_MAX_AGE_DAYS):
+    """Run price alerts against the latest average modal price per commodity."""
+    from database.price_alert_engine import process_price_updates
+    
+    cutoff = (datetime.now() - timedelta(days=max_age_days)).strftime("%Y-%m-%d")
+    latest = {}
+    for commodity, _, _, price_date, _, _, modal_price in rows:
+        if price_date < cutoff:
+            continue
+        date, prices = latest.get(commodity, (None, []))
+        if date is None or price_date > date:
+            latest[commodity] = (price_date, [modal_price])
+        elif price_date == date:
+            prices.append(modal_price)
+    
+    return process_price_updates(
+        {commodity: sum(prices) / len(prices) for commodity, (_, prices) in latest.items()},
+        source="agmarknet"
+    )
+
 # Fallback sample data
 SAMPLE_PRICES = {
     "Maharashtra": {
@@ -108,6 +173,7 @@ SAMPLE_PRICES = {
 
 def get_ai_market_insights(price_data, commodity, location):
     """Generate AI-powered market insights"""
+    ai_client = get_ai_client()
     if not ai_client:
         return "AI insights unavailable. Please check AI API configuration."
     
@@ -163,6 +229,7 @@ Keep advice practical, specific to Indian agricultural markets, and focused on m
 
 def ask_ai_assistant(user_query, context_data=None):
     """AI assistant for market questions with Google Search"""
+    ai_client = get_ai_client()
     if not ai_client:
         return "❌ AI assistant unavailable. Please configure GEMINI_API_KEY in .env file."
     
@@ -203,6 +270,7 @@ You are an expert agricultural market advisor for Indian farmers.
 
 def get_live_price_with_search(commodity, location):
     """Get live market prices for commodities"""
+    ai_client = get_ai_client()
     if not ai_client:
         return None
     
@@ -233,6 +301,7 @@ Keep response concise and factual.
 
 def render_market_price():
     """Main component to display market prices"""
+    ai_client = get_ai_client()
     # Mobile responsive CSS for market price component
     st.markdown("""
     <style>
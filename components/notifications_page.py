@@ -2,42 +2,12 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
 from database.db_functions import get_connection
+from database.migrations import ensure_schema
 import sqlite3
 
 def init_notifications_table():
-    """Initialize notifications and alerts table"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    # Create notifications table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS notifications (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            farmer_name TEXT NOT NULL,
-            type TEXT NOT NULL,
-            title TEXT NOT NULL,
-            message TEXT NOT NULL,
-            priority TEXT DEFAULT 'medium',
-            is_read INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Create price alerts table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS price_alerts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            farmer_name TEXT NOT NULL,
-            commodity TEXT NOT NULL,
-            target_price REAL NOT NULL,
-            alert_type TEXT NOT NULL,
-            is_active INTEGER DEFAULT 1,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    conn.commit()
-    conn.close()
+    """Initialize notifications and alerts table (once per process)"""
+    ensure_schema()
 
 def add_notification(farmer_name, notif_type, title, message, priority="medium"):
     """Add a notification for a farmer"""
@@ -105,6 +75,89 @@ def delete_price_alert(alert_id):
     conn.commit()
     conn.close()
 
+def get_all_active_price_alerts():
+    """Get every active price alert with the farmer's location (for batch jobs)"""
+    conn = get_connection()
+    df = pd.read_sql_query("""
+        SELECT a.id, a.farmer_name, a.commodity, a.target_price, a.alert_type,
+               COALESCE(f.location, 'India') AS location
+        FROM price_alerts a
+        LEFT JOIN farmers f ON LOWER(f.name) = LOWER(a.farmer_name)
+        WHERE a.is_active = 1
+    """, conn)
+    conn.close()
+    return df
+
+def forecast_price_alerts(predictor=None, horizon="day_7"):
+    """
+    Warn farmers whose price alerts are forecast to trigger, in one batch pass.
+    
+    All active alerts are turned into a single PricePredictor.predict_batch call, so
+    alerts for the same commodity and location share one prediction. An alert is
+    warned once per horizon: not again until that forecast window has passed.
+    
+    Returns:
+        Number of forecast notifications created
+    """
+    alerts_df = get_all_active_price_alerts()
+    if alerts_df.empty:
+        return 0
+    
+    if predictor is None:
+        from ai.price_predictor import PricePredictor
+        predictor = PricePredictor()
+    
+    results = predictor.predict_batch([
+        {'crop_name': alert['commodity'], 'location': alert['location'], 'current_price': None}
+        for _, alert in alerts_df.iterrows()
+    ])
+    
+    days = int(horizon.split('_')[1])
+    today = datetime.now().date()
+    conn = get_connection()
+    try:
+        warned = {row[0] for row in conn.execute("""
+            SELECT alert_id FROM price_forecast_warnings WHERE horizon = ? AND sent_on > ?
+        """, (horizon, (today - timedelta(days=days)).isoformat()))}
+        
+        warnings, notifications = [], []
+        for (_, alert), (_, result) in zip(alerts_df.iterrows(), results.iterrows()):
+            if alert['id'] in warned:
+                continue
+            forecast_price = result[horizon] if result['success'] else None
+            if forecast_price is None or pd.isna(forecast_price):
+                continue
+            
+            target = alert['target_price']
+            alert_type = alert['alert_type']
+            hit = ((alert_type == "Goes Above" and forecast_price >= target) or
+                   (alert_type == "Goes Below" and forecast_price <= target) or
+                   (alert_type == "Equals" and abs(forecast_price - target) <= target * 0.02))
+            if hit:
+                warned.add(alert['id'])
+                warnings.append((int(alert['id']), horizon, today.isoformat()))
+                notifications.append((
+                    alert['farmer_name'], "price_forecast",
+                    f"📈 {alert['commodity']} may reach your target",
+                    f"{alert['commodity']} is forecast at ₹{forecast_price:.0f} in {days} days "
+                    f"(your alert: {alert_type.lower()} ₹{target:.0f}).",
+                    "high"
+                ))
+        
+        if notifications:
+            conn.executemany("""
+                INSERT OR IGNORE INTO price_forecast_warnings (alert_id, horizon, sent_on) VALUES (?, ?, ?)
+            """, warnings)
+            conn.executemany("""
+                INSERT INTO notifications (farmer_name, type, title, message, priority)
+                VALUES (?, ?, ?, ?, ?)
+            """, notifications)
+            conn.commit()
+    finally:
+        conn.close()
+    
+    return len(notifications)
+
 def render_notifications_page():
     """
     Render Notifications and Alerts page
@@ -3,10 +3,14 @@ Offline Manager - Handles offline data storage and sync for rural connectivity
 """
 import streamlit as st
 import json
-import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
 import pickle
+import uuid
+
+from database.cache_manager import CacheManager
+from database.migrations import ensure_schema
+from database import query_stats
 
 
 class OfflineManager:
@@ -14,183 +18,89 @@ class OfflineManager:
     
     def __init__(self, db_path="farmermarket.db"):
         self.db_path = db_path
+        self.cache = CacheManager(db_path)
         self.init_offline_cache()
     
+    @staticmethod
+    def is_offline():
+        """Offline flag set by the connectivity check in the sidebar"""
+        return not st.session_state.get('is_online', True)
+    
+    @staticmethod
+    def price_location(market, state):
+        """Cache location key for a market: 'Market, State'"""
+        return ', '.join(part for part in (market, state) if part)
+    
     def init_offline_cache(self):
-        """Initialize offline cache tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Cache for weather data
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS weather_cache (
-                location TEXT PRIMARY KEY,
-                data TEXT NOT NULL,
-                cached_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                expires_at TIMESTAMP NOT NULL
-            )
-        ''')
-        
-        # Cache for market prices
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS price_cache (
-                commodity TEXT,
-                market TEXT,
-                state TEXT,
-                data TEXT NOT NULL,
-                cached_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                expires_at TIMESTAMP NOT NULL,
-                PRIMARY KEY (commodity, market, state)
-            )
-        ''')
-        
-        # Cache for calendar events
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS calendar_cache (
-                user_id INTEGER,
-                date TEXT,
-                events TEXT NOT NULL,
-                cached_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (user_id, date)
-            )
-        ''')
-        
-        # Offline sync queue
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sync_queue (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                action_type TEXT NOT NULL,
-                data TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                synced INTEGER DEFAULT 0
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        """Initialize offline cache and sync queue tables (once per process)"""
+        # Weather, price and calendar caches live in CacheManager's tables
+        ensure_schema(self.db_path)
     
     def cache_weather(self, location, data, hours=6):
         """Cache weather data for offline access"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        expires_at = datetime.now() + timedelta(hours=hours)
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO weather_cache (location, data, expires_at)
-            VALUES (?, ?, ?)
-        ''', (location, json.dumps(data), expires_at))
-        
-        conn.commit()
-        conn.close()
+        self.cache.set_weather_cache(location, data, hours=hours)
     
-    def get_cached_weather(self, location):
-        """Get cached weather data"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT data, cached_at FROM weather_cache
-            WHERE location = ? AND expires_at > CURRENT_TIMESTAMP
-        ''', (location,))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
-            data = json.loads(result[0])
-            data['_cached'] = True
-            data['_cached_at'] = result[1]
-            return data
-        return None
+    def get_cached_weather(self, location, offline=None):
+        """
+        Get cached weather data, flagged with _cached/_cached_at/_stale.
+        Expired entries are only served when offline (default: session state).
+        """
+        offline = self.is_offline() if offline is None else offline
+        data = self.cache.get_weather_cache(location, allow_stale=True)
+        if data and data.get('_stale') and not offline:
+            return None
+        return data
     
     def cache_market_price(self, commodity, market, state, data, hours=24):
         """Cache market price data"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        expires_at = datetime.now() + timedelta(hours=hours)
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO price_cache 
-            (commodity, market, state, data, expires_at)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (commodity, market, state, json.dumps(data), expires_at))
-        
-        conn.commit()
-        conn.close()
+        self.cache.set_market_price_cache(commodity, self.price_location(market, state), data, hours=hours)
     
-    def get_cached_price(self, commodity, market, state):
-        """Get cached market price"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT data, cached_at FROM price_cache
-            WHERE commodity = ? AND market = ? AND state = ?
-            AND expires_at > CURRENT_TIMESTAMP
-        ''', (commodity, market, state))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
-            data = json.loads(result[0])
-            data['_cached'] = True
-            data['_cached_at'] = result[1]
-            return data
-        return None
+    def get_cached_price(self, commodity, market, state, offline=None):
+        """Get cached market price (stale entries only when offline)"""
+        offline = self.is_offline() if offline is None else offline
+        data = self.cache.get_market_price_cache(commodity, self.price_location(market, state),
+                                                 allow_stale=True)
+        if data and data.get('_stale') and not offline:
+            return None
+        return data
     
     def cache_calendar_events(self, user_id, date, events):
         """Cache calendar events for offline access"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO calendar_cache (user_id, date, events)
-            VALUES (?, ?, ?)
-        ''', (user_id, date, json.dumps(events)))
-        
-        conn.commit()
-        conn.close()
+        self.cache.set_calendar_cache(user_id, date, events)
     
     def get_cached_calendar(self, user_id, date):
         """Get cached calendar events"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT events, cached_at FROM calendar_cache
-            WHERE user_id = ? AND date = ?
-        ''', (user_id, date))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
-            return {
-                'events': json.loads(result[0]),
-                '_cached': True,
-                '_cached_at': result[1]
-            }
-        return None
+        return self.cache.get_calendar_cache(user_id, date)
     
-    def add_to_sync_queue(self, action_type, data):
-        """Add action to sync queue for later processing"""
-        conn = sqlite3.connect(self.db_path)
+    def add_to_sync_queue(self, action_type, data, idempotency_key=None):
+        """
+        Add action to sync queue for later processing
+        
+        Args:
+            action_type: One of sync_engine.HANDLERS (e.g. 'create_crop_listing')
+            data: Action payload
+            idempotency_key: Client-generated key; re-queuing the same key never
+                applies the action twice (default: a new unique key)
+        
+        Returns:
+            The idempotency key
+        """
+        idempotency_key = idempotency_key or uuid.uuid4().hex
+        conn = query_stats.connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute('''
-            INSERT INTO sync_queue (action_type, data)
-            VALUES (?, ?)
-        ''', (action_type, json.dumps(data)))
+            INSERT INTO sync_queue (action_type, data, idempotency_key)
+            VALUES (?, ?, ?)
+        ''', (action_type, json.dumps(data), idempotency_key))
         
         conn.commit()
         conn.close()
+        return idempotency_key
     
     def get_pending_syncs(self):
         """Get all pending sync actions"""
-        conn = sqlite3.connect(self.db_path)
+        conn = query_stats.connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -209,24 +119,33 @@ class OfflineManager:
     
     def mark_synced(self, sync_id):
         """Mark a sync action as completed"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE sync_queue SET synced = 1
-            WHERE id = ?
-        ''', (sync_id,))
-        
+        self.mark_synced_many([sync_id])
+    
+    def mark_synced_many(self, sync_ids):
+        """Mark several sync actions as completed in one transaction"""
+        conn = query_stats.connect(self.db_path)
+        conn.executemany('UPDATE sync_queue SET synced = 1 WHERE id = ?',
+                         [(sync_id,) for sync_id in sync_ids])
         conn.commit()
         conn.close()
     
+    def sync_pending(self, batch_size=200):
+        """
+        Replay queued offline actions in batched, idempotent transactions.
+        
+        Returns:
+            Replay metrics (applied, duplicates, coalesced, failed, actions_per_second, ...)
+        """
+        from components.sync_engine import SyncEngine
+        return SyncEngine(self.db_path).run(batch_size=batch_size)
+    
     def clean_expired_cache(self):
         """Remove expired cache entries"""
-        conn = sqlite3.connect(self.db_path)
+        self.cache.clear_expired_cache()
+        
+        conn = query_stats.connect(self.db_path)
         cursor = conn.cursor()
         
-        cursor.execute('DELETE FROM weather_cache WHERE expires_at < CURRENT_TIMESTAMP')
-        cursor.execute('DELETE FROM price_cache WHERE expires_at < CURRENT_TIMESTAMP')
         cursor.execute('DELETE FROM sync_queue WHERE synced = 1 AND created_at < datetime("now", "-7 days")')
         
         conn.commit()
@@ -234,15 +153,16 @@ class OfflineManager:
     
     def get_cache_stats(self):
         """Get cache statistics"""
-        conn = sqlite3.connect(self.db_path)
+        conn = query_stats.connect(self.db_path)
         cursor = conn.cursor()
         
         stats = {}
+        now = datetime.now().isoformat()
         
-        cursor.execute('SELECT COUNT(*) FROM weather_cache WHERE expires_at > CURRENT_TIMESTAMP')
+        cursor.execute('SELECT COUNT(*) FROM weather_cache WHERE expires_at > ?', (now,))
         stats['weather_cached'] = cursor.fetchone()[0]
         
-        cursor.execute('SELECT COUNT(*) FROM price_cache WHERE expires_at > CURRENT_TIMESTAMP')
+        cursor.execute('SELECT COUNT(*) FROM market_price_cache WHERE expires_at > ?', (now,))
         stats['prices_cached'] = cursor.fetchone()[0]
         
         cursor.execute('SELECT COUNT(*) FROM calendar_cache')
@@ -251,6 +171,9 @@ class OfflineManager:
         cursor.execute('SELECT COUNT(*) FROM sync_queue WHERE synced = 0')
         stats['pending_syncs'] = cursor.fetchone()[0]
         
+        cursor.execute('SELECT COUNT(*) FROM sync_queue WHERE synced = -1')
+        stats['failed_syncs'] = cursor.fetchone()[0]
+        
         conn.close()
         return stats
 
@@ -281,6 +204,13 @@ def render_offline_status():
             
             if stats['pending_syncs'] > 0:
                 st.warning(f"⏳ {stats['pending_syncs']} pending syncs")
+                if is_online and st.button("🔄 Sync now"):
+                    result = offline_mgr.sync_pending()
+                    st.success(f"✅ Synced {result['applied']} actions "
+                               f"({result['duplicates'] + result['coalesced']} merged, {result['failed']} failed)")
+            
+            if stats['failed_syncs'] > 0:
+                st.error(f"⚠️ {stats['failed_syncs']} actions could not be synced")
             
             if st.button("🗑️ Clear Cache"):
                 offline_mgr.clean_expired_cache()
@@ -246,13 +246,13 @@ def render_onboarding_checklist(farmer_name):
 
 def check_and_update_listing_task(farmer_name):
     """Check if farmer has created their first listing and update progress."""
-    from database.db_functions import get_data
+    from database.db_functions import get_dataset
     progress = get_onboarding_progress(farmer_name)
     
     if not progress.get('first_listing_created', 0):
         # Check if farmer has any listings
-        tools = get_data("tools")
-        crops = get_data("crops")
+        tools = get_dataset("tools")
+        crops = get_dataset("crops")
         
         has_tools = not tools.empty and farmer_name in tools['Farmer'].values
         has_crops = not crops.empty and farmer_name in crops['Farmer'].values
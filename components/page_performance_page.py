@@ -0,0 +1,131 @@
+# components/page_performance_page.py
+"""
+Page Performance Dashboard
+Latency budgets per menu page from sampled rerun traces: p50/p95/p99 of the
+whole rerun and of each span type (database, HTTP, AI, translation and the
+remaining Python rendering), the slowest traces with their spans, and a
+one-off cProfile capture of a page's next rerun.
+"""
+
+from datetime import datetime, timedelta
+
+import streamlit as st
+import pandas as pd
+
+from database import tracing
+from components import page_registry
+
+WINDOWS = {
+    "Last hour": timedelta(hours=1),
+    "Last 24 hours": timedelta(days=1),
+    "Last 7 days": timedelta(days=7),
+    "All time": None,
+}
+
+KIND_LABELS = {
+    'total': "⏱️ Whole rerun",
+    'render': "🖥️ Python rendering",
+    'db': "🗄️ Database",
+    'http': "🌐 HTTP",
+    'llm': "🤖 AI (Gemini)",
+    'translation': "🔤 Translation",
+}
+
+
+def render_page_performance_page():
+    """Render the page latency dashboard."""
+    st.header("⏱️ Page Performance")
+    st.caption(f"{tracing.TRACE_SAMPLE_RATE:.0%} of page reruns are traced "
+               f"(set TRACE_SAMPLE_RATE to change). Times are in milliseconds.")
+
+    window = st.selectbox("Time window", list(WINDOWS), index=1)
+    since = datetime.now() - WINDOWS[window] if WINDOWS[window] else None
+    summary = tracing.get_latency_summary(since=since.isoformat() if since else None)
+
+    if not summary:
+        st.info("No traces recorded in this window yet. Browse a few pages and come back.")
+    else:
+        render_latency_budgets(summary)
+
+    st.markdown("---")
+    render_slowest_traces()
+
+    st.markdown("---")
+    render_profile_capture()
+
+
+def render_latency_budgets(summary):
+    """Whole-rerun percentiles per page, then the span type breakdown of one page."""
+    st.subheader("📊 Rerun Latency by Page")
+
+    totals = pd.DataFrame([
+        {'Page': row['page'], 'Traces': row['traces'], 'p50': row['p50_ms'],
+         'p95': row['p95_ms'], 'p99': row['p99_ms']}
+        for row in summary if row['kind'] == 'total'
+    ])
+    st.dataframe(totals, width="stretch", hide_index=True)
+    st.bar_chart(totals.set_index('Page')[['p50', 'p95']])
+
+    st.subheader("🔍 Where the Time Goes")
+    page = st.selectbox("Page", totals['Page'].tolist(), key="perf_breakdown_page")
+    breakdown = pd.DataFrame([
+        {'Span type': KIND_LABELS.get(row['kind'], row['kind']), 'p50': row['p50_ms'],
+         'p95': row['p95_ms'], 'p99': row['p99_ms'], 'Spans per rerun': row['avg_spans']}
+        for row in summary if row['page'] == page and row['kind'] != 'total'
+    ])
+    st.dataframe(breakdown, width="stretch", hide_index=True)
+
+
+def render_slowest_traces():
+    """The slowest stored traces, each with its spans and profile if captured."""
+    st.subheader("🐢 Slowest Reruns")
+
+    traces = tracing.get_recent_traces(limit=10, slowest=True)
+    if not traces:
+        st.info("No traces stored yet")
+        return
+
+    for summary in traces:
+        label = f"{summary['duration_ms']:.0f} ms · {summary['page']} · {summary['started_at'][:19]}"
+        if summary['has_profile']:
+            label += " · 📈 profiled"
+        with st.expander(label):
+            trace = tracing.get_trace(summary['id'])
+            if trace['spans']:
+                spans_df = pd.DataFrame(trace['spans'])
+                spans_df['name'] = ['  ' * depth + name for depth, name in zip(spans_df['depth'], spans_df['name'])]
+                st.dataframe(spans_df[['start_ms', 'duration_ms', 'kind', 'name']],
+                             width="stretch", hide_index=True)
+                if trace['span_count'] > len(trace['spans']):
+                    st.caption(f"Showing the first {len(trace['spans'])} of {trace['span_count']} spans")
+            else:
+                st.caption("No database, HTTP, AI or translation calls in this rerun")
+            if trace['profile']:
+                st.code(trace['profile'], language="text")
+
+    if st.button("🗑️ Clear All Traces", width="stretch"):
+        tracing.clear_traces()
+        st.rerun()
+
+
+def render_profile_capture():
+    """Ask for the next rerun of a page to be captured with cProfile."""
+    st.subheader("📈 Profile a Page")
+    st.markdown("The next time you open the chosen page, that rerun runs under cProfile and is "
+                "stored with its trace. Profiling slows the rerun down, so its timing is not "
+                "representative.")
+
+    pending = st.session_state.get("profile_page")
+    if pending:
+        st.info(f"Waiting to profile the next visit to **{pending}**")
+
+    page = st.selectbox("Page to profile", sorted(page_registry.PAGES), key="perf_profile_page")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("📈 Profile Next Visit", width="stretch", type="primary"):
+            st.session_state.profile_page = page
+            st.rerun()
+    with col2:
+        if pending and st.button("✖️ Cancel", width="stretch"):
+            st.session_state.profile_page = None
+            st.rerun()
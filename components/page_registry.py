@@ -0,0 +1,90 @@
+# components/page_registry.py
+"""
+Lazy Page Registry
+Maps menu entries to "module:function" render targets and imports a page's
+module only when that page is first shown, so a cold start pays for the
+shared shell (database, translations, PWA) instead of every page's SDKs.
+Import times are recorded per module for the startup benchmark.
+"""
+
+import importlib
+import sys
+import threading
+import time
+
+# Menu entry -> render target. Old labels from earlier menus stay as aliases.
+PAGES = {
+    "🏠 Home": "components.home_page:render_home_page",
+    "👤 My Profile": "components.view_profile_page:render_view_profile_page",
+    "👷 Worker Board": "components.labor_board:render_labor_board",
+    "🌤️ Weather Forecast": "components.weather_component:render_weather_component",
+    "💰 Market Prices": "components.market_price_scraper:render_market_price",
+    "💰 Today's Market Price": "components.market_price_scraper:render_market_price",
+    "🤖 AI Price Prediction": "components.simple_price_advisor:render_simple_price_advisor",
+    "🤔 Should I Sell?": "components.simple_price_advisor:render_simple_price_advisor",
+    "🌡️ Climate Risk Dashboard": "components.climate_risk_dashboard:render_climate_risk_dashboard",
+    "🌾 Climate-Smart Crops": "components.climate_smart_crops:render_climate_smart_crops",
+    "💧 Water & Carbon Tracker": "components.sustainability_tracker:render_sustainability_tracker",
+    "🗺️ Nearby Places & Services": "components.location_services_page:render_location_services_page",
+    "👥 Manage Farmers": "components.profiles_page:render_profiles_page",
+    "🗄️ Database Viewer": "components.home_page:render_db_check",
+    "💾 Cache Management": "components.cache_admin_page:render_cache_admin_page",
+    "⏱️ Page Performance": "components.page_performance_page:render_page_performance_page",
+    "🏛️ Government Schemes": "components.government_schemes_page:render_government_schemes_page",
+    "🏛️ Schemes & Financial Tools": "components.government_schemes_page:render_government_schemes_page",
+    "📒 My Money Diary": "components.simple_finance_page:render_simple_finance_page",
+    "💰 My Money Diary": "components.simple_finance_page:render_simple_finance_page",
+    "💰 Farm Finance Management": "components.simple_finance_page:render_simple_finance_page",
+    "🤖 AI Chatbot": "components.ai_chatbot_page:render_ai_chatbot_page",
+    "🗣️ Ask Advisor": "components.voice_chatbot:render_voice_chatbot",
+    "🔔 Notifications & Alerts": "components.notifications_page:render_notifications_page",
+}
+
+# module name -> seconds its first import took in this process
+_import_times = {}
+_import_lock = threading.Lock()
+
+
+def import_page_module(module_name):
+    """Import a page module, recording how long the first import took."""
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+
+    with _import_lock:
+        if module_name in sys.modules:
+            return sys.modules[module_name]
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        _import_times[module_name] = time.perf_counter() - start
+    return module
+
+
+def load(target):
+    """Resolve a "module:function" target, importing its module on first use."""
+    module_name, function_name = target.split(':')
+    return getattr(import_page_module(module_name), function_name)
+
+
+def render_page(menu, *args, **kwargs):
+    """
+    Render a registered page.
+
+    Returns:
+        True if the menu entry is registered, False otherwise
+    """
+    target = PAGES.get(menu)
+    if target is None:
+        return False
+    load(target)(*args, **kwargs)
+    return True
+
+
+def page_modules():
+    """Every distinct module behind a registered page, in menu order."""
+    return list(dict.fromkeys(target.split(':')[0] for target in PAGES.values()))
+
+
+def get_import_times():
+    """{module: seconds} for page modules imported so far in this process."""
+    return dict(_import_times)
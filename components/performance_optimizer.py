@@ -1,47 +1,24 @@
 """
 Performance Optimizer - Database indexing, query optimization, lazy loading
 """
-import sqlite3
+import os
+import threading
 import streamlit as st
 from functools import wraps
 from time import time
 import hashlib
 
+from database import db_functions, query_stats
+from database.migrations import ensure_schema
 
-def create_database_indexes():
-    """Create indexes for frequently queried columns"""
-    conn = sqlite3.connect('farmermarket.db')
-    cursor = conn.cursor()
-    
-    # Farmers table indexes - only create if columns exist
-    try:
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_farmers_name ON farmers(name)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_farmers_location ON farmers(location)')
-    except sqlite3.OperationalError as e:
-        print(f"⚠️ Performance optimization warning: {e}")
-    
-    # Tool listings indexes
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_tools_farmer_id ON tool_listings(farmer_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_tools_district ON tool_listings(district)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_tools_category ON tool_listings(category)')
-    
-    # Crop listings indexes
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_crops_farmer_id ON crop_listings(farmer_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_crops_district ON crop_listings(district)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_crops_category ON crop_listings(category)')
-    
-    # Weather cache indexes
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_weather_location ON weather_cache(location)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_weather_expires ON weather_cache(expires_at)')
-    
-    # Price cache indexes
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_price_commodity ON price_cache(commodity)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_price_market ON price_cache(market)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_price_expires ON price_cache(expires_at)')
-    
-    conn.commit()
-    conn.close()
-    print("✅ Database indexes created")
+
+# Database paths already provisioned in this process
+_provisioned = set()
+_provision_lock = threading.Lock()
+
+
+def _db_path(db_path=None):
+    return db_path or db_functions.DB_NAME
 
 
 def query_timer(func):
@@ -60,7 +37,7 @@ def query_timer(func):
 @st.cache_data(ttl=3600)
 def cached_query(query, params=None):
     """Execute cached database query"""
-    conn = sqlite3.connect('farmermarket.db')
+    conn = query_stats.connect(_db_path())
     cursor = conn.cursor()
     
     if params:
@@ -75,22 +52,22 @@ def cached_query(query, params=None):
 
 @st.cache_data(ttl=3600, show_spinner=False)
 def get_districts_cached():
-    """Get cached list of districts"""
-    query = "SELECT DISTINCT district FROM farmers WHERE district IS NOT NULL"
+    """Get cached list of farmer locations"""
+    query = "SELECT DISTINCT location FROM farmers WHERE location IS NOT NULL ORDER BY location"
     return [row[0] for row in cached_query(query)]
 
 
 @st.cache_data(ttl=1800, show_spinner=False)
 def get_tool_categories_cached():
-    """Get cached tool categories"""
-    query = "SELECT DISTINCT category FROM tool_listings WHERE category IS NOT NULL"
+    """Get cached tool types"""
+    query = "SELECT DISTINCT Tool FROM tools WHERE Tool IS NOT NULL ORDER BY Tool"
     return [row[0] for row in cached_query(query)]
 
 
 @st.cache_data(ttl=1800, show_spinner=False)
 def get_crop_categories_cached():
-    """Get cached crop categories"""
-    query = "SELECT DISTINCT category FROM crop_listings WHERE category IS NOT NULL"
+    """Get cached crop names"""
+    query = "SELECT DISTINCT Crop FROM crops WHERE Crop IS NOT NULL ORDER BY Crop"
     return [row[0] for row in cached_query(query)]
 
 
@@ -172,12 +149,10 @@ def compress_image_data(image_bytes, max_size_kb=500):
         return image_bytes
 
 
-def enable_connection_pooling():
+def enable_connection_pooling(db_path=None):
     """Enable SQLite connection pooling for better performance"""
-    import sqlite3
-    
     # Set pragmas for better performance
-    conn = sqlite3.connect('farmermarket.db')
+    conn = query_stats.connect(_db_path(db_path))
     cursor = conn.cursor()
     
     # Performance pragmas
@@ -196,7 +171,7 @@ def batch_insert(table, columns, data_list):
     if not data_list:
         return
     
-    conn = sqlite3.connect('farmermarket.db')
+    conn = query_stats.connect(_db_path())
     cursor = conn.cursor()
     
     placeholders = ','.join(['?' for _ in columns])
@@ -207,9 +182,9 @@ def batch_insert(table, columns, data_list):
     conn.close()
 
 
-def analyze_database():
+def analyze_database(db_path=None):
     """Analyze database and optimize"""
-    conn = sqlite3.connect('farmermarket.db')
+    conn = query_stats.connect(_db_path(db_path))
     cursor = conn.cursor()
     
     # Analyze tables for query optimizer
@@ -223,11 +198,19 @@ def analyze_database():
     print("✅ Database analyzed and optimized")
 
 
-def init_performance_optimizations():
-    """Initialize all performance optimizations"""
-    try:
-        create_database_indexes()
-        enable_connection_pooling()
-        print("✅ Performance optimizations initialized")
-    except Exception as e:
-        print(f"⚠️ Performance optimization warning: {e}")
+def init_performance_optimizations(db_path=None):
+    """Initialize all performance optimizations (once per process and database)"""
+    db_path = os.path.abspath(_db_path(db_path))
+    if db_path in _provisioned:
+        return
+    with _provision_lock:
+        if db_path in _provisioned:
+            return
+        try:
+            # Workload indexes come with the schema (migration 14)
+            ensure_schema(db_path)
+            enable_connection_pooling(db_path)
+            _provisioned.add(db_path)
+            print("✅ Performance optimizations initialized")
+        except Exception as e:
+            print(f"⚠️ Performance optimization warning: {e}")
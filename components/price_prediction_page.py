@@ -182,6 +182,9 @@ def render_price_prediction_page():
                             if prediction.get('online_data'):
                                 online = prediction['online_data']
                                 st.markdown("### 🔍 Market Intelligence (Google Search)")
+                                if online.get('digest_built_at'):
+                                    freshness = "⚠️ refreshing soon" if online.get('stale') else "✅ fresh"
+                                    st.caption(f"Digest updated {online['digest_built_at'][:16].replace('T', ' ')} ({freshness})")
                                 
                                 if online.get('current_price'):
                                     price_diff = online['current_price'] - current_price
@@ -271,6 +274,16 @@ def render_price_prediction_page():
                                 </div>
                                 """, unsafe_allow_html=True)
                             
+                            # Forecast ranges from the local forecasting engine
+                            if prediction.get('intervals'):
+                                ranges = prediction['intervals']
+                                st.caption(
+                                    f"📐 Likely ranges (80%): Day 7 ₹{ranges['day_7']['low']:.0f}-{ranges['day_7']['high']:.0f} · "
+                                    f"Day 15 ₹{ranges['day_15']['low']:.0f}-{ranges['day_15']['high']:.0f} · "
+                                    f"Day 30 ₹{ranges['day_30']['low']:.0f}-{ranges['day_30']['high']:.0f} "
+                                    f"(local model, mandi history up to {prediction['forecast']['as_of']})"
+                                )
+                            
                             # Peak and Lowest days
                             st.markdown("### 📅 Best and Worst Days")
                             col1, col2 = st.columns(2)
@@ -5,68 +5,85 @@ Just track: Money In and Money Out
 """
 
 import streamlit as st
-import sqlite3
 import pandas as pd
 from datetime import datetime, date
 from calendar import month_name
 from components.translation_utils import t
+from database.migrations import ensure_schema
+from database import query_stats
 
 DB_NAME = 'farmermarket.db'
 
 def init_simple_finance_db():
-    """Create simple money tracking table."""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    
-    c.execute("""CREATE TABLE IF NOT EXISTS simple_money_tracker (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        farmer_name TEXT NOT NULL,
-        entry_type TEXT NOT NULL,
-        amount REAL NOT NULL,
-        reason TEXT NOT NULL,
-        entry_date TEXT NOT NULL,
-        created_at TEXT DEFAULT CURRENT_TIMESTAMP
-    )""")
-    
-    conn.commit()
-    conn.close()
+    """Create simple money tracking table (once per process)."""
+    ensure_schema(DB_NAME)
 
-def add_money_entry(farmer_name, entry_type, amount, reason, entry_date):
-    """Add money in/out entry."""
-    conn = sqlite3.connect(DB_NAME)
+def add_money_entry(farmer_name, entry_type, amount, reason, entry_date, conn=None):
+    """Add money in/out entry. Pass conn to join a caller's transaction."""
+    own_conn = conn is None
+    if own_conn:
+        conn = query_stats.connect(DB_NAME)
     c = conn.cursor()
     c.execute("""
         INSERT INTO simple_money_tracker (farmer_name, entry_type, amount, reason, entry_date)
         VALUES (?, ?, ?, ?, ?)
     """, (farmer_name, entry_type, amount, reason, entry_date))
-    conn.commit()
-    conn.close()
+    if own_conn:
+        conn.commit()
+        conn.close()
 
 def get_month_summary(farmer_name, year, month):
-    """Get money in/out summary for a month."""
-    conn = sqlite3.connect(DB_NAME)
-    
-    # Get entries for the month
-    query = """
-        SELECT entry_type, SUM(amount) as total
-        FROM simple_money_tracker
-        WHERE farmer_name = ?
-        AND strftime('%Y', entry_date) = ?
-        AND strftime('%m', entry_date) = ?
+    """Get money in/out summary for a month (from the month rollup)."""
+    conn = query_stats.connect(DB_NAME)
+    rows = conn.execute("""
+        SELECT entry_type, SUM(total)
+        FROM money_month_rollup
+        WHERE farmer_name = ? AND month = ?
         GROUP BY entry_type
-    """
-    
-    df = pd.read_sql_query(query, conn, params=(farmer_name, str(year), f"{month:02d}"))
+    """, (farmer_name, f"{year}-{month:02d}")).fetchall()
     conn.close()
     
-    money_in = df[df['entry_type'] == 'Money In']['total'].sum() if not df.empty else 0
-    money_out = df[df['entry_type'] == 'Money Out']['total'].sum() if not df.empty else 0
+    totals = dict(rows)
+    return totals.get('Money In', 0) or 0, totals.get('Money Out', 0) or 0
+
+def get_reason_totals(farmer_name, year, month):
+    """Money in/out per reason for a month, largest first."""
+    conn = query_stats.connect(DB_NAME)
+    df = pd.read_sql_query("""
+        SELECT entry_type, reason, total, entries
+        FROM money_month_rollup
+        WHERE farmer_name = ? AND month = ?
+        ORDER BY total DESC
+    """, conn, params=(farmer_name, f"{year}-{month:02d}"))
+    conn.close()
+    return df
+
+def get_yearly_totals(farmer_name, years):
+    """
+    Money in/out per month for the given years.
     
-    return money_in, money_out
+    Returns:
+        DataFrame with one row per (year, month) that has entries:
+        year, month, money_in, money_out
+    """
+    conn = query_stats.connect(DB_NAME)
+    placeholders = ', '.join('?' * len(years))
+    df = pd.read_sql_query(f"""
+        SELECT CAST(substr(month, 1, 4) AS INTEGER) AS year,
+               CAST(substr(month, 6, 2) AS INTEGER) AS month,
+               SUM(CASE WHEN entry_type = 'Money In' THEN total ELSE 0 END) AS money_in,
+               SUM(CASE WHEN entry_type = 'Money Out' THEN total ELSE 0 END) AS money_out
+        FROM money_month_rollup
+        WHERE farmer_name = ? AND substr(month, 1, 4) IN ({placeholders})
+        GROUP BY month
+        ORDER BY month
+    """, conn, params=(farmer_name, *[str(y) for y in years]))
+    conn.close()
+    return df
 
 def get_recent_entries(farmer_name, limit=10):
     """Get recent money entries."""
-    conn = sqlite3.connect(DB_NAME)
+    conn = query_stats.connect(DB_NAME)
     query = """
         SELECT entry_type, amount, reason, entry_date
         FROM simple_money_tracker
@@ -247,6 +264,26 @@ def render_simple_finance_page():
         </div>
         """, unsafe_allow_html=True)
     
+    # Charts - served from the month rollup, not the raw entries
+    with st.expander(f"📊 {t('Where did the money go?')}"):
+        reasons_df = get_reason_totals(farmer_name, selected_year, selected_month)
+        if not reasons_df.empty:
+            chart_df = reasons_df.pivot_table(index='reason', columns='entry_type',
+                                              values='total', aggfunc='sum', fill_value=0)
+            st.bar_chart(chart_df)
+        else:
+            st.info(f"📝 {t('No entries this month')}")
+        
+        st.markdown(f"#### 📅 {selected_year} {t('vs')} {selected_year - 1}")
+        yearly_df = get_yearly_totals(farmer_name, [selected_year - 1, selected_year])
+        if not yearly_df.empty:
+            yearly_df['profit'] = yearly_df['money_in'] - yearly_df['money_out']
+            compare_df = yearly_df.pivot_table(index='month', columns='year',
+                                               values='profit', aggfunc='sum', fill_value=0)
+            compare_df.index = [month_name[m][:3] for m in compare_df.index]
+            compare_df.columns = [str(y) for y in compare_df.columns]
+            st.bar_chart(compare_df)
+    
     st.markdown("---")
     
     # Quick Add Buttons
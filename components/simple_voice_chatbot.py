@@ -4,9 +4,11 @@ Simplified Voice Chatbot - Minimal UI for home page integration
 
 import streamlit as st
 from google import genai
+from google.genai import types
 import os
 from streamlit_mic_recorder import mic_recorder
 from components.translation_utils import t, get_current_language
+from components.audio_pipeline import preprocess_audio
 
 def transcribe_voice(audio_bytes, language='en'):
     """Transcribe audio using Gemini"""
@@ -17,8 +19,9 @@ def transcribe_voice(audio_bytes, language='en'):
     try:
         client = genai.Client(api_key=api_key)
         
-        # Upload audio
-        audio_file = client.files.upload(path_or_bytes=audio_bytes, mime_type="audio/wav")
+        # Trimmed, compressed audio is small enough to send inline
+        audio = preprocess_audio(audio_bytes)
+        audio_part = types.Part.from_bytes(data=audio.data, mime_type=audio.mime_type)
         
         # Transcribe
         model_name = "gemini-2.5-flash"
@@ -26,7 +29,7 @@ def transcribe_voice(audio_bytes, language='en'):
         
         response = client.models.generate_content(
             model=model_name,
-            contents=[prompt, audio_file]
+            contents=[prompt, audio_part]
         )
         
         if response and response.text:
@@ -101,6 +104,7 @@ Be concise (3-5 sentences), practical, and provide actionable advice."""
             stop_prompt="⏹️ Stop Recording",
             just_once=False,
             use_container_width=True,
+            format="wav",
             key="simple_mic"
         )
     
@@ -0,0 +1,197 @@
+"""
+Sync Engine - Replays OfflineManager's sync_queue when the device is back online
+
+Pending actions are drained in batches, each batch inside one transaction:
+- every action carries an idempotency key, recorded in sync_applied in the
+  same transaction as the write, so a replayed or re-queued action is never
+  applied twice
+- coalescable actions are merged first (profile updates per farmer merge into
+  one, newest field wins; actions sharing an idempotency key collapse into one)
+- an action that fails is rolled back to its savepoint, retried later with
+  exponential backoff and parked as dead (synced = -1) after MAX_ATTEMPTS
+"""
+import json
+import time
+from datetime import datetime, timedelta
+
+from database import db_functions, query_stats
+
+BATCH_SIZE = 200
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 6 * 3600
+
+TOOL_COLUMNS = ('Farmer', 'Location', 'Tool', 'Rate', 'Contact', 'Notes', 'Photo')
+CROP_COLUMNS = ('Farmer', 'Location', 'Crop', 'Quantity', 'Expected_Price', 'Contact', 'Listing_Date', 'Photo')
+EVENT_COLUMNS = ('farmer_name', 'event_date', 'event_time', 'event_title', 'event_description',
+                 'weather_alert', 'created_at')
+PROFILE_FIELDS = ('name', 'location', 'farm_size', 'farm_unit', 'contact', 'weather_location',
+                  'latitude', 'longitude')
+
+
+def _row(data, columns):
+    return tuple(data.get(column) for column in columns)
+
+
+def _add_money_entry(conn, data):
+    from components.simple_finance_page import add_money_entry
+    add_money_entry(data['farmer_name'], data['entry_type'], data['amount'], data['reason'],
+                    data['entry_date'], conn=conn)
+
+
+def _update_profile(conn, data):
+    # Offline edits may carry only the changed fields; the rest keep their stored values
+    stored = conn.execute(f"SELECT {', '.join(PROFILE_FIELDS)} FROM farmers WHERE LOWER(name) = LOWER(?)",
+                          (data['name'],)).fetchone()
+    if stored is not None:
+        data = {**dict(zip(PROFILE_FIELDS, stored)), **data}
+    db_functions.update_farmer_profile(*_row(data, PROFILE_FIELDS), conn=conn)
+
+
+def _add_calendar_event(conn, data):
+    data = dict(data)
+    data.setdefault('event_time', '09:00')
+    data.setdefault('created_at', datetime.now().isoformat())
+    db_functions.add_data('calendar_events', _row(data, EVENT_COLUMNS), conn=conn)
+
+
+# action_type -> handler(conn, data); handlers write through the db_functions APIs
+HANDLERS = {
+    'create_tool_listing': lambda conn, data: db_functions.add_data('tools', _row(data, TOOL_COLUMNS), conn=conn),
+    'create_crop_listing': lambda conn, data: db_functions.add_data('crops', _row(data, CROP_COLUMNS), conn=conn),
+    'add_calendar_event': _add_calendar_event,
+    'add_money_entry': _add_money_entry,
+    'update_profile': _update_profile,
+}
+
+# action_type -> key function; actions with the same key merge, newer fields winning
+COALESCE_MERGE = {
+    'update_profile': lambda data: str(data.get('name', '')).lower(),
+}
+
+
+def _backoff(attempts):
+    return min(BACKOFF_BASE_SECONDS * (2 ** (attempts - 1)), BACKOFF_MAX_SECONDS)
+
+
+class SyncEngine:
+    """Drains sync_queue in batched, idempotent transactions."""
+
+    def __init__(self, db_path="farmermarket.db", handlers=None):
+        self.db_path = db_path
+        self.handlers = handlers if handlers is not None else HANDLERS
+
+    def _due_actions(self, conn, limit):
+        rows = conn.execute("""
+            SELECT id, action_type, data, idempotency_key, attempts FROM sync_queue
+            WHERE synced = 0 AND (next_attempt_at IS NULL OR next_attempt_at <= ?)
+            ORDER BY id LIMIT ?
+        """, (datetime.now().isoformat(), limit)).fetchall()
+        return [{'id': r[0], 'action_type': r[1], 'data': json.loads(r[2]),
+                 'key': r[3] or f"sync-{r[0]}", 'attempts': r[4] or 0} for r in rows]
+
+    @staticmethod
+    def _coalesce(actions):
+        """
+        Fold a batch into the actions to apply.
+
+        Each kept action carries the ids it absorbed in 'merged_ids'; they are only
+        marked synced together with it, so a failed merge keeps every row queued.
+        """
+        keep = {}
+        for action in actions:
+            key_fn = COALESCE_MERGE.get(action['action_type'])
+            if key_fn:
+                group = ('merge', action['action_type'], key_fn(action['data']))
+            else:
+                # Identical creates are legitimate (two equal money entries); only a re-queued key repeats
+                group = ('key', action['key'])
+
+            previous = keep.get(group)
+            if previous is None:
+                keep[group] = dict(action, merged_ids=[])
+            elif group[0] == 'merge':
+                keep[group] = dict(action, data={**previous['data'], **action['data']},
+                                   merged_ids=previous['merged_ids'] + [previous['id']])
+            else:
+                previous['merged_ids'].append(action['id'])
+        return sorted(keep.values(), key=lambda a: a['id'])
+
+    def _fail(self, conn, action, error):
+        attempts = action['attempts'] + 1
+        dead = attempts >= MAX_ATTEMPTS or action['action_type'] not in self.handlers
+        next_attempt = (datetime.now() + timedelta(seconds=_backoff(attempts))).isoformat()
+        # Absorbed rows back off with the action, so they are retried merged again
+        conn.executemany("""
+            UPDATE sync_queue SET attempts = ?, next_attempt_at = ?, last_error = ?, synced = ?
+            WHERE id = ?
+        """, [(attempts, next_attempt, error[:500], -1 if dead else 0, sync_id)
+              for sync_id in action['merged_ids'] + [action['id']]])
+
+    def _apply_batch(self, conn, actions):
+        start = time.perf_counter()
+        to_apply = self._coalesce(actions)
+        synced_ids = []
+        stats = {'size': len(actions), 'applied': 0, 'duplicates': 0,
+                 'coalesced': len(actions) - len(to_apply), 'failed': 0}
+
+        conn.execute("BEGIN IMMEDIATE")
+        for action in to_apply:
+            conn.execute("SAVEPOINT action")
+            try:
+                handler = self.handlers.get(action['action_type'])
+                if handler is None:
+                    raise ValueError(f"Unknown action type: {action['action_type']}")
+
+                claimed = conn.execute("""
+                    INSERT OR IGNORE INTO sync_applied (idempotency_key, sync_id, applied_at)
+                    VALUES (?, ?, ?)
+                """, (action['key'], action['id'], datetime.now().isoformat())).rowcount
+                if claimed:
+                    handler(conn, action['data'])
+                    stats['applied'] += 1
+                else:
+                    stats['duplicates'] += 1
+                conn.execute("RELEASE action")
+                synced_ids.extend(action['merged_ids'] + [action['id']])
+            except Exception as e:
+                conn.execute("ROLLBACK TO action")
+                conn.execute("RELEASE action")
+                self._fail(conn, action, str(e))
+                stats['failed'] += 1
+
+        conn.executemany("UPDATE sync_queue SET synced = 1, last_error = NULL WHERE id = ?",
+                         [(sync_id,) for sync_id in synced_ids])
+        conn.execute("COMMIT")
+
+        stats['seconds'] = round(time.perf_counter() - start, 4)
+        stats['actions_per_second'] = round(len(actions) / stats['seconds'], 1) if stats['seconds'] else None
+        return stats
+
+    def run(self, batch_size=BATCH_SIZE, max_batches=None):
+        """
+        Replay every due action.
+
+        Returns:
+            dict with totals and per-batch throughput metrics
+        """
+        conn = query_stats.connect(self.db_path, timeout=30.0, isolation_level=None)
+        batches = []
+        try:
+            while max_batches is None or len(batches) < max_batches:
+                actions = self._due_actions(conn, batch_size)
+                if not actions:
+                    break
+                batches.append(self._apply_batch(conn, actions))
+        finally:
+            conn.close()
+
+        totals = {key: sum(b[key] for b in batches)
+                  for key in ('size', 'applied', 'duplicates', 'coalesced', 'failed')}
+        seconds = sum(b['seconds'] for b in batches)
+        return {
+            **totals,
+            'batches': batches,
+            'seconds': round(seconds, 4),
+            'actions_per_second': round(totals['size'] / seconds, 1) if seconds else None,
+        }
@@ -5,10 +5,11 @@ Perfect for farmers with low literacy
 """
 
 import streamlit as st
-from gtts import gTTS
-from io import BytesIO
+import streamlit.components.v1 as components
 import base64
+import uuid
 from components.translation_utils import get_current_language
+from components.tts_engine import get_tts_engine
 
 def text_to_audio(text, language='en'):
     """
@@ -22,20 +23,76 @@ def text_to_audio(text, language='en'):
         Audio bytes
     """
     try:
-        # Create text-to-speech
-        tts = gTTS(text=text, lang=language, slow=False)
-        
-        # Save to bytes
-        audio_bytes = BytesIO()
-        tts.write_to_fp(audio_bytes)
-        audio_bytes.seek(0)
-        
-        return audio_bytes.getvalue()
+        # Sentence chunks are synthesized concurrently and cached on disk,
+        # so repeated tips and narration cost no network call
+        return get_tts_engine().synthesize(text, language)
     except Exception as e:
         st.error(f"Error generating audio: {e}")
         return None
 
 
+def chunk_player_html(player_id, index, audio_bytes):
+    """
+    Queue one sentence's MP3 on a page-level player
+    
+    Chunks with the same player_id play back to back in index order: each
+    one starts from the previous chunk's onended, or at once if playback
+    is already waiting for it.
+    
+    Args:
+        player_id: Identifies one piece of text being read
+        index: Position of the chunk in the text
+        audio_bytes: MP3 data of the chunk
+    
+    Returns:
+        HTML string (for a zero-height components.html frame)
+    """
+    b64_audio = base64.b64encode(audio_bytes).decode()
+    
+    return f"""
+    <script>
+    const root = window.parent;
+    const players = root.ttsPlayers = root.ttsPlayers || {{}};
+    const player = players['{player_id}'] = players['{player_id}'] || {{chunks: {{}}, next: 0, playing: false}};
+    player.chunks[{index}] = 'data:audio/mp3;base64,{b64_audio}';
+    player.pump = player.pump || function () {{
+        const src = player.chunks[player.next];
+        if (player.playing || !src) return;
+        delete player.chunks[player.next];
+        player.next += 1;
+        player.playing = true;
+        const audio = new root.Audio(src);
+        audio.onended = function () {{ player.playing = false; player.pump(); }};
+        audio.play().catch(function () {{ player.playing = false; }});
+    }};
+    player.pump();
+    </script>
+    """
+
+
+def stream_audio(text, language='en'):
+    """
+    Read text aloud, starting as soon as its first sentence is synthesized
+    
+    Args:
+        text: Text to speak
+        language: Language code ('en', 'hi', 'mr')
+    
+    Returns:
+        Full MP3 bytes once every sentence is ready (for a replay player), or None
+    """
+    player_id = uuid.uuid4().hex
+    chunks = []
+    try:
+        for index, chunk in enumerate(get_tts_engine().stream(text, language)):
+            components.html(chunk_player_html(player_id, index, chunk), height=0)
+            chunks.append(chunk)
+    except Exception as e:
+        st.error(f"Error generating audio: {e}")
+        return None
+    return b''.join(chunks) or None
+
+
 def create_audio_player_html(audio_bytes, autoplay=False):
     """
     Create HTML audio player with base64 encoded audio
@@ -76,11 +133,10 @@ def speak_button(text, button_text="🔊 Listen", language=None, key_suffix=""):
         language = get_current_language()
     
     if st.button(button_text, key=f"speak_btn_{key_suffix}", width="content"):
-        with st.spinner("🎵 Generating audio..."):
-            audio_bytes = text_to_audio(text, language)
+        audio_bytes = stream_audio(text, language)
         
         if audio_bytes:
-            # Display audio player
+            # Player for replaying once the whole text is ready
             st.audio(audio_bytes, format='audio/mp3')
             return True
     
@@ -99,15 +155,10 @@ def auto_speak(text, language=None, show_controls=True):
     if language is None:
         language = get_current_language()
     
-    audio_bytes = text_to_audio(text, language)
+    audio_bytes = stream_audio(text, language)
     
-    if audio_bytes:
-        if show_controls:
-            st.audio(audio_bytes, format='audio/mp3')
-        else:
-            # Hidden autoplay audio
-            html = create_audio_player_html(audio_bytes, autoplay=True)
-            st.markdown(html, unsafe_allow_html=True)
+    if audio_bytes and show_controls:
+        st.audio(audio_bytes, format='audio/mp3')
 
 
 def render_read_aloud_panel(texts_to_read, language=None):
@@ -199,17 +250,13 @@ def speak_text_block(text, title=None, language=None, auto_play=False):
         
         with col2:
             if st.button("🔊", key=f"speak_{hash(text)}", help="Listen"):
-                with st.spinner("🎵"):
-                    audio_bytes = text_to_audio(text, language)
-                    if audio_bytes:
-                        st.audio(audio_bytes, format='audio/mp3')
+                audio_bytes = stream_audio(text, language)
+                if audio_bytes:
+                    st.audio(audio_bytes, format='audio/mp3')
         
         # Auto-play if enabled
         if auto_play or st.session_state.get('auto_read_mode', False):
-            audio_bytes = text_to_audio(text, language)
-            if audio_bytes:
-                html = create_audio_player_html(audio_bytes, autoplay=True)
-                st.markdown(html, unsafe_allow_html=True)
+            stream_audio(text, language)
 
 
 def add_page_narrator():
@@ -258,7 +305,4 @@ def add_page_narrator():
             
             text_to_speak = descriptions.get(page_title, f"You are on {page_title} page")
             
-            with st.spinner("🎵 Preparing audio..."):
-                audio_bytes = text_to_audio(text_to_speak, language)
-                if audio_bytes:
-                    st.audio(audio_bytes, format='audio/mp3', autoplay=True)
+            stream_audio(text_to_speak, language)
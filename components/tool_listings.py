@@ -1,6 +1,7 @@
 # components/tool_listings.py
 import streamlit as st
-from database.db_functions import add_data, get_data
+from database.db_functions import add_data, get_dataset
+from database.photo_store import PHOTO_TYPES, save_uploaded_photo, photo_path
 import pandas as pd
 try:
     from ai.ai_matcher import get_recommendations  # ✅ AI integration
@@ -53,14 +54,20 @@ def render_tool_listing(farmer_name):
         with col3:
             contact = st.text_input(t("Contact Number"), value=contact_value, key="tool_contact_input")
             notes = st.text_area(t("Additional Notes (e.g., condition, availability)"), height=80)
+        photo_file = st.file_uploader(t("Photo (optional)"), type=PHOTO_TYPES, key="tool_photo_input")
         
         submitted = st.form_submit_button(t("Add Tool Listing"))
 
         if submitted:
             if name and location and tool_name and rent_rate > 0 and contact:
-                tool_data = (name, location, tool_name, rent_rate, contact, notes)
+                try:
+                    photo_hash = save_uploaded_photo(photo_file)
+                except ValueError as e:
+                    photo_hash = None
+                    st.warning(f"{t('Listing saved without the photo')}: {e}")
+                tool_data = (name, location, tool_name, rent_rate, contact, notes, photo_hash)
                 add_data("tools", tool_data)
-                st.session_state.tools = get_data("tools")
+                st.session_state.tools = get_dataset("tools")
 
                 recs = get_recommendations({
                     "type": "tool",
@@ -158,6 +165,11 @@ def render_tool_management(tools_df, farmer_name):
             col1, col2 = st.columns([4, 1])
             
             with col1:
+                # Cards use the small thumbnail rendition; legacy inline photos only show in details
+                thumb = photo_path(tool.get('Photo'), 'thumb')
+                if thumb:
+                    st.image(thumb, width=120)
+                
                 # Rating stars display
                 rating_display = "⭐" * int(tool['avg_rating']) + "☆" * (5 - int(tool['avg_rating']))
                 rating_text = f"{rating_display} {tool['avg_rating']:.1f}/5" if tool['total_ratings'] > 0 else "⭐ No ratings yet"
@@ -196,13 +208,13 @@ def render_tool_management(tools_df, farmer_name):
         if not editable_tools.empty:
             editable_for_display = editable_tools.drop(columns=['rowid'])
 
-            updated_tools_df = st.data_editor(
+            # Edits stay in the editor; the shared listings frame is read-only
+            st.data_editor(
                 editable_for_display,
                 key="tool_editor",
                 use_container_width=True,
                 num_rows="dynamic"
             )
-            st.session_state.tools.loc[updated_tools_df.index, updated_tools_df.columns] = updated_tools_df.values
         else:
             st.info(t("You have no tool listings yet."))
     else:
@@ -5,9 +5,10 @@ Hybrid system: Manual translations + Deep Translator fallback
 """
 
 import streamlit as st
-import importlib
 from deep_translator import GoogleTranslator
 from functools import lru_cache
+from translations.catalog import get_catalog
+from database import tracing
 
 # Supported Languages
 LANGUAGES = {
@@ -18,12 +19,8 @@ LANGUAGES = {
 
 # Load translation dictionaries
 def load_translations(lang_code):
-    """Load translation dictionary for given language"""
-    try:
-        module = importlib.import_module(f'translations.{lang_code}')
-        return module.TRANSLATIONS
-    except Exception as e:
-        return {}
+    """Load translation dictionary for given language (compiled once per process)"""
+    return get_catalog(lang_code)
 
 @lru_cache(maxsize=1000)
 def auto_translate(text, target_lang):
@@ -37,14 +34,15 @@ def auto_translate(text, target_lang):
     try:
         translator = GoogleTranslator(source='en', target=target_lang)
         
-        # Split long text into chunks if needed
-        max_length = 4500
-        if len(text) > max_length:
-            chunks = [text[i:i+max_length] for i in range(0, len(text), max_length)]
-            translated_chunks = [translator.translate(chunk) for chunk in chunks]
-            return " ".join(translated_chunks)
-        else:
-            return translator.translate(text)
+        with tracing.span('translation', f"en->{target_lang}"):
+            # Split long text into chunks if needed
+            max_length = 4500
+            if len(text) > max_length:
+                chunks = [text[i:i+max_length] for i in range(0, len(text), max_length)]
+                translated_chunks = [translator.translate(chunk) for chunk in chunks]
+                return " ".join(translated_chunks)
+            else:
+                return translator.translate(text)
     except Exception as e:
         # If translation fails, return original text
         return text
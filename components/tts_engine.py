@@ -0,0 +1,181 @@
+# components/tts_engine.py
+"""
+Cached Text-to-Speech Engine
+Splits text into sentences, synthesizes them concurrently through gTTS, hands
+each one out as soon as it is ready and keeps each sentence's MP3 on disk keyed by (text hash, language) with LRU
+eviction. Standard tips and page narration are synthesized once and then
+served from disk with no network call.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from gtts import gTTS
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'tts')
+CACHE_MAX_BYTES = 50 * 1024 * 1024
+MAX_WORKERS = 4
+# gTTS splits longer text itself; keep chunks below that so one chunk = one request
+MAX_CHUNK_CHARS = 200
+
+# Sentence ends in English, Hindi and Marathi (। is the Devanagari danda)
+_SENTENCE_END = re.compile(r'(?<=[.!?।॥])\s+|\n+')
+
+
+def split_sentences(text, max_chars=MAX_CHUNK_CHARS):
+    """Split text into sentence chunks no longer than max_chars."""
+    chunks = []
+    for sentence in _SENTENCE_END.split(text or ''):
+        sentence = ' '.join(sentence.split())
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(' ', 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            chunks.append(sentence)
+    return chunks
+
+
+def gtts_synthesize(text, language):
+    """Synthesize one chunk through gTTS. Returns MP3 bytes."""
+    audio = BytesIO()
+    gTTS(text=text, lang=language, slow=False).write_to_fp(audio)
+    return audio.getvalue()
+
+
+class TTSCache:
+    """MP3 files on disk with least-recently-used eviction."""
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index = OrderedDict()  # key -> size, oldest first
+        self._total = 0
+        self._load_index()
+
+    @staticmethod
+    def key(text, language):
+        return hashlib.sha256(f"{language}\x00{text}".encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def _load_index(self):
+        """Rebuild the LRU order from file access times left by earlier processes."""
+        try:
+            entries = [e for e in os.scandir(self.cache_dir) if e.name.endswith('.mp3')]
+        except OSError:
+            return
+        for entry in sorted(entries, key=lambda e: e.stat().st_mtime):
+            size = entry.stat().st_size
+            self._index[entry.name[:-4]] = size
+            self._total += size
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._index:
+                return None
+            self._index.move_to_end(key)
+
+        try:
+            with open(self._path(key), 'rb') as f:
+                data = f.read()
+            os.utime(self._path(key))
+            return data
+        except OSError:
+            with self._lock:
+                self._total -= self._index.pop(key, 0)
+            return None
+
+    def put(self, key, data):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = self._path(key) + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"Could not cache TTS audio: {e}")
+            return
+
+        with self._lock:
+            self._total += len(data) - self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self._evict()
+
+    def _evict(self):
+        while self._total > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._index), 'bytes': self._total, 'max_bytes': self.max_bytes}
+
+
+class TTSEngine:
+    """Sentence-chunked, cached, concurrent speech synthesis."""
+
+    def __init__(self, cache=None, synthesize=gtts_synthesize, max_workers=MAX_WORKERS):
+        self.cache = cache if cache is not None else TTSCache()
+        self.synthesize_chunk = synthesize
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tts')
+        # Updated from pool threads
+        self._counts_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _chunk_audio(self, sentence, language):
+        key = TTSCache.key(sentence, language)
+        data = self.cache.get(key)
+        if data is not None:
+            with self._counts_lock:
+                self.hits += 1
+            return data
+
+        with self._counts_lock:
+            self.misses += 1
+        data = self.synthesize_chunk(sentence, language)
+        self.cache.put(key, data)
+        return data
+
+    def stream(self, text, language='en'):
+        """
+        Yield MP3 chunks in sentence order as soon as each one is ready.
+
+        Every sentence is queued up front, first sentence first, so the first
+        chunk arrives after one synthesis call however long the text is.
+        """
+        futures = [self._pool.submit(self._chunk_audio, sentence, language)
+                   for sentence in split_sentences(text)]
+        for future in futures:
+            yield future.result()
+
+    def synthesize(self, text, language='en'):
+        """Full MP3 for the text (MP3 frames concatenate into one playable file)."""
+        return b''.join(self.stream(text, language))
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_tts_engine():
+    """Process-wide engine so every session shares the pool and disk cache."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = TTSEngine()
+    return _engine
@@ -6,22 +6,24 @@ Supports voice commands, voice search, and audio responses in English, Hindi, an
 
 import streamlit as st
 import speech_recognition as sr
-from gtts import gTTS
-import tempfile
 import os
-from io import BytesIO
 from components.translation_utils import t, get_current_language
+from components.audio_pipeline import preprocess_pcm
+from components.tts_engine import get_tts_engine
+from components.text_to_speech_widget import stream_audio
+from components.asr_backends import get_asr_router
+from components.intent_router import route_intent, get_router_stats
 
 class VoiceAssistant:
     """Voice assistant with multilingual support"""
     
     def __init__(self):
-        self.recognizer = sr.Recognizer()
         self.supported_languages = {
             'en': 'en-IN',  # English (India)
             'hi': 'hi-IN',  # Hindi (India)
             'mr': 'mr-IN'   # Marathi (India)
         }
+        self.last_backend = None
     
     def recognize_speech_from_audio(self, audio_data, language='en'):
         """
@@ -35,23 +37,13 @@ class VoiceAssistant:
             Recognized text or None
         """
         try:
-            # Get the appropriate language code
-            lang_code = self.supported_languages.get(language, 'en-IN')
-            
-            # Save audio to temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-                tmp_file.write(audio_data)
-                tmp_file_path = tmp_file.name
-            
-            # Load audio file
-            with sr.AudioFile(tmp_file_path) as source:
-                audio = self.recognizer.record(source)
+            # Trim silence and resample in memory - no temp file needed
+            raw_data, sample_rate, sample_width = preprocess_pcm(audio_data)
             
-            # Recognize speech using Google
-            text = self.recognizer.recognize_google(audio, language=lang_code)
-            
-            # Clean up temporary file
-            os.unlink(tmp_file_path)
+            # Cloud when reachable and fast enough, local model otherwise
+            text, self.last_backend = get_asr_router().transcribe(
+                raw_data, sample_rate, sample_width, language
+            )
             
             return text
         
@@ -79,15 +71,7 @@ class VoiceAssistant:
             # Get the appropriate language code
             lang_code = self.supported_languages.get(language, 'en-IN')
             
-            # Create text-to-speech
-            tts = gTTS(text=text, lang=lang_code.split('-')[0], slow=False)
-            
-            # Save to bytes
-            audio_bytes = BytesIO()
-            tts.write_to_fp(audio_bytes)
-            audio_bytes.seek(0)
-            
-            return audio_bytes.getvalue()
+            return get_tts_engine().synthesize(text, lang_code.split('-')[0])
         
         except Exception as e:
             st.error(f"Error generating speech: {e}")
@@ -104,61 +88,37 @@ class VoiceAssistant:
         Returns:
             Dictionary with action and parameters
         """
-        command_lower = command_text.lower()
-        
-        # English commands
-        if language == 'en':
-            if 'weather' in command_lower:
-                return {'action': 'weather', 'text': command_text}
-            elif 'price' in command_lower or 'market' in command_lower:
-                return {'action': 'price', 'text': command_text}
-            elif 'calendar' in command_lower or 'schedule' in command_lower:
-                return {'action': 'calendar', 'text': command_text}
-            elif 'list tool' in command_lower or 'rent tool' in command_lower:
-                return {'action': 'list_tool', 'text': command_text}
-            elif 'list crop' in command_lower or 'sell crop' in command_lower:
-                return {'action': 'list_crop', 'text': command_text}
-            elif 'profile' in command_lower:
-                return {'action': 'profile', 'text': command_text}
-            elif 'help' in command_lower:
-                return {'action': 'help', 'text': command_text}
+        # Navigation and simple commands resolve locally in well under 10 ms;
+        # only open-ended questions come back as 'ask_ai' for Gemini
+        return route_intent(command_text, language)
+    
+    def answer_open_question(self, question, language='en'):
+        """
+        Answer a question the intent router escalated
         
-        # Hindi commands (हिंदी)
-        elif language == 'hi':
-            if 'मौसम' in command_lower or 'weather' in command_lower:
-                return {'action': 'weather', 'text': command_text}
-            elif 'कीमत' in command_lower or 'मंडी' in command_lower or 'price' in command_lower:
-                return {'action': 'price', 'text': command_text}
-            elif 'कैलेंडर' in command_lower or 'calendar' in command_lower:
-                return {'action': 'calendar', 'text': command_text}
-            elif 'औजार' in command_lower or 'tool' in command_lower:
-                return {'action': 'list_tool', 'text': command_text}
-            elif 'फसल' in command_lower or 'crop' in command_lower:
-                return {'action': 'list_crop', 'text': command_text}
-            elif 'प्रोफाइल' in command_lower or 'profile' in command_lower:
-                return {'action': 'profile', 'text': command_text}
-            elif 'मदद' in command_lower or 'help' in command_lower:
-                return {'action': 'help', 'text': command_text}
+        Args:
+            question: Farmer's question
+            language: Language code for the reply
         
-        # Marathi commands (मराठी)
-        elif language == 'mr':
-            if 'हवामान' in command_lower or 'weather' in command_lower:
-                return {'action': 'weather', 'text': command_text}
-            elif 'किंमत' in command_lower or 'बाजार' in command_lower or 'price' in command_lower:
-                return {'action': 'price', 'text': command_text}
-            elif 'calendar' in command_lower or 'दिनदर्शिका' in command_lower:
-                return {'action': 'calendar', 'text': command_text}
-            elif 'साधन' in command_lower or 'tool' in command_lower:
-                return {'action': 'list_tool', 'text': command_text}
-            elif 'पीक' in command_lower or 'crop' in command_lower:
-                return {'action': 'list_crop', 'text': command_text}
-            elif 'प्रोफाइल' in command_lower or 'profile' in command_lower:
-                return {'action': 'profile', 'text': command_text}
-            elif 'मदत' in command_lower or 'help' in command_lower:
-                return {'action': 'help', 'text': command_text}
+        Returns:
+            Answer text or None
+        """
+        api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            return None
         
-        # Default: search or AI query
-        return {'action': 'search', 'text': command_text}
+        try:
+            from google import genai
+            client = genai.Client(api_key=api_key)
+            lang_name = {'en': 'English', 'hi': 'Hindi', 'mr': 'Marathi'}.get(language, 'English')
+            response = client.models.generate_content(
+                model="gemini-2.5-flash",
+                contents=f"You are a farming advisor for Indian farmers. Reply in {lang_name} in 3-5 short sentences.\n\nQuestion: {question}"
+            )
+            return response.text.strip() if response and response.text else None
+        except Exception as e:
+            st.error(f"Error getting answer: {e}")
+            return None
 
 
 def render_voice_input(placeholder="Speak your question...", language=None):
@@ -267,6 +227,10 @@ def speak_text(text, language=None, auto_play=True):
     if language is None:
         language = get_current_language()
     
+    if auto_play:
+        # Starts playing after the first sentence instead of the whole text
+        return stream_audio(text, language) is not None
+    
     assistant = VoiceAssistant()
     
     with st.spinner(t("Generating audio...")):
@@ -341,67 +305,18 @@ def render_voice_assistant_page():
         st.divider()
         st.subheader(f"📋 {t('Command Recognized')}")
         st.write(f"**{t('Action')}:** {command['action']}")
+        st.caption(f"{command['source']} · {command['latency_ms']} ms")
         st.write(f"**{t('Text')}:** {command['text']}")
         
         # Execute action
-        if command['action'] == 'weather':
-            response_text = t("Opening weather forecast...")
+        if command['menu']:
+            response_text = t("Opening") + f" {t(command['menu'])}..."
             speak_text(response_text, language, auto_play=False)
             
-            if st.button(f"🌤️ {t('Go to Weather')}", width="stretch", type="primary"):
+            if st.button(f"➡️ {t('Go to')} {t(command['menu'])}", width="stretch", type="primary"):
                 st.session_state.nav_history.append(st.session_state.selected_menu)
                 st.session_state.nav_forward = []
-                st.session_state.selected_menu = "🌤️ Weather Forecast"
-                st.rerun()
-        
-        elif command['action'] == 'price':
-            response_text = t("Opening market prices...")
-            speak_text(response_text, language, auto_play=False)
-            
-            if st.button(f"💰 {t('Go to Market Prices')}", width="stretch", type="primary"):
-                st.session_state.nav_history.append(st.session_state.selected_menu)
-                st.session_state.nav_forward = []
-                st.session_state.selected_menu = "💰 Market Prices"
-                st.rerun()
-        
-        elif command['action'] == 'calendar':
-            response_text = t("Opening farming calendar...")
-            speak_text(response_text, language, auto_play=False)
-            
-            if st.button(f"📅 {t('Go to Calendar')}", width="stretch", type="primary"):
-                st.session_state.nav_history.append(st.session_state.selected_menu)
-                st.session_state.nav_forward = []
-                st.session_state.selected_menu = "📅 Farming Calendar"
-                st.rerun()
-        
-        elif command['action'] == 'profile':
-            response_text = t("Opening your profile...")
-            speak_text(response_text, language, auto_play=False)
-            
-            if st.button(f"👤 {t('Go to Profile')}", width="stretch", type="primary"):
-                st.session_state.nav_history.append(st.session_state.selected_menu)
-                st.session_state.nav_forward = []
-                st.session_state.selected_menu = "👤 My Profile"
-                st.rerun()
-        
-        elif command['action'] == 'list_tool':
-            response_text = t("Opening tool listing form...")
-            speak_text(response_text, language, auto_play=False)
-            
-            if st.button(f"🔧 {t('Go to Tool Listing')}", width="stretch", type="primary"):
-                st.session_state.nav_history.append(st.session_state.selected_menu)
-                st.session_state.nav_forward = []
-                st.session_state.selected_menu = "➕ Create New Listing"
-                st.rerun()
-        
-        elif command['action'] == 'list_crop':
-            response_text = t("Opening crop listing form...")
-            speak_text(response_text, language, auto_play=False)
-            
-            if st.button(f"🌾 {t('Go to Crop Listing')}", width="stretch", type="primary"):
-                st.session_state.nav_history.append(st.session_state.selected_menu)
-                st.session_state.nav_forward = []
-                st.session_state.selected_menu = "➕ Create New Listing"
+                st.session_state.selected_menu = command['menu']
                 st.rerun()
         
         elif command['action'] == 'help':
@@ -421,12 +336,26 @@ def render_voice_assistant_page():
             """)
         
         else:
-            # Search or AI query
-            response_text = t("Searching for") + f": {voice_text}"
-            speak_text(response_text, language, auto_play=False)
+            # Open-ended question: escalate to Gemini
+            with st.spinner(t("Getting answer...")):
+                answer = assistant.answer_open_question(voice_text, language)
             
-            st.info(f"🔍 {t('Search results for')}: **{voice_text}**")
-            st.write(t("This would search across all features..."))
+            if answer:
+                st.info(answer)
+                speak_text(answer, language, auto_play=False)
+            else:
+                st.warning(t("Could not get an answer right now. Please try again."))
+    
+    # How many commands were answered without the LLM
+    stats = get_router_stats()
+    if stats['total']:
+        with st.expander(f"📊 {t('Voice command stats')}", expanded=False):
+            st.metric(t("Handled locally"), f"{stats['local_hit_rate']:.0%}",
+                      help=f"{stats['local']} local, {stats['escalated']} sent to AI")
+            st.table([
+                {'intent': intent, **counts}
+                for intent, counts in sorted(stats['per_intent'].items())
+            ])
     
     # Tips section
     st.divider()
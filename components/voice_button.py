@@ -151,24 +151,13 @@ def render_voice_quick_input():
                     # Process command
                     command = assistant.process_voice_command(text, language)
                     
-                    if command['action'] != 'search':
+                    if command['menu']:
                         # Show action button
-                        action_map = {
-                            'weather': ('🌤️ Weather Forecast', "🌤️ Weather Forecast"),
-                            'price': ('💰 Market Prices', "💰 Market Prices"),
-                            'calendar': ('📅 Farming Calendar', "📅 Farming Calendar"),
-                            'profile': ('👤 My Profile', "👤 My Profile"),
-                            'list_tool': ('➕ Create New Listing', "➕ Create New Listing"),
-                            'list_crop': ('➕ Create New Listing', "➕ Create New Listing"),
-                        }
-                        
-                        if command['action'] in action_map:
-                            button_text, menu_item = action_map[command['action']]
-                            if st.button(f"➡️ {t('Go to')} {button_text}", width="stretch"):
-                                st.session_state.nav_history.append(st.session_state.selected_menu)
-                                st.session_state.nav_forward = []
-                                st.session_state.selected_menu = menu_item
-                                st.rerun()
+                        if st.button(f"➡️ {t('Go to')} {t(command['menu'])}", width="stretch"):
+                            st.session_state.nav_history.append(st.session_state.selected_menu)
+                            st.session_state.nav_forward = []
+                            st.session_state.selected_menu = command['menu']
+                            st.rerun()
                 else:
                     st.error(t("Could not understand. Try again."))
         
@@ -12,6 +12,7 @@ import os
 from datetime import datetime
 from streamlit_mic_recorder import mic_recorder
 from components.translation_utils import t, get_current_language
+from components.audio_pipeline import preprocess_audio
 import requests
 
 def get_location_from_coordinates(lat, lon, api_key=None):
@@ -93,6 +94,7 @@ def transcribe_voice_to_text(audio_bytes, language='en'):
     
     try:
         client = genai.Client(api_key=api_key)
+        audio = preprocess_audio(audio_bytes)
         
         # Language-specific transcription instructions
         lang_names = {
@@ -121,8 +123,8 @@ Transcript:"""
             contents=[
                 task_prompt,
                 types.Part.from_bytes(
-                    data=audio_bytes,
-                    mime_type='audio/wav'
+                    data=audio.data,
+                    mime_type=audio.mime_type
                 )
             ],
             config=types.GenerateContentConfig(
@@ -309,6 +311,7 @@ Now answer the farmer's question clearly and helpfully:"""
             stop_prompt=f"⏹️ {t('Stop Recording')}",
             just_once=False,
             use_container_width=True,
+            format="wav",
             key="voice_chatbot_recorder"
         )
     
@@ -10,9 +10,13 @@ from google.genai import types
 from pydantic import BaseModel, Field
 from typing import Optional, Literal
 import os
+import io
+import json
 from datetime import date
 from components.translation_utils import t, get_current_language
-from database.db_functions import add_data, get_data
+from components.audio_pipeline import preprocess_audio
+from database.db_functions import add_data, get_data, get_dataset
+from database.photo_store import PHOTO_TYPES, save_uploaded_photo
 from streamlit_mic_recorder import mic_recorder
 
 
@@ -22,6 +26,7 @@ from streamlit_mic_recorder import mic_recorder
 
 class ToolListing(BaseModel):
     """Schema for Tool/Machine listing extracted from voice"""
+    transcript: Optional[str] = Field(description="Verbatim transcript of everything spoken in the audio")
     farmer_name: Optional[str] = Field(description="Name of the farmer")
     location: Optional[str] = Field(description="Village or location name")
     tool_type: Optional[Literal["Tractor", "Plow", "Seeder", "Sprayer", "Harvester", "Other"]] = Field(
@@ -34,6 +39,7 @@ class ToolListing(BaseModel):
 
 class CropListing(BaseModel):
     """Schema for Crop listing extracted from voice"""
+    transcript: Optional[str] = Field(description="Verbatim transcript of everything spoken in the audio")
     farmer_name: Optional[str] = Field(description="Name of the farmer")
     location: Optional[str] = Field(description="Village or location name")
     crop_name: Optional[str] = Field(description="Name of the crop (e.g., Wheat, Rice, Tomato)")
@@ -47,6 +53,7 @@ class CropListing(BaseModel):
 
 class LaborListing(BaseModel):
     """Schema for Labor/Worker job listing extracted from voice"""
+    transcript: Optional[str] = Field(description="Verbatim transcript of everything spoken in the audio")
     posted_by: Optional[str] = Field(description="Name of the farmer posting the job")
     location: Optional[str] = Field(description="Village or location name")
     work_type: Optional[Literal["Harvesting", "Planting", "Irrigation", "General Farm Work", "Other"]] = Field(
@@ -78,6 +85,40 @@ def get_gemini_client():
     return genai.Client(api_key=api_key)
 
 
+# Audio larger than this is uploaded once through the Files API instead of inline
+INLINE_AUDIO_LIMIT_BYTES = 4 * 1024 * 1024
+
+
+def prepare_audio_part(client, audio_bytes, mime_type='audio/wav'):
+    """
+    Build the audio content part for a Gemini request.
+    
+    Small clips go inline; larger ones are uploaded once through the Files API
+    and referenced by handle.
+    
+    Returns:
+        (part, uploaded_file) - uploaded_file is None for inline audio
+    """
+    if len(audio_bytes) <= INLINE_AUDIO_LIMIT_BYTES:
+        return types.Part.from_bytes(data=audio_bytes, mime_type=mime_type), None
+    
+    uploaded = client.files.upload(
+        file=io.BytesIO(audio_bytes),
+        config=types.UploadFileConfig(mime_type=mime_type)
+    )
+    return uploaded, uploaded
+
+
+def release_audio_part(client, uploaded_file):
+    """Delete an uploaded audio file (best effort, files also expire on their own)."""
+    if uploaded_file is None:
+        return
+    try:
+        client.files.delete(name=uploaded_file.name)
+    except Exception as e:
+        print(f"Could not delete uploaded audio {uploaded_file.name}: {e}")
+
+
 def transcribe_and_extract_listing(audio_bytes, listing_type, language='en'):
     """
     Transcribe audio and extract structured listing data using Gemini 2.5 Flash
@@ -95,6 +136,7 @@ def transcribe_and_extract_listing(audio_bytes, listing_type, language='en'):
     if not client:
         return None
     
+    uploaded_file = None
     try:
         # Create system instruction and prompt based on listing type
         # Using Google's best practices: clear instructions, examples, constraints
@@ -109,6 +151,7 @@ Extract information accurately from audio and return structured JSON data."""
             task_prompt = """Listen to the audio and extract farm tool rental information.
 
 REQUIRED FIELDS:
+- transcript: Verbatim transcript of everything spoken, in the original language
 - farmer_name: Full name of the farmer
 - location: Village or town name
 - tool_type: Must be one of: Tractor, Plow, Seeder, Sprayer, Harvester, Other
@@ -135,7 +178,7 @@ EXTRACTION RULES:
 
 EXAMPLES:
 Input: "Mera naam Ram. Tractor kiraye par. 2000 rupay per day. Phone 9876543210"
-Output: {"farmer_name": "Ram", "location": null, "tool_type": "Tractor", "rent_rate": 2000, "contact": "9876543210", "notes": null}
+Output: {"transcript": "Mera naam Ram. Tractor kiraye par. 2000 rupay per day. Phone 9876543210", "farmer_name": "Ram", "location": null, "tool_type": "Tractor", "rent_rate": 2000, "contact": "9876543210", "notes": null}
 
 Now extract from the audio:"""
             
@@ -149,6 +192,7 @@ Extract information accurately from audio and return structured JSON data."""
             task_prompt = """Listen to the audio and extract crop sale information.
 
 REQUIRED FIELDS:
+- transcript: Verbatim transcript of everything spoken, in the original language
 - farmer_name: Full name of the farmer
 - location: Village or town name
 - crop_name: Name of the crop
@@ -179,7 +223,7 @@ EXTRACTION RULES:
 
 EXAMPLES:
 Input: "Mai Suresh. 100 quintal tamatar. 20 rupay kilo. 9823456789"
-Output: {"farmer_name": "Suresh", "location": null, "crop_name": "tamatar", "quantity": 100, "unit": "Quintals", "price_per_unit": 20, "contact": "9823456789"}
+Output: {"transcript": "Mai Suresh. 100 quintal tamatar. 20 rupay kilo. 9823456789", "farmer_name": "Suresh", "location": null, "crop_name": "tamatar", "quantity": 100, "unit": "Quintals", "price_per_unit": 20, "contact": "9823456789"}
 
 Now extract from the audio:"""
             
@@ -193,6 +237,7 @@ Extract information accurately from audio and return structured JSON data."""
             task_prompt = """Listen to the audio and extract worker job information.
 
 REQUIRED FIELDS:
+- transcript: Verbatim transcript of everything spoken, in the original language
 - posted_by: Name of the farmer posting
 - location: Village or town name
 - work_type: Must be one of: Harvesting, Planting, Irrigation, General Farm Work, Other
@@ -219,23 +264,19 @@ EXTRACTION RULES:
 
 EXAMPLES:
 Input: "Mujhe 5 majdur chahiye katai ke liye. 10 din. 500 rupay daily. Call 9876543210"
-Output: {"posted_by": null, "location": null, "work_type": "Harvesting", "workers_needed": 5, "duration_days": 10, "wage_per_day": 500, "contact": "9876543210", "description": null, "start_date": null}
+Output: {"transcript": "Mujhe 5 majdur chahiye katai ke liye. 10 din. 500 rupay daily. Call 9876543210", "posted_by": null, "location": null, "work_type": "Harvesting", "workers_needed": 5, "duration_days": 10, "wage_per_day": 500, "contact": "9876543210", "description": null, "start_date": null}
 
 Now extract from the audio:"""
             
             schema = LaborListing.model_json_schema()
         
-        # SINGLE API CALL - Gemini understands audio directly and returns structured JSON!
-        # Using system instruction for better prompt separation and clarity
+        # SINGLE API CALL - Gemini understands audio directly and returns the
+        # transcript together with the structured listing
+        audio = preprocess_audio(audio_bytes)
+        audio_part, uploaded_file = prepare_audio_part(client, audio.data, audio.mime_type)
         response = client.models.generate_content(
             model="gemini-2.5-flash",
-            contents=[
-                task_prompt,
-                types.Part.from_bytes(
-                    data=audio_bytes,
-                    mime_type='audio/wav'
-                )
-            ],
+            contents=[task_prompt, audio_part],
             config=types.GenerateContentConfig(
                 system_instruction=system_instruction,
                 response_mime_type="application/json",
@@ -246,41 +287,11 @@ Now extract from the audio:"""
         )
         
         # Parse the response
-        import json
         extracted_data = json.loads(response.text)
-        
-        # Generate a human-friendly transcript for display
-        # (Quick second call just for showing what was said)
-        # Using clear, specific instruction with output prefix
-        transcript_system = "You are a transcription assistant. Provide clean, accurate transcripts."
-        transcript_task = """Transcribe this audio accurately.
-
-Rules:
-- Keep natural speech patterns
-- Include all spoken words
-- Don't add interpretation or formatting
-- Just return the transcript text
-
-Transcript:"""
-        
-        transcript_response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=[
-                transcript_task,
-                types.Part.from_bytes(
-                    data=audio_bytes,
-                    mime_type='audio/wav'
-                )
-            ],
-            config=types.GenerateContentConfig(
-                system_instruction=transcript_system,
-                temperature=0.1,
-                thinking_config=types.ThinkingConfig(thinking_budget=0)
-            )
-        )
+        transcript = extracted_data.pop('transcript', None) or ''
         
         return {
-            'transcript': transcript_response.text,
+            'transcript': transcript,
             'extracted_data': extracted_data,
             'success': True
         }
@@ -293,6 +304,8 @@ Transcript:"""
             'success': False,
             'error': str(e)
         }
+    finally:
+        release_audio_part(client, uploaded_file)
 
 
 # ----------------------------------------
@@ -422,6 +435,7 @@ def render_voice_listing_creator(farmer_name):
         stop_prompt=f"⏹️ {t('Stop Recording')}",
         just_once=False,
         use_container_width=True,
+        format="wav",
         key="voice_listing_recorder"
     )
     
@@ -502,14 +516,20 @@ def render_voice_listing_creator(farmer_name):
                         value=extracted.get('notes') or '',
                         key="voice_notes"
                     )
+                photo_file = st.file_uploader(t("Photo (optional)"), type=PHOTO_TYPES, key="voice_tool_photo")
                 
                 col1, col2 = st.columns(2)
                 with col1:
                     if st.form_submit_button(f"✅ {t('Confirm and Add Listing')}", use_container_width=True):
                         if farmer_name_val and location_val and tool_type_val and rent_rate_val > 0 and contact_val:
-                            tool_data = (farmer_name_val, location_val, tool_type_val, rent_rate_val, contact_val, notes_val)
+                            try:
+                                photo_hash = save_uploaded_photo(photo_file)
+                            except ValueError as e:
+                                photo_hash = None
+                                st.warning(f"{t('Listing saved without the photo')}: {e}")
+                            tool_data = (farmer_name_val, location_val, tool_type_val, rent_rate_val, contact_val, notes_val, photo_hash)
                             add_data("tools", tool_data)
-                            st.session_state.tools = get_data("tools")
+                            st.session_state.tools = get_dataset("tools")
                             st.success(f"🎉 {t('Tool listing created successfully!')} - {tool_type_val}")
                             # Clear session state
                             del st.session_state.voice_listing_result
@@ -568,6 +588,7 @@ def render_voice_listing_creator(farmer_name):
                         value=extracted.get('contact') or profile.get('contact', ''),
                         key="voice_contact"
                     )
+                photo_file = st.file_uploader(t("Photo (optional)"), type=PHOTO_TYPES, key="voice_crop_photo")
                 
                 col1, col2 = st.columns(2)
                 with col1:
@@ -575,9 +596,14 @@ def render_voice_listing_creator(farmer_name):
                         if farmer_name_val and location_val and crop_name_val and quantity_val > 0 and price_val > 0 and contact_val:
                             listing_date = date.today().strftime("%Y-%m-%d")
                             quantity_str = f"{quantity_val} {unit_val}"
-                            crop_data = (farmer_name_val, location_val, crop_name_val, quantity_str, price_val, contact_val, listing_date)
+                            try:
+                                photo_hash = save_uploaded_photo(photo_file)
+                            except ValueError as e:
+                                photo_hash = None
+                                st.warning(f"{t('Listing saved without the photo')}: {e}")
+                            crop_data = (farmer_name_val, location_val, crop_name_val, quantity_str, price_val, contact_val, listing_date, photo_hash)
                             add_data("crops", crop_data)
-                            st.session_state.crops = get_data("crops")
+                            st.session_state.crops = get_dataset("crops")
                             st.success(f"🎉 {t('Crop listing created successfully!')} - {crop_name_val}")
                             # Clear session state
                             del st.session_state.voice_listing_result
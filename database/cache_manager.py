@@ -2,6 +2,9 @@
 """
 Smart Caching System for Price Predictions, Weather, and Market Data
 Reduces API calls by caching data for 24 hours per user/location
+
+This is the app's only cache store: OfflineManager reads and writes through it
+and asks for stale entries when the device is offline.
 """
 
 import sqlite3
@@ -9,64 +12,30 @@ import json
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 
+from database.migrations import ensure_schema
+from database import query_stats
+
 DB_NAME = 'farmermarket.db'
 
+# Expired weather/price entries are kept this long so they can be served offline
+STALE_RETENTION_HOURS = 72
+
+# Failed digest builds are retried after 30 min, doubling up to a day
+DIGEST_RETRY_BASE_MINUTES = 30
+DIGEST_RETRY_MAX_MINUTES = 24 * 60
+
+
 class CacheManager:
     """Manages caching of weather, market prices, and predictions."""
     
-    def __init__(self):
+    def __init__(self, db_path: Optional[str] = None):
         """Initialize cache tables."""
+        self.db_path = db_path or DB_NAME
         self._init_cache_tables()
     
     def _init_cache_tables(self):
-        """Create cache tables if they don't exist."""
-        conn = sqlite3.connect(DB_NAME)
-        c = conn.cursor()
-        
-        # Weather Cache Table
-        c.execute("""CREATE TABLE IF NOT EXISTS weather_cache (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            location TEXT NOT NULL,
-            weather_data TEXT NOT NULL,
-            cached_at TEXT NOT NULL,
-            expires_at TEXT NOT NULL,
-            UNIQUE(location)
-        )""")
-        
-        # Market Price Cache Table
-        c.execute("""CREATE TABLE IF NOT EXISTS market_price_cache (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            crop_name TEXT NOT NULL,
-            location TEXT NOT NULL,
-            price_data TEXT NOT NULL,
-            cached_at TEXT NOT NULL,
-            expires_at TEXT NOT NULL,
-            UNIQUE(crop_name, location)
-        )""")
-        
-        # Price Prediction Cache Table
-        c.execute("""CREATE TABLE IF NOT EXISTS prediction_cache (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            crop_name TEXT NOT NULL,
-            location TEXT NOT NULL,
-            reference_price REAL NOT NULL,
-            prediction_data TEXT NOT NULL,
-            cached_at TEXT NOT NULL,
-            expires_at TEXT NOT NULL,
-            UNIQUE(crop_name, location, reference_price)
-        )""")
-        
-        # Cache Statistics Table (for monitoring)
-        c.execute("""CREATE TABLE IF NOT EXISTS cache_statistics (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            cache_type TEXT NOT NULL,
-            hits INTEGER DEFAULT 0,
-            misses INTEGER DEFAULT 0,
-            last_updated TEXT NOT NULL
-        )""")
-        
-        conn.commit()
-        conn.close()
+        """Create cache tables if they don't exist (once per process)."""
+        ensure_schema(self.db_path)
     
     def _is_expired(self, expires_at_str: str) -> bool:
         """Check if cache entry has expired."""
@@ -78,7 +47,7 @@ class CacheManager:
     
     def _update_statistics(self, cache_type: str, is_hit: bool):
         """Update cache hit/miss statistics."""
-        conn = sqlite3.connect(DB_NAME)
+        conn = query_stats.connect(self.db_path)
         c = conn.cursor()
         
         # Check if stats exist
@@ -107,17 +76,39 @@ class CacheManager:
     # WEATHER CACHE
     # ========================================
     
-    def get_weather_cache(self, location: str) -> Optional[Dict[str, Any]]:
+    def _read_entry(self, row, data_column: str, cache_type: str,
+                    allow_stale: bool) -> Optional[Dict[str, Any]]:
+        """Decode a cache row, applying the freshness policy."""
+        if row is None:
+            self._update_statistics(cache_type, False)
+            return None
+        
+        stale = self._is_expired(row['expires_at'])
+        if stale and not allow_stale:
+            self._update_statistics(cache_type, False)
+            return None
+        
+        self._update_statistics(cache_type, True)
+        data = json.loads(row[data_column])
+        if allow_stale and isinstance(data, dict):
+            data['_cached'] = True
+            data['_cached_at'] = row['cached_at']
+            data['_stale'] = stale
+        return data
+    
+    def get_weather_cache(self, location: str, allow_stale: bool = False) -> Optional[Dict[str, Any]]:
         """
         Get cached weather data for a location.
         
         Args:
             location: Location string
+            allow_stale: Offline policy - also return expired entries (kept for
+                STALE_RETENTION_HOURS), flagged with _cached, _cached_at and _stale
         
         Returns:
             Cached weather data or None if expired/not found
         """
-        conn = sqlite3.connect(DB_NAME)
+        conn = query_stats.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         c = conn.cursor()
         
@@ -125,16 +116,8 @@ class CacheManager:
         result = c.fetchone()
         conn.close()
         
-        if result:
-            if not self._is_expired(result['expires_at']):
-                self._update_statistics('weather', True)
-                return json.loads(result['weather_data'])
-            else:
-                # Expired, delete it
-                self.clear_weather_cache(location)
-        
-        self._update_statistics('weather', False)
-        return None
+        # Expired rows stay until clear_expired_cache so offline reads can use them
+        return self._read_entry(result, 'weather_data', 'weather', allow_stale)
     
     def set_weather_cache(self, location: str, weather_data: Dict[str, Any], hours: int = 24):
         """
@@ -145,7 +128,7 @@ class CacheManager:
             weather_data: Weather data dictionary
             hours: Cache validity in hours (default: 24)
         """
-        conn = sqlite3.connect(DB_NAME)
+        conn = query_stats.connect(self.db_path)
         c = conn.cursor()
         
         cached_at = datetime.now()
@@ -162,7 +145,7 @@ class CacheManager:
     
     def clear_weather_cache(self, location: Optional[str] = None):
         """Clear weather cache for specific location or all."""
-        conn = sqlite3.connect(DB_NAME)
+        conn = query_stats.connect(self.db_path)
         c = conn.cursor()
         
         if location:
@@ -177,18 +160,20 @@ class CacheManager:
     # MARKET PRICE CACHE
     # ========================================
     
-    def get_market_price_cache(self, crop_name: str, location: str) -> Optional[Dict[str, Any]]:
+    def get_market_price_cache(self, crop_name: str, location: str,
+                               allow_stale: bool = False) -> Optional[Dict[str, Any]]:
         """
         Get cached market price data.
         
         Args:
             crop_name: Name of crop
             location: Location string
+            allow_stale: Offline policy, as in get_weather_cache
         
         Returns:
             Cached price data or None if expired/not found
         """
-        conn = sqlite3.connect(DB_NAME)
+        conn = query_stats.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         c = conn.cursor()
         
@@ -199,15 +184,7 @@ class CacheManager:
         result = c.fetchone()
         conn.close()
         
-        if result:
-            if not self._is_expired(result['expires_at']):
-                self._update_statistics('market_price', True)
-                return json.loads(result['price_data'])
-            else:
-                self.clear_market_price_cache(crop_name, location)
-        
-        self._update_statistics('market_price', False)
-        return None
+        return self._read_entry(result, 'price_data', 'market_price', allow_stale)
     
     def set_market_price_cache(self, crop_name: str, location: str, 
                                price_data: Dict[str, Any], hours: int = 24):
@@ -220,7 +197,7 @@ class CacheManager:
             price_data: Market data dictionary
             hours: Cache validity in hours (default: 24)
         """
-        conn = sqlite3.connect(DB_NAME)
+        conn = query_stats.connect(self.db_path)
         c = conn.cursor()
         
         cached_at = datetime.now()
@@ -235,10 +212,16 @@ class CacheManager:
         
         conn.commit()
         conn.close()
+        
+        # A fresh price may cross farmers' alert targets
+        current_price = price_data.get('current_price')
+        if isinstance(current_price, (int, float)):
+            from database.price_alert_engine import process_price_update
+            process_price_update(crop_name, current_price, source=f'market_cache:{location}', db_name=self.db_path)
     
     def clear_market_price_cache(self, crop_name: Optional[str] = None, location: Optional[str] = None):
         """Clear market price cache."""
-        conn = sqlite3.connect(DB_NAME)
+        conn = query_stats.connect(self.db_path)
         c = conn.cursor()
         
         if crop_name and location:
@@ -256,6 +239,31 @@ class CacheManager:
         conn.commit()
         conn.close()
     
+    # ========================================
+    # CALENDAR CACHE
+    # ========================================
+    
+    def set_calendar_cache(self, user_id: int, date: str, events: Any):
+        """Cache a user's calendar events for one day (kept until replaced)."""
+        conn = query_stats.connect(self.db_path)
+        conn.execute("""
+            INSERT OR REPLACE INTO calendar_cache (user_id, date, events, cached_at)
+            VALUES (?, ?, ?, ?)
+        """, (user_id, date, json.dumps(events), datetime.now().isoformat()))
+        conn.commit()
+        conn.close()
+    
+    def get_calendar_cache(self, user_id: int, date: str) -> Optional[Dict[str, Any]]:
+        """Get cached calendar events as {'events', '_cached', '_cached_at'}."""
+        conn = query_stats.connect(self.db_path)
+        row = conn.execute("SELECT events, cached_at FROM calendar_cache WHERE user_id = ? AND date = ?",
+                           (user_id, date)).fetchone()
+        conn.close()
+        
+        if row:
+            return {'events': json.loads(row[0]), '_cached': True, '_cached_at': row[1]}
+        return None
+    
     # ========================================
     # PREDICTION CACHE
     # ========================================
@@ -274,7 +282,7 @@ class CacheManager:
         Returns:
             Cached prediction or None if expired/not found
         """
-        conn = sqlite3.connect(DB_NAME)
+        conn = query_stats.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         c = conn.cursor()
         
@@ -312,7 +320,7 @@ class CacheManager:
             prediction_data: Prediction dictionary
             hours: Cache validity in hours (default: 24)
         """
-        conn = sqlite3.connect(DB_NAME)
+        conn = query_stats.connect(self.db_path)
         c = conn.cursor()
         
         cached_at = datetime.now()
@@ -330,7 +338,7 @@ class CacheManager:
     
     def clear_prediction_cache(self, crop_name: Optional[str] = None, location: Optional[str] = None):
         """Clear prediction cache."""
-        conn = sqlite3.connect(DB_NAME)
+        conn = query_stats.connect(self.db_path)
         c = conn.cursor()
         
         if crop_name and location:
@@ -348,13 +356,140 @@ class CacheManager:
         conn.commit()
         conn.close()
     
+    # ========================================
+    # MARKET INTELLIGENCE DIGESTS
+    # ========================================
+    
+    def get_market_digest(self, crop_name: str, state: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest market digest for a crop and state.
+        
+        Stale digests are still returned (with 'stale': True) so predictions never
+        wait on a web search; the digest builder refreshes them in the background.
+        
+        Returns:
+            Digest data with freshness metadata, or None if never built
+        """
+        conn = query_stats.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        c = conn.cursor()
+        
+        c.execute("""
+            SELECT * FROM market_digest_cache
+            WHERE LOWER(crop_name) = LOWER(?) AND LOWER(state) = LOWER(?)
+        """, (crop_name, state))
+        result = c.fetchone()
+        conn.close()
+        
+        if result and result['digest_data']:
+            self._update_statistics('market_digest', True)
+            digest = json.loads(result['digest_data'])
+            digest['digest_built_at'] = result['built_at']
+            digest['stale'] = self._is_expired(result['fresh_until'])
+            return digest
+        
+        self._update_statistics('market_digest', False)
+        return None
+    
+    def request_market_digest(self, crop_name: str, state: str):
+        """Queue a crop/state pair for the digest builder (no-op if already known)."""
+        conn = query_stats.connect(self.db_path)
+        c = conn.cursor()
+        c.execute("""
+            INSERT OR IGNORE INTO market_digest_cache (crop_name, state, requested_at)
+            VALUES (?, ?, ?)
+        """, (crop_name, state, datetime.now().isoformat()))
+        conn.commit()
+        conn.close()
+    
+    def set_market_digest(self, crop_name: str, state: str, digest_data: Dict[str, Any],
+                          hours: int = 12, build_seconds: Optional[float] = None):
+        """
+        Store a freshly built market digest.
+        
+        Args:
+            crop_name: Name of crop
+            state: Indian state the digest covers
+            digest_data: Compact digest dictionary (with 'sources')
+            hours: How long the digest counts as fresh (default: 12)
+            build_seconds: Time taken to build it
+        """
+        conn = query_stats.connect(self.db_path)
+        c = conn.cursor()
+        
+        built_at = datetime.now()
+        fresh_until = built_at + timedelta(hours=hours)
+        
+        c.execute("""
+            INSERT INTO market_digest_cache
+            (crop_name, state, digest_data, source_count, requested_at, built_at, fresh_until, build_seconds, last_error,
+             attempts, next_attempt_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL, 0, NULL)
+            ON CONFLICT(crop_name, state) DO UPDATE SET
+                digest_data = excluded.digest_data,
+                source_count = excluded.source_count,
+                built_at = excluded.built_at,
+                fresh_until = excluded.fresh_until,
+                build_seconds = excluded.build_seconds,
+                last_error = NULL,
+                attempts = 0,
+                next_attempt_at = NULL
+        """, (crop_name, state, json.dumps(digest_data), len(digest_data.get('sources', [])),
+              built_at.isoformat(), built_at.isoformat(), fresh_until.isoformat(), build_seconds))
+        
+        conn.commit()
+        conn.close()
+    
+    def record_market_digest_error(self, crop_name: str, state: str, error: str):
+        """
+        Remember why a digest build failed (the previous digest is kept) and
+        back the pair off, so persistently failing pairs do not use up every run.
+        """
+        conn = query_stats.connect(self.db_path)
+        c = conn.cursor()
+        c.execute("""
+            SELECT id, attempts FROM market_digest_cache
+            WHERE LOWER(crop_name) = LOWER(?) AND LOWER(state) = LOWER(?)
+        """, (crop_name, state))
+        row = c.fetchone()
+        if row:
+            attempts = (row[1] or 0) + 1
+            delay = min(DIGEST_RETRY_BASE_MINUTES * 2 ** min(attempts - 1, 16), DIGEST_RETRY_MAX_MINUTES)
+            c.execute("""
+                UPDATE market_digest_cache SET last_error = ?, attempts = ?, next_attempt_at = ?
+                WHERE id = ?
+            """, (error, attempts, (datetime.now() + timedelta(minutes=delay)).isoformat(), row[0]))
+        conn.commit()
+        conn.close()
+    
+    def get_stale_market_digests(self, limit: int = 50):
+        """
+        List (crop_name, state) pairs that were never built or are past fresh_until.
+        
+        Pairs still backing off after a failed build are skipped, and pairs with
+        fewer failures come first.
+        """
+        now = datetime.now().isoformat()
+        conn = query_stats.connect(self.db_path)
+        c = conn.cursor()
+        c.execute("""
+            SELECT crop_name, state FROM market_digest_cache
+            WHERE (fresh_until IS NULL OR fresh_until < ?)
+              AND (next_attempt_at IS NULL OR next_attempt_at <= ?)
+            ORDER BY attempts, fresh_until IS NOT NULL, fresh_until, requested_at
+            LIMIT ?
+        """, (now, now, limit))
+        results = c.fetchall()
+        conn.close()
+        return results
+    
     # ========================================
     # CACHE MANAGEMENT
     # ========================================
     
     def get_cache_statistics(self) -> Dict[str, Dict[str, int]]:
         """Get cache hit/miss statistics."""
-        conn = sqlite3.connect(DB_NAME)
+        conn = query_stats.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         c = conn.cursor()
         
@@ -378,16 +513,17 @@ class CacheManager:
         return stats
     
     def clear_expired_cache(self):
-        """Clear all expired cache entries."""
+        """Clear all expired cache entries (weather and prices after STALE_RETENTION_HOURS)."""
         now = datetime.now().isoformat()
+        stale_cutoff = (datetime.now() - timedelta(hours=STALE_RETENTION_HOURS)).isoformat()
         
-        conn = sqlite3.connect(DB_NAME)
+        conn = query_stats.connect(self.db_path)
         c = conn.cursor()
         
-        c.execute("DELETE FROM weather_cache WHERE expires_at < ?", (now,))
+        c.execute("DELETE FROM weather_cache WHERE expires_at < ?", (stale_cutoff,))
         weather_deleted = c.rowcount
         
-        c.execute("DELETE FROM market_price_cache WHERE expires_at < ?", (now,))
+        c.execute("DELETE FROM market_price_cache WHERE expires_at < ?", (stale_cutoff,))
         price_deleted = c.rowcount
         
         c.execute("DELETE FROM prediction_cache WHERE expires_at < ?", (now,))
@@ -405,12 +541,13 @@ class CacheManager:
     
     def clear_all_cache(self):
         """Clear all cache data."""
-        conn = sqlite3.connect(DB_NAME)
+        conn = query_stats.connect(self.db_path)
         c = conn.cursor()
         
         c.execute("DELETE FROM weather_cache")
         c.execute("DELETE FROM market_price_cache")
         c.execute("DELETE FROM prediction_cache")
+        c.execute("DELETE FROM calendar_cache")
         c.execute("DELETE FROM cache_statistics")
         
         conn.commit()
@@ -418,7 +555,7 @@ class CacheManager:
     
     def get_cache_info(self) -> Dict[str, Any]:
         """Get overall cache information."""
-        conn = sqlite3.connect(DB_NAME)
+        conn = query_stats.connect(self.db_path)
         c = conn.cursor()
         
         c.execute("SELECT COUNT(*) FROM weather_cache")
@@ -1,189 +1,32 @@
 import sqlite3
+import json
+import statistics
+import threading
+from datetime import date, datetime, timedelta
 import pandas as pd
 
+from database.migrations import ensure_schema
+from database import query_stats
+
 DB_NAME = 'farmermarket.db'
 
 def get_connection():
     """Get a connection to the database"""
-    return sqlite3.connect(DB_NAME)
+    return query_stats.connect(DB_NAME)
 
 def init_db():
-    """Initializes the database file and creates tables if they don't exist."""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
+    """Creates or upgrades the database schema (once per process, see database/migrations.py)."""
+    ensure_schema(DB_NAME)
 
-    # Create Tools Table
-    c.execute("""CREATE TABLE IF NOT EXISTS tools (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        Farmer TEXT,
-        Location TEXT,
-        Tool TEXT,
-        Rate REAL,
-        Contact TEXT,
-        Notes TEXT,
-        Photo TEXT,
-        Created_Date TEXT DEFAULT CURRENT_TIMESTAMP
-    )""")
-
-    # Create Crops Table
-    c.execute("""CREATE TABLE IF NOT EXISTS crops (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        Farmer TEXT,
-        Location TEXT,
-        Crop TEXT,
-        Quantity TEXT,
-        Expected_Price REAL,
-        Contact TEXT,
-        Listing_Date TEXT,
-        Photo TEXT,
-        Created_Date TEXT DEFAULT CURRENT_TIMESTAMP
-    )""")
-
-    # Create Farmers Table
-    c.execute("""CREATE TABLE IF NOT EXISTS farmers (
-        name TEXT PRIMARY KEY,
-        location TEXT,
-        farm_size REAL,
-        farm_unit TEXT,
-        contact TEXT,
-        weather_location TEXT,
-        latitude REAL,
-        longitude REAL,
-        password TEXT DEFAULT 'farmer123',
-        created_date TEXT DEFAULT CURRENT_TIMESTAMP,
-        total_ratings INTEGER DEFAULT 0,
-        avg_rating REAL DEFAULT 0.0
-    )""")
-    
-    # Create Ratings Table
-    c.execute("""CREATE TABLE IF NOT EXISTS ratings (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        listing_type TEXT NOT NULL,
-        listing_id INTEGER NOT NULL,
-        seller_name TEXT NOT NULL,
-        rater_name TEXT NOT NULL,
-        stars INTEGER NOT NULL,
-        comment TEXT,
-        created_date TEXT DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (seller_name) REFERENCES farmers(name)
-    )""")
-    
-    # Create Calendar Events Table
-    c.execute("""CREATE TABLE IF NOT EXISTS calendar_events (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        farmer_name TEXT,
-        event_date TEXT,
-        event_time TEXT DEFAULT '09:00',
-        event_title TEXT,
-        event_description TEXT,
-        weather_alert TEXT,
-        created_at TEXT,
-        FOREIGN KEY (farmer_name) REFERENCES farmers(name)
-    )""")
-    
-    # Create Labor/Worker Jobs Table
-    c.execute("""CREATE TABLE IF NOT EXISTS labor_jobs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        posted_by TEXT NOT NULL,
-        location TEXT NOT NULL,
-        work_type TEXT NOT NULL,
-        workers_needed INTEGER NOT NULL,
-        duration_days INTEGER NOT NULL,
-        wage_per_day REAL NOT NULL,
-        contact TEXT NOT NULL,
-        description TEXT,
-        start_date TEXT,
-        status TEXT DEFAULT 'Open',
-        created_date TEXT DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (posted_by) REFERENCES farmers(name)
-    )""")
-    
-    # NEW: Climate Risk History Table
-    c.execute("""CREATE TABLE IF NOT EXISTS climate_risk_history (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        farmer_name TEXT NOT NULL,
-        date TEXT NOT NULL,
-        location TEXT NOT NULL,
-        overall_risk INTEGER,
-        drought_risk INTEGER,
-        flood_risk INTEGER,
-        heat_stress INTEGER,
-        days_without_rain INTEGER,
-        soil_moisture INTEGER,
-        actions_recommended TEXT,
-        actions_taken TEXT,
-        FOREIGN KEY (farmer_name) REFERENCES farmers(name)
-    )""")
+def add_data(table_name, data_tuple, conn=None):
+    """
+    Adds a new row of data to the specified SQLite table.
     
-    # NEW: Sustainability Metrics Table
-    c.execute("""CREATE TABLE IF NOT EXISTS sustainability_metrics (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        farmer_name TEXT NOT NULL,
-        season TEXT,
-        year INTEGER,
-        water_usage REAL,
-        water_optimal REAL,
-        carbon_emissions REAL,
-        irrigation_method TEXT,
-        fertilizer_type TEXT,
-        energy_source TEXT,
-        crop_type TEXT,
-        recorded_date TEXT DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (farmer_name) REFERENCES farmers(name)
-    )""")
-    
-    # NEW: Climate-Smart Crop Adoptions Table
-    c.execute("""CREATE TABLE IF NOT EXISTS crop_adoptions (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        farmer_name TEXT NOT NULL,
-        crop_name TEXT,
-        season TEXT,
-        year INTEGER,
-        climate_risk_score INTEGER,
-        drought_tolerance INTEGER,
-        water_requirement TEXT,
-        reason_for_selection TEXT,
-        expected_yield REAL,
-        actual_yield REAL,
-        profit_expected REAL,
-        profit_actual REAL,
-        adopted_date TEXT DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (farmer_name) REFERENCES farmers(name)
-    )""")
-    
-    # Create Worker Availability Table
-    c.execute("""CREATE TABLE IF NOT EXISTS worker_availability (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        worker_name TEXT NOT NULL,
-        location TEXT NOT NULL,
-        skills TEXT NOT NULL,
-        wage_expected REAL NOT NULL,
-        contact TEXT NOT NULL,
-        experience_years INTEGER,
-        availability_status TEXT DEFAULT 'Available',
-        description TEXT,
-        created_date TEXT DEFAULT CURRENT_TIMESTAMP
-    )""")
-    
-    # Create User Onboarding Progress Table
-    c.execute("""CREATE TABLE IF NOT EXISTS user_onboarding_progress (
-        farmer_name TEXT PRIMARY KEY,
-        profile_completed INTEGER DEFAULT 0,
-        first_listing_created INTEGER DEFAULT 0,
-        calendar_event_added INTEGER DEFAULT 0,
-        weather_checked INTEGER DEFAULT 0,
-        market_prices_viewed INTEGER DEFAULT 0,
-        onboarding_dismissed INTEGER DEFAULT 0,
-        last_updated TEXT,
-        FOREIGN KEY (farmer_name) REFERENCES farmers(name)
-    )""")
-    
-    conn.commit()
-    conn.close()
-
-def add_data(table_name, data_tuple):
-    """Adds a new row of data to the specified SQLite table."""
-    conn = sqlite3.connect(DB_NAME)
+    Pass conn to write inside a caller's transaction (the caller commits).
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = query_stats.connect(DB_NAME)
     c = conn.cursor()
     
     if table_name == "tools":
@@ -201,27 +44,107 @@ def add_data(table_name, data_tuple):
     elif table_name == "farmers":
         sql = "INSERT OR REPLACE INTO farmers (name, location, farm_size, farm_unit, contact, weather_location, latitude, longitude, password) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
     elif table_name == "calendar_events":
-        sql = "INSERT INTO calendar_events (farmer_name, event_date, event_time, event_title, event_description, weather_alert, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)"
+        # Recurring events add repeat_every_days and repeat_until - backward compatible
+        if len(data_tuple) == 9:
+            sql = "INSERT INTO calendar_events (farmer_name, event_date, event_time, event_title, event_description, weather_alert, created_at, repeat_every_days, repeat_until) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        else:
+            sql = "INSERT INTO calendar_events (farmer_name, event_date, event_time, event_title, event_description, weather_alert, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)"
     elif table_name == "labor_jobs":
         sql = "INSERT INTO labor_jobs (posted_by, location, work_type, workers_needed, duration_days, wage_per_day, contact, description, start_date, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
     elif table_name == "worker_availability":
         sql = "INSERT INTO worker_availability (worker_name, location, skills, wage_expected, contact, experience_years, availability_status, description) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
         
     c.execute(sql, data_tuple)
-    conn.commit()
-    conn.close()
+    if own_conn:
+        conn.commit()
+        conn.close()
+
+def add_calendar_events(rows, conn=None):
+    """
+    Inserts many calendar events in one transaction.
+    
+    rows are (farmer_name, event_date, event_time, event_title, event_description,
+    weather_alert, created_at, repeat_every_days, repeat_until) tuples.
+    Pass conn to write inside a caller's transaction (the caller commits).
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = query_stats.connect(DB_NAME)
+    try:
+        conn.executemany("""
+            INSERT INTO calendar_events (farmer_name, event_date, event_time, event_title, event_description,
+                                         weather_alert, created_at, repeat_every_days, repeat_until)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        if own_conn:
+            conn.commit()
+    finally:
+        if own_conn:
+            conn.close()
 
 def get_data(table_name):
     """Retrieves all data from the specified SQLite table and returns a Pandas DataFrame."""
-    conn = sqlite3.connect(DB_NAME)
+    conn = query_stats.connect(DB_NAME)
     # Using rowid allows us to uniquely identify rows, essential for update/delete later
     df = pd.read_sql_query(f"SELECT rowid, * FROM {table_name}", conn)
     conn.close()
     return df
 
+# (database, table) -> (version, DataFrame), shared by every session in the process
+_datasets = {}
+_datasets_lock = threading.Lock()
+
+def get_data_version(table_name, conn=None):
+    """Current change counter of a versioned table, or None if it is not tracked."""
+    own_conn = conn is None
+    if own_conn:
+        conn = query_stats.connect(DB_NAME)
+    try:
+        row = conn.execute("SELECT version FROM data_versions WHERE table_name = ?", (table_name,)).fetchone()
+        return row[0] if row else None
+    except sqlite3.OperationalError:
+        # init_db has not created data_versions yet
+        return None
+    finally:
+        if own_conn:
+            conn.close()
+
+def get_dataset(table_name):
+    """
+    Read-only snapshot of a table, shared across sessions.
+    
+    The frame is re-read only when a write has bumped the table's version, so
+    reruns cost one single-row lookup. Callers must not modify the returned
+    DataFrame; take a .copy() first. Untracked tables fall back to get_data.
+    """
+    version = get_data_version(table_name)
+    if version is None:
+        return get_data(table_name)
+    
+    key = (DB_NAME, table_name)
+    cached = _datasets.get(key)
+    if cached and cached[0] == version:
+        return cached[1]
+    
+    with _datasets_lock:
+        cached = _datasets.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+        conn = query_stats.connect(DB_NAME)
+        try:
+            # Read the version in the same transaction as the rows, so a write
+            # landing in between cannot pair new rows with an old version
+            conn.execute("BEGIN")
+            version = get_data_version(table_name, conn)
+            df = pd.read_sql_query(f"SELECT rowid, * FROM {table_name}", conn)
+        finally:
+            conn.close()
+        _datasets[key] = (version, df)
+        return df
+
 def get_farmer_profile(name):
     """Retrieves a farmer's profile by name (case-insensitive)."""
-    conn = sqlite3.connect(DB_NAME)
+    conn = query_stats.connect(DB_NAME)
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
     c.execute("SELECT ROWID as id, * FROM farmers WHERE LOWER(name) = LOWER(?)", (name,))
@@ -231,7 +154,7 @@ def get_farmer_profile(name):
 
 def verify_farmer_login(name, password):
     """Verify farmer login credentials."""
-    conn = sqlite3.connect(DB_NAME)
+    conn = query_stats.connect(DB_NAME)
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
     c.execute("SELECT * FROM farmers WHERE LOWER(name) = LOWER(?) AND password = ?", (name, password))
@@ -241,18 +164,103 @@ def verify_farmer_login(name, password):
 
 def get_farmer_events(farmer_name):
     """Retrieves all calendar events for a specific farmer (case-insensitive)."""
-    conn = sqlite3.connect(DB_NAME)
+    conn = query_stats.connect(DB_NAME)
     df = pd.read_sql_query(
-        "SELECT * FROM calendar_events WHERE LOWER(farmer_name) = LOWER(?) ORDER BY event_date", 
+        "SELECT * FROM calendar_events WHERE farmer_name = ? COLLATE NOCASE ORDER BY event_date", 
         conn, 
         params=(farmer_name,)
     )
     conn.close()
     return df
 
-def update_farmer_profile(name, location, farm_size, farm_unit, contact, weather_location, latitude, longitude):
-    """Updates a farmer's profile (case-insensitive)."""
-    conn = sqlite3.connect(DB_NAME)
+def _iso_date(value):
+    """'YYYY-MM-DD' for a date, datetime or ISO string."""
+    return value.isoformat()[:10] if hasattr(value, 'isoformat') else str(value)[:10]
+
+def _occurrences(series_start, every_days, until, start, end):
+    """ISO dates on which a series repeating every every_days falls in [start, end]."""
+    first = date.fromisoformat(series_start)
+    window_start = date.fromisoformat(start)
+    last = date.fromisoformat(min(end, until) if until else end)
+    
+    # Jump straight to the first occurrence inside the window
+    skipped = max(0, -(-(window_start - first).days // every_days))
+    day = first + timedelta(days=skipped * every_days)
+    while day <= last:
+        yield day.isoformat()
+        day += timedelta(days=every_days)
+
+def get_events_in_range(farmer_name, start_date, end_date, conn=None):
+    """
+    Calendar events of a farmer between two dates (inclusive), by date and time.
+    
+    Recurring events are expanded into one entry per occurrence in the window:
+    event_date is the occurrence date and series_start the stored first date.
+    
+    Returns:
+        List of event dicts
+    """
+    start, end = _iso_date(start_date), _iso_date(end_date)
+    own_conn = conn is None
+    if own_conn:
+        conn = query_stats.connect(DB_NAME)
+    conn.row_factory = sqlite3.Row
+    try:
+        single = conn.execute("""
+            SELECT * FROM calendar_events
+            WHERE farmer_name = ? COLLATE NOCASE AND event_date BETWEEN ? AND ?
+            AND COALESCE(repeat_every_days, 0) = 0
+        """, (farmer_name, start, end)).fetchall()
+        recurring = conn.execute("""
+            SELECT * FROM calendar_events
+            WHERE farmer_name = ? COLLATE NOCASE AND event_date <= ? AND repeat_every_days > 0
+            AND (repeat_until IS NULL OR repeat_until = '' OR repeat_until >= ?)
+        """, (farmer_name, end, start)).fetchall()
+    finally:
+        conn.row_factory = None
+        if own_conn:
+            conn.close()
+    
+    events = [dict(row, series_start=row['event_date']) for row in single]
+    for row in recurring:
+        for day in _occurrences(row['event_date'], row['repeat_every_days'], row['repeat_until'], start, end):
+            events.append(dict(row, event_date=day, series_start=row['event_date']))
+    events.sort(key=lambda e: (e['event_date'], e['event_time'] or '09:00'))
+    return events
+
+def get_event_counts(farmer_name, today, upcoming_days=7):
+    """
+    Task counts for the calendar overview.
+    
+    Returns:
+        {'total', 'upcoming', 'overdue', 'today'}; upcoming and today count
+        occurrences of recurring events, total and overdue count stored events
+    """
+    today_iso = _iso_date(today)
+    conn = query_stats.connect(DB_NAME)
+    try:
+        total, overdue = conn.execute("""
+            SELECT COUNT(*),
+                   SUM(CASE WHEN event_date < ? AND COALESCE(repeat_every_days, 0) = 0 THEN 1 ELSE 0 END)
+            FROM calendar_events WHERE farmer_name = ? COLLATE NOCASE
+        """, (today_iso, farmer_name)).fetchone()
+        upcoming = get_events_in_range(farmer_name, today_iso,
+                                       date.fromisoformat(today_iso) + timedelta(days=upcoming_days), conn)
+    finally:
+        conn.close()
+    return {
+        'total': total,
+        'upcoming': len(upcoming),
+        'overdue': overdue or 0,
+        'today': len([e for e in upcoming if e['event_date'] == today_iso]),
+    }
+
+def update_farmer_profile(name, location, farm_size, farm_unit, contact, weather_location, latitude, longitude,
+                          conn=None):
+    """Updates a farmer's profile (case-insensitive). Pass conn to join a caller's transaction."""
+    own_conn = conn is None
+    if own_conn:
+        conn = query_stats.connect(DB_NAME)
     c = conn.cursor()
     c.execute("""
         UPDATE farmers 
@@ -260,33 +268,76 @@ def update_farmer_profile(name, location, farm_size, farm_unit, contact, weather
             weather_location = ?, latitude = ?, longitude = ?
         WHERE LOWER(name) = LOWER(?)
     """, (location, farm_size, farm_unit, contact, weather_location, latitude, longitude, name))
-    conn.commit()
-    conn.close()
+    if own_conn:
+        conn.commit()
+        conn.close()
 
 def delete_event(event_id):
     """Deletes a calendar event by ID."""
-    conn = sqlite3.connect(DB_NAME)
+    conn = query_stats.connect(DB_NAME)
     c = conn.cursor()
     c.execute("DELETE FROM calendar_events WHERE id = ?", (event_id,))
     conn.commit()
     conn.close()
 
-def update_event(event_id, event_date, event_title, event_description, weather_alert):
-    """Updates a calendar event by ID."""
-    conn = sqlite3.connect(DB_NAME)
+def detach_occurrence(event_id, occurrence_date):
+    """
+    Remove one occurrence from a recurring event, leaving the rest of the series.
+    
+    The series is split around the date: the part before keeps its row (ending
+    one step earlier) and the part after becomes a new row with the same task.
+    """
+    occurrence = date.fromisoformat(_iso_date(occurrence_date))
+    conn = query_stats.connect(DB_NAME)
+    conn.row_factory = sqlite3.Row
+    try:
+        row = conn.execute("SELECT * FROM calendar_events WHERE id = ?", (event_id,)).fetchone()
+        if row is None:
+            return
+        step = timedelta(days=row['repeat_every_days'] or 0)
+        if not step:
+            conn.execute("DELETE FROM calendar_events WHERE id = ?", (event_id,))
+            conn.commit()
+            return
+        
+        until = row['repeat_until'] or None
+        following = (occurrence + step).isoformat()
+        if until is None or following <= until:
+            conn.execute("""
+                INSERT INTO calendar_events (farmer_name, event_date, event_time, event_title, event_description,
+                                             weather_alert, created_at, repeat_every_days, repeat_until)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (row['farmer_name'], following, row['event_time'], row['event_title'], row['event_description'],
+                  row['weather_alert'], row['created_at'], row['repeat_every_days'], until))
+        
+        if occurrence.isoformat() <= row['event_date']:
+            conn.execute("DELETE FROM calendar_events WHERE id = ?", (event_id,))
+        else:
+            conn.execute("UPDATE calendar_events SET repeat_until = ? WHERE id = ?",
+                         ((occurrence - step).isoformat(), event_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+def update_event(event_id, event_date, event_title, event_description, weather_alert, event_time=None):
+    """Updates a calendar event by ID. A "YYYY-MM-DD HH:MM" event_date is split into date and time."""
+    if event_time is None and ' ' in event_date:
+        event_date, event_time = event_date.split(' ', 1)
+    conn = query_stats.connect(DB_NAME)
     c = conn.cursor()
     c.execute("""
         UPDATE calendar_events
-        SET event_date = ?, event_title = ?, event_description = ?, weather_alert = ?
+        SET event_date = ?, event_time = COALESCE(?, event_time), event_title = ?,
+            event_description = ?, weather_alert = ?
         WHERE id = ?
-    """, (event_date, event_title, event_description, weather_alert, event_id))
+    """, (event_date, event_time, event_title, event_description, weather_alert, event_id))
     conn.commit()
     conn.close()
 
 def get_onboarding_progress(farmer_name):
     """Get onboarding progress for a farmer."""
     try:
-        conn = sqlite3.connect(DB_NAME, timeout=30.0)
+        conn = query_stats.connect(DB_NAME, timeout=30.0)
         conn.execute('PRAGMA journal_mode=WAL')
         conn.row_factory = sqlite3.Row
         c = conn.cursor()
@@ -332,7 +383,7 @@ def update_onboarding_progress(farmer_name, **kwargs):
     """Update onboarding progress fields."""
     from datetime import datetime
     try:
-        conn = sqlite3.connect(DB_NAME, timeout=30.0)
+        conn = query_stats.connect(DB_NAME, timeout=30.0)
         conn.execute('PRAGMA journal_mode=WAL')
         c = conn.cursor()
         
@@ -357,7 +408,7 @@ def update_onboarding_progress(farmer_name, **kwargs):
 
 def update_farmer_location(farmer_name, location, latitude, longitude):
     """Update farmer's location and coordinates."""
-    conn = sqlite3.connect(DB_NAME)
+    conn = query_stats.connect(DB_NAME)
     c = conn.cursor()
     c.execute("""
         UPDATE farmers
@@ -374,7 +425,7 @@ def update_farmer_location(farmer_name, location, latitude, longitude):
 
 def add_rating(listing_type, listing_id, seller_name, rater_name, stars, comment=""):
     """Add a rating for a listing/seller."""
-    conn = sqlite3.connect(DB_NAME)
+    conn = query_stats.connect(DB_NAME)
     c = conn.cursor()
     c.execute("""
         INSERT INTO ratings (listing_type, listing_id, seller_name, rater_name, stars, comment)
@@ -389,7 +440,7 @@ def add_rating(listing_type, listing_id, seller_name, rater_name, stars, comment
 
 def get_ratings_for_seller(seller_name):
     """Get all ratings for a specific seller."""
-    conn = sqlite3.connect(DB_NAME)
+    conn = query_stats.connect(DB_NAME)
     df = pd.read_sql_query("""
         SELECT * FROM ratings 
         WHERE LOWER(seller_name) = LOWER(?) 
@@ -401,7 +452,7 @@ def get_ratings_for_seller(seller_name):
 
 def get_ratings_for_listing(listing_type, listing_id):
     """Get all ratings for a specific listing."""
-    conn = sqlite3.connect(DB_NAME)
+    conn = query_stats.connect(DB_NAME)
     df = pd.read_sql_query("""
         SELECT * FROM ratings 
         WHERE listing_type = ? AND listing_id = ? 
@@ -413,7 +464,7 @@ def get_ratings_for_listing(listing_type, listing_id):
 
 def update_farmer_rating(farmer_name):
     """Update farmer's average rating based on all their ratings."""
-    conn = sqlite3.connect(DB_NAME)
+    conn = query_stats.connect(DB_NAME)
     c = conn.cursor()
     
     # Calculate average rating
@@ -440,7 +491,7 @@ def update_farmer_rating(farmer_name):
 
 def get_farmer_rating(farmer_name):
     """Get farmer's rating statistics."""
-    conn = sqlite3.connect(DB_NAME)
+    conn = query_stats.connect(DB_NAME)
     c = conn.cursor()
     c.execute("""
         SELECT total_ratings, avg_rating 
@@ -461,7 +512,7 @@ def get_farmer_rating(farmer_name):
 
 def has_user_rated_listing(rater_name, listing_type, listing_id):
     """Check if user has already rated a listing."""
-    conn = sqlite3.connect(DB_NAME)
+    conn = query_stats.connect(DB_NAME)
     c = conn.cursor()
     c.execute("""
         SELECT COUNT(*) FROM ratings 
@@ -473,3 +524,163 @@ def has_user_rated_listing(rater_name, listing_type, listing_id):
     return count > 0
 
 
+
+
+# ========================================
+# MANDI PRICE HISTORY FUNCTIONS
+# ========================================
+
+def add_mandi_prices(rows, source="agmarknet"):
+    """
+    Bulk insert daily mandi prices (duplicates per crop/market/date are replaced).
+    
+    A mandi reports one row per variety, so rows for the same crop, market and
+    date are first combined: the median modal price, the lowest min_price and
+    the highest max_price.
+    
+    Args:
+        rows: Iterable of (crop_name, market, state, price_date, min_price, max_price, modal_price)
+        source: Where the prices came from
+    
+    Returns:
+        Number of rows written
+    """
+    by_day = {}
+    for crop_name, market, state, price_date, min_price, max_price, modal_price in rows:
+        by_day.setdefault((crop_name, market, price_date), []).append((state, min_price, max_price, modal_price))
+    
+    rows = []
+    for (crop_name, market, price_date), varieties in by_day.items():
+        rows.append((
+            crop_name, market, varieties[0][0], price_date,
+            min((v[1] for v in varieties if pd.notna(v[1])), default=None),
+            max((v[2] for v in varieties if pd.notna(v[2])), default=None),
+            statistics.median(v[3] for v in varieties),
+            source
+        ))
+    if not rows:
+        return 0
+    
+    conn = query_stats.connect(DB_NAME, timeout=30.0)
+    c = conn.cursor()
+    c.executemany("""
+        INSERT OR REPLACE INTO mandi_price_history
+        (crop_name, market, state, price_date, min_price, max_price, modal_price, source)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+    conn.close()
+    return len(rows)
+
+
+def get_mandi_price_history(crop_name, market=None):
+    """
+    Get the daily modal price series for a crop in one market, or averaged
+    across all markets when no market is given.
+    
+    Returns:
+        DataFrame with price_date and modal_price columns, oldest first
+    """
+    conn = query_stats.connect(DB_NAME)
+    if market:
+        df = pd.read_sql_query("""
+            SELECT price_date, modal_price FROM mandi_price_history
+            WHERE crop_name = ? AND market = ?
+            ORDER BY price_date
+        """, conn, params=(crop_name, market))
+    else:
+        df = pd.read_sql_query("""
+            SELECT price_date, AVG(modal_price) AS modal_price FROM mandi_price_history
+            WHERE crop_name = ?
+            GROUP BY price_date
+            ORDER BY price_date
+        """, conn, params=(crop_name,))
+    conn.close()
+    return df
+
+
+def get_latest_mandi_price(crop_name, market=None):
+    """
+    Latest modal price of a crop in one market, or averaged across the markets
+    reporting on the latest date when no market is given (None if unknown).
+    """
+    conn = query_stats.connect(DB_NAME)
+    if market:
+        row = conn.execute("""
+            SELECT modal_price FROM mandi_price_history
+            WHERE crop_name = ? AND market = ?
+            ORDER BY price_date DESC LIMIT 1
+        """, (crop_name, market)).fetchone()
+    else:
+        row = conn.execute("""
+            SELECT AVG(modal_price) FROM mandi_price_history
+            WHERE crop_name = ? AND price_date = (SELECT MAX(price_date) FROM mandi_price_history
+                                                  WHERE crop_name = ?)
+        """, (crop_name, crop_name)).fetchone()
+    conn.close()
+    return row[0] if row else None
+
+
+def get_mandi_series(min_days=1):
+    """(crop_name, market) pairs with at least min_days of mandi price history."""
+    conn = query_stats.connect(DB_NAME)
+    rows = conn.execute("""
+        SELECT crop_name, market FROM mandi_price_history
+        GROUP BY crop_name, market
+        HAVING COUNT(*) >= ?
+        ORDER BY crop_name, market
+    """, (min_days,)).fetchall()
+    conn.close()
+    return [tuple(row) for row in rows]
+
+
+def start_job_run(job_name, worker_id=None):
+    """Record that a background job started. Returns the run id."""
+    conn = query_stats.connect(DB_NAME, timeout=30.0)
+    c = conn.cursor()
+    c.execute("""
+        INSERT INTO job_runs (job_name, worker_id, status, started_at)
+        VALUES (?, ?, 'running', ?)
+    """, (job_name, worker_id, datetime.now().isoformat()))
+    run_id = c.lastrowid
+    conn.commit()
+    conn.close()
+    return run_id
+
+
+def finish_job_run(run_id, status, duration_seconds, result=None, error=None):
+    """Mark a job run as finished ('success' or 'failed')."""
+    conn = query_stats.connect(DB_NAME, timeout=30.0)
+    conn.execute("""
+        UPDATE job_runs
+        SET status = ?, finished_at = ?, duration_seconds = ?, result = ?, error = ?
+        WHERE id = ?
+    """, (status, datetime.now().isoformat(), duration_seconds,
+          json.dumps(result, default=str) if result is not None else None, error, run_id))
+    conn.commit()
+    conn.close()
+
+
+def get_job_runs(job_name=None, limit=50):
+    """Most recent job runs, newest first."""
+    conn = query_stats.connect(DB_NAME)
+    query = "SELECT * FROM job_runs"
+    params = ()
+    if job_name:
+        query += " WHERE job_name = ?"
+        params = (job_name,)
+    query += " ORDER BY id DESC LIMIT ?"
+    df = pd.read_sql_query(query, conn, params=params + (limit,))
+    conn.close()
+    return df
+
+
+def get_last_job_runs():
+    """Latest run of every job (used by the worker to resume its schedule)."""
+    conn = query_stats.connect(DB_NAME)
+    df = pd.read_sql_query("""
+        SELECT * FROM job_runs
+        WHERE id IN (SELECT MAX(id) FROM job_runs GROUP BY job_name)
+    """, conn)
+    conn.close()
+    return df
@@ -7,6 +7,8 @@ import sqlite3
 import time
 from contextlib import contextmanager
 
+from database import query_stats
+
 DB_NAME = 'farmermarket.db'
 
 def get_db_connection(timeout=30.0):
@@ -19,7 +21,7 @@ def get_db_connection(timeout=30.0):
     Returns:
         sqlite3.Connection with WAL mode enabled
     """
-    conn = sqlite3.connect(DB_NAME, timeout=timeout, check_same_thread=False)
+    conn = query_stats.connect(DB_NAME, timeout=timeout, check_same_thread=False)
     conn.execute('PRAGMA journal_mode=WAL')
     conn.execute('PRAGMA busy_timeout=30000')  # 30 seconds
     return conn
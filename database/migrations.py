@@ -0,0 +1,828 @@
+# database/migrations.py
+"""
+Versioned Schema Migrations
+Every table, index and trigger the app uses is created here, once per
+database. Applied versions are recorded in schema_version, so a database that
+is up to date costs one SELECT the first time a process touches it and nothing
+afterwards: constructors and page renders call ensure_schema() instead of
+running CREATE TABLE IF NOT EXISTS / ALTER TABLE themselves.
+
+Add a schema change as a new numbered migration at the end; never edit one
+that has shipped. Migrations must also work on databases created before the
+runner existed, so they use IF NOT EXISTS and check columns before ALTER.
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+# Tables served from the shared dataset cache; triggers bump their version on every write
+VERSIONED_TABLES = ('tools', 'crops')
+
+# (version, name, apply(conn)) in version order
+MIGRATIONS = []
+
+# Absolute database paths already migrated by this process
+_ready = set()
+_ready_lock = threading.Lock()
+
+
+def migration(version, name):
+    """Register a schema migration."""
+    def register(func):
+        MIGRATIONS.append((version, name, func))
+        return func
+    return register
+
+
+def _columns(c, table):
+    return {row[1] for row in c.execute(f"PRAGMA table_info({table})")}
+
+
+def _add_missing_columns(c, table, columns):
+    existing = _columns(c, table)
+    for column, definition in columns:
+        if column not in existing:
+            c.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+# ----------------------------------------
+# --- MIGRATIONS ---
+# ----------------------------------------
+
+@migration(1, 'core tables')
+def _core_tables(c):
+    # Create Tools Table
+    c.execute("""CREATE TABLE IF NOT EXISTS tools (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        Farmer TEXT,
+        Location TEXT,
+        Tool TEXT,
+        Rate REAL,
+        Contact TEXT,
+        Notes TEXT,
+        Photo TEXT,
+        Created_Date TEXT DEFAULT CURRENT_TIMESTAMP
+    )""")
+
+    # Create Crops Table
+    c.execute("""CREATE TABLE IF NOT EXISTS crops (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        Farmer TEXT,
+        Location TEXT,
+        Crop TEXT,
+        Quantity TEXT,
+        Expected_Price REAL,
+        Contact TEXT,
+        Listing_Date TEXT,
+        Photo TEXT,
+        Created_Date TEXT DEFAULT CURRENT_TIMESTAMP
+    )""")
+
+    # Create Farmers Table
+    c.execute("""CREATE TABLE IF NOT EXISTS farmers (
+        name TEXT PRIMARY KEY,
+        location TEXT,
+        farm_size REAL,
+        farm_unit TEXT,
+        contact TEXT,
+        weather_location TEXT,
+        latitude REAL,
+        longitude REAL,
+        password TEXT DEFAULT 'farmer123',
+        created_date TEXT DEFAULT CURRENT_TIMESTAMP,
+        total_ratings INTEGER DEFAULT 0,
+        avg_rating REAL DEFAULT 0.0
+    )""")
+    
+    # Create Ratings Table
+    c.execute("""CREATE TABLE IF NOT EXISTS ratings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        listing_type TEXT NOT NULL,
+        listing_id INTEGER NOT NULL,
+        seller_name TEXT NOT NULL,
+        rater_name TEXT NOT NULL,
+        stars INTEGER NOT NULL,
+        comment TEXT,
+        created_date TEXT DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (seller_name) REFERENCES farmers(name)
+    )""")
+    
+    # Create Calendar Events Table
+    c.execute("""CREATE TABLE IF NOT EXISTS calendar_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        farmer_name TEXT,
+        event_date TEXT,
+        event_time TEXT DEFAULT '09:00',
+        event_title TEXT,
+        event_description TEXT,
+        weather_alert TEXT,
+        created_at TEXT,
+        FOREIGN KEY (farmer_name) REFERENCES farmers(name)
+    )""")
+    
+    # Create Labor/Worker Jobs Table
+    c.execute("""CREATE TABLE IF NOT EXISTS labor_jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        posted_by TEXT NOT NULL,
+        location TEXT NOT NULL,
+        work_type TEXT NOT NULL,
+        workers_needed INTEGER NOT NULL,
+        duration_days INTEGER NOT NULL,
+        wage_per_day REAL NOT NULL,
+        contact TEXT NOT NULL,
+        description TEXT,
+        start_date TEXT,
+        status TEXT DEFAULT 'Open',
+        created_date TEXT DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (posted_by) REFERENCES farmers(name)
+    )""")
+    
+    # NEW: Climate Risk History Table
+    c.execute("""CREATE TABLE IF NOT EXISTS climate_risk_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        farmer_name TEXT NOT NULL,
+        date TEXT NOT NULL,
+        location TEXT NOT NULL,
+        overall_risk INTEGER,
+        drought_risk INTEGER,
+        flood_risk INTEGER,
+        heat_stress INTEGER,
+        days_without_rain INTEGER,
+        soil_moisture INTEGER,
+        actions_recommended TEXT,
+        actions_taken TEXT,
+        FOREIGN KEY (farmer_name) REFERENCES farmers(name)
+    )""")
+    
+    # NEW: Sustainability Metrics Table
+    c.execute("""CREATE TABLE IF NOT EXISTS sustainability_metrics (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        farmer_name TEXT NOT NULL,
+        season TEXT,
+        year INTEGER,
+        water_usage REAL,
+        water_optimal REAL,
+        carbon_emissions REAL,
+        irrigation_method TEXT,
+        fertilizer_type TEXT,
+        energy_source TEXT,
+        crop_type TEXT,
+        recorded_date TEXT DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (farmer_name) REFERENCES farmers(name)
+    )""")
+    
+    # NEW: Climate-Smart Crop Adoptions Table
+    c.execute("""CREATE TABLE IF NOT EXISTS crop_adoptions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        farmer_name TEXT NOT NULL,
+        crop_name TEXT,
+        season TEXT,
+        year INTEGER,
+        climate_risk_score INTEGER,
+        drought_tolerance INTEGER,
+        water_requirement TEXT,
+        reason_for_selection TEXT,
+        expected_yield REAL,
+        actual_yield REAL,
+        profit_expected REAL,
+        profit_actual REAL,
+        adopted_date TEXT DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (farmer_name) REFERENCES farmers(name)
+    )""")
+    
+    # Create Worker Availability Table
+    c.execute("""CREATE TABLE IF NOT EXISTS worker_availability (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        worker_name TEXT NOT NULL,
+        location TEXT NOT NULL,
+        skills TEXT NOT NULL,
+        wage_expected REAL NOT NULL,
+        contact TEXT NOT NULL,
+        experience_years INTEGER,
+        availability_status TEXT DEFAULT 'Available',
+        description TEXT,
+        created_date TEXT DEFAULT CURRENT_TIMESTAMP
+    )""")
+    
+    # Historical Mandi Prices (training data for the local price forecaster)
+    c.execute("""CREATE TABLE IF NOT EXISTS mandi_price_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        crop_name TEXT NOT NULL COLLATE NOCASE,
+        market TEXT NOT NULL COLLATE NOCASE,
+        state TEXT,
+        price_date TEXT NOT NULL,
+        min_price REAL,
+        max_price REAL,
+        modal_price REAL NOT NULL,
+        source TEXT DEFAULT 'agmarknet',
+        UNIQUE(crop_name, market, price_date)
+    )""")
+    
+    # Background worker job runs (scripts/worker.py)
+    c.execute("""CREATE TABLE IF NOT EXISTS job_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_name TEXT NOT NULL,
+        worker_id TEXT,
+        status TEXT NOT NULL DEFAULT 'running',
+        started_at TEXT NOT NULL,
+        finished_at TEXT,
+        duration_seconds REAL,
+        result TEXT,
+        error TEXT
+    )""")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_job_runs_job ON job_runs(job_name, started_at)")
+    
+    # Create User Onboarding Progress Table
+    c.execute("""CREATE TABLE IF NOT EXISTS user_onboarding_progress (
+        farmer_name TEXT PRIMARY KEY,
+        profile_completed INTEGER DEFAULT 0,
+        first_listing_created INTEGER DEFAULT 0,
+        calendar_event_added INTEGER DEFAULT 0,
+        weather_checked INTEGER DEFAULT 0,
+        market_prices_viewed INTEGER DEFAULT 0,
+        onboarding_dismissed INTEGER DEFAULT 0,
+        last_updated TEXT,
+        FOREIGN KEY (farmer_name) REFERENCES farmers(name)
+    )""")
+
+
+@migration(2, 'columns added after the first release')
+def _late_columns(c):
+    # Older databases were upgraded by scripts/migrate_db.py and friends
+    _add_missing_columns(c, 'farmers', (('weather_location', 'TEXT'),
+                                        ('latitude', 'REAL'),
+                                        ('longitude', 'REAL'),
+                                        ('password', "TEXT DEFAULT 'farmer123'"),
+                                        ('total_ratings', 'INTEGER DEFAULT 0'),
+                                        ('avg_rating', 'REAL DEFAULT 0.0')))
+    _add_missing_columns(c, 'calendar_events', (('event_time', "TEXT DEFAULT '09:00'"),))
+    _add_missing_columns(c, 'tools', (('Photo', 'TEXT'),))
+    _add_missing_columns(c, 'crops', (('Photo', 'TEXT'),))
+
+
+@migration(3, 'listing change counters')
+def _listing_versions(c):
+    # Change counters for the shared dataset cache (see db_functions.get_dataset)
+    c.execute("""CREATE TABLE IF NOT EXISTS data_versions (
+        table_name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    )""")
+    for table in VERSIONED_TABLES:
+        c.execute("INSERT OR IGNORE INTO data_versions (table_name, version) VALUES (?, 0)", (table,))
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            c.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_version
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE data_versions SET version = version + 1 WHERE table_name = '{table}';
+                END""")
+
+
+@migration(4, 'cache tables')
+def _cache_tables(c):
+    # OfflineManager used to create its own weather_cache (location, data, ...);
+    # move it aside so the shared table below can be created, then merge it in
+    if 'data' in _columns(c, 'weather_cache') and 'weather_data' not in _columns(c, 'weather_cache'):
+        c.execute("DROP TABLE IF EXISTS weather_cache_legacy")
+        c.execute("ALTER TABLE weather_cache RENAME TO weather_cache_legacy")
+    
+    # Weather Cache Table
+    c.execute("""CREATE TABLE IF NOT EXISTS weather_cache (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        location TEXT NOT NULL,
+        weather_data TEXT NOT NULL,
+        cached_at TEXT NOT NULL,
+        expires_at TEXT NOT NULL,
+        UNIQUE(location)
+    )""")
+
+    # Market Price Cache Table
+    c.execute("""CREATE TABLE IF NOT EXISTS market_price_cache (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        crop_name TEXT NOT NULL,
+        location TEXT NOT NULL,
+        price_data TEXT NOT NULL,
+        cached_at TEXT NOT NULL,
+        expires_at TEXT NOT NULL,
+        UNIQUE(crop_name, location)
+    )""")
+
+    # Price Prediction Cache Table
+    c.execute("""CREATE TABLE IF NOT EXISTS prediction_cache (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        crop_name TEXT NOT NULL,
+        location TEXT NOT NULL,
+        reference_price REAL NOT NULL,
+        prediction_data TEXT NOT NULL,
+        cached_at TEXT NOT NULL,
+        expires_at TEXT NOT NULL,
+        UNIQUE(crop_name, location, reference_price)
+    )""")
+
+    # Market Intelligence Digest Table (built on a schedule, read by predictions)
+    c.execute("""CREATE TABLE IF NOT EXISTS market_digest_cache (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        crop_name TEXT NOT NULL COLLATE NOCASE,
+        state TEXT NOT NULL COLLATE NOCASE,
+        digest_data TEXT,
+        source_count INTEGER DEFAULT 0,
+        requested_at TEXT NOT NULL,
+        built_at TEXT,
+        fresh_until TEXT,
+        build_seconds REAL,
+        last_error TEXT,
+        UNIQUE(crop_name, state)
+    )""")
+
+    # Cache Statistics Table (for monitoring)
+    c.execute("""CREATE TABLE IF NOT EXISTS cache_statistics (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        cache_type TEXT NOT NULL,
+        hits INTEGER DEFAULT 0,
+        misses INTEGER DEFAULT 0,
+        last_updated TEXT NOT NULL
+    )""")
+
+    # Calendar Cache Table (events per user and day, for offline access)
+    c.execute("""CREATE TABLE IF NOT EXISTS calendar_cache (
+        user_id INTEGER,
+        date TEXT,
+        events TEXT NOT NULL,
+        cached_at TEXT,
+        PRIMARY KEY (user_id, date)
+    )""")
+    
+    _merge_legacy_cache_tables(c)
+
+
+def _merge_legacy_cache_tables(c):
+    """
+    Fold OfflineManager's old weather_cache and price_cache rows into the
+    shared tables. Its cached_at was UTC CURRENT_TIMESTAMP and expires_at a
+    local 'YYYY-MM-DD HH:MM:SS' string; both become local ISO text. When a
+    key exists in both stores the entry that expires later wins.
+    """
+    if _columns(c, 'weather_cache_legacy'):
+        c.execute("""
+            INSERT INTO weather_cache (location, weather_data, cached_at, expires_at)
+            SELECT location, data,
+                   strftime('%Y-%m-%dT%H:%M:%S', COALESCE(cached_at, 'now'), 'localtime'),
+                   REPLACE(expires_at, ' ', 'T')
+            FROM weather_cache_legacy WHERE true
+            ON CONFLICT(location) DO UPDATE SET
+                weather_data = excluded.weather_data,
+                cached_at = excluded.cached_at,
+                expires_at = excluded.expires_at
+            WHERE excluded.expires_at > weather_cache.expires_at
+        """)
+        c.execute("DROP TABLE weather_cache_legacy")
+    
+    if _columns(c, 'price_cache'):
+        c.execute("""
+            INSERT INTO market_price_cache (crop_name, location, price_data, cached_at, expires_at)
+            SELECT commodity, TRIM(COALESCE(market, '') || ', ' || COALESCE(state, ''), ', '), data,
+                   strftime('%Y-%m-%dT%H:%M:%S', COALESCE(cached_at, 'now'), 'localtime'),
+                   REPLACE(expires_at, ' ', 'T')
+            FROM price_cache WHERE commodity IS NOT NULL
+            ON CONFLICT(crop_name, location) DO UPDATE SET
+                price_data = excluded.price_data,
+                cached_at = excluded.cached_at,
+                expires_at = excluded.expires_at
+            WHERE excluded.expires_at > market_price_cache.expires_at
+        """)
+        c.execute("DROP TABLE price_cache")
+
+
+@migration(5, 'offline sync queue')
+def _sync_queue(c):
+    # Offline sync queue
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS sync_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            action_type TEXT NOT NULL,
+            data TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            synced INTEGER DEFAULT 0
+        )
+    ''')
+
+    # Replay bookkeeping (added after the first release, so migrate old queues)
+    existing = {row[1] for row in c.execute('PRAGMA table_info(sync_queue)')}
+    for column, definition in (('idempotency_key', 'TEXT'),
+                               ('attempts', 'INTEGER DEFAULT 0'),
+                               ('next_attempt_at', 'TEXT'),
+                               ('last_error', 'TEXT')):
+        if column not in existing:
+            c.execute(f'ALTER TABLE sync_queue ADD COLUMN {column} {definition}')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_sync_queue_pending
+        ON sync_queue(synced, next_attempt_at, id)
+    ''')
+
+    # Idempotency keys of actions already applied
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS sync_applied (
+            idempotency_key TEXT PRIMARY KEY,
+            sync_id INTEGER,
+            applied_at TEXT
+        )
+    ''')
+
+
+@migration(6, 'notifications and price alerts')
+def _notifications(c):
+    # Create notifications table
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS notifications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            farmer_name TEXT NOT NULL,
+            type TEXT NOT NULL,
+            title TEXT NOT NULL,
+            message TEXT NOT NULL,
+            priority TEXT DEFAULT 'medium',
+            is_read INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Create price alerts table
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS price_alerts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            farmer_name TEXT NOT NULL,
+            commodity TEXT NOT NULL,
+            target_price REAL NOT NULL,
+            alert_type TEXT NOT NULL,
+            is_active INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Active alerts sorted by target price within each commodity and direction
+    c.execute("""CREATE INDEX IF NOT EXISTS idx_price_alerts_eval
+        ON price_alerts(commodity COLLATE NOCASE, alert_type, target_price)
+        WHERE is_active = 1""")
+    
+    # Last evaluated price per commodity, so each update only scans the crossed range
+    c.execute("""CREATE TABLE IF NOT EXISTS price_alert_state (
+        commodity TEXT PRIMARY KEY COLLATE NOCASE,
+        last_price REAL NOT NULL,
+        source TEXT,
+        updated_at TIMESTAMP
+    )""")
+
+
+@migration(7, 'finance tables')
+def _finance(c):
+    c.execute("""CREATE TABLE IF NOT EXISTS simple_money_tracker (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        farmer_name TEXT NOT NULL,
+        entry_type TEXT NOT NULL,
+        amount REAL NOT NULL,
+        reason TEXT NOT NULL,
+        entry_date TEXT NOT NULL,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )""")
+    
+    # Income/Expense table
+    c.execute("""CREATE TABLE IF NOT EXISTS farm_transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        farmer_id INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        category TEXT NOT NULL,
+        amount REAL NOT NULL,
+        description TEXT,
+        date TEXT NOT NULL,
+        payment_mode TEXT,
+        receipt_number TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (farmer_id) REFERENCES farmers(id)
+    )""")
+    
+    # Investment Planning table
+    c.execute("""CREATE TABLE IF NOT EXISTS farm_investments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        farmer_id INTEGER NOT NULL,
+        item_name TEXT NOT NULL,
+        category TEXT NOT NULL,
+        estimated_cost REAL NOT NULL,
+        target_date TEXT,
+        priority TEXT,
+        status TEXT DEFAULT 'Planned',
+        notes TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (farmer_id) REFERENCES farmers(id)
+    )""")
+    
+    # Insurance Tracker table
+    c.execute("""CREATE TABLE IF NOT EXISTS farm_insurance (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        farmer_id INTEGER NOT NULL,
+        insurance_type TEXT NOT NULL,
+        provider TEXT,
+        policy_number TEXT,
+        coverage_amount REAL,
+        premium_amount REAL,
+        start_date TEXT,
+        end_date TEXT,
+        reminder_days INTEGER DEFAULT 30,
+        status TEXT DEFAULT 'Active',
+        notes TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (farmer_id) REFERENCES farmers(id)
+    )""")
+
+
+@migration(8, 'schemes cache')
+def _schemes_cache(c):
+    c.execute("""CREATE TABLE IF NOT EXISTS schemes_cache (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        cache_key TEXT UNIQUE,
+        data TEXT,
+        cached_at TEXT,
+        expires_at TEXT
+    )""")
+
+
+def _rollup_triggers(c, table, rollup, keys, date_column):
+    """
+    Keep rollup's (keys..., month) -> total/entries rows in step with every
+    insert, update and delete on table. Rows whose entries reach 0 are removed.
+    """
+    key_columns = ', '.join(keys + ['month'])
+    
+    def add(ref):
+        values = ', '.join([f"{ref}.{k}" for k in keys] + [f"substr({ref}.{date_column}, 1, 7)"])
+        return f"""INSERT INTO {rollup} ({key_columns}, total, entries)
+                    VALUES ({values}, {ref}.amount, 1)
+                    ON CONFLICT({key_columns}) DO UPDATE SET
+                        total = total + excluded.total, entries = entries + 1;"""
+    
+    def remove(ref):
+        match = ' AND '.join([f"{k} = {ref}.{k}" for k in keys] + [f"month = substr({ref}.{date_column}, 1, 7)"])
+        return f"""UPDATE {rollup} SET total = total - {ref}.amount, entries = entries - 1 WHERE {match};
+                    DELETE FROM {rollup} WHERE {match} AND entries <= 0;"""
+    
+    for event, body in (('INSERT', add('NEW')),
+                        ('DELETE', remove('OLD')),
+                        ('UPDATE', remove('OLD') + add('NEW'))):
+        c.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_rollup
+            AFTER {event} ON {table}
+            BEGIN
+                {body}
+            END""")
+
+
+@migration(9, 'finance month rollups')
+def _finance_rollups(c):
+    # Covering indexes for per-farmer date-ordered reads
+    c.execute("""CREATE INDEX IF NOT EXISTS idx_money_farmer_date
+        ON simple_money_tracker(farmer_name, entry_date, created_at, entry_type, amount, reason)""")
+    c.execute("""CREATE INDEX IF NOT EXISTS idx_farm_txn_farmer_date
+        ON farm_transactions(farmer_id, date, type, category, amount, description)""")
+    
+    # Totals per farmer, month ('YYYY-MM') and category, maintained by triggers
+    c.execute("""CREATE TABLE IF NOT EXISTS money_month_rollup (
+        farmer_name TEXT NOT NULL,
+        month TEXT NOT NULL,
+        entry_type TEXT NOT NULL,
+        reason TEXT NOT NULL,
+        total REAL NOT NULL DEFAULT 0,
+        entries INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (farmer_name, month, entry_type, reason)
+    ) WITHOUT ROWID""")
+    c.execute("""CREATE TABLE IF NOT EXISTS finance_month_rollup (
+        farmer_id INTEGER NOT NULL,
+        month TEXT NOT NULL,
+        type TEXT NOT NULL,
+        category TEXT NOT NULL,
+        total REAL NOT NULL DEFAULT 0,
+        entries INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (farmer_id, month, type, category)
+    ) WITHOUT ROWID""")
+    
+    _rollup_triggers(c, 'simple_money_tracker', 'money_month_rollup',
+                     ['farmer_name', 'entry_type', 'reason'], 'entry_date')
+    _rollup_triggers(c, 'farm_transactions', 'finance_month_rollup',
+                     ['farmer_id', 'type', 'category'], 'date')
+    
+    # Backfill from existing entries
+    c.execute("DELETE FROM money_month_rollup")
+    c.execute("""INSERT INTO money_month_rollup (farmer_name, month, entry_type, reason, total, entries)
+        SELECT farmer_name, substr(entry_date, 1, 7), entry_type, reason, SUM(amount), COUNT(*)
+        FROM simple_money_tracker GROUP BY 1, 2, 3, 4""")
+    c.execute("DELETE FROM finance_month_rollup")
+    c.execute("""INSERT INTO finance_month_rollup (farmer_id, month, type, category, total, entries)
+        SELECT farmer_id, substr(date, 1, 7), type, category, SUM(amount), COUNT(*)
+        FROM farm_transactions GROUP BY 1, 2, 3, 4""")
+
+
+@migration(10, 'calendar event store')
+def _calendar_store(c):
+    # Edits used to save "YYYY-MM-DD HH:MM" into event_date; split those so
+    # event_date is always an ISO date and event_time an 'HH:MM' time
+    c.execute("""UPDATE calendar_events
+                 SET event_time = substr(event_date, 12, 5), event_date = substr(event_date, 1, 10)
+                 WHERE length(event_date) > 10""")
+    c.execute("UPDATE calendar_events SET event_time = '09:00' WHERE event_time IS NULL OR event_time = ''")
+    
+    # Recurring tasks: every N days from event_date, until repeat_until (inclusive) or forever
+    _add_missing_columns(c, 'calendar_events', (('repeat_every_days', 'INTEGER DEFAULT 0'),
+                                                ('repeat_until', 'TEXT')))
+    
+    # Farmer names are matched case-insensitively
+    c.execute("""CREATE INDEX IF NOT EXISTS idx_calendar_farmer_date
+        ON calendar_events(farmer_name COLLATE NOCASE, event_date)""")
+    c.execute("""CREATE INDEX IF NOT EXISTS idx_calendar_farmer_recurring
+        ON calendar_events(farmer_name COLLATE NOCASE, event_date) WHERE repeat_every_days > 0""")
+
+
+@migration(11, 'slow query log')
+def _slow_query_log(c):
+    # Written by database/query_stats.py for statements over SLOW_QUERY_MS
+    c.execute("""CREATE TABLE IF NOT EXISTS slow_query_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        statement TEXT NOT NULL,
+        module TEXT,
+        duration_ms REAL NOT NULL,
+        query_plan TEXT,
+        logged_at TEXT NOT NULL
+    )""")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_slow_query_statement ON slow_query_log(statement, logged_at)")
+
+
+@migration(12, 'request traces')
+def _request_traces(c):
+    # Sampled page reruns, written by database/tracing.py
+    c.execute("""CREATE TABLE IF NOT EXISTS request_traces (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        page TEXT NOT NULL,
+        started_at TEXT NOT NULL,
+        duration_ms REAL NOT NULL,
+        span_count INTEGER NOT NULL DEFAULT 0,
+        profile TEXT
+    )""")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_request_traces_page ON request_traces(page, started_at)")
+    c.execute("""CREATE TABLE IF NOT EXISTS trace_span_totals (
+        trace_id INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        duration_ms REAL NOT NULL,
+        spans INTEGER NOT NULL,
+        PRIMARY KEY (trace_id, kind)
+    ) WITHOUT ROWID""")
+    c.execute("""CREATE TABLE IF NOT EXISTS trace_spans (
+        trace_id INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        name TEXT NOT NULL,
+        start_ms REAL NOT NULL,
+        duration_ms REAL NOT NULL,
+        depth INTEGER NOT NULL DEFAULT 0
+    )""")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_trace_spans_trace ON trace_spans(trace_id, start_ms)")
+
+
+
+@migration(13, 'price alert state per source')
+def _price_alert_state_per_source(c):
+    # One last price per (commodity, source): a mandi's cache and the national
+    # averages disagree, and sharing one state made alerts fire on every switch
+    c.execute("""CREATE TABLE IF NOT EXISTS price_alert_state_by_source (
+        commodity TEXT NOT NULL COLLATE NOCASE,
+        source TEXT NOT NULL COLLATE NOCASE,
+        last_price REAL NOT NULL,
+        updated_at TIMESTAMP,
+        PRIMARY KEY (commodity, source)
+    )""")
+    c.execute("""INSERT OR IGNORE INTO price_alert_state_by_source (commodity, source, last_price, updated_at)
+                 SELECT commodity, COALESCE(source, 'market'), last_price, updated_at FROM price_alert_state""")
+    c.execute("DROP TABLE price_alert_state")
+    c.execute("ALTER TABLE price_alert_state_by_source RENAME TO price_alert_state")
+
+
+@migration(14, 'workload indexes')
+def _workload_indexes(c):
+    # Lookups that compare LOWER(column) = LOWER(?) get expression indexes,
+    # which SQLite uses only when the query repeats the same expression
+    c.execute("CREATE INDEX IF NOT EXISTS idx_farmers_name_nocase ON farmers(LOWER(name))")
+    
+    # Ratings by seller and by listing, newest first; also update_farmer_rating's summary
+    c.execute("CREATE INDEX IF NOT EXISTS idx_ratings_seller ON ratings(LOWER(seller_name), created_date)")
+    c.execute("""CREATE INDEX IF NOT EXISTS idx_ratings_listing
+        ON ratings(listing_type, listing_id, created_date)""")
+    
+    # Labor board lists, newest first
+    c.execute("CREATE INDEX IF NOT EXISTS idx_labor_jobs_created ON labor_jobs(created_date)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_workers_created ON worker_availability(created_date)")
+    
+    # CacheManager lookups and expiry sweeps
+    c.execute("CREATE INDEX IF NOT EXISTS idx_weather_cache_location ON weather_cache(LOWER(location))")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_weather_cache_expires ON weather_cache(expires_at)")
+    c.execute("""CREATE INDEX IF NOT EXISTS idx_price_cache_lookup
+        ON market_price_cache(LOWER(crop_name), LOWER(location))""")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_price_cache_expires ON market_price_cache(expires_at)")
+    # Newest matching prediction first; replaces the runtime index without cached_at
+    c.execute("DROP INDEX IF EXISTS idx_prediction_cache_lookup")
+    c.execute("""CREATE INDEX idx_prediction_cache_lookup
+        ON prediction_cache(LOWER(crop_name), LOWER(location), cached_at)""")
+    
+    # Created at runtime by earlier releases for listing and labor filters that
+    # run in pandas, never in SQL: pure write cost
+    for name in ('idx_tools_location_tool', 'idx_tools_farmer', 'idx_crops_location_crop', 'idx_crops_farmer',
+                 'idx_labor_jobs_location_status', 'idx_workers_location_status'):
+        c.execute(f"DROP INDEX IF EXISTS {name}")
+    
+    # Give the planner row counts for the new indexes
+    c.execute("ANALYZE")
+
+
+@migration(15, 'price forecast warnings')
+def _price_forecast_warnings(c):
+    # Forecast warnings already sent, so a daily run does not repeat one
+    # while its forecast window is still open
+    c.execute("""CREATE TABLE IF NOT EXISTS price_forecast_warnings (
+        alert_id INTEGER NOT NULL,
+        horizon TEXT NOT NULL,
+        sent_on TEXT NOT NULL,
+        PRIMARY KEY (alert_id, horizon, sent_on)
+    )""")
+
+
+@migration(16, 'market digest retry backoff')
+def _market_digest_backoff(c):
+    # Failed builds wait before retrying so they cannot fill every refresh run
+    _add_missing_columns(c, 'market_digest_cache', (('attempts', 'INTEGER DEFAULT 0'),
+                                                    ('next_attempt_at', 'TEXT')))
+
+LATEST_VERSION = max(version for version, _, _ in MIGRATIONS)
+
+
+# ----------------------------------------
+# --- RUNNER ---
+# ----------------------------------------
+
+def _default_db():
+    from database import db_functions
+    return db_functions.DB_NAME
+
+
+def applied_versions(conn):
+    """Versions recorded in schema_version (empty if the table does not exist yet)."""
+    try:
+        return {row[0] for row in conn.execute("SELECT version FROM schema_version")}
+    except sqlite3.OperationalError:
+        return set()
+
+
+def migrate(db_path=None):
+    """
+    Apply pending migrations in order, each in its own transaction.
+    
+    Safe to run from several processes at once: each migration takes the
+    write lock and re-checks schema_version before applying.
+    
+    Returns:
+        List of versions applied by this call
+    """
+    conn = sqlite3.connect(db_path or _default_db(), timeout=30.0, isolation_level=None)
+    applied = []
+    try:
+        done = applied_versions(conn)
+        if all(version in done for version, _, _ in MIGRATIONS):
+            return applied
+        
+        conn.execute("""CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )""")
+        for version, name, apply in sorted(MIGRATIONS, key=lambda m: m[0]):
+            if version in done:
+                continue
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,)).fetchone():
+                    conn.execute("ROLLBACK")
+                    continue
+                apply(conn)
+                conn.execute("INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                             (version, name, datetime.now().isoformat()))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            applied.append(version)
+        return applied
+    finally:
+        conn.close()
+
+
+def ensure_schema(db_path=None):
+    """Migrate a database once per process; later calls return immediately."""
+    path = os.path.abspath(db_path or _default_db())
+    if path in _ready:
+        return
+    with _ready_lock:
+        if path not in _ready:
+            migrate(path)
+            _ready.add(path)
@@ -0,0 +1,119 @@
+# database/photo_store.py
+"""
+Listing Photo Store
+Originals are kept on disk under their SHA-256 and WebP renditions (thumb,
+card, detail) are generated once at upload time. Listing rows store only the
+hash in their Photo column, so listing queries stay narrow and card grids
+load small thumbnails instead of full images.
+"""
+
+import hashlib
+import io
+import os
+import re
+
+PHOTO_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'photos')
+
+# rendition -> (longest side in px, WebP quality)
+RENDITIONS = {
+    'thumb': (160, 70),
+    'card': (480, 80),
+    'detail': (1280, 85),
+}
+
+PHOTO_TYPES = ['jpg', 'jpeg', 'png', 'webp']
+MAX_PHOTO_BYTES = 10 * 1024 * 1024
+
+_HASH = re.compile(r'^[0-9a-f]{64}$')
+
+
+def is_photo_hash(value):
+    """True if a Photo column value is a photo store hash."""
+    return isinstance(value, str) and bool(_HASH.match(value))
+
+
+def _path(photo_hash, suffix, photo_dir):
+    return os.path.join(photo_dir, photo_hash[:2], f"{photo_hash}.{suffix}")
+
+
+def _write(path, data):
+    """Write via a temp file so readers never see a partial image."""
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def save_photo(image_bytes, photo_dir=None):
+    """
+    Store an uploaded photo and its renditions.
+
+    Uploading the same image again reuses the stored files.
+
+    Returns:
+        SHA-256 hex digest of the original, for the listing's Photo column
+
+    Raises:
+        ValueError: if the data is too large or not a readable image
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    photo_dir = photo_dir or PHOTO_DIR
+    if len(image_bytes) > MAX_PHOTO_BYTES:
+        raise ValueError(f"Photo is larger than {MAX_PHOTO_BYTES // (1024 * 1024)} MB")
+
+    photo_hash = hashlib.sha256(image_bytes).hexdigest()
+    if all(os.path.exists(_path(photo_hash, f"{name}.webp", photo_dir)) for name in RENDITIONS):
+        return photo_hash
+
+    try:
+        img = Image.open(io.BytesIO(image_bytes))
+        img.load()
+    except (UnidentifiedImageError, OSError) as e:
+        raise ValueError(f"Not a readable image: {e}")
+
+    # Phone photos are often stored sideways with an EXIF rotation
+    img = ImageOps.exif_transpose(img)
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA' if 'transparency' in img.info or img.mode in ('LA', 'PA') else 'RGB')
+
+    os.makedirs(os.path.join(photo_dir, photo_hash[:2]), exist_ok=True)
+    _write(_path(photo_hash, 'orig', photo_dir), image_bytes)
+    for name, (max_side, quality) in RENDITIONS.items():
+        rendition = img.copy()
+        rendition.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        rendition.save(buffer, format='WEBP', quality=quality, method=4)
+        _write(_path(photo_hash, f"{name}.webp", photo_dir), buffer.getvalue())
+
+    return photo_hash
+
+
+def save_uploaded_photo(uploaded_file, photo_dir=None):
+    """save_photo for a Streamlit UploadedFile; None when nothing was uploaded."""
+    if uploaded_file is None:
+        return None
+    return save_photo(uploaded_file.getvalue(), photo_dir)
+
+
+def photo_path(photo_hash, rendition='thumb', photo_dir=None):
+    """Path of a stored rendition ('orig' for the original), or None if missing."""
+    if not is_photo_hash(photo_hash):
+        return None
+    suffix = 'orig' if rendition == 'orig' else f"{rendition}.webp"
+    path = _path(photo_hash, suffix, photo_dir or PHOTO_DIR)
+    return path if os.path.exists(path) else None
+
+
+def photo_source(value, rendition='thumb', photo_dir=None):
+    """
+    What to hand st.image for a listing's Photo value.
+
+    Hashes resolve to the stored rendition; anything else (URLs or inline
+    data saved before the photo store) is returned unchanged.
+    """
+    if not value or (isinstance(value, float) and value != value):
+        return None
+    if is_photo_hash(value):
+        return photo_path(value, rendition, photo_dir)
+    return value
@@ -0,0 +1,116 @@
+# database/price_alert_engine.py
+"""
+Incremental Price Alert Evaluation
+When a new market price lands, only that commodity's alerts are checked, and
+only the ones whose target the price just crossed: a range query on an index
+sorted by target_price per (commodity, alert_type). Matching alerts become
+notifications with a single INSERT ... SELECT, so thousands of alerts cost
+one statement per price update and no per-alert work in Python.
+
+The last price is kept per (commodity, source). Sources quote different
+prices for the same commodity (one mandi's cache vs. national averages), so a
+shared last price would swing across targets and re-fire alerts whenever the
+reporting source changed.
+"""
+
+import sqlite3
+from datetime import datetime
+
+from database import db_functions, query_stats
+from database.migrations import ensure_schema
+
+# "Equals" alerts fire when the price is within this fraction of the target
+EQUALS_TOLERANCE = 0.02
+
+_INSERT_SELECT = """
+    INSERT INTO notifications (farmer_name, type, title, message, priority)
+    SELECT farmer_name, 'price_alert',
+           printf('🔔 %s price alert', commodity),
+           printf('%s is now ₹%.0f (your alert: %s ₹%.0f).', commodity, :price, LOWER(alert_type), target_price),
+           'high'
+    FROM price_alerts
+    WHERE is_active = 1 AND commodity = :commodity COLLATE NOCASE AND alert_type = :alert_type
+      AND target_price {condition}
+"""
+
+
+def _crossed_ranges(old_price, new_price):
+    """(alert_type, SQL condition, params) for every range the price move crossed."""
+    ranges = []
+    low_band, high_band = new_price / (1 + EQUALS_TOLERANCE), new_price / (1 - EQUALS_TOLERANCE)
+
+    if old_price is None:
+        ranges.append(("Goes Above", "<= :new", {}))
+        ranges.append(("Goes Below", ">= :new", {}))
+        ranges.append(("Equals", "BETWEEN :low AND :high", {'low': low_band, 'high': high_band}))
+        return ranges
+
+    if new_price > old_price:
+        ranges.append(("Goes Above", "> :old AND target_price <= :new", {}))
+    elif new_price < old_price:
+        ranges.append(("Goes Below", ">= :new AND target_price < :old", {}))
+
+    # Targets newly inside the tolerance band that were not inside it before
+    old_low, old_high = old_price / (1 + EQUALS_TOLERANCE), old_price / (1 - EQUALS_TOLERANCE)
+    ranges.append(("Equals", "BETWEEN :low AND :high AND NOT (target_price BETWEEN :old_low AND :old_high)",
+                   {'low': low_band, 'high': high_band, 'old_low': old_low, 'old_high': old_high}))
+    return ranges
+
+
+def _evaluate(conn, commodity, new_price, source):
+    row = conn.execute("SELECT last_price FROM price_alert_state WHERE commodity = ? AND source = ?",
+                       (commodity, source)).fetchone()
+    old_price = row[0] if row else None
+
+    created = 0
+    if old_price != new_price:
+        for alert_type, condition, extra in _crossed_ranges(old_price, new_price):
+            params = {'commodity': commodity, 'alert_type': alert_type, 'price': new_price,
+                      'new': new_price, 'old': old_price, **extra}
+            created += conn.execute(_INSERT_SELECT.format(condition=condition), params).rowcount
+
+    conn.execute("""
+        INSERT INTO price_alert_state (commodity, source, last_price, updated_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(commodity, source) DO UPDATE SET
+            last_price = excluded.last_price, updated_at = excluded.updated_at
+    """, (commodity, source, new_price, datetime.now().isoformat()))
+    return created
+
+
+def process_price_updates(prices, source="market", db_name=None):
+    """
+    Evaluate alerts for a batch of new prices in one transaction.
+
+    Args:
+        prices: {commodity: price} with the latest price per commodity
+        source: Where the prices came from; each source keeps its own last
+            price, so include the market for per-location feeds
+        db_name: Database path (default: the app database)
+
+    Returns:
+        Number of notifications created
+    """
+    prices = {name.strip(): float(price) for name, price in prices.items()
+              if name and price is not None and float(price) > 0}
+    if not prices:
+        return 0
+
+    db_name = db_name or db_functions.DB_NAME
+    ensure_schema(db_name)
+    conn = query_stats.connect(db_name, timeout=30.0)
+    try:
+        created = sum(_evaluate(conn, commodity, price, source) for commodity, price in prices.items())
+        conn.commit()
+        return created
+    except sqlite3.OperationalError as e:
+        # e.g. database locked; state is unchanged, so the next update re-checks
+        print(f"Price alerts not evaluated: {e}")
+        return 0
+    finally:
+        conn.close()
+
+
+def process_price_update(commodity, price, source="market", db_name=None):
+    """Evaluate alerts for one commodity's new price. Returns notifications created."""
+    return process_price_updates({commodity: price}, source=source, db_name=db_name)
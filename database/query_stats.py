@@ -0,0 +1,303 @@
+# database/query_stats.py
+"""
+SQL Query Instrumentation
+connect() returns a sqlite3 connection whose cursors time every statement.
+Per (statement, calling module) it keeps a latency histogram, total time and
+rows returned; statements slower than SLOW_QUERY_MS are written to the
+slow_query_log table together with their EXPLAIN QUERY PLAN. Parameters are
+never recorded. Inside a traced rerun each statement is also a 'db' span.
+"""
+
+import re
+import sqlite3
+import sys
+import threading
+import time
+import weakref
+from datetime import datetime
+
+from database import tracing
+
+SLOW_QUERY_MS = 200
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+HISTOGRAM_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000)
+
+# Frames from these modules are skipped when looking for the caller
+_INTERNAL_MODULES = ('database.query_stats', 'sqlite3', 'pandas', 'contextlib')
+_WHITESPACE = re.compile(r'\s+')
+
+# (statement, module) -> stats dict, shared by every connection in the process
+_stats = {}
+_stats_lock = threading.Lock()
+
+# Slow statements waiting to be written: on connection close, or once there are
+# SLOW_FLUSH_SIZE of them or the oldest is SLOW_FLUSH_SECONDS old
+SLOW_FLUSH_SIZE = 50
+SLOW_FLUSH_SECONDS = 30
+# Entries kept if the log cannot be written; the oldest are dropped first
+MAX_PENDING_SLOW = 1000
+_pending_slow = []
+_pending_lock = threading.Lock()
+
+
+def _normalize(sql):
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def _calling_module():
+    frame = sys._getframe(2)
+    while frame is not None:
+        name = frame.f_globals.get('__name__', '')
+        if not name.startswith(_INTERNAL_MODULES):
+            return name
+        frame = frame.f_back
+    return '?'
+
+
+def _record(key, elapsed_ms, rows):
+    with _stats_lock:
+        entry = _stats.get(key)
+        if entry is None:
+            entry = _stats[key] = {
+                'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0,
+                'histogram': [0] * (len(HISTOGRAM_BUCKETS_MS) + 1),
+            }
+        entry['calls'] += 1
+        entry['total_ms'] += elapsed_ms
+        entry['rows'] += rows
+        bucket = next((i for i, bound in enumerate(HISTOGRAM_BUCKETS_MS) if elapsed_ms <= bound),
+                      len(HISTOGRAM_BUCKETS_MS))
+        entry['histogram'][bucket] += 1
+        entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """
+    Cursor that records the latency and row count of each statement.
+
+    SQLite's execute() only steps to the first row; reading the rest happens
+    in the fetch calls. A query is therefore recorded once it is finished:
+    when its rows are exhausted, at the cursor's next execute, or when the
+    cursor is closed or dropped or its connection closes.
+    """
+
+    _key = None
+    _span = None
+    _params = ()
+    _elapsed_ms = 0.0
+    _rows = 0
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        self._key = (_normalize(sql), _calling_module())
+        self._params = parameters
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._executed(start, self.rowcount if self.rowcount > 0 else 0)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        self._key = (_normalize(sql), _calling_module())
+        self._params = None
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._executed(start, max(self.rowcount, 0))
+
+    def _executed(self, start, rows):
+        self._elapsed_ms = (time.perf_counter() - start) * 1000
+        self._rows = rows
+        self._span = tracing.record_span('db', self._key[0], self._elapsed_ms)
+        self.connection._open_cursors.add(self)
+        if self.description is None:
+            # No result rows to fetch: the statement is complete
+            self._finish()
+
+    def _fetched(self, start, rows, exhausted):
+        if self._key is None:
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._elapsed_ms += elapsed_ms
+        self._rows += rows
+        tracing.extend_span(self._span, elapsed_ms)
+        if exhausted:
+            self._finish()
+
+    def _finish(self):
+        """Record the current statement, once, with its execute and fetch time."""
+        if self._key is None:
+            return
+        _record(self._key, self._elapsed_ms, self._rows)
+        self.connection._open_cursors.discard(self)
+        if self._elapsed_ms >= SLOW_QUERY_MS:
+            self._log_slow()
+        self._key = None
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(start, 0 if row is None else 1, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        start = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(start, len(rows), len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(start, len(rows), True)
+        return rows
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # conn.execute(...).fetchone() drops its cursor with the statement unfinished
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+    def _log_slow(self):
+        sql, module = self._key
+        plan = None
+        if self._params is not None and not sql.upper().startswith(('EXPLAIN', 'BEGIN', 'COMMIT', 'PRAGMA')):
+            try:
+                # A plain cursor, so explaining is not itself recorded
+                rows = sqlite3.Cursor(self.connection).execute(f"EXPLAIN QUERY PLAN {sql}",
+                                                               self._params).fetchall()
+                plan = '\n'.join(row[3] for row in rows)
+            except sqlite3.Error:
+                pass
+        with _pending_lock:
+            _pending_slow.append((self.connection.db_path, sql, module, round(self._elapsed_ms, 2),
+                                  plan, datetime.now().isoformat()))
+            due = (len(_pending_slow) >= SLOW_FLUSH_SIZE or
+                   time.time() - datetime.fromisoformat(_pending_slow[0][5]).timestamp() >= SLOW_FLUSH_SECONDS)
+        # Writing from another connection would wait on this one's open transaction
+        if due and not self.connection.in_transaction:
+            flush_slow_queries()
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors (including execute shortcuts) are instrumented."""
+
+    def __init__(self, database, *args, **kwargs):
+        super().__init__(database, *args, **kwargs)
+        self.db_path = database
+        # Cursors with a statement not yet recorded
+        self._open_cursors = weakref.WeakSet()
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def close(self):
+        for cursor in list(self._open_cursors):
+            cursor._finish()
+        super().close()
+        flush_slow_queries(self.db_path)
+
+
+def connect(database, **kwargs):
+    """sqlite3.connect with statement instrumentation."""
+    return sqlite3.connect(database, factory=InstrumentedConnection, **kwargs)
+
+
+def flush_slow_queries(db_path=None):
+    """Write pending slow statements (for db_path, or all) to their databases' slow_query_log."""
+    with _pending_lock:
+        entries = [e for e in _pending_slow if db_path is None or e[0] == db_path]
+        if not entries:
+            return
+        _pending_slow[:] = [e for e in _pending_slow if db_path is not None and e[0] != db_path]
+
+    by_path = {}
+    for entry in entries:
+        by_path.setdefault(entry[0], []).append(entry)
+    for path, path_entries in by_path.items():
+        try:
+            conn = sqlite3.connect(path, timeout=1.0)
+            try:
+                conn.executemany("""INSERT INTO slow_query_log (statement, module, duration_ms, query_plan,
+                                                                logged_at)
+                                    VALUES (?, ?, ?, ?, ?)""", [e[1:] for e in path_entries])
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            # Logging must never break the query that was being measured; retry on the next flush
+            print(f"Could not write slow query log: {e}")
+            with _pending_lock:
+                _pending_slow[:0] = path_entries
+                del _pending_slow[:-MAX_PENDING_SLOW]
+
+
+def get_query_stats(limit=None):
+    """
+    Recorded statements, slowest total time first.
+
+    Returns:
+        List of dicts: statement, module, calls, total_ms, avg_ms, max_ms,
+        rows and histogram ({bucket label: count})
+    """
+    labels = [f"≤{bound}ms" for bound in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}ms"]
+    with _stats_lock:
+        items = [(key, dict(entry, histogram=list(entry['histogram']))) for key, entry in _stats.items()]
+    stats = [
+        {
+            'statement': statement,
+            'module': module,
+            'calls': entry['calls'],
+            'total_ms': round(entry['total_ms'], 2),
+            'avg_ms': round(entry['total_ms'] / entry['calls'], 3) if entry['calls'] else 0.0,
+            'max_ms': round(entry['max_ms'], 2),
+            'rows': entry['rows'],
+            'histogram': dict(zip(labels, entry['histogram'])),
+        }
+        for (statement, module), entry in items
+    ]
+    stats.sort(key=lambda s: s['total_ms'], reverse=True)
+    return stats[:limit] if limit else stats
+
+
+def reset_query_stats():
+    """Forget the in-memory statistics (the slow query log is kept)."""
+    with _stats_lock:
+        _stats.clear()
+
+
+def get_slow_queries(db_path, limit=20):
+    """Slow statements from slow_query_log, worst first, with their latest plan."""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("""
+            SELECT statement, module, COUNT(*), MAX(duration_ms), AVG(duration_ms), MAX(logged_at),
+                   (SELECT query_plan FROM slow_query_log latest
+                    WHERE latest.statement = log.statement ORDER BY logged_at DESC LIMIT 1)
+            FROM slow_query_log log
+            GROUP BY statement, module
+            ORDER BY MAX(duration_ms) DESC
+            LIMIT ?
+        """, (limit,)).fetchall()
+    finally:
+        conn.close()
+    return [
+        {'statement': row[0], 'module': row[1], 'count': row[2], 'max_ms': row[3],
+         'avg_ms': round(row[4], 2), 'last_seen': row[5], 'query_plan': row[6]}
+        for row in rows
+    ]
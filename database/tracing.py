@@ -0,0 +1,377 @@
+# database/tracing.py
+"""
+Per-Rerun Tracing
+app.py wraps each page dispatch in trace_rerun(); while it is active, the
+database layer (query_stats), outbound HTTP (requests), Gemini calls and
+translations record spans into the rerun's trace. A sample of traces
+(TRACE_SAMPLE_RATE) is written to request_traces/trace_spans for the page
+performance dashboard, and a single rerun can be captured with cProfile.
+
+Work outside a trace, or done on threads a page starts itself, is not
+recorded. Spans cost one context variable lookup when no trace is active.
+"""
+
+import contextvars
+import cProfile
+import io
+import os
+import pstats
+import random
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from urllib.parse import urlsplit
+
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0.1'))
+
+# Span kinds, plus 'render': rerun time not spent inside any top-level span
+SPAN_KINDS = ('db', 'http', 'llm', 'translation')
+
+# Spans stored per trace; totals per kind always include every span
+MAX_STORED_SPANS = 200
+MAX_SPAN_NAME = 300
+
+# Traces kept in the store; older ones are pruned as new ones arrive
+TRACE_RETENTION = 5000
+
+PROFILE_LINES = 40
+
+_current = contextvars.ContextVar('trace', default=None)
+
+_hooks_lock = threading.Lock()
+_hooked = set()
+
+
+class Trace:
+    """Spans recorded during one rerun of one page."""
+
+    def __init__(self, page):
+        self.page = page
+        self.started_at = datetime.now().isoformat()
+        self.start = time.perf_counter()
+        self.duration_ms = None
+        # [kind, name, start offset ms, duration ms, depth]
+        self.spans = []
+        self.depth = 0
+        self.profile = None
+
+    def add_span(self, kind, name, start, duration_ms):
+        span = [kind, name, round((start - self.start) * 1000, 3), duration_ms, self.depth]
+        self.spans.append(span)
+        return span
+
+    def totals(self):
+        """{kind: (total ms, span count)}, with 'render' for time outside top-level spans."""
+        totals = {}
+        outside = self.duration_ms
+        for kind, _, _, duration_ms, depth in self.spans:
+            total, count = totals.get(kind, (0.0, 0))
+            totals[kind] = (total + duration_ms, count + 1)
+            if depth == 0:
+                outside -= duration_ms
+        totals['render'] = (max(outside, 0.0), 1)
+        return totals
+
+
+def current_trace():
+    """The trace of the rerun running on this thread, or None."""
+    return _current.get()
+
+
+@contextmanager
+def span(kind, name):
+    """Time a block as a span of the current trace (no-op outside a trace)."""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    trace.depth += 1
+    try:
+        yield
+    finally:
+        trace.depth -= 1
+        trace.add_span(kind, name, start, (time.perf_counter() - start) * 1000)
+
+
+def record_span(kind, name, duration_ms):
+    """
+    Add an already-timed span that ended just now.
+
+    Returns:
+        The span, so later work (e.g. fetching rows) can be added to it with
+        extend_span(); None outside a trace
+    """
+    trace = _current.get()
+    if trace is None:
+        return None
+    return trace.add_span(kind, name, time.perf_counter() - duration_ms / 1000, duration_ms)
+
+
+def extend_span(span_entry, duration_ms):
+    if span_entry is not None:
+        span_entry[3] += duration_ms
+
+
+@contextmanager
+def trace_rerun(page, db_path=None, sample_rate=None, profile=False):
+    """
+    Trace one page rerun.
+
+    Sampled (or profiled) traces are saved when the block exits, including
+    when it exits through st.stop()/st.rerun().
+    """
+    install_gateway_hooks()
+    rate = TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+    if not profile and random.random() >= rate:
+        yield None
+        return
+
+    trace = Trace(page)
+    token = _current.set(trace)
+    profiler = _start_profiler() if profile else None
+    try:
+        yield trace
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        trace.duration_ms = (time.perf_counter() - trace.start) * 1000
+        _current.reset(token)
+        if profiler is not None:
+            trace.profile = _profile_text(profiler)
+        # SDKs imported during this rerun get their hooks for the next one
+        install_gateway_hooks()
+        save_trace(trace, db_path)
+
+
+def _start_profiler():
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another session is already profiling
+        return None
+    return profiler
+
+
+def _profile_text(profiler):
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(PROFILE_LINES)
+    return out.getvalue()
+
+
+# ----------------------------------------
+# --- GATEWAY HOOKS ---
+# ----------------------------------------
+
+def _http_span_name(method, url):
+    # Query strings can carry API keys, so only host and path are kept
+    parts = urlsplit(url)
+    return f"{method} {parts.netloc}{parts.path}"
+
+
+def _hook_requests():
+    import requests
+
+    send = requests.Session.send
+
+    def traced_send(self, request, **kwargs):
+        with span('http', _http_span_name(request.method, request.url)):
+            return send(self, request, **kwargs)
+
+    requests.Session.send = traced_send
+
+
+def _hook_genai():
+    from google.genai import models
+
+    generate_content = models.Models.generate_content
+
+    def traced_generate_content(self, *, model, **kwargs):
+        with span('llm', model):
+            return generate_content(self, model=model, **kwargs)
+
+    models.Models.generate_content = traced_generate_content
+
+
+# module that must already be imported -> installer
+_GATEWAYS = {
+    'requests': _hook_requests,
+    'google.genai.models': _hook_genai,
+}
+
+
+def install_gateway_hooks():
+    """
+    Wrap the HTTP and LLM client entry points with spans.
+
+    Only SDKs that are already imported are hooked, so tracing never pulls a
+    heavy SDK into startup; called at the start and end of every trace.
+    """
+    if len(_hooked) == len(_GATEWAYS):
+        return
+    with _hooks_lock:
+        for module, install in _GATEWAYS.items():
+            if module not in _hooked and module in sys.modules:
+                install()
+                _hooked.add(module)
+
+
+# ----------------------------------------
+# --- TRACE STORE ---
+# ----------------------------------------
+
+def _default_db():
+    from database import db_functions
+    return db_functions.DB_NAME
+
+
+def save_trace(trace, db_path=None):
+    """Write a finished trace to the store."""
+    try:
+        # A plain connection, so storing a trace is not itself measured
+        conn = sqlite3.connect(db_path or _default_db(), timeout=1.0)
+        try:
+            cursor = conn.execute("""INSERT INTO request_traces (page, started_at, duration_ms, span_count, profile)
+                                     VALUES (?, ?, ?, ?, ?)""",
+                                  (trace.page, trace.started_at, round(trace.duration_ms, 3),
+                                   len(trace.spans), trace.profile))
+            trace_id = cursor.lastrowid
+            conn.executemany("""INSERT INTO trace_span_totals (trace_id, kind, duration_ms, spans)
+                                VALUES (?, ?, ?, ?)""",
+                             [(trace_id, kind, round(total, 3), count)
+                              for kind, (total, count) in trace.totals().items()])
+            conn.executemany("""INSERT INTO trace_spans (trace_id, kind, name, start_ms, duration_ms, depth)
+                                VALUES (?, ?, ?, ?, ?, ?)""",
+                             [(trace_id, kind, name[:MAX_SPAN_NAME], start_ms, round(duration_ms, 3), depth)
+                              for kind, name, start_ms, duration_ms, depth in trace.spans[:MAX_STORED_SPANS]])
+            if trace_id % 100 == 0:
+                _prune(conn, trace_id - TRACE_RETENTION)
+            conn.commit()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        # Tracing must never break the page it measured
+        print(f"Could not save trace: {e}")
+
+
+def _prune(conn, oldest_id):
+    for table in ('trace_spans', 'trace_span_totals'):
+        conn.execute(f"DELETE FROM {table} WHERE trace_id <= ?", (oldest_id,))
+    conn.execute("DELETE FROM request_traces WHERE id <= ?", (oldest_id,))
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (None if empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def get_latency_summary(db_path=None, since=None):
+    """
+    p50/p95/p99 per page for the whole rerun and per span kind.
+
+    A trace without spans of a kind counts as 0 ms for it, so kind
+    percentiles describe the cost per rerun of that page.
+
+    Returns:
+        List of dicts: page, kind ('total', 'render' or a span kind), traces,
+        p50_ms, p95_ms, p99_ms, avg_spans; slowest p95 first
+    """
+    conn = sqlite3.connect(db_path or _default_db())
+    try:
+        where, params = ("WHERE started_at >= ?", (since,)) if since else ("", ())
+        traces = conn.execute(f"SELECT id, page, duration_ms FROM request_traces {where}", params).fetchall()
+        totals = conn.execute(f"""
+            SELECT t.trace_id, t.kind, t.duration_ms, t.spans
+            FROM trace_span_totals t JOIN request_traces r ON r.id = t.trace_id {where}
+        """, params).fetchall()
+    finally:
+        conn.close()
+
+    by_trace = {}
+    for trace_id, kind, duration_ms, spans in totals:
+        by_trace.setdefault(trace_id, {})[kind] = (duration_ms, spans)
+
+    pages = {}
+    for trace_id, page, duration_ms in traces:
+        pages.setdefault(page, []).append((duration_ms, by_trace.get(trace_id, {})))
+
+    summary = []
+    for page, rows in pages.items():
+        for kind in ('total', 'render') + SPAN_KINDS:
+            if kind == 'total':
+                values, spans = [duration for duration, _ in rows], [0] * len(rows)
+            else:
+                if not any(kind in kinds for _, kinds in rows):
+                    continue
+                values = [kinds.get(kind, (0.0, 0))[0] for _, kinds in rows]
+                spans = [kinds.get(kind, (0.0, 0))[1] for _, kinds in rows]
+            summary.append({
+                'page': page,
+                'kind': kind,
+                'traces': len(rows),
+                'p50_ms': round(percentile(values, 50), 1),
+                'p95_ms': round(percentile(values, 95), 1),
+                'p99_ms': round(percentile(values, 99), 1),
+                'avg_spans': round(sum(spans) / len(spans), 1),
+            })
+    summary.sort(key=lambda row: (row['kind'] != 'total', -row['p95_ms']))
+    return summary
+
+
+def get_recent_traces(db_path=None, page=None, limit=20, slowest=False):
+    """Recent (or slowest) traces: id, page, started_at, duration_ms, span_count, has_profile."""
+    conn = sqlite3.connect(db_path or _default_db())
+    try:
+        rows = conn.execute(f"""
+            SELECT id, page, started_at, duration_ms, span_count, profile IS NOT NULL
+            FROM request_traces
+            WHERE (? IS NULL OR page = ?)
+            ORDER BY {'duration_ms' if slowest else 'id'} DESC
+            LIMIT ?
+        """, (page, page, limit)).fetchall()
+    finally:
+        conn.close()
+    return [
+        {'id': row[0], 'page': row[1], 'started_at': row[2], 'duration_ms': row[3],
+         'span_count': row[4], 'has_profile': bool(row[5])}
+        for row in rows
+    ]
+
+
+def get_trace(trace_id, db_path=None):
+    """A stored trace with its spans in start order, or None."""
+    conn = sqlite3.connect(db_path or _default_db())
+    try:
+        row = conn.execute("""SELECT page, started_at, duration_ms, span_count, profile
+                              FROM request_traces WHERE id = ?""", (trace_id,)).fetchone()
+        if row is None:
+            return None
+        spans = conn.execute("""SELECT kind, name, start_ms, duration_ms, depth FROM trace_spans
+                                WHERE trace_id = ? ORDER BY start_ms""", (trace_id,)).fetchall()
+    finally:
+        conn.close()
+    return {
+        'id': trace_id, 'page': row[0], 'started_at': row[1], 'duration_ms': row[2],
+        'span_count': row[3], 'profile': row[4],
+        'spans': [{'kind': s[0], 'name': s[1], 'start_ms': s[2], 'duration_ms': s[3], 'depth': s[4]}
+                  for s in spans],
+    }
+
+
+def clear_traces(db_path=None):
+    """Delete every stored trace."""
+    conn = sqlite3.connect(db_path or _default_db())
+    try:
+        for table in ('trace_spans', 'trace_span_totals', 'request_traces'):
+            conn.execute(f"DELETE FROM {table}")
+        conn.commit()
+    finally:
+        conn.close()
@@ -0,0 +1,18 @@
+"""Refresh market intelligence digests (run on a schedule, e.g. every few hours)"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from ai.market_digest import MarketDigestBuilder
+
+if __name__ == "__main__":
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"📰 Refreshing up to {limit} market digests...")
+    summary = MarketDigestBuilder().refresh(limit=limit)
+    print(f"✅ Built {summary['built']} / {summary['targets']} digests ({summary['failed']} failed)")
@@ -0,0 +1,14 @@
+"""Compile translations/<lang>.py modules into pickled catalogs"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from translations.catalog import compile_all, CATALOG_DIR
+
+if __name__ == "__main__":
+    counts = compile_all()
+    for lang, count in counts.items():
+        print(f"✅ {lang}: {count} strings")
+    print(f"Catalogs written to {CATALOG_DIR}")
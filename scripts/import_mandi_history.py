@@ -0,0 +1,66 @@
+"""Import historical mandi prices (Agmarknet CSV export) for the local price forecaster"""
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import db_functions
+
+db_functions.DB_NAME = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'farmermarket.db')
+
+# Agmarknet export headers -> mandi_price_history columns
+COLUMN_MAP = {
+    'Commodity': 'crop_name',
+    'Market Name': 'market',
+    'Market': 'market',
+    'State Name': 'state',
+    'State': 'state',
+    'Price Date': 'price_date',
+    'Arrival_Date': 'price_date',
+    'Date': 'price_date',
+    'Min Price (Rs./Quintal)': 'min_price',
+    'Min_x0020_Price': 'min_price',
+    'Min Price': 'min_price',
+    'Max Price (Rs./Quintal)': 'max_price',
+    'Max_x0020_Price': 'max_price',
+    'Max Price': 'max_price',
+    'Modal Price (Rs./Quintal)': 'modal_price',
+    'Modal_x0020_Price': 'modal_price',
+    'Modal Price': 'modal_price',
+}
+
+
+def import_csv(path):
+    """Load one CSV file into mandi_price_history. Returns rows written."""
+    df = pd.read_csv(path).rename(columns=COLUMN_MAP)
+    missing = {'crop_name', 'market', 'price_date', 'modal_price'} - set(df.columns)
+    if missing:
+        print(f"❌ {path}: missing columns {sorted(missing)}")
+        return 0
+
+    for col in ('state', 'min_price', 'max_price'):
+        if col not in df.columns:
+            df[col] = None
+
+    df['price_date'] = pd.to_datetime(df['price_date'], dayfirst=True, errors='coerce').dt.strftime('%Y-%m-%d')
+    df = df.dropna(subset=['price_date', 'modal_price'])
+
+    columns = ['crop_name', 'market', 'state', 'price_date', 'min_price', 'max_price', 'modal_price']
+    return db_functions.add_mandi_prices(df[columns].itertuples(index=False, name=None), source='csv_import')
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python scripts/import_mandi_history.py <file.csv> [more.csv ...]")
+        sys.exit(1)
+
+    db_functions.init_db()
+    total = 0
+    for csv_path in sys.argv[1:]:
+        written = import_csv(csv_path)
+        print(f"✅ {csv_path}: {written} rows")
+        total += written
+    print(f"\n📊 Imported {total} mandi price rows")
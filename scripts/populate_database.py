@@ -1,6 +1,10 @@
 """
 Populate database with realistic Maharashtra farmer data
 Run this script to add sample farmers, tools, and crops
+
+The create_* generators take an optional rng (a random.Random) so the same
+seed always produces the same data; scripts/synthetic_data.py uses them to
+build large benchmark databases.
 """
 
 import sqlite3
@@ -80,7 +84,69 @@ SURNAMES = [
     "Khandekar", "Suryawanshi", "Shelar", "Dhere", "Lokhande"
 ]
 
-def get_coordinates_for_location(location):
+# Realistic rental rates (per day in INR)
+TOOL_RATES = {
+    "Tractor": (800, 1500),
+    "Power Tiller": (500, 800),
+    "Rotavator": (300, 600),
+    "Cultivator": (200, 400),
+    "Harrow": (200, 350),
+    "Seed Drill": (250, 450),
+    "Sprayer": (150, 300),
+    "Harvester": (1500, 2500),
+    "Thresher": (600, 1000),
+    "Water Pump": (200, 400),
+    "Drip Irrigation System": (500, 1000),
+    "Plough": (150, 250),
+    "Leveler": (300, 500),
+    "Reaper": (400, 700),
+    "Weeder": (100, 200),
+    "Chaff Cutter": (200, 350),
+    "Trailer": (400, 700),
+    "Ridger": (200, 400),
+    "Disc Harrow": (300, 500),
+    "Subsoiler": (350, 600)
+}
+
+# Realistic quantities based on crop type (in quintals)
+CROP_QUANTITIES = {
+    "Sugarcane": (50, 500),
+    "Cotton": (10, 100),
+    "Soybean": (5, 50),
+    "Jowar": (10, 80),
+    "Bajra": (10, 70),
+    "Wheat": (15, 100),
+    "Tur (Pigeon Pea)": (5, 40),
+    "Onion": (20, 200),
+    "Tomato": (10, 150),
+    "Potato": (20, 180),
+    "Grapes": (5, 50),
+    "Pomegranate": (5, 40),
+    "Banana": (10, 100),
+    "Mango": (5, 50),
+    "Orange": (10, 80)
+}
+
+# Realistic prices (per quintal in INR)
+CROP_PRICES = {
+    "Sugarcane": (280, 350),
+    "Cotton": (5500, 7000),
+    "Soybean": (4000, 5500),
+    "Jowar": (2500, 3500),
+    "Bajra": (2200, 3000),
+    "Wheat": (2000, 2500),
+    "Tur (Pigeon Pea)": (6000, 8000),
+    "Onion": (800, 2500),
+    "Tomato": (1000, 3000),
+    "Potato": (800, 1500),
+    "Grapes": (3000, 6000),
+    "Pomegranate": (4000, 8000),
+    "Banana": (1500, 2500),
+    "Mango": (3000, 5000),
+    "Orange": (2000, 4000)
+}
+
+def get_coordinates_for_location(location, rng=random):
     """Get realistic coordinates for Maharashtra locations"""
     # Approximate coordinates for major cities (you can expand this)
     coords = {
@@ -102,37 +168,43 @@ def get_coordinates_for_location(location):
     
     # Otherwise, return nearby coordinates (slight variation from base city)
     base_lat, base_lon = 18.5204, 73.8567  # Default to Pune area
-    variation_lat = random.uniform(-2, 2)
-    variation_lon = random.uniform(-2, 2)
+    variation_lat = rng.uniform(-2, 2)
+    variation_lon = rng.uniform(-2, 2)
     return (base_lat + variation_lat, base_lon + variation_lon)
 
-def create_farmers(count=50):
-    """Create realistic farmer profiles"""
+def create_farmers(count=50, rng=random, used_names=None):
+    """
+    Create realistic farmer profiles
+    
+    Names are unique; once a first name + surname pair is taken, later
+    farmers with the same pair get a number ("Ramesh Patil 2"). Pass the same
+    used_names dict to several calls to keep names unique across batches.
+    """
     farmers = []
-    used_names = set()
+    used_names = {} if used_names is None else used_names
     
     for i in range(count):
         # Generate unique name
-        while True:
-            first_name = random.choice(MALE_NAMES)
-            surname = random.choice(SURNAMES)
-            full_name = f"{first_name} {surname}"
-            if full_name not in used_names:
-                used_names.add(full_name)
-                break
+        first_name = rng.choice(MALE_NAMES)
+        surname = rng.choice(SURNAMES)
+        full_name = f"{first_name} {surname}"
+        taken = used_names.get(full_name, 0)
+        used_names[full_name] = taken + 1
+        if taken:
+            full_name = f"{full_name} {taken + 1}"
         
-        location = random.choice(MAHARASHTRA_LOCATIONS)
-        lat, lon = get_coordinates_for_location(location)
+        location = rng.choice(MAHARASHTRA_LOCATIONS)
+        lat, lon = get_coordinates_for_location(location, rng)
         
         # Realistic farm sizes (in acres)
-        farm_size = random.choice([
+        farm_size = rng.choice([
             0.5, 1, 1.5, 2, 2.5, 3, 4, 5,  # Small farmers (most common)
             6, 7, 8, 10, 12, 15,  # Medium farmers
             20, 25, 30, 40, 50  # Large farmers (less common)
         ])
         
         # Contact numbers
-        contact = f"+91-{random.randint(7000000000, 9999999999)}"
+        contact = f"+91-{rng.randint(7000000000, 9999999999)}"
         
         farmers.append({
             'name': full_name,
@@ -148,43 +220,19 @@ def create_farmers(count=50):
     
     return farmers
 
-def create_tools(farmers):
+def create_tools(farmers, rng=random):
     """Create tool listings for farmers"""
     tools = []
     
     # Each farmer lists 1-3 tools
     for farmer in farmers:
-        num_tools = random.randint(1, 3)
-        farmer_tools = random.sample(FARMING_TOOLS, min(num_tools, len(FARMING_TOOLS)))
+        num_tools = rng.randint(1, 3)
+        farmer_tools = rng.sample(FARMING_TOOLS, min(num_tools, len(FARMING_TOOLS)))
         
         for tool in farmer_tools:
-            # Realistic rental rates (per day in INR)
-            rates = {
-                "Tractor": random.randint(800, 1500),
-                "Power Tiller": random.randint(500, 800),
-                "Rotavator": random.randint(300, 600),
-                "Cultivator": random.randint(200, 400),
-                "Harrow": random.randint(200, 350),
-                "Seed Drill": random.randint(250, 450),
-                "Sprayer": random.randint(150, 300),
-                "Harvester": random.randint(1500, 2500),
-                "Thresher": random.randint(600, 1000),
-                "Water Pump": random.randint(200, 400),
-                "Drip Irrigation System": random.randint(500, 1000),
-                "Plough": random.randint(150, 250),
-                "Leveler": random.randint(300, 500),
-                "Reaper": random.randint(400, 700),
-                "Weeder": random.randint(100, 200),
-                "Chaff Cutter": random.randint(200, 350),
-                "Trailer": random.randint(400, 700),
-                "Ridger": random.randint(200, 400),
-                "Disc Harrow": random.randint(300, 500),
-                "Subsoiler": random.randint(350, 600)
-            }
+            rate = rng.randint(*TOOL_RATES.get(tool, (200, 800)))
             
-            rate = rates.get(tool, random.randint(200, 800))
-            
-            notes = random.choice([
+            notes = rng.choice([
                 "Well maintained, fuel included",
                 "Good condition, operator available",
                 "Available immediately",
@@ -206,63 +254,26 @@ def create_tools(farmers):
     
     return tools
 
-def create_crops(farmers):
+def create_crops(farmers, rng=random, today=None):
     """Create crop listings for farmers"""
     crops = []
+    today = today or datetime.now()
     
     # About 60% of farmers have crops to sell
-    selling_farmers = random.sample(farmers, int(len(farmers) * 0.6))
+    selling_farmers = rng.sample(farmers, int(len(farmers) * 0.6))
     
     for farmer in selling_farmers:
-        num_crops = random.randint(1, 2)
-        farmer_crops = random.sample(MAHARASHTRA_CROPS, min(num_crops, len(MAHARASHTRA_CROPS)))
+        num_crops = rng.randint(1, 2)
+        farmer_crops = rng.sample(MAHARASHTRA_CROPS, min(num_crops, len(MAHARASHTRA_CROPS)))
         
         for crop in farmer_crops:
-            # Realistic quantities based on crop type (in quintals)
-            quantities = {
-                "Sugarcane": random.randint(50, 500),
-                "Cotton": random.randint(10, 100),
-                "Soybean": random.randint(5, 50),
-                "Jowar": random.randint(10, 80),
-                "Bajra": random.randint(10, 70),
-                "Wheat": random.randint(15, 100),
-                "Tur (Pigeon Pea)": random.randint(5, 40),
-                "Onion": random.randint(20, 200),
-                "Tomato": random.randint(10, 150),
-                "Potato": random.randint(20, 180),
-                "Grapes": random.randint(5, 50),
-                "Pomegranate": random.randint(5, 40),
-                "Banana": random.randint(10, 100),
-                "Mango": random.randint(5, 50),
-                "Orange": random.randint(10, 80)
-            }
-            
-            quantity = quantities.get(crop, random.randint(10, 100))
-            
-            # Realistic prices (per quintal in INR)
-            prices = {
-                "Sugarcane": random.randint(280, 350),
-                "Cotton": random.randint(5500, 7000),
-                "Soybean": random.randint(4000, 5500),
-                "Jowar": random.randint(2500, 3500),
-                "Bajra": random.randint(2200, 3000),
-                "Wheat": random.randint(2000, 2500),
-                "Tur (Pigeon Pea)": random.randint(6000, 8000),
-                "Onion": random.randint(800, 2500),
-                "Tomato": random.randint(1000, 3000),
-                "Potato": random.randint(800, 1500),
-                "Grapes": random.randint(3000, 6000),
-                "Pomegranate": random.randint(4000, 8000),
-                "Banana": random.randint(1500, 2500),
-                "Mango": random.randint(3000, 5000),
-                "Orange": random.randint(2000, 4000)
-            }
+            quantity = rng.randint(*CROP_QUANTITIES.get(crop, (10, 100)))
             
-            expected_price = prices.get(crop, random.randint(2000, 5000))
+            expected_price = rng.randint(*CROP_PRICES.get(crop, (2000, 5000)))
             
             # Listing date (within last 30 days)
-            days_ago = random.randint(0, 30)
-            listing_date = (datetime.now() - timedelta(days=days_ago)).strftime('%Y-%m-%d')
+            days_ago = rng.randint(0, 30)
+            listing_date = (today - timedelta(days=days_ago)).strftime('%Y-%m-%d')
             
             crops.append({
                 'Farmer': farmer['name'],
@@ -276,9 +287,10 @@ def create_crops(farmers):
     
     return crops
 
-def create_calendar_events(farmers):
-    """Create sample calendar events for farmers"""
+def create_calendar_events(farmers, rng=random, limit=20, today=None):
+    """Create sample calendar events for farmers (the first `limit`, or all if None)"""
     events = []
+    today = today or datetime.now()
     
     activities = [
         "Ploughing", "Sowing", "Irrigation", "Fertilizer Application",
@@ -288,16 +300,16 @@ def create_calendar_events(farmers):
     ]
     
     # Create 3-5 events per farmer
-    for farmer in farmers[:20]:  # Only first 20 farmers to keep it manageable
-        num_events = random.randint(3, 5)
+    for farmer in farmers[:limit]:  # Only first 20 farmers by default to keep it manageable
+        num_events = rng.randint(3, 5)
         
         for _ in range(num_events):
             # Random date within next 60 days
-            days_ahead = random.randint(0, 60)
-            event_date = (datetime.now() + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
-            event_time = f"{random.randint(6, 18):02d}:00"
+            days_ahead = rng.randint(0, 60)
+            event_date = (today + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
+            event_time = f"{rng.randint(6, 18):02d}:00"
             
-            activity = random.choice(activities)
+            activity = rng.choice(activities)
             
             descriptions = [
                 f"Complete {activity.lower()} for main field",
@@ -312,7 +324,7 @@ def create_calendar_events(farmers):
                 'event_date': event_date,
                 'event_time': event_time,
                 'event_title': activity,
-                'event_description': random.choice(descriptions),
+                'event_description': rng.choice(descriptions),
                 'weather_alert': ''
             })
     
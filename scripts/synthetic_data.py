@@ -0,0 +1,231 @@
+"""
+Seeded synthetic data for benchmarks
+Builds a farmermarket database of any size from the generators in
+populate_database.py (farmers, tool and crop listings, calendar events) and
+the review comments of populate_ratings.py, plus ratings, money diary
+entries, farm transactions and cache entries. The same size and seed always
+produce the same rows; dates are relative to BASE_DATE, not today.
+
+Usage:
+    python scripts/synthetic_data.py --farmers 100000 --seed 42 --output bench.db
+
+Rows are generated and written in batches, so memory stays flat from 10k to
+1M farmers. The schema and its indexes come from the app's migrations.
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from database import migrations
+from scripts.populate_database import (MAHARASHTRA_CROPS, MAHARASHTRA_LOCATIONS, create_calendar_events,
+                                       create_crops, create_farmers, create_tools)
+from scripts.populate_ratings import COMMENTS
+
+BASE_DATE = date(2025, 6, 15)
+BATCH_FARMERS = 10_000
+
+# Rating stars, skewed positive like real marketplace reviews
+STARS = [5, 4, 3, 2, 1]
+STAR_WEIGHTS = [40, 30, 15, 10, 5]
+
+MONEY_IN_REASONS = ["Sold Wheat", "Sold Tomatoes", "Sold Onions", "Rented Tool", "Milk Sale", "Subsidy"]
+MONEY_OUT_REASONS = ["Seeds", "Fertilizer", "Labour", "Diesel", "Electricity Bill", "Tool Repair", "Pesticide"]
+INCOME_CATEGORIES = ["Crop Sale", "Tool Rental", "Livestock Sale", "Government Subsidy", "Other"]
+EXPENSE_CATEGORIES = ["Seeds", "Fertilizer", "Pesticides", "Labor", "Equipment",
+                      "Fuel", "Electricity", "Maintenance", "Other"]
+
+# Cache entries that are still valid / already expired, whenever the data is used
+FRESH_UNTIL = '2099-12-31T00:00:00'
+EXPIRED_AT = '2000-01-01T00:00:00'
+
+
+def _next_id(conn, table):
+    return (conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]) + 1
+
+
+def _insert_batch(conn, rng, farmers, first_rowid, ratings_per_listing, finance_entries):
+    """Insert one batch of farmers with everything that belongs to them; returns row counts."""
+    # Timestamp columns are set explicitly; their CURRENT_TIMESTAMP defaults would differ per build
+    created = f"{BASE_DATE.isoformat()} 06:00:00"
+    conn.executemany("""INSERT INTO farmers (name, location, farm_size, farm_unit, contact, weather_location,
+                                             latitude, longitude, password, created_date)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                     [(f['name'], f['location'], f['farm_size'], f['farm_unit'], f['contact'],
+                       f['weather_location'], f['latitude'], f['longitude'], f['password'], created)
+                      for f in farmers])
+
+    tools = create_tools(farmers, rng)
+    first_tool = _next_id(conn, 'tools')
+    conn.executemany("""INSERT INTO tools (Farmer, Location, Tool, Rate, Contact, Notes, Created_Date)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                     [(t['Farmer'], t['Location'], t['Tool'], t['Rate'], t['Contact'], t['Notes'], created)
+                      for t in tools])
+
+    crops = create_crops(farmers, rng, today=BASE_DATE)
+    first_crop = _next_id(conn, 'crops')
+    conn.executemany("""INSERT INTO crops (Farmer, Location, Crop, Quantity, Expected_Price, Contact, Listing_Date,
+                                           Created_Date)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                     [(c['Farmer'], c['Location'], c['Crop'], c['Quantity'], c['Expected_Price'],
+                       c['Contact'], c['Listing_Date'], f"{c['Listing_Date']} 06:00:00") for c in crops])
+
+    events = create_calendar_events(farmers, rng, limit=None, today=BASE_DATE - timedelta(days=30))
+    conn.executemany("""INSERT INTO calendar_events (farmer_name, event_date, event_time, event_title,
+                                                     event_description, weather_alert)
+                        VALUES (?, ?, ?, ?, ?, ?)""",
+                     [(e['farmer_name'], e['event_date'], e['event_time'], e['event_title'],
+                       e['event_description'], e['weather_alert']) for e in events])
+
+    # Raters come from the same batch, never the seller
+    names = [f['name'] for f in farmers]
+    listings = [('tool', first_tool + i, t['Farmer']) for i, t in enumerate(tools)] + \
+               [('crop', first_crop + i, c['Farmer']) for i, c in enumerate(crops)]
+    ratings = []
+    for listing_type, listing_id, seller in listings:
+        for _ in range(ratings_per_listing):
+            rater = rng.choice(names)
+            if rater == seller:
+                continue
+            stars = rng.choices(STARS, STAR_WEIGHTS)[0]
+            created = BASE_DATE - timedelta(days=rng.randint(0, 365))
+            ratings.append((listing_type, listing_id, seller, rater, stars,
+                            rng.choice(COMMENTS[stars]), created.isoformat()))
+    conn.executemany("""INSERT INTO ratings (listing_type, listing_id, seller_name, rater_name, stars, comment,
+                                             created_date)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)""", ratings)
+
+    money, transactions = [], []
+    for offset, farmer in enumerate(farmers):
+        for _ in range(finance_entries):
+            entry_date = (BASE_DATE - timedelta(days=rng.randint(0, 365))).isoformat()
+            if rng.random() < 0.5:
+                money.append((farmer['name'], 'Money In', rng.randint(5, 500) * 100,
+                              rng.choice(MONEY_IN_REASONS), entry_date, f"{entry_date} 18:00:00"))
+            else:
+                money.append((farmer['name'], 'Money Out', rng.randint(1, 100) * 50,
+                              rng.choice(MONEY_OUT_REASONS), entry_date, f"{entry_date} 18:00:00"))
+
+            txn_date = (BASE_DATE - timedelta(days=rng.randint(0, 365))).isoformat()
+            if rng.random() < 0.4:
+                transactions.append((first_rowid + offset, 'Income', rng.choice(INCOME_CATEGORIES),
+                                     rng.randint(10, 1000) * 100, txn_date, f"{txn_date} 18:00:00"))
+            else:
+                transactions.append((first_rowid + offset, 'Expense', rng.choice(EXPENSE_CATEGORIES),
+                                     rng.randint(1, 200) * 50, txn_date, f"{txn_date} 18:00:00"))
+    conn.executemany("""INSERT INTO simple_money_tracker (farmer_name, entry_type, amount, reason, entry_date,
+                                                          created_at)
+                        VALUES (?, ?, ?, ?, ?, ?)""", money)
+    conn.executemany("""INSERT INTO farm_transactions (farmer_id, type, category, amount, description, date,
+                                                       created_at)
+                        VALUES (?, ?, ?, ?, '', ?, ?)""", transactions)
+
+    return {'tools': len(tools), 'crops': len(crops), 'calendar_events': len(events),
+            'ratings': len(ratings), 'simple_money_tracker': len(money), 'farm_transactions': len(transactions)}
+
+
+def _insert_cache_entries(conn, rng, count):
+    """Weather and market price cache entries; one in ten is expired."""
+    weather, prices = [], []
+    for i in range(count):
+        location = f"{rng.choice(MAHARASHTRA_LOCATIONS)} {i}"
+        expires_at = EXPIRED_AT if rng.random() < 0.1 else FRESH_UNTIL
+        cached_at = f"{BASE_DATE.isoformat()}T06:00:00"
+        if i % 2 == 0:
+            data = {'temperature': rng.randint(18, 42), 'humidity': rng.randint(20, 95), 'location': location}
+            weather.append((location, json.dumps(data), cached_at, expires_at))
+        else:
+            data = {'current_price': rng.randint(800, 8000), 'unit': 'quintal'}
+            prices.append((rng.choice(MAHARASHTRA_CROPS), location, json.dumps(data), cached_at, expires_at))
+    conn.executemany("""INSERT OR REPLACE INTO weather_cache (location, weather_data, cached_at, expires_at)
+                        VALUES (?, ?, ?, ?)""", weather)
+    conn.executemany("""INSERT OR REPLACE INTO market_price_cache (crop_name, location, price_data, cached_at,
+                                                                   expires_at)
+                        VALUES (?, ?, ?, ?, ?)""", prices)
+    return len(weather) + len(prices)
+
+
+def build_database(db_path, farmers=10_000, seed=42, ratings_per_listing=2, finance_entries=4,
+                   cache_entries=None, progress=print):
+    """
+    Create a fresh synthetic database at db_path.
+
+    Args:
+        farmers: number of farmers; listings, events and ratings scale with it
+        seed: random seed; the same arguments always give the same rows
+        ratings_per_listing: ratings attempted per tool/crop listing
+        finance_entries: money diary entries and farm transactions per farmer
+        cache_entries: weather + market price cache rows (default: one per farmer)
+
+    Returns:
+        {table: rows inserted}
+    """
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    migrations.migrate(db_path)
+
+    rng = random.Random(seed)
+    counts = {'farmers': 0}
+    used_names = {}
+    start = time.perf_counter()
+
+    conn = sqlite3.connect(db_path)
+    try:
+        # A throwaway database: skip durability while loading
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        for batch_start in range(0, farmers, BATCH_FARMERS):
+            batch = create_farmers(min(BATCH_FARMERS, farmers - batch_start), rng, used_names)
+            batch_counts = _insert_batch(conn, rng, batch, batch_start + 1, ratings_per_listing, finance_entries)
+            conn.commit()
+            counts['farmers'] += len(batch)
+            for table, rows in batch_counts.items():
+                counts[table] = counts.get(table, 0) + rows
+            progress(f"  {counts['farmers']:>9,} / {farmers:,} farmers  ({time.perf_counter() - start:.0f}s)")
+
+        counts['cache_entries'] = _insert_cache_entries(conn, rng, farmers if cache_entries is None else cache_entries)
+
+        # Seller rating summaries, as update_farmer_rating would leave them
+        conn.execute("""UPDATE farmers SET total_ratings = r.total, avg_rating = r.avg
+                        FROM (SELECT seller_name, COUNT(*) AS total, AVG(stars) AS avg
+                              FROM ratings GROUP BY seller_name) AS r
+                        WHERE farmers.name = r.seller_name""")
+        conn.commit()
+    finally:
+        conn.close()
+
+    # Planner statistics for the loaded data, as a long-running database would have
+    conn = sqlite3.connect(db_path)
+    conn.execute("ANALYZE")
+    conn.close()
+    progress(f"  built in {time.perf_counter() - start:.0f}s")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--farmers', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--ratings-per-listing', type=int, default=2)
+    parser.add_argument('--finance-entries', type=int, default=4, help="money entries and transactions per farmer")
+    parser.add_argument('--cache-entries', type=int, default=None, help="default: one per farmer")
+    parser.add_argument('--output', default='synthetic.db')
+    args = parser.parse_args()
+
+    print(f"🌾 Building {args.output} with {args.farmers:,} farmers (seed {args.seed})...")
+    counts = build_database(args.output, args.farmers, args.seed, args.ratings_per_listing,
+                            args.finance_entries, args.cache_entries)
+    for table, rows in counts.items():
+        print(f"   • {table}: {rows:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Background worker for scheduled jobs (cache sweeps, weather prefetch, price
+alerts, price model training, market digests, scheme refresh), so this work
+stays off page renders.
+
+Usage:
+    python -m scripts.worker                 # run forever
+    python -m scripts.worker --once          # run every job once and exit
+    python -m scripts.worker --jobs cache_sweep,market_digests
+    python -m scripts.worker --stub --once   # no network/AI calls, for tests
+
+Every run is logged to the job_runs table in farmermarket.db. On restart the
+schedule resumes from the last logged run of each job.
+"""
+
+import argparse
+import os
+import random
+import re
+import signal
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from database import db_functions
+
+_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_interval(spec):
+    """'30s', '15m', '6h', '1d' or 'every 2h' -> seconds."""
+    match = re.fullmatch(r'(?:every\s+)?(\d+(?:\.\d+)?)\s*([smhd])', str(spec).strip().lower())
+    if not match:
+        raise ValueError(f"Invalid interval: {spec!r}")
+    return float(match.group(1)) * _UNITS[match.group(2)]
+
+
+@dataclass
+class Job:
+    """A periodic job: interval, allowed overlap and +/- jitter fraction."""
+    name: str
+    func: callable
+    every: str
+    max_concurrency: int = 1
+    jitter: float = 0.1
+    interval_seconds: float = field(init=False)
+
+    def __post_init__(self):
+        self.interval_seconds = parse_interval(self.every)
+
+
+class Scheduler:
+    """Runs due jobs on a thread pool, honouring per-job concurrency limits."""
+
+    def __init__(self, jobs, max_workers=4, stub=False, clock=time.time, rng=None, worker_id=None):
+        self.jobs = {job.name: job for job in jobs}
+        self.stub = stub
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self.slots = {job.name: threading.BoundedSemaphore(job.max_concurrency) for job in jobs}
+        self.next_run = {}
+        self.skipped = {job.name: 0 for job in jobs}
+        self._stop = threading.Event()
+        self._resume_schedule()
+
+    def _with_jitter(self, seconds, jitter):
+        return seconds * (1 + self.rng.uniform(-jitter, jitter))
+
+    def _resume_schedule(self):
+        """Continue from the last logged run instead of running everything on restart."""
+        now = self.clock()
+        try:
+            last_runs = db_functions.get_last_job_runs()
+        except Exception:
+            last_runs = None
+
+        last_started = {}
+        if last_runs is not None and not last_runs.empty:
+            for _, run in last_runs.iterrows():
+                last_started[run['job_name']] = datetime.fromisoformat(run['started_at']).timestamp()
+
+        for name, job in self.jobs.items():
+            if name in last_started:
+                self.next_run[name] = last_started[name] + job.interval_seconds
+            else:
+                # Spread first runs so a fresh worker does not start everything at once
+                self.next_run[name] = now + self.rng.uniform(0, job.jitter * min(job.interval_seconds, 60))
+
+    def due_jobs(self):
+        now = self.clock()
+        return [name for name, at in self.next_run.items() if at <= now]
+
+    def _execute(self, job):
+        run_id = None
+        start = time.perf_counter()
+        try:
+            # Inside the try: if the run log is locked, the slot must still be released
+            run_id = db_functions.start_job_run(job.name, self.worker_id)
+            result = {'stub': True} if self.stub else job.func()
+            db_functions.finish_job_run(run_id, 'success', round(time.perf_counter() - start, 3), result=result)
+            return result
+        except Exception as e:
+            if run_id is not None:
+                db_functions.finish_job_run(run_id, 'failed', round(time.perf_counter() - start, 3), error=str(e))
+            print(f"❌ Job {job.name} failed: {e}")
+            return None
+        finally:
+            self.slots[job.name].release()
+
+    def submit(self, name):
+        """Start a job now if it has a free slot. Returns the future or None."""
+        job = self.jobs[name]
+        if not self.slots[name].acquire(blocking=False):
+            self.skipped[name] += 1
+            return None
+        return self.pool.submit(self._execute, job)
+
+    def run_pending(self):
+        """Submit every due job and schedule its next run. Returns the futures."""
+        futures = []
+        for name in self.due_jobs():
+            job = self.jobs[name]
+            self.next_run[name] = self.clock() + self._with_jitter(job.interval_seconds, job.jitter)
+            future = self.submit(name)
+            if future:
+                futures.append(future)
+        return futures
+
+    def run_once(self):
+        """Run every job once and wait for them (cron-style invocation)."""
+        futures = {name: self.submit(name) for name in self.jobs}
+        return {name: future.result() for name, future in futures.items() if future}
+
+    def run_forever(self, poll_seconds=1.0):
+        print(f"👷 Worker {self.worker_id} running {len(self.jobs)} jobs: {', '.join(self.jobs)}")
+        while not self._stop.is_set():
+            self.run_pending()
+            self._stop.wait(poll_seconds)
+        self.pool.shutdown(wait=True)
+
+    def stop(self, *_):
+        self._stop.set()
+
+
+# ----------------------------------------
+# --- JOBS ---
+# ----------------------------------------
+
+def _farmer_locations(limit=None):
+    conn = sqlite3.connect(db_functions.DB_NAME)
+    query = """SELECT location FROM farmers WHERE location IS NOT NULL AND location != ''
+               GROUP BY location ORDER BY COUNT(*) DESC"""
+    rows = conn.execute(query + (f" LIMIT {int(limit)}" if limit else "")).fetchall()
+    conn.close()
+    return [row[0] for row in rows]
+
+
+def cache_sweep():
+    from database.cache_manager import CacheManager
+    return CacheManager().clear_expired_cache()
+
+
+def weather_prefetch():
+    from ai.price_predictor import PricePredictor
+    predictor = PricePredictor()
+    fetched = sum(1 for location in _farmer_locations() if predictor.get_weather_data(location))
+    return {'locations_fetched': fetched}
+
+
+def price_alert_forecast():
+    from components.notifications_page import init_notifications_table, forecast_price_alerts
+    init_notifications_table()
+    return {'notifications': forecast_price_alerts()}
+
+
+def market_digests():
+    from ai.market_digest import MarketDigestBuilder
+    return MarketDigestBuilder().refresh(limit=20)
+
+
+def scheme_refresh():
+    from components.government_schemes_page import GovernmentSchemesHelper, SCHEME_LANGUAGES, schemes_location
+    helper = GovernmentSchemesHelper()
+    # Same location and language as the page's cache key, so its next visit is a hit
+    locations = list(dict.fromkeys(schemes_location(location) for location in _farmer_locations(limit=20)))[:10]
+    for location in locations:
+        for language in SCHEME_LANGUAGES:
+            helper.search_government_schemes(location, force_refresh=True, language=language)
+    return {'locations_refreshed': len(locations), 'entries_refreshed': len(locations) * len(SCHEME_LANGUAGES)}
+
+
+def price_models():
+    from ai.price_forecaster import PriceForecaster
+    return PriceForecaster().train_models()
+
+
+def offline_sync():
+    from components.offline_manager import OfflineManager
+    result = OfflineManager(db_functions.DB_NAME).sync_pending()
+    result.pop('batches')
+    return result
+
+
+JOBS = [
+    Job('cache_sweep', cache_sweep, every='1h'),
+    Job('offline_sync', offline_sync, every='5m'),
+    Job('weather_prefetch', weather_prefetch, every='5h'),  # weather cache lives 6h
+    Job('market_digests', market_digests, every='3h'),
+    Job('price_alert_forecast', price_alert_forecast, every='1d'),
+    Job('price_models', price_models, every='1d'),  # retrains once history grows
+    Job('scheme_refresh', scheme_refresh, every='2h'),  # schemes cache lives 2h
+]
+
+
+def build_scheduler(job_names=None, stub=False, max_workers=4):
+    db_functions.init_db()
+    jobs = [job for job in JOBS if not job_names or job.name in job_names]
+    unknown = set(job_names or ()) - {job.name for job in JOBS}
+    if unknown:
+        raise ValueError(f"Unknown jobs: {', '.join(sorted(unknown))}")
+    return Scheduler(jobs, max_workers=max_workers, stub=stub)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run scheduled background jobs")
+    parser.add_argument('--once', action='store_true', help="run every job once and exit")
+    parser.add_argument('--jobs', help="comma-separated job names (default: all)")
+    parser.add_argument('--stub', action='store_true', help="log runs without doing any work")
+    parser.add_argument('--workers', type=int, default=4, help="thread pool size")
+    args = parser.parse_args(argv)
+
+    scheduler = build_scheduler(args.jobs.split(',') if args.jobs else None,
+                                stub=args.stub, max_workers=args.workers)
+
+    if args.once:
+        results = scheduler.run_once()
+        for name, result in results.items():
+            print(f"{'✅' if result is not None else '❌'} {name}: {result}")
+        return 0
+
+    signal.signal(signal.SIGINT, scheduler.stop)
+    signal.signal(signal.SIGTERM, scheduler.stop)
+    scheduler.run_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.exit(main())
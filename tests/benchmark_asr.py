@@ -0,0 +1,102 @@
+# benchmark_asr.py
+"""
+Benchmark speech-recognition backends over recorded fixtures.
+
+Each fixture is a .wav clip with a reference transcript in a .txt file of the
+same name. The clip's language comes from its subdirectory (en/, hi/, mr/).
+
+Usage:
+    python tests/benchmark_asr.py [fixture_dir] [backend ...]
+
+Reports per backend and language: real-time factor (processing seconds per
+second of audio) and word error rate against the reference transcripts.
+"""
+
+import glob
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from components.asr_backends import GoogleWebASR, VoskASR, WhisperASR, word_error_rate
+from components.audio_pipeline import preprocess_pcm
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'asr')
+BACKENDS = {'google': GoogleWebASR, 'vosk': VoskASR, 'whisper': WhisperASR}
+
+
+def load_fixtures(fixture_dir):
+    fixtures = []
+    for wav_path in sorted(glob.glob(os.path.join(fixture_dir, '*', '*.wav'))):
+        txt_path = os.path.splitext(wav_path)[0] + '.txt'
+        if not os.path.exists(txt_path):
+            continue
+        with open(wav_path, 'rb') as f:
+            audio_bytes = f.read()
+        with open(txt_path, encoding='utf-8') as f:
+            reference = f.read().strip()
+        language = os.path.basename(os.path.dirname(wav_path))
+        fixtures.append((os.path.basename(wav_path), language, audio_bytes, reference))
+    return fixtures
+
+
+def run(backend, fixtures):
+    """Returns {language: {'audio': s, 'elapsed': s, 'wer': [..]}} plus the first-call load time."""
+    results = defaultdict(lambda: {'audio': 0.0, 'elapsed': 0.0, 'wer': []})
+    load_seconds = None
+
+    for name, language, audio_bytes, reference in fixtures:
+        if not backend.available(language):
+            continue
+        raw, rate, width = preprocess_pcm(audio_bytes, trim=False)
+        duration = len(raw) / float(rate * width)
+
+        start = time.perf_counter()
+        try:
+            hypothesis = backend.transcribe(raw, rate, width, language)
+        except Exception as e:
+            print(f"  ❌ {backend.name} {name}: {e}")
+            continue
+        elapsed = time.perf_counter() - start
+
+        # The first call includes loading the model; report it separately
+        if load_seconds is None and backend.is_local:
+            load_seconds = elapsed
+            start = time.perf_counter()
+            hypothesis = backend.transcribe(raw, rate, width, language)
+            elapsed = time.perf_counter() - start
+
+        stats = results[language]
+        stats['audio'] += duration
+        stats['elapsed'] += elapsed
+        stats['wer'].append(word_error_rate(reference, hypothesis))
+
+    return results, load_seconds
+
+
+if __name__ == "__main__":
+    fixture_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_FIXTURES
+    names = sys.argv[2:] or list(BACKENDS)
+    fixtures = load_fixtures(fixture_dir)
+
+    if not fixtures:
+        print(f"❌ No .wav/.txt fixture pairs found under {fixture_dir}/<lang>/")
+        sys.exit(1)
+
+    print(f"🎤 {len(fixtures)} fixtures from {fixture_dir}\n")
+    print(f"{'backend':<10}{'lang':<6}{'clips':>6}{'audio s':>10}{'RTF':>8}{'WER':>8}")
+
+    for name in names:
+        backend = BACKENDS[name]()
+        results, load_seconds = run(backend, fixtures)
+        if not results:
+            print(f"{name:<10}(unavailable: missing package, model or network)")
+            continue
+        for language, stats in sorted(results.items()):
+            rtf = stats['elapsed'] / stats['audio'] if stats['audio'] else 0.0
+            wer = sum(stats['wer']) / len(stats['wer'])
+            print(f"{name:<10}{language:<6}{len(stats['wer']):>6}{stats['audio']:>10.1f}{rtf:>8.2f}{wer:>8.1%}")
+        if load_seconds is not None:
+            print(f"{'':<10}model load + first clip: {load_seconds:.2f}s")
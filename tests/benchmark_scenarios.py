@@ -0,0 +1,404 @@
+# benchmark_scenarios.py
+"""
+Benchmark the app's data paths on seeded synthetic data.
+
+Builds (or reuses) a database from scripts/synthetic_data.py and times the
+calls behind each scenario:
+- listing page: the shared listings frame after a write (cold) and on a
+  rerun (warm), and the seller rating lookups for one page of cards
+- login
+- cache get / set (weather and market price)
+- ratings aggregation for a seller
+- calendar month view
+- finance summary (money diary month and farm finance categories)
+- weather fetch through the cache and AI listing recommendations, against
+  stubbed HTTP and Gemini backends (no network, fixed latency)
+
+Usage:
+    python tests/benchmark_scenarios.py [--farmers N] [--seed S] [--iterations N]
+        [--scenario NAME ...] [--output results.json] [--baseline previous.json]
+
+Results (mean/p50/p95/max ms per scenario, plus dataset and environment) are
+written as JSON; with --baseline each p50 is compared to the previous run.
+Built databases are kept in --data-dir and reused for the same size and seed;
+every run works on a fresh copy.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from database.tracing import percentile
+from scripts import synthetic_data
+
+SAMPLE_FARMERS = 200
+CARDS_PER_PAGE = 50
+
+# (name) -> (description, setup(ctx) returning a step(i) callable)
+SCENARIOS = {}
+
+
+def scenario(name, description):
+    """Register a benchmark scenario."""
+    def register(setup):
+        SCENARIOS[name] = (description, setup)
+        return setup
+    return register
+
+
+class Context:
+    """Sample of the synthetic data that scenarios query."""
+
+    def __init__(self, db_path, seed):
+        rng = random.Random(seed)
+        conn = sqlite3.connect(db_path)
+        total = conn.execute("SELECT MAX(rowid) FROM farmers").fetchone()[0]
+        rowids = rng.sample(range(1, total + 1), min(SAMPLE_FARMERS, total))
+        placeholders = ', '.join('?' * len(rowids))
+        self.farmers = conn.execute(f"SELECT rowid, name FROM farmers WHERE rowid IN ({placeholders})",
+                                    rowids).fetchall()
+        rng.shuffle(self.farmers)
+        self.weather_locations = [row[0] for row in conn.execute(
+            "SELECT location FROM weather_cache ORDER BY id LIMIT ?", (SAMPLE_FARMERS,))]
+        self.price_keys = conn.execute(
+            "SELECT crop_name, location FROM market_price_cache ORDER BY id LIMIT ?", (SAMPLE_FARMERS,)).fetchall()
+        conn.close()
+        self.db_path = db_path
+        self.base_date = synthetic_data.BASE_DATE
+
+    def farmer(self, i):
+        return self.farmers[i % len(self.farmers)]
+
+
+# ----------------------------------------
+# --- SCENARIOS ---
+# ----------------------------------------
+
+@scenario('listing_cold', "tools + crops frames re-read after a listing write")
+def _listing_cold(ctx):
+    from database import db_functions
+
+    def step(i):
+        # What any listing write's trigger does
+        conn = sqlite3.connect(ctx.db_path)
+        conn.execute("UPDATE data_versions SET version = version + 1")
+        conn.commit()
+        conn.close()
+        db_functions.get_dataset('tools')
+        db_functions.get_dataset('crops')
+    return step
+
+
+@scenario('listing_warm', "tools + crops frames on a rerun with no writes")
+def _listing_warm(ctx):
+    from database import db_functions
+
+    def step(i):
+        db_functions.get_dataset('tools')
+        db_functions.get_dataset('crops')
+    return step
+
+
+@scenario('listing_ratings', f"seller rating lookups for {CARDS_PER_PAGE} listing cards")
+def _listing_ratings(ctx):
+    from database import db_functions
+
+    tools = db_functions.get_dataset('tools')
+
+    def step(i):
+        start = (i * CARDS_PER_PAGE) % max(len(tools) - CARDS_PER_PAGE, 1)
+        # Browse Listings looks each seller up twice per card
+        for seller in tools['Farmer'].iloc[start:start + CARDS_PER_PAGE]:
+            db_functions.get_farmer_rating(seller).get('avg_rating', 0.0)
+            db_functions.get_farmer_rating(seller).get('total_ratings', 0)
+    return step
+
+
+@scenario('login', "farmer login check")
+def _login(ctx):
+    from database import db_functions
+
+    def step(i):
+        assert db_functions.verify_farmer_login(ctx.farmer(i)[1].upper(), 'farmer123')
+    return step
+
+
+@scenario('cache_get', "weather + market price cache hits")
+def _cache_get(ctx):
+    from database.cache_manager import CacheManager
+
+    cache = CacheManager()
+
+    def step(i):
+        cache.get_weather_cache(ctx.weather_locations[i % len(ctx.weather_locations)], allow_stale=True)
+        crop, location = ctx.price_keys[i % len(ctx.price_keys)]
+        cache.get_market_price_cache(crop, location, allow_stale=True)
+    return step
+
+
+@scenario('cache_set', "weather + market price cache writes")
+def _cache_set(ctx):
+    from database.cache_manager import CacheManager
+
+    cache = CacheManager()
+
+    def step(i):
+        cache.set_weather_cache(f"Bench Location {i}", {'temperature': 30, 'humidity': 60}, hours=6)
+        cache.set_market_price_cache('Onion', f"Bench Market {i}", {'price': 1800, 'unit': 'quintal'})
+    return step
+
+
+@scenario('ratings_aggregation', "recompute a seller's rating summary and list their reviews")
+def _ratings_aggregation(ctx):
+    from database import db_functions
+
+    def step(i):
+        seller = ctx.farmer(i)[1]
+        db_functions.update_farmer_rating(seller)
+        db_functions.get_ratings_for_seller(seller)
+    return step
+
+
+@scenario('calendar_month', "calendar events for a month view")
+def _calendar_month(ctx):
+    from database import db_functions
+
+    month_start = ctx.base_date.replace(day=1)
+    month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+    def step(i):
+        db_functions.get_events_in_range(ctx.farmer(i)[1], month_start, month_end)
+    return step
+
+
+@scenario('finance_summary', "money diary month + farm finance quarter by category")
+def _finance_summary(ctx):
+    from database import query_stats
+    from components import farm_finance_page, simple_finance_page
+
+    year, month = ctx.base_date.year, ctx.base_date.month
+    quarter_end = ctx.base_date
+    quarter_start = quarter_end - timedelta(days=90)
+
+    def step(i):
+        rowid, name = ctx.farmer(i)
+        simple_finance_page.get_month_summary(name, year, month)
+        simple_finance_page.get_reason_totals(name, year, month)
+        conn = query_stats.connect(farm_finance_page.DB_NAME)
+        farm_finance_page.get_category_totals(conn, rowid, quarter_start, quarter_end)
+        conn.close()
+    return step
+
+
+@scenario('weather_fetch', "weather cache miss fetched over (stubbed) HTTP and cached")
+def _weather_fetch(ctx):
+    from ai.price_predictor import PricePredictor
+
+    predictor = PricePredictor()
+
+    def step(i):
+        assert predictor.get_weather_data(f"Bench City {i}")
+    return step
+
+
+@scenario('ai_recommendations', "listing recommendations from (stubbed) Gemini")
+def _ai_recommendations(ctx):
+    from ai import ai_matcher
+
+    def step(i):
+        reply = ai_matcher.get_recommendations({'farmer': ctx.farmer(i)[1], 'location': 'Pune',
+                                                'item': 'Tractor', 'type': 'tool'})
+        assert reply == STUB_REPLY, reply
+    return step
+
+
+# ----------------------------------------
+# --- STUB BACKENDS ---
+# ----------------------------------------
+
+STUB_REPLY = "- Bundle a plough with the tractor\n- Advertise before sowing\n- Share with neighbours"
+
+
+def _stub_json(url):
+    if '/geo/' in url:
+        return [{'name': 'Pune', 'lat': 18.52, 'lon': 73.86}]
+    if '/forecast' in url:
+        start = int(datetime(2025, 6, 15).timestamp())
+        return {'list': [{'dt': start + hour * 3600,
+                          'main': {'temp': 28 + hour % 5, 'humidity': 60},
+                          'weather': [{'description': 'scattered clouds'}], 'pop': 0.2}
+                         for hour in range(0, 120, 3)]}
+    if '/weather' in url:
+        return {'dt': int(datetime(2025, 6, 15).timestamp()),
+                'main': {'temp': 29.5, 'feels_like': 31.0, 'humidity': 62, 'pressure': 1008},
+                'weather': [{'description': 'scattered clouds'}], 'wind': {'speed': 3.2}}
+    return {}
+
+
+def install_stub_backends(http_latency_ms=0, llm_latency_ms=0):
+    """
+    Replace the HTTP transport and Gemini calls with local stubs.
+
+    Stubs sit below the app's code (requests' adapter, the genai client), so
+    scenarios exercise the same call paths as production.
+    """
+    import requests
+    from google.genai import models, types
+
+    def stub_send(adapter, request, **kwargs):
+        time.sleep(http_latency_ms / 1000)
+        response = requests.Response()
+        response.status_code = 200
+        response.url = request.url
+        response.request = request
+        response.headers['Content-Type'] = 'application/json'
+        response._content = json.dumps(_stub_json(request.url)).encode()
+        return response
+
+    def stub_generate_content(self, *, model, contents, config=None):
+        time.sleep(llm_latency_ms / 1000)
+        return types.GenerateContentResponse(candidates=[
+            types.Candidate(content=types.Content(role='model', parts=[types.Part(text=STUB_REPLY)]))])
+
+    requests.adapters.HTTPAdapter.send = stub_send
+    models.Models.generate_content = stub_generate_content
+    os.environ.setdefault('GEMINI_API_KEY', 'benchmark')
+    os.environ.setdefault('OPENWEATHER_API_KEY', 'benchmark')
+
+
+# ----------------------------------------
+# --- RUNNER ---
+# ----------------------------------------
+
+def dataset_path(data_dir, farmers, seed, rebuild=False):
+    """Path of the synthetic database for (farmers, seed), building it if needed."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"synthetic-{farmers}-{seed}.db")
+    if rebuild or not os.path.exists(path):
+        print(f"🌾 Building synthetic data: {farmers:,} farmers, seed {seed}")
+        building = path + '.building'
+        synthetic_data.build_database(building, farmers, seed)
+        os.replace(building, path)
+    return path
+
+
+def table_counts(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ('farmers', 'tools', 'crops', 'ratings', 'calendar_events',
+                              'simple_money_tracker', 'farm_transactions', 'weather_cache', 'market_price_cache')}
+    finally:
+        conn.close()
+
+
+def run_scenario(setup, ctx, iterations, warmup=1):
+    """Time iterations of a scenario's step; returns summary statistics in ms."""
+    samples = []
+    # App code prints progress freely; keep it out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        step = setup(ctx)
+        for i in range(warmup):
+            step(-1 - i)
+        for i in range(iterations):
+            start = time.perf_counter()
+            step(i)
+            samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'iterations': iterations,
+        'mean_ms': round(statistics.mean(samples), 3),
+        'p50_ms': round(percentile(samples, 50), 3),
+        'p95_ms': round(percentile(samples, 95), 3),
+        'max_ms': round(max(samples), 3),
+    }
+
+
+def compare(results, baseline):
+    """Print p50 per scenario next to a previous run's."""
+    previous = baseline.get('scenarios', {})
+    if baseline.get('dataset', {}).get('farmers') != results['dataset']['farmers']:
+        print("⚠️ Baseline was measured on a different dataset size")
+    print(f"\n{'Scenario':<22}{'baseline p50':>14}{'p50':>12}{'change':>10}")
+    for name, stats in results['scenarios'].items():
+        before = previous.get(name, {}).get('p50_ms')
+        if before:
+            change = (stats['p50_ms'] - before) / before * 100
+            print(f"{name:<22}{before:>11.2f} ms{stats['p50_ms']:>9.2f} ms{change:>+9.0f}%")
+        else:
+            print(f"{name:<22}{'-':>14}{stats['p50_ms']:>9.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--farmers', type=int, default=10_000, help="dataset size (10k to 1M)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=50, help="timed runs per scenario")
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help="run only these scenarios (repeatable)")
+    parser.add_argument('--http-latency-ms', type=float, default=0, help="stub HTTP response time")
+    parser.add_argument('--llm-latency-ms', type=float, default=0, help="stub Gemini response time")
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'farmer-bench'),
+                        help="where synthetic databases are kept between runs")
+    parser.add_argument('--rebuild', action='store_true', help="regenerate the synthetic database")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', help="previous results JSON to compare against")
+    args = parser.parse_args()
+
+    source = dataset_path(args.data_dir, args.farmers, args.seed, args.rebuild)
+    install_stub_backends(args.http_latency_ms, args.llm_latency_ms)
+
+    output = os.path.abspath(args.output)
+    workdir = tempfile.mkdtemp(prefix='scenario-bench-')
+    cwd = os.getcwd()
+    try:
+        # App modules open farmermarket.db relative to the working directory
+        shutil.copy(source, os.path.join(workdir, 'farmermarket.db'))
+        os.chdir(workdir)
+        ctx = Context('farmermarket.db', args.seed)
+
+        results = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'environment': {'python': platform.python_version(), 'sqlite': sqlite3.sqlite_version,
+                            'platform': platform.platform()},
+            'dataset': {'farmers': args.farmers, 'seed': args.seed, 'base_date': ctx.base_date.isoformat(),
+                        'rows': table_counts('farmermarket.db')},
+            'config': {'iterations': args.iterations, 'http_latency_ms': args.http_latency_ms,
+                       'llm_latency_ms': args.llm_latency_ms},
+            'scenarios': {},
+        }
+
+        print(f"\n{'Scenario':<22}{'p50':>10}{'p95':>10}{'max':>10}")
+        for name in args.scenario or SCENARIOS:
+            description, setup = SCENARIOS[name]
+            stats = run_scenario(setup, ctx, args.iterations)
+            results['scenarios'][name] = dict(description=description, **stats)
+            print(f"{name:<22}{stats['p50_ms']:>7.2f} ms{stats['p95_ms']:>7.2f} ms{stats['max_ms']:>7.2f} ms")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
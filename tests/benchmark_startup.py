@@ -0,0 +1,120 @@
+# benchmark_startup.py
+"""
+Benchmark app.py startup cost.
+
+Reports, each measured in a fresh interpreter:
+- the import time of every shell and page module on top of streamlit/pandas
+  (what a page's first visit adds with lazy loading)
+- cold start to first render of app.py for the login page and a logged-in
+  farmer's home page, via streamlit's AppTest
+- the cost the old eager imports paid up front: every page module at once
+
+Usage:
+    python tests/benchmark_startup.py [--runs N]
+
+The app runs against a temporary copy of farmermarket.db.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from components.page_registry import page_modules
+
+SHELL_MODULES = [
+    'database.db_functions',
+    'components.translation_utils',
+    'components.pwa_component',
+    'components.performance_optimizer',
+    'components.notification_manager',
+    'components.page_registry',
+]
+
+IMPORT_SNIPPET = """
+import sys, time, importlib
+sys.path.insert(0, {root!r})
+import streamlit, pandas
+start = time.perf_counter()
+for name in {modules!r}:
+    importlib.import_module(name)
+print(time.perf_counter() - start)
+"""
+
+RENDER_SNIPPET = """
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({app!r}, default_timeout=120)
+if {logged_in!r}:
+    app.session_state['logged_in'] = True
+    app.session_state['role'] = 'Farmer'
+    app.session_state['farmer_name'] = 'Benchmark Farmer'
+    app.session_state['farmer_profile'] = {{'location': 'Pune'}}
+app.run()
+elapsed = time.perf_counter() - start
+print('ERROR' if app.exception else elapsed)
+"""
+
+
+def _run(snippet, cwd):
+    env = dict(os.environ, PYTHONPATH=ROOT_DIR)
+    result = subprocess.run([sys.executable, '-c', snippet], cwd=cwd, env=env,
+                            capture_output=True, text=True, timeout=600)
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines or lines[-1] == 'ERROR':
+        return None
+    return float(lines[-1])
+
+
+def median_seconds(snippet, runs, cwd=ROOT_DIR):
+    samples = [s for s in (_run(snippet, cwd) for _ in range(runs)) if s is not None]
+    return statistics.median(samples) if samples else None
+
+
+def fmt(seconds):
+    return f"{seconds * 1000:8.0f} ms" if seconds is not None else "  failed"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=3, help="runs per measurement (median is reported)")
+    args = parser.parse_args()
+
+    print("Per-module import time (on top of streamlit + pandas):")
+    importable = []
+    for name in SHELL_MODULES + page_modules():
+        seconds = median_seconds(IMPORT_SNIPPET.format(root=ROOT_DIR, modules=[name]), args.runs)
+        print(f"  {'shell' if name in SHELL_MODULES else 'page ':5}  {fmt(seconds)}  {name}")
+        if seconds is not None:
+            importable.append(name)
+
+    # Modules that fail to import on this interpreter are left out of both totals
+    shell = median_seconds(IMPORT_SNIPPET.format(
+        root=ROOT_DIR, modules=[m for m in SHELL_MODULES if m in importable]), args.runs)
+    eager = median_seconds(IMPORT_SNIPPET.format(root=ROOT_DIR, modules=importable), args.runs)
+    print(f"\nShell imports (lazy startup):     {fmt(shell)}")
+    print(f"Shell + every page (eager):       {fmt(eager)}")
+
+    workdir = tempfile.mkdtemp(prefix='startup-bench-')
+    try:
+        db_path = os.path.join(ROOT_DIR, 'farmermarket.db')
+        if os.path.exists(db_path):
+            shutil.copy(db_path, workdir)
+        app_path = os.path.join(ROOT_DIR, 'app.py')
+        for label, logged_in in (("login page", False), ("farmer home page", True)):
+            seconds = median_seconds(RENDER_SNIPPET.format(app=app_path, logged_in=logged_in),
+                                     args.runs, cwd=workdir)
+            print(f"Cold start -> first render, {label + ':':18}{fmt(seconds)}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
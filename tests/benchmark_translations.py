@@ -0,0 +1,56 @@
+# benchmark_translations.py
+"""Benchmark t() throughput over a full page's worth of strings"""
+
+import importlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit as st
+from components.translation_utils import t
+from translations.catalog import clear_registry, get_catalog
+from translations import en
+
+ROUNDS = 200
+
+# Every manually translated string stands in for one (very large) page render
+PAGE_STRINGS = list(en.TRANSLATIONS.keys())
+
+
+def legacy_lookup(text, lang_code):
+    """The pre-catalog lookup: import_module + dict fetch on every call"""
+    module = importlib.import_module(f'translations.{lang_code}')
+    return module.TRANSLATIONS.get(text)
+
+
+def bench(label, fn):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for text in PAGE_STRINGS:
+            fn(text)
+    elapsed = time.perf_counter() - start
+    calls = ROUNDS * len(PAGE_STRINGS)
+    print(f"  {label:<28} {calls / elapsed:>12,.0f} calls/s  "
+          f"({elapsed / ROUNDS * 1000:.3f} ms per page)")
+    return elapsed
+
+
+if __name__ == "__main__":
+    print(f"🚀 t() benchmark: {len(PAGE_STRINGS)} strings x {ROUNDS} renders\n")
+
+    clear_registry()
+    start = time.perf_counter()
+    get_catalog('hi')
+    print(f"  First catalog load (hi):     {(time.perf_counter() - start) * 1000:.2f} ms\n")
+
+    st.session_state['language'] = 'हिन्दी (Hindi)'
+    legacy = bench("legacy import_module lookup", lambda s: legacy_lookup(s, 'hi'))
+    catalog = bench("catalog registry lookup", lambda s: get_catalog('hi').get(s))
+    full = bench("t() (Hindi, no auto)", lambda s: t(s, use_auto=False))
+
+    st.session_state['language'] = 'English'
+    bench("t() (English)", t)
+
+    print(f"\n📊 Catalog lookup is {legacy / catalog:.1f}x faster than the legacy path")
@@ -0,0 +1,102 @@
+# benchmark_voice_listing.py
+"""
+Benchmark voice listing extraction: legacy two-call flow vs single-pass
+transcript + extraction.
+
+Usage:
+    python tests/benchmark_voice_listing.py [fixture_dir] [listing_type]
+
+fixture_dir holds recorded .wav clips (default: tests/fixtures/voice_listings).
+Needs GEMINI_API_KEY.
+"""
+
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from google.genai import types
+from components.voice_listing_creator import (
+    get_gemini_client, transcribe_and_extract_listing,
+    ToolListing, CropListing, LaborListing
+)
+
+SCHEMAS = {'tool': ToolListing, 'crop': CropListing, 'labor': LaborListing}
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'voice_listings')
+
+
+def legacy_two_pass(client, audio_bytes, listing_type):
+    """The previous flow: extraction call, then a separate transcript call, both inline"""
+    schema = SCHEMAS[listing_type].model_json_schema()
+    schema['properties'].pop('transcript', None)
+    extraction = client.models.generate_content(
+        model="gemini-2.5-flash",
+        contents=["Extract the listing fields from this audio.",
+                  types.Part.from_bytes(data=audio_bytes, mime_type='audio/wav')],
+        config=types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_json_schema=schema,
+            temperature=0.1,
+            thinking_config=types.ThinkingConfig(thinking_budget=0)
+        )
+    )
+    transcript = client.models.generate_content(
+        model="gemini-2.5-flash",
+        contents=["Transcribe this audio accurately.",
+                  types.Part.from_bytes(data=audio_bytes, mime_type='audio/wav')],
+        config=types.GenerateContentConfig(
+            temperature=0.1,
+            thinking_config=types.ThinkingConfig(thinking_budget=0)
+        )
+    )
+    return {'transcript': transcript.text, 'extracted_data': json.loads(extraction.text)}
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    fixture_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_FIXTURES
+    listing_type = sys.argv[2] if len(sys.argv) > 2 else 'crop'
+    clips = sorted(glob.glob(os.path.join(fixture_dir, '*.wav')))
+
+    if not clips:
+        print(f"❌ No .wav fixtures found in {fixture_dir}")
+        sys.exit(1)
+
+    client = get_gemini_client()
+    if not client:
+        sys.exit(1)
+
+    print(f"🎤 {len(clips)} clips, listing type '{listing_type}'\n")
+    legacy_times, single_times, uploaded_bytes = [], [], 0
+
+    for clip in clips:
+        with open(clip, 'rb') as f:
+            audio_bytes = f.read()
+        uploaded_bytes += len(audio_bytes)
+
+        legacy_s, _ = timed(legacy_two_pass, client, audio_bytes, listing_type)
+        single_s, result = timed(transcribe_and_extract_listing, audio_bytes, listing_type)
+        legacy_times.append(legacy_s)
+        single_times.append(single_s)
+
+        ok = "✅" if result and result.get('success') else "❌"
+        print(f"  {ok} {os.path.basename(clip):<30} legacy {legacy_s:6.2f}s   single-pass {single_s:6.2f}s")
+
+    print("\n📊 Summary")
+    print(f"  Audio per clip (avg):     {uploaded_bytes / len(clips) / 1024:.0f} KB "
+          f"(legacy uploads it twice)")
+    print(f"  Legacy median:            {statistics.median(legacy_times):.2f}s")
+    print(f"  Single-pass median:       {statistics.median(single_times):.2f}s")
+    print(f"  Speedup:                  {sum(legacy_times) / sum(single_times):.2f}x")
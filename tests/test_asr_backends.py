@@ -0,0 +1,114 @@
+# test_asr_backends.py
+"""Test ASR backend routing: budget/connectivity choice, fallback, WER"""
+
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from components.asr_backends import ASRBackend, ASRRouter, WhisperASR, word_error_rate
+
+
+class FakeBackend(ASRBackend):
+    def __init__(self, name, is_local, overhead, rtf, up=True, fail=False):
+        self.name = name
+        self.is_local = is_local
+        self.overhead_seconds = overhead
+        self.rtf = rtf
+        self.up = up
+        self.fail = fail
+        self.calls = 0
+
+    def available(self, language):
+        return self.up and self.supports(language)
+
+    def transcribe(self, raw_pcm, sample_rate, sample_width, language):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("network dropped")
+        return f"{self.name} text"
+
+
+PCM_5S = b'\0' * (16000 * 2 * 5)
+
+
+def test_prefers_cloud_within_budget():
+    cloud = FakeBackend('cloud', False, 1.0, 0.3)
+    local = FakeBackend('local', True, 0.0, 0.4)
+    router = ASRRouter([local, cloud])
+    assert router.transcribe(PCM_5S, 16000, 2, 'hi') == ("cloud text", 'cloud')
+
+
+def test_tight_budget_picks_local():
+    cloud = FakeBackend('cloud', False, 1.0, 0.3)
+    local = FakeBackend('local', True, 0.0, 0.2)
+    router = ASRRouter([cloud, local])
+    assert router.transcribe(PCM_5S, 16000, 2, 'en', latency_budget=1.5)[1] == 'local'
+
+
+def test_offline_uses_local_and_failure_falls_back():
+    local = FakeBackend('local', True, 0.0, 0.4)
+    assert ASRRouter([FakeBackend('cloud', False, 1.0, 0.3, up=False), local]) \
+        .transcribe(PCM_5S, 16000, 2, 'mr')[1] == 'local'
+
+    flaky = FakeBackend('cloud', False, 1.0, 0.3, fail=True)
+    assert ASRRouter([flaky, local]).transcribe(PCM_5S, 16000, 2, 'mr')[1] == 'local'
+    assert flaky.calls == 1
+
+
+def test_error_reaches_the_caller_when_every_backend_fails():
+    import speech_recognition as sr
+
+    class DownBackend(FakeBackend):
+        def transcribe(self, raw_pcm, sample_rate, sample_width, language):
+            raise sr.RequestError("recognition connection failed")
+
+    with pytest.raises(sr.RequestError):
+        ASRRouter([DownBackend('cloud', False, 1.0, 0.3)]).transcribe(PCM_5S, 16000, 2, 'hi')
+
+
+def test_backends_must_implement_transcribe():
+    class Incomplete(ASRBackend):
+        name = 'incomplete'
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_whisper_unavailable_until_model_is_cached(monkeypatch):
+    cached = set()
+
+    def download_model(name, local_files_only=False):
+        assert local_files_only
+        if name not in cached:
+            raise RuntimeError("not in local cache")
+        return f"/hub/{name}"
+
+    utils = types.SimpleNamespace(download_model=download_model)
+    monkeypatch.setitem(sys.modules, 'faster_whisper', types.SimpleNamespace(utils=utils))
+    monkeypatch.setitem(sys.modules, 'faster_whisper.utils', utils)
+
+    whisper = WhisperASR('small')
+    assert not whisper.available('hi')
+    cached.add('small')
+    assert whisper.available('hi')
+
+
+def test_no_backend_available():
+    router = ASRRouter([FakeBackend('cloud', False, 1.0, 0.3, up=False)])
+    assert router.transcribe(PCM_5S, 16000, 2, 'en') == (None, None)
+
+
+def test_observed_latency_updates_rtf():
+    backend = FakeBackend('local', True, 0.0, 1.0)
+    backend.observe(elapsed_seconds=1.0, duration_seconds=5.0)
+    assert backend.rtf < 1.0
+
+
+def test_word_error_rate():
+    assert word_error_rate("mujhe pani chahiye", "mujhe pani chahiye") == 0.0
+    assert word_error_rate("mujhe pani chahiye", "mujhe chahiye") == 1 / 3
+    assert word_error_rate("a b", "a x b y") == 1.0
@@ -0,0 +1,95 @@
+# test_audio_pipeline.py
+"""Test in-memory audio preprocessing: silence trim, downmix/resample, encoding fallback"""
+
+import io
+import os
+import sys
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from components import audio_pipeline
+from components.audio_pipeline import preprocess_audio, preprocess_pcm, trim_silence
+
+
+def recording(silence_ms=1500, speech_ms=2000, channels=2, rate=44100):
+    """Stereo 44.1 kHz WAV: silence, a tone standing in for speech, silence."""
+    quiet = AudioSegment.silent(duration=silence_ms, frame_rate=rate)
+    tone = Sine(440, sample_rate=rate).to_audio_segment(duration=speech_ms, volume=-10)
+    clip = (quiet + tone + quiet).set_channels(channels).set_sample_width(2)
+    buffer = io.BytesIO()
+    clip.export(buffer, format='wav')
+    return buffer.getvalue()
+
+
+def test_trim_silence_keeps_speech_with_padding():
+    clip = AudioSegment.from_file(io.BytesIO(recording()), format='wav')
+    trimmed = trim_silence(clip)
+    assert 2000 <= len(trimmed) <= 2000 + 2 * audio_pipeline.KEEP_PADDING_MS + 20
+
+
+def test_all_silent_clip_is_not_emptied():
+    clip = AudioSegment.silent(duration=1000)
+    assert len(trim_silence(clip)) == 1000
+
+
+def test_wav_fallback_is_mono_16k_and_smaller(monkeypatch):
+    monkeypatch.setattr(audio_pipeline, '_ffmpeg', lambda: None)
+    original = recording()
+    processed = preprocess_audio(original)
+
+    assert processed.mime_type == 'audio/wav'
+    with wave.open(io.BytesIO(processed.data)) as wav:
+        assert wav.getnchannels() == 1
+        assert wav.getframerate() == 16000
+    assert processed.trimmed_ms > 2000
+    assert processed.reduction > 5
+
+
+def test_undecodable_audio_passes_through():
+    processed = preprocess_audio(b'not audio')
+    assert processed.data == b'not audio'
+    assert processed.mime_type == 'audio/wav'
+
+
+def test_webm_is_detected_not_labelled_wav():
+    webm_header = b'\x1aE\xdf\xa3' + b'\x00' * 32
+    assert audio_pipeline.detect_format(webm_header) == 'webm'
+    assert audio_pipeline.detect_format(recording()) == 'wav'
+
+    processed = preprocess_audio(webm_header)
+    assert processed.data == webm_header
+    assert processed.mime_type == 'audio/webm'
+
+
+@pytest.mark.skipif(audio_pipeline._ffmpeg() is None, reason="ffmpeg not installed")
+def test_webm_recording_is_preprocessed(monkeypatch):
+    # mic_recorder's default format is WebM/Opus
+    buffer = io.BytesIO()
+    AudioSegment.from_file(io.BytesIO(recording()), format='wav').export(buffer, format='webm', codec='libopus')
+    monkeypatch.setattr(audio_pipeline, '_ffmpeg', lambda: None)
+    processed = preprocess_audio(buffer.getvalue())
+
+    assert processed.mime_type == 'audio/wav'
+    assert processed.sample_rate == 16000
+    assert processed.trimmed_ms > 2000
+    with wave.open(io.BytesIO(processed.data)) as wav:
+        assert wav.getnchannels() == 1
+
+
+def test_pcm_for_speech_recognition():
+    raw, rate, width = preprocess_pcm(recording())
+    assert rate == 16000 and width == 2
+    assert len(raw) < 16000 * 2 * 3
+
+
+@pytest.mark.skipif(audio_pipeline._ffmpeg() is None, reason="ffmpeg not installed")
+@pytest.mark.parametrize('codec,mime', [('opus', 'audio/ogg'), ('flac', 'audio/flac')])
+def test_compressed_codecs(codec, mime):
+    processed = preprocess_audio(recording(), codec=codec)
+    assert processed.mime_type == mime
+    assert processed.reduction > 5
@@ -0,0 +1,126 @@
+# test_calendar_store.py
+"""Test calendar range reads, recurrence expansion and the legacy date split"""
+
+import os
+import sqlite3
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from database import db_functions
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'test.db')
+    monkeypatch.setattr(db_functions, 'DB_NAME', path)
+    db_functions.init_db()
+    return path
+
+
+def add_event(event_date, title, every=0, until=None, farmer='Ramesh', event_time='09:00'):
+    db_functions.add_data('calendar_events', (farmer, event_date, event_time, title, '', '',
+                                              '2025-01-01 00:00:00', every, until))
+
+
+def test_range_read_returns_only_the_window(db_path):
+    add_event('2025-03-01', 'Plowing')
+    add_event('2025-03-31', 'Weeding', event_time='07:00')
+    add_event('2025-04-01', 'Harvest')
+    add_event('2025-03-15', 'Other farmer', farmer='Suresh')
+
+    events = db_functions.get_events_in_range('ramesh', date(2025, 3, 1), date(2025, 3, 31))
+    assert [e['event_title'] for e in events] == ['Plowing', 'Weeding']
+
+
+def test_recurring_events_are_expanded_inside_the_window(db_path):
+    add_event('2025-02-20', 'Irrigation', every=4, until='2025-03-12')
+    add_event('2025-03-10', 'Spray', every=7)
+
+    events = db_functions.get_events_in_range('Ramesh', '2025-03-01', '2025-03-20')
+    assert [(e['event_date'], e['event_title']) for e in events] == [
+        ('2025-03-04', 'Irrigation'),
+        ('2025-03-08', 'Irrigation'),
+        ('2025-03-10', 'Spray'),
+        ('2025-03-12', 'Irrigation'),
+        ('2025-03-17', 'Spray'),
+    ]
+    assert {e['series_start'] for e in events} == {'2025-02-20', '2025-03-10'}
+
+
+def test_event_counts(db_path):
+    add_event('2025-03-01', 'Missed')
+    add_event('2025-03-10', 'Today')
+    add_event('2025-03-05', 'Irrigation', every=3)
+
+    counts = db_functions.get_event_counts('Ramesh', date(2025, 3, 10))
+    # Irrigation falls on 03-11, 03-14 and 03-17 in the next 7 days
+    assert counts == {'total': 3, 'upcoming': 4, 'overdue': 1, 'today': 1}
+
+
+def test_combined_date_time_is_split(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO calendar_events (farmer_name, event_date, event_title) "
+                 "VALUES ('Ramesh', '2025-03-04 06:30', 'Old edit')")
+    conn.execute("DELETE FROM schema_version WHERE version = 10")
+    conn.commit()
+    conn.close()
+
+    from database.migrations import migrate
+    assert migrate(db_path) == [10]
+    event, = db_functions.get_events_in_range('Ramesh', '2025-03-04', '2025-03-04')
+    assert (event['event_date'], event['event_time']) == ('2025-03-04', '06:30')
+
+    db_functions.update_event(event['id'], '2025-03-05 07:15', 'Edited', '', '')
+    event, = db_functions.get_events_in_range('Ramesh', '2025-03-05', '2025-03-05')
+    assert (event['event_title'], event['event_time']) == ('Edited', '07:15')
+
+
+def test_month_read_uses_the_index(db_path):
+    conn = sqlite3.connect(db_path)
+    plan = ' '.join(row[3] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM calendar_events WHERE farmer_name = ? COLLATE NOCASE "
+        "AND event_date BETWEEN ? AND ?", ('Ramesh', '2025-03-01', '2025-03-31')))
+    conn.close()
+    assert 'idx_calendar_farmer_date' in plan
+
+
+def test_week_view_renders_the_window(db_path):
+    from streamlit.testing.v1 import AppTest
+
+    add_event('2025-03-04', 'Plowing')
+    add_event('2025-03-05', 'Spray', every=2, until='2025-03-09')
+
+    def week_page():
+        from calender.week_view import render_week_view
+        from components.calendar_integration import to_calendar_events
+        from database import db_functions
+
+        events = db_functions.get_events_in_range('Ramesh', '2025-03-03', '2025-03-09')
+        render_week_view(2025, 3, 5, to_calendar_events(events), 'en')
+
+    app = AppTest.from_function(week_page, default_timeout=30)
+    app.run()
+    assert not app.exception
+    assert "Total events this week: **4**" in app.info[-1].value
+
+
+def test_detaching_an_occurrence_keeps_the_rest_of_the_series(db_path):
+    add_event('2025-03-01', 'Irrigation', every=3, until='2025-03-16')
+    series = db_functions.get_events_in_range('Ramesh', '2025-03-01', '2025-03-31')
+    assert [e['event_date'] for e in series] == ['2025-03-01', '2025-03-04', '2025-03-07', '2025-03-10',
+                                                 '2025-03-13', '2025-03-16']
+    series_id = series[0]['id']
+
+    db_functions.detach_occurrence(series_id, '2025-03-07')
+    db_functions.detach_occurrence(series_id, '2025-03-01')
+    events = db_functions.get_events_in_range('Ramesh', '2025-03-01', '2025-03-31')
+    assert [e['event_date'] for e in events] == ['2025-03-04', '2025-03-10', '2025-03-13', '2025-03-16']
+    assert {e['series_start'] for e in events} == {'2025-03-04', '2025-03-10'}
+
+    db_functions.detach_occurrence(events[-1]['id'], '2025-03-16')
+    events = db_functions.get_events_in_range('Ramesh', '2025-03-01', '2025-03-31')
+    assert [e['event_date'] for e in events] == ['2025-03-04', '2025-03-10', '2025-03-13']
@@ -0,0 +1,58 @@
+# test_dataset_cache.py
+"""Test the shared, version-stamped listings cache"""
+
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from database import db_functions
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'test.db')
+    monkeypatch.setattr(db_functions, 'DB_NAME', path)
+    db_functions.init_db()
+    return path
+
+
+def tool(name='Tractor'):
+    return ('Ramesh', 'Pune', name, 800, '9876543210', 'Good condition')
+
+
+def test_sessions_share_one_frame_until_a_write(db_path):
+    db_functions.add_data('tools', tool())
+    first = db_functions.get_dataset('tools')
+
+    assert db_functions.get_dataset('tools') is first
+
+    db_functions.add_data('tools', tool('Sprayer'))
+    second = db_functions.get_dataset('tools')
+    assert second is not first
+    assert list(second['Tool']) == ['Tractor', 'Sprayer']
+
+
+def test_any_write_bumps_the_version(db_path):
+    db_functions.add_data('crops', ('Ramesh', 'Pune', 'Wheat', '10 quintal', 2500, '9876543210', '2025-06-01'))
+    before = db_functions.get_data_version('crops')
+    frame = db_functions.get_dataset('crops')
+
+    # Writes that bypass add_data (sync replay, editors, scripts) are seen too
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE crops SET Expected_Price = 2600")
+    conn.commit()
+    conn.close()
+
+    assert db_functions.get_data_version('crops') == before + 1
+    refreshed = db_functions.get_dataset('crops')
+    assert refreshed is not frame
+    assert refreshed['Expected_Price'].tolist() == [2600]
+
+
+def test_untracked_tables_fall_back_to_fresh_reads(db_path):
+    assert db_functions.get_data_version('farmers') is None
+    assert db_functions.get_dataset('farmers') is not db_functions.get_dataset('farmers')
@@ -0,0 +1,116 @@
+# test_finance_rollup.py
+"""Test the per-month finance rollups against sums over the raw entries"""
+
+import os
+import random
+import sqlite3
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from database.migrations import migrate
+from components import simple_finance_page
+from components import farm_finance_page
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'test.db')
+    monkeypatch.setattr(simple_finance_page, 'DB_NAME', path)
+    monkeypatch.setattr(farm_finance_page, 'DB_NAME', path)
+    migrate(path)
+    return path
+
+
+def add_transactions(db_path, rows):
+    conn = sqlite3.connect(db_path)
+    conn.executemany("""INSERT INTO farm_transactions (farmer_id, type, category, amount, description, date)
+                        VALUES (?, ?, ?, ?, '', ?)""", rows)
+    conn.commit()
+    return conn
+
+
+def test_month_summary_follows_inserts_updates_and_deletes(db_path):
+    add = simple_finance_page.add_money_entry
+    add('Ramesh', 'Money In', 5000, 'Sold Wheat', '2025-03-04')
+    add('Ramesh', 'Money In', 1500, 'Sold Wheat', '2025-03-20')
+    add('Ramesh', 'Money Out', 800, 'Seeds', '2025-03-11')
+    add('Ramesh', 'Money Out', 400, 'Seeds', '2025-04-01')
+    add('Suresh', 'Money In', 9000, 'Sold Onion', '2025-03-09')
+
+    assert simple_finance_page.get_month_summary('Ramesh', 2025, 3) == (6500, 800)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE simple_money_tracker SET entry_date = '2025-04-11' WHERE reason = 'Seeds' "
+                 "AND entry_date = '2025-03-11'")
+    conn.execute("DELETE FROM simple_money_tracker WHERE amount = 1500")
+    conn.commit()
+    conn.close()
+
+    assert simple_finance_page.get_month_summary('Ramesh', 2025, 3) == (5000, 0)
+    assert simple_finance_page.get_month_summary('Ramesh', 2025, 4) == (0, 1200)
+    reasons = simple_finance_page.get_reason_totals('Ramesh', 2025, 4)
+    assert reasons[['reason', 'total', 'entries']].values.tolist() == [['Seeds', 1200, 2]]
+
+    yearly = simple_finance_page.get_yearly_totals('Ramesh', [2024, 2025])
+    assert yearly[['month', 'money_in', 'money_out']].values.tolist() == [[3, 5000, 0], [4, 0, 1200]]
+
+
+def test_existing_entries_are_backfilled(tmp_path):
+    path = str(tmp_path / 'old.db')
+    migrate(path)
+    conn = sqlite3.connect(path)
+    # Roll the database back to before migration 9
+    for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' "
+                                "AND name LIKE '%rollup'").fetchall():
+        conn.execute(f"DROP TRIGGER {name}")
+    conn.execute("DROP TABLE money_month_rollup")
+    conn.execute("DELETE FROM schema_version WHERE version = 9")
+    conn.execute("INSERT INTO simple_money_tracker (farmer_name, entry_type, amount, reason, entry_date) "
+                 "VALUES ('Ramesh', 'Money In', 700, 'Milk', '2025-01-15')")
+    conn.commit()
+    conn.close()
+
+    assert migrate(path) == [9]
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT * FROM money_month_rollup").fetchall() == [
+        ('Ramesh', '2025-01', 'Money In', 'Milk', 700, 1)]
+    conn.close()
+
+
+@pytest.mark.parametrize('start, end', [
+    (date(2025, 1, 1), date(2025, 12, 31)),   # whole months only
+    (date(2025, 2, 14), date(2025, 5, 3)),    # partial months at both ends
+    (date(2025, 3, 5), date(2025, 3, 20)),    # inside a single month
+    (date(2024, 12, 31), date(2025, 1, 31)),  # across a year boundary
+])
+def test_category_totals_match_raw_sums(db_path, start, end):
+    rng = random.Random(7)
+    first_day = date(2024, 12, 1).toordinal()
+    rows = [(1, rng.choice(['Income', 'Expense']), rng.choice(['Seeds', 'Labor', 'Crop Sale']),
+             rng.randint(1, 500), date.fromordinal(first_day + rng.randint(0, 400)).isoformat())
+            for _ in range(500)]
+    rows.append((2, 'Income', 'Crop Sale', 99999, '2025-03-10'))
+    conn = add_transactions(db_path, rows)
+
+    expected = {}
+    for farmer_id, txn_type, category, amount, day in rows:
+        if farmer_id == 1 and start.isoformat() <= day <= end.isoformat():
+            total, count = expected.get((txn_type, category), (0, 0))
+            expected[(txn_type, category)] = (total + amount, count + 1)
+
+    assert farm_finance_page.get_category_totals(conn, 1, start, end) == expected
+    conn.close()
+
+
+def test_dashboard_queries_use_covering_index(db_path):
+    conn = sqlite3.connect(db_path)
+    plan = ' '.join(row[3] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT category, amount, date, description FROM farm_transactions "
+        "WHERE farmer_id = ? AND type = 'Income' ORDER BY date DESC LIMIT 5", (1,)))
+    conn.close()
+    assert 'COVERING INDEX idx_farm_txn_farmer_date' in plan
+    assert 'TEMP B-TREE' not in plan
@@ -0,0 +1,80 @@
+# test_intent_router.py
+"""Test the local voice intent router: keyword/phonetic, model fallback, escalation, stats"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from components.intent_router import (
+    ASK_AI, INTENTS, get_router_stats, phonetic_key, reset_router_stats, route_intent
+)
+
+MENU_ITEMS = {
+    "🏠 Home", "🌡️ Climate Risk Dashboard", "🌾 Climate-Smart Crops", "💧 Water & Carbon Tracker",
+    "🗣️ Ask Advisor", "🌤️ Weather Forecast", "💰 Today's Market Price", "🤔 Should I Sell?",
+    "🛍️ Browse Listings", "➕ Post Listing", "🎤 Voice Listing (NEW)", "📅 My Calendar",
+    "📒 My Money Diary", "👤 My Profile", "📦 My Listings", "🏛️ Government Schemes",
+}
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    reset_router_stats()
+
+
+@pytest.mark.parametrize('text,language,action', [
+    ("show weather", 'en', 'weather'),
+    ("open market prices", 'en', 'price'),
+    ("add crop listing", 'en', 'list_crop'),
+    ("mosam batao", 'hi', 'weather'),
+    ("मौसम कैसा रहेगा", 'hi', 'weather'),
+    ("आजचा बाजारभाव", 'mr', 'price'),
+    ("sarkari yojna", 'hi', 'schemes'),
+    ("I want to rent out my tractor", 'en', 'list_tool'),
+    ("should i sell my onions now or wait", 'en', 'sell_advice'),
+])
+def test_commands_resolve_locally(text, language, action):
+    result = route_intent(text, language)
+    assert result['action'] == action
+    assert result['source'] in ('keyword', 'model')
+
+
+def test_open_questions_escalate():
+    result = route_intent("How do I protect my tomato crop from early blight this season", 'en')
+    assert result['action'] == ASK_AI
+    assert result['source'] == 'llm'
+    assert result['menu'] is None
+
+
+def test_menu_targets_exist_in_app():
+    for spec in INTENTS.values():
+        assert spec['menu'] is None or spec['menu'] in MENU_ITEMS
+
+
+def test_phonetic_key_merges_spellings():
+    assert phonetic_key('mausam') == phonetic_key('mosam') == phonetic_key('mousum')
+    assert phonetic_key('bhav') == phonetic_key('bhaav')
+
+
+def test_fast_path_latency():
+    route_intent("rent out harvester please")  # trains the model once
+    start = time.perf_counter()
+    for _ in range(100):
+        route_intent("rent out harvester please")
+    assert (time.perf_counter() - start) / 100 < 0.010
+
+
+def test_hit_rate_metrics():
+    route_intent("show weather")
+    route_intent("weather forecast")
+    route_intent("What fertilizer should I use for sugarcane in black soil")
+    stats = get_router_stats()
+
+    assert stats['total'] == 3
+    assert stats['escalated'] == 1
+    assert stats['local_hit_rate'] == pytest.approx(2 / 3)
+    assert stats['per_intent']['weather'] == {'keyword': 2}
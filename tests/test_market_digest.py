@@ -0,0 +1,103 @@
+# test_market_digest.py
+"""Test market intelligence digests: builder, freshness and predictor reads"""
+
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+from database import cache_manager, db_functions
+from ai.market_digest import MarketDigestBuilder, state_from_location
+from ai.price_predictor import PricePredictor
+
+
+@pytest.fixture
+def predictor(tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'test.db')
+    monkeypatch.setattr(db_functions, 'DB_NAME', db_path)
+    monkeypatch.setattr(cache_manager, 'DB_NAME', db_path)
+    db_functions.init_db()
+    predictor = PricePredictor()
+    predictor.searches = []
+
+    def fake_search(crop_name, location, use_cache=True):
+        predictor.searches.append((crop_name, location))
+        return {'current_price': 2450.0, 'news_summary': f'{crop_name} arrivals steady',
+                'market_conditions': 'Normal supply', 'policy_updates': 'MSP unchanged',
+                'full_response': 'long text', 'search_queries': ['wheat price'],
+                'sources': [{'url': f'https://example.org/{i}', 'title': 'Mandi'} for i in range(8)]}
+
+    monkeypatch.setattr(predictor, 'get_online_news_and_prices', fake_search)
+    return predictor
+
+
+def test_state_from_location():
+    assert state_from_location("Pune, Maharashtra") == "Maharashtra"
+    assert state_from_location("Pune, Maharashtra, India") == "Maharashtra"
+    assert state_from_location("") == "India"
+
+
+def test_prediction_reads_digest_without_searching(predictor):
+    missing = predictor.get_market_digest("Wheat", "Pune, Maharashtra")
+    assert missing['current_price'] is None
+    assert predictor.searches == []
+
+    summary = MarketDigestBuilder(predictor).refresh(discover=False)
+    assert summary == {'targets': 1, 'built': 1, 'failed': 0}
+    assert predictor.searches == [("Wheat", "Maharashtra")]
+
+    digest = predictor.get_market_digest("wheat", "Nashik, Maharashtra")
+    assert digest['current_price'] == 2450.0
+    assert len(digest['sources']) == 5
+    assert digest['stale'] is False
+    assert 'full_response' not in digest
+    assert len(predictor.searches) == 1
+
+
+def test_fresh_digests_are_not_rebuilt(predictor):
+    builder = MarketDigestBuilder(predictor)
+    builder.cache.request_market_digest("Onion", "Maharashtra")
+    builder.refresh(discover=False)
+    builder.refresh(discover=False)
+
+    assert predictor.searches == [("Onion", "Maharashtra")]
+
+
+def test_failing_pairs_back_off_and_do_not_starve_the_queue(predictor, monkeypatch):
+    builder = MarketDigestBuilder(predictor)
+    builder.cache.request_market_digest("Onion", "Maharashtra")
+    builder.refresh(discover=False)
+    for crop in ("Quinoa", "Saffron"):
+        builder.cache.request_market_digest(crop, "Kerala")
+
+    search = predictor.get_online_news_and_prices
+
+    def flaky_search(crop_name, location, use_cache=True):
+        if location == "Kerala":
+            predictor.searches.append((crop_name, location))
+            return {'error': 'no results'}
+        return search(crop_name, location, use_cache)
+
+    monkeypatch.setattr(predictor, 'get_online_news_and_prices', flaky_search)
+    assert builder.refresh(limit=2, discover=False) == {'targets': 2, 'built': 0, 'failed': 2}
+
+    # The built digest goes stale: it is refreshed while the failed pairs back off
+    conn = sqlite3.connect(db_functions.DB_NAME)
+    conn.execute("UPDATE market_digest_cache SET fresh_until = '2000-01-01' WHERE crop_name = 'Onion'")
+    conn.commit()
+    assert builder.refresh(limit=2, discover=False) == {'targets': 1, 'built': 1, 'failed': 0}
+
+    attempts, next_attempt_at = conn.execute(
+        "SELECT attempts, next_attempt_at FROM market_digest_cache WHERE crop_name = 'Quinoa'").fetchone()
+    conn.close()
+    assert attempts == 1 and next_attempt_at > datetime.now().isoformat()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,105 @@
+# test_migrations.py
+"""Test the versioned migration runner and that page renders issue no DDL"""
+
+import os
+import re
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from database import migrations
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+DDL = re.compile(r'^\s*(CREATE|ALTER|DROP)\b', re.IGNORECASE)
+
+
+def versions(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = [row[0] for row in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+    conn.close()
+    return rows
+
+
+def test_fresh_database_gets_every_migration_once(tmp_path):
+    db_path = str(tmp_path / 'fresh.db')
+
+    assert migrations.migrate(db_path) == list(range(1, migrations.LATEST_VERSION + 1))
+    assert versions(db_path) == list(range(1, migrations.LATEST_VERSION + 1))
+    assert migrations.migrate(db_path) == []
+
+
+def test_pre_runner_database_is_upgraded_in_place(tmp_path):
+    db_path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE farmers (name TEXT PRIMARY KEY, location TEXT, farm_size REAL, "
+                 "farm_unit TEXT, contact TEXT)")
+    conn.execute("INSERT INTO farmers VALUES ('Ramesh', 'Pune', 2, 'acre', '9876543210')")
+    conn.commit()
+    conn.close()
+
+    migrations.migrate(db_path)
+
+    conn = sqlite3.connect(db_path)
+    row = conn.execute("SELECT name, password, total_ratings FROM farmers").fetchone()
+    conn.close()
+    assert row == ('Ramesh', 'farmer123', 0)
+
+
+def test_failed_migration_is_rolled_back_and_retried(tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'retry.db')
+
+    def broken(c):
+        c.execute("CREATE TABLE half_done (id INTEGER)")
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(migrations, 'MIGRATIONS', migrations.MIGRATIONS + [(99, 'broken', broken)])
+    with pytest.raises(RuntimeError):
+        migrations.migrate(db_path)
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'half_done'").fetchone() is None
+    conn.close()
+    assert 99 not in versions(db_path)
+
+
+@pytest.fixture
+def ddl_log(monkeypatch):
+    """Record DDL statements run on any sqlite3 connection."""
+    statements = []
+    connect = sqlite3.connect
+
+    def traced_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.set_trace_callback(lambda sql: statements.append(sql) if DDL.match(sql) else None)
+        return conn
+
+    monkeypatch.setattr(sqlite3, 'connect', traced_connect)
+    return statements
+
+
+def test_page_render_issues_no_ddl(tmp_path, monkeypatch, ddl_log):
+    from streamlit.testing.v1 import AppTest
+
+    # The app opens farmermarket.db relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    migrations.ensure_schema('farmermarket.db')
+    ddl_log.clear()
+
+    app = AppTest.from_file(APP_PATH, default_timeout=60)
+    app.session_state['logged_in'] = True
+    app.session_state['role'] = 'Farmer'
+    app.session_state['farmer_name'] = 'Ramesh'
+    app.session_state['farmer_profile'] = {'location': 'Pune'}
+    app.session_state['selected_menu'] = "📒 My Money Diary"
+    app.run()
+    assert not app.exception
+    assert ddl_log == []
+
+    # Rerun of a page whose render used to create its tables
+    ddl_log.clear()
+    app.run()
+    assert not app.exception
+    assert ddl_log == []
@@ -0,0 +1,96 @@
+# test_performance_optimizer.py
+"""Test that the workload indexes exist on the real schema and that the app's queries use them"""
+
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from database import db_functions, migrations
+from components import performance_optimizer
+
+UNUSED = ('idx_tools_location_tool', 'idx_tools_farmer', 'idx_crops_location_crop', 'idx_crops_farmer',
+          'idx_labor_jobs_location_status', 'idx_workers_location_status')
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'test.db')
+    monkeypatch.setattr(db_functions, 'DB_NAME', path)
+    db_functions.init_db()
+    return path
+
+
+def plan(db_path, query, params=()):
+    conn = sqlite3.connect(db_path)
+    detail = ' | '.join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params))
+    conn.close()
+    return detail
+
+
+def test_migration_replaces_runtime_indexes(db_path):
+    # A database provisioned by the old runtime index set
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM schema_version WHERE version >= 14")
+    conn.execute("CREATE INDEX idx_tools_location_tool ON tools(Location, Tool)")
+    conn.execute("CREATE INDEX idx_labor_jobs_location_status ON labor_jobs(location, status)")
+    conn.commit()
+    conn.close()
+
+    assert 14 in migrations.migrate(db_path)
+
+    conn = sqlite3.connect(db_path)
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+    conn.close()
+    assert not indexes & set(UNUSED)
+    assert {'idx_farmers_name_nocase', 'idx_ratings_seller', 'idx_price_cache_lookup'} <= indexes
+
+
+def test_provisioning_runs_no_ddl_on_a_migrated_database(db_path):
+    statements = []
+    connect = sqlite3.connect
+
+    def traced_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.set_trace_callback(lambda sql: statements.append(sql) if 'CREATE INDEX' in sql.upper() else None)
+        return conn
+
+    sqlite3.connect = traced_connect
+    try:
+        performance_optimizer.init_performance_optimizations(db_path)
+    finally:
+        sqlite3.connect = connect
+    assert statements == []
+
+
+# The statements as the app issues them (db_functions, cache_manager, labor_board)
+@pytest.mark.parametrize('query, params, index', [
+    ("SELECT ROWID as id, * FROM farmers WHERE LOWER(name) = LOWER(?)", ('Ramesh',), 'idx_farmers_name_nocase'),
+    ("SELECT * FROM farmers WHERE LOWER(name) = LOWER(?) AND password = ?", ('Ramesh', 'x'),
+     'idx_farmers_name_nocase'),
+    ("SELECT * FROM ratings WHERE LOWER(seller_name) = LOWER(?) ORDER BY created_date DESC",
+     ('Ramesh',), 'idx_ratings_seller'),
+    ("SELECT COUNT(*) as total, AVG(stars) as avg FROM ratings WHERE LOWER(seller_name) = LOWER(?)",
+     ('Ramesh',), 'idx_ratings_seller'),
+    ("SELECT * FROM ratings WHERE listing_type = ? AND listing_id = ? ORDER BY created_date DESC",
+     ('tool', 1), 'idx_ratings_listing'),
+    ("SELECT * FROM calendar_events WHERE farmer_name = ? COLLATE NOCASE AND event_date BETWEEN ? AND ? "
+     "AND COALESCE(repeat_every_days, 0) = 0", ('Ramesh', '2025-03-01', '2025-03-31'), 'idx_calendar_farmer_date'),
+    ("SELECT rowid, * FROM labor_jobs ORDER BY created_date DESC", (), 'idx_labor_jobs_created'),
+    ("SELECT rowid, * FROM worker_availability ORDER BY created_date DESC", (), 'idx_workers_created'),
+    ("SELECT * FROM weather_cache WHERE LOWER(location) = LOWER(?)", ('Pune',), 'idx_weather_cache_location'),
+    ("SELECT * FROM market_price_cache WHERE LOWER(crop_name) = LOWER(?) AND LOWER(location) = LOWER(?)",
+     ('Onion', 'Pune'), 'idx_price_cache_lookup'),
+    ("SELECT * FROM prediction_cache WHERE LOWER(crop_name) = LOWER(?) AND LOWER(location) = LOWER(?) "
+     "AND ABS(reference_price - ?) <= ? ORDER BY cached_at DESC LIMIT 1", ('Onion', 'Pune', 2000, 100),
+     'idx_prediction_cache_lookup'),
+    ("DELETE FROM market_price_cache WHERE expires_at < ?", ('2025-01-01',), 'idx_price_cache_expires'),
+])
+def test_workload_queries_use_their_index(db_path, query, params, index):
+    detail = plan(db_path, query, params)
+    assert index in detail
+    assert 'TEMP B-TREE' not in detail
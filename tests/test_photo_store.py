@@ -0,0 +1,71 @@
+# test_photo_store.py
+"""Test the content-addressed listing photo store"""
+
+import hashlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from PIL import Image
+
+from database import db_functions, photo_store
+
+
+@pytest.fixture
+def photo_dir(tmp_path, monkeypatch):
+    path = str(tmp_path / 'photos')
+    monkeypatch.setattr(photo_store, 'PHOTO_DIR', path)
+    return path
+
+
+def camera_jpeg(width=3000, height=2000):
+    """A large, detailed JPEG like a phone camera upload."""
+    img = Image.effect_mandelbrot((width, height), (-2, -1.2, 1, 1.2), 80).convert('RGB')
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', quality=92)
+    return buffer.getvalue()
+
+
+def test_renditions_are_generated_once_per_content(photo_dir):
+    data = camera_jpeg()
+    photo_hash = photo_store.save_photo(data)
+
+    assert photo_hash == hashlib.sha256(data).hexdigest()
+    with open(photo_store.photo_path(photo_hash, 'orig'), 'rb') as f:
+        assert f.read() == data
+    for name, (max_side, _) in photo_store.RENDITIONS.items():
+        with Image.open(photo_store.photo_path(photo_hash, name)) as img:
+            assert img.format == 'WEBP'
+            assert max(img.size) == max_side
+    assert os.path.getsize(photo_store.photo_path(photo_hash, 'thumb')) < 20 * 1024
+
+    before = os.path.getmtime(photo_store.photo_path(photo_hash, 'card'))
+    assert photo_store.save_photo(data) == photo_hash
+    assert os.path.getmtime(photo_store.photo_path(photo_hash, 'card')) == before
+
+
+def test_rejects_data_that_is_not_an_image(photo_dir):
+    with pytest.raises(ValueError):
+        photo_store.save_photo(b'not an image')
+    assert not os.path.exists(photo_dir) or not os.listdir(photo_dir)
+
+
+def test_photo_source_keeps_legacy_values(photo_dir):
+    assert photo_store.photo_source(None) is None
+    assert photo_store.photo_source('https://example.com/tractor.jpg') == 'https://example.com/tractor.jpg'
+    assert photo_store.photo_source('0' * 64) is None
+
+
+def test_listing_rows_store_only_the_hash(tmp_path, photo_dir, monkeypatch):
+    monkeypatch.setattr(db_functions, 'DB_NAME', str(tmp_path / 'test.db'))
+    db_functions.init_db()
+    photo_hash = photo_store.save_photo(camera_jpeg(800, 600))
+
+    db_functions.add_data('tools', ('Ramesh', 'Pune', 'Tractor', 800, '9876543210', 'Good', photo_hash))
+
+    photo = db_functions.get_dataset('tools')['Photo'][0]
+    assert photo == photo_hash
+    assert photo_store.photo_source(photo, 'detail').endswith(f"{photo_hash}.detail.webp")
@@ -0,0 +1,99 @@
+# test_plan_to_calendar.py
+"""Test that saving an AI plan costs one round trip per stage"""
+
+import os
+import sqlite3
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from database import db_functions
+from components import calendar_integration
+from calender import translation_service
+from calender.translation_service import TranslationService
+
+START = date(2025, 11, 1)
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'test.db')
+    monkeypatch.setattr(db_functions, 'DB_NAME', path)
+    db_functions.init_db()
+    return path
+
+
+class UpperTranslator:
+    """Stands in for GoogleTranslator without the network; counts requests."""
+    requests = []
+
+    def __init__(self, source, target):
+        pass
+
+    def translate(self, text):
+        UpperTranslator.requests.append(text)
+        return text.upper()
+
+
+@pytest.fixture
+def translator(monkeypatch):
+    UpperTranslator.requests = []
+    monkeypatch.setattr(translation_service, 'GoogleTranslator', UpperTranslator)
+    return UpperTranslator
+
+
+def plan_steps(count):
+    return [{'title': f'Step {n}', 'description': f'Do task {n}', 'date': START + timedelta(days=n),
+             'time': '07:00'} for n in range(count)]
+
+
+def test_thirty_step_plan_is_one_round_trip_per_stage(db_path, translator, monkeypatch):
+    forecasts = []
+
+    def forecast(location, lat=None, lon=None):
+        forecasts.append(location)
+        return [{'date': (START + timedelta(days=n)).isoformat(), 'temperature': 38, 'rainfall': 0,
+                 'wind_speed': 5} for n in range(7)]
+
+    monkeypatch.setattr(calendar_integration, 'get_weather_forecast', forecast)
+    statements = []
+    connect = sqlite3.connect
+
+    def traced_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(sqlite3, 'connect', traced_connect)
+
+    added = calendar_integration.add_plan_to_calendar(
+        'Ramesh', {'weather_location': 'Pune'}, plan_steps(30), target_lang='hi', source_lang='en')
+
+    assert added == 30
+    assert len(translator.requests) == 1
+    assert forecasts == ['Pune']
+    assert sum(sql.startswith('COMMIT') for sql in statements) == 1
+
+    events = db_functions.get_events_in_range('Ramesh', START, START + timedelta(days=29))
+    assert [e['event_title'] for e in events] == [f'STEP {n}' for n in range(30)]
+    assert events[0]['weather_alert'] == "🔥 Very hot - ensure proper irrigation"
+    assert events[-1]['weather_alert'] == ""
+
+
+def test_batch_splits_long_plans_and_keeps_order(translator):
+    texts = ['a' * 2000, '', 'b' * 2000, 'c' * 2000]
+
+    assert TranslationService().translate_batch(texts, 'hi') == ['A' * 2000, '', 'B' * 2000, 'C' * 2000]
+    assert len(translator.requests) == 2
+
+
+def test_batch_falls_back_when_separator_is_lost(monkeypatch):
+    class Mangling(UpperTranslator):
+        def translate(self, text):
+            return text.replace('###', '').upper()
+
+    monkeypatch.setattr(translation_service, 'GoogleTranslator', Mangling)
+    assert TranslationService().translate_batch(['one', 'two'], 'hi') == ['ONE', 'TWO']
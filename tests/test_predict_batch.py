@@ -0,0 +1,110 @@
+# test_predict_batch.py
+"""Test PricePredictor.predict_batch with stubbed weather, digest and AI calls"""
+
+import os
+import sys
+import threading
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+from database import cache_manager, db_functions
+from ai.price_predictor import PricePredictor
+
+
+@pytest.fixture
+def predictor(tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'test.db')
+    monkeypatch.setattr(db_functions, 'DB_NAME', db_path)
+    monkeypatch.setattr(cache_manager, 'DB_NAME', db_path)
+    db_functions.init_db()
+
+    predictor = PricePredictor()
+    calls = Counter()
+    lock = threading.Lock()
+
+    def count(name):
+        with lock:
+            calls[name] += 1
+
+    def fake_weather(location):
+        count(('weather', location))
+        return None
+
+    def fake_news(crop_name, location):
+        count(('news', crop_name, location))
+        return {'current_price': None, 'sources': []}
+
+    def fake_ai(crop_name, current_price, location, days_ahead, weather_data, online_data):
+        count(('ai', crop_name, location))
+        return {'success': True, 'current_price': current_price, 'trend': 'STABLE',
+                'confidence': 'MEDIUM', 'recommendation': 'Hold',
+                'predictions': {'day_7': current_price, 'day_15': current_price, 'day_30': current_price}}
+
+    monkeypatch.setattr(predictor, 'get_weather_data', fake_weather)
+    monkeypatch.setattr(predictor, 'get_market_digest', fake_news)
+    monkeypatch.setattr(predictor, '_predict_with_ai', fake_ai)
+    predictor.calls = calls
+    return predictor
+
+
+def test_shared_inputs_fetched_once(predictor):
+    results = predictor.predict_batch([
+        {'crop_name': 'Wheat', 'location': 'Pune, Maharashtra', 'current_price': 2500},
+        {'crop_name': 'Onion', 'location': 'Pune, Maharashtra', 'current_price': 1800},
+        {'crop_name': 'Wheat', 'location': 'Pune, Maharashtra', 'current_price': 2500},
+        {'crop_name': 'Wheat', 'location': 'Nashik, Maharashtra', 'current_price': 2400},
+    ])
+
+    assert list(results['crop_name']) == ['Wheat', 'Onion', 'Wheat', 'Wheat']
+    assert results['success'].all()
+    assert predictor.calls[('weather', 'Pune, Maharashtra')] == 1
+    assert predictor.calls[('news', 'Wheat', 'Pune, Maharashtra')] == 1
+    assert predictor.calls[('ai', 'Wheat', 'Pune, Maharashtra')] == 1
+    assert sum(n for k, n in predictor.calls.items() if k[0] == 'ai') == 3
+
+
+def test_missing_price_without_history_is_reported(predictor):
+    results = predictor.predict_batch([{'crop_name': 'Millet', 'location': 'Pune', 'current_price': None}])
+
+    assert not results.loc[0, 'success']
+    assert not predictor.calls
+
+
+def test_latest_price_looked_up_once_per_crop_and_location(predictor, monkeypatch):
+    lookups = Counter()
+
+    def fake_latest_price(crop_name, location):
+        lookups[(crop_name, location)] += 1
+        return 2000.0
+
+    monkeypatch.setattr(predictor.forecaster, 'latest_price', fake_latest_price)
+    results = predictor.predict_batch([
+        {'crop_name': 'Onion', 'location': 'Pune, Maharashtra', 'current_price': None},
+        {'crop_name': 'onion', 'location': 'Pune, Maharashtra', 'current_price': None},
+        {'crop_name': 'Onion', 'location': 'Nashik, Maharashtra', 'current_price': None},
+        {'crop_name': 'Onion', 'location': 'Pune, Maharashtra', 'current_price': 2100},
+    ])
+
+    assert results['success'].all()
+    assert lookups == {('Onion', 'Pune, Maharashtra'): 1, ('Onion', 'Nashik, Maharashtra'): 1}
+
+
+def test_latest_price_reads_newest_row(predictor):
+    db_functions.add_mandi_prices([
+        ('Onion', 'Pune', 'Maharashtra', '2026-01-01', 1700, 1900, 1800),
+        ('Onion', 'Pune', 'Maharashtra', '2026-01-02', 1800, 2000, 1900),
+        ('Onion', 'Nashik', 'Maharashtra', '2026-01-02', 2000, 2200, 2100),
+    ])
+
+    assert predictor.forecaster.latest_price('Onion', 'Pune, Maharashtra') == 1900.0
+    assert predictor.forecaster.latest_price('Onion', 'Lasalgaon') == 2000.0
+    assert predictor.forecaster.latest_price('Millet', 'Pune') is None
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-q']))
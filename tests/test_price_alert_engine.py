@@ -0,0 +1,134 @@
+# test_price_alert_engine.py
+"""Test incremental price-alert evaluation: crossed ranges, bulk inserts, index use"""
+
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from database import cache_manager, db_functions
+from database.price_alert_engine import process_price_update, process_price_updates
+from components import notifications_page
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'test.db')
+    monkeypatch.setattr(db_functions, 'DB_NAME', db_path)
+    monkeypatch.setattr(cache_manager, 'DB_NAME', db_path)
+    notifications_page.init_notifications_table()
+    return db_path
+
+
+def notifications(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT farmer_name, type, message FROM notifications ORDER BY id").fetchall()
+    conn.close()
+    return rows
+
+
+def test_only_crossed_targets_fire_once(db):
+    notifications_page.add_price_alert("Ramesh", "Onion", 2000, "Goes Above")
+    notifications_page.add_price_alert("Suresh", "Onion", 3000, "Goes Above")
+    notifications_page.add_price_alert("Mahesh", "Onion", 1500, "Goes Below")
+    notifications_page.add_price_alert("Ganesh", "Tomato", 1000, "Goes Above")
+
+    assert process_price_update("Onion", 1800) == 0
+    assert process_price_update("onion", 2100) == 1
+    assert process_price_update("Onion", 2200) == 0  # already above 2000
+    assert process_price_update("Onion", 1400) == 1
+    assert process_price_update("Onion", 3100) == 2  # crosses 2000 again and 3000
+
+    farmers = [row[0] for row in notifications(db)]
+    assert farmers == ["Ramesh", "Mahesh", "Ramesh", "Suresh"]
+    assert "Onion is now ₹2100 (your alert: goes above ₹2000)." in notifications(db)[0][2]
+
+
+def test_equals_and_inactive_alerts(db):
+    notifications_page.add_price_alert("Ramesh", "Wheat", 2500, "Equals")
+    notifications_page.add_price_alert("Suresh", "Wheat", 2500, "Goes Above")
+    conn = sqlite3.connect(db)
+    conn.execute("UPDATE price_alerts SET is_active = 0 WHERE farmer_name = 'Suresh'")
+    conn.commit()
+    conn.close()
+
+    assert process_price_update("Wheat", 2000) == 0
+    assert process_price_update("Wheat", 2480) == 1
+    assert process_price_update("Wheat", 2490) == 0  # still inside the band
+
+
+def test_market_cache_triggers_alerts(db):
+    notifications_page.add_price_alert("Ramesh", "Soybean", 4000, "Goes Above")
+    cache_manager.CacheManager().set_market_price_cache("Soybean", "Latur", {'current_price': 4200.0})
+    assert len(notifications(db)) == 1
+
+
+def test_alternating_sources_do_not_refire(db):
+    notifications_page.add_price_alert("Ramesh", "Onion", 2000, "Goes Above")
+    cache = cache_manager.CacheManager()
+
+    cache.set_market_price_cache("Onion", "Lasalgaon", {'current_price': 2200.0})
+    assert process_price_update("Onion", 1900, source="agmarknet") == 0
+    # Each source moves within its own side of the target: nothing new crossed
+    for _ in range(3):
+        cache.set_market_price_cache("Onion", "Lasalgaon", {'current_price': 2250.0})
+        assert process_price_update("Onion", 1950, source="agmarknet") == 0
+    assert len(notifications(db)) == 1
+
+    assert process_price_update("Onion", 2050, source="agmarknet") == 1
+
+
+def test_forecast_warning_sent_once_per_window(db):
+    import pandas as pd
+
+    class FakePredictor:
+        def predict_batch(self, requests_list):
+            return pd.DataFrame([{'success': True, 'day_7': 2600.0} for _ in requests_list])
+
+    notifications_page.add_price_alert("Ramesh", "Onion", 2500, "Goes Above")
+    notifications_page.add_price_alert("Suresh", "Onion", 3000, "Goes Above")
+
+    assert notifications_page.forecast_price_alerts(FakePredictor()) == 1
+    assert notifications_page.forecast_price_alerts(FakePredictor()) == 0
+    assert [row[:2] for row in notifications(db)] == [("Ramesh", "price_forecast")]
+
+    # Once the 7-day window has passed the alert can be warned again
+    conn = sqlite3.connect(db)
+    conn.execute("UPDATE price_forecast_warnings SET sent_on = date(sent_on, '-7 days')")
+    conn.commit()
+    conn.close()
+    assert notifications_page.forecast_price_alerts(FakePredictor()) == 1
+
+
+def test_range_query_uses_index(db):
+    conn = sqlite3.connect(db)
+    plan = ' '.join(row[-1] for row in conn.execute("""
+        EXPLAIN QUERY PLAN SELECT farmer_name FROM price_alerts
+        WHERE is_active = 1 AND commodity = 'Onion' COLLATE NOCASE AND alert_type = 'Goes Above'
+          AND target_price > 100 AND target_price <= 200
+    """))
+    conn.close()
+    assert 'idx_price_alerts_eval' in plan
+
+
+def test_thousands_of_alerts_per_update(db):
+    conn = sqlite3.connect(db)
+    conn.executemany(
+        "INSERT INTO price_alerts (farmer_name, commodity, target_price, alert_type) VALUES (?, ?, ?, ?)",
+        [(f"Farmer {i}", crop, 1000 + i % 2000, direction)
+         for i in range(5000) for crop in ("Onion", "Cotton")
+         for direction in ("Goes Above", "Goes Below")]
+    )
+    conn.commit()
+    conn.close()
+
+    process_price_updates({"Onion": 1500, "Cotton": 1500})
+    start = time.perf_counter()
+    created = process_price_updates({"Onion": 1600, "Cotton": 1400})
+    # 100 crossed targets per commodity, each held by three farmers
+    assert created == 600
+    assert time.perf_counter() - start < 0.5
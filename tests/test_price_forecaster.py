@@ -0,0 +1,131 @@
+# test_price_forecaster.py
+"""Test the local ML price forecasting engine on synthetic mandi history"""
+
+import math
+import os
+import random
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from database import db_functions
+from ai import price_forecaster
+from ai.price_forecaster import PriceForecaster, clear_model_registry
+
+
+def seasonal_rows(crop, market, days=400, base=2000.0):
+    """Seasonal price curve with noise, one mandi report per day"""
+    rng = random.Random(7)
+    start = date(2024, 1, 1)
+    rows = []
+    for i in range(days):
+        day = start + timedelta(days=i)
+        price = base * (1 + 0.15 * math.sin(2 * math.pi * i / 365)) * (1 + rng.uniform(-0.02, 0.02))
+        rows.append((crop, market, 'Maharashtra', day.isoformat(), price * 0.9, price * 1.1, round(price, 2)))
+    return rows
+
+
+@pytest.fixture
+def history_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_functions, 'DB_NAME', str(tmp_path / 'test.db'))
+    db_functions.init_db()
+    clear_model_registry()
+    yield tmp_path
+    clear_model_registry()
+
+
+def test_forecast_returns_intervals(history_db):
+    db_functions.add_mandi_prices(seasonal_rows('Onion', 'Pune'))
+    forecaster = PriceForecaster(model_dir=str(history_db / 'models'))
+
+    result = forecaster.forecast('Onion', 'Pune, Maharashtra', current_price=2100)
+
+    assert result is not None
+    assert result['market'] == 'Pune'
+    for key in ('day_7', 'day_15', 'day_30'):
+        horizon = result['forecasts'][key]
+        assert horizon['low'] <= horizon['price'] <= horizon['high']
+        assert 1000 < horizon['price'] < 4000
+
+
+def test_models_are_memoized(history_db):
+    db_functions.add_mandi_prices(seasonal_rows('Onion', 'Pune'))
+    forecaster = PriceForecaster(model_dir=str(history_db / 'models'))
+    forecaster.forecast('Onion', 'Pune')
+
+    start = time.perf_counter()
+    forecaster.forecast('Onion', 'Pune')
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    assert len(price_forecaster._MODEL_REGISTRY) == 1
+    assert elapsed_ms < 200
+
+
+def test_falls_back_to_all_markets(history_db):
+    db_functions.add_mandi_prices(seasonal_rows('Wheat', 'Nashik'))
+    forecaster = PriceForecaster(model_dir=str(history_db / 'models'))
+
+    result = forecaster.forecast('wheat', 'Satara, Maharashtra')
+
+    assert result['market'] == '*'
+
+
+def test_short_history_returns_none(history_db):
+    db_functions.add_mandi_prices(seasonal_rows('Tomato', 'Pune', days=30))
+    forecaster = PriceForecaster(model_dir=str(history_db / 'models'))
+
+    assert forecaster.forecast('Tomato', 'Pune') is None
+
+
+def test_stale_model_is_served_while_retraining(history_db, monkeypatch):
+    rows = seasonal_rows('Onion', 'Pune')
+    db_functions.add_mandi_prices(rows[:380])
+    forecaster = PriceForecaster(model_dir=str(history_db / 'models'))
+    first = forecaster.forecast('Onion', 'Pune')
+
+    release = threading.Event()
+    train = price_forecaster._train_bundle
+
+    def slow_train(*args):
+        release.wait(10)
+        return train(*args)
+
+    monkeypatch.setattr(price_forecaster, '_train_bundle', slow_train)
+    db_functions.add_mandi_prices(rows[380:])
+
+    # Stale: answered at once from the old model; other keys are not blocked either
+    start = time.perf_counter()
+    assert forecaster.forecast('Onion', 'Pune')['trained_at'] == first['trained_at']
+    assert (time.perf_counter() - start) * 1000 < 500
+
+    release.set()
+    price_forecaster._retrain_pool.submit(lambda: None).result()
+    assert forecaster.forecast('Onion', 'Pune')['trained_at'] != first['trained_at']
+
+
+def test_train_models_warms_every_series(history_db):
+    db_functions.add_mandi_prices(seasonal_rows('Onion', 'Pune') + seasonal_rows('Onion', 'Nashik', days=60))
+    forecaster = PriceForecaster(model_dir=str(history_db / 'models'))
+
+    assert forecaster.train_models() == {'models_checked': 2, 'models_trained': 2}
+    assert set(price_forecaster._MODEL_REGISTRY) == {('onion', 'pune'), ('onion', '*')}
+    assert forecaster.train_models() == {'models_checked': 2, 'models_trained': 0}
+
+
+def test_varieties_of_a_day_are_combined(history_db):
+    db_functions.add_mandi_prices([
+        ('Onion', 'Pune', 'Maharashtra', '2025-01-01', 900, 1500, 1200),
+        ('Onion', 'Pune', 'Maharashtra', '2025-01-01', 1000, 2100, 1800),
+        ('Onion', 'Pune', 'Maharashtra', '2025-01-01', 1100, 1600, 1300),
+    ])
+    history = db_functions.get_mandi_price_history('Onion', 'Pune')
+    assert history['modal_price'].tolist() == [1300]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-q']))
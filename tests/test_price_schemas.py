@@ -0,0 +1,90 @@
+# test_price_schemas.py
+"""Test structured-output handling in PricePredictor with a stubbed Gemini client"""
+
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+from database import cache_manager, db_functions
+from ai.price_predictor import PricePredictor, PricePrediction, SellingAdvice
+
+
+class FakeModels:
+    def __init__(self, payload):
+        self.payload = payload
+        self.configs = []
+
+    def generate_content(self, model, contents, config=None):
+        self.configs.append(config)
+        return SimpleNamespace(text=self.payload)
+
+
+@pytest.fixture
+def predictor(tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'test.db')
+    monkeypatch.setattr(db_functions, 'DB_NAME', db_path)
+    monkeypatch.setattr(cache_manager, 'DB_NAME', db_path)
+    db_functions.init_db()
+    return PricePredictor()
+
+
+def use_payload(predictor, payload):
+    predictor.client = SimpleNamespace(models=FakeModels(json.dumps(payload) if isinstance(payload, dict) else payload))
+    return predictor.client.models
+
+
+def test_prediction_uses_schema_and_is_cached(predictor):
+    models = use_payload(predictor, {
+        "day_7_price": 2600, "day_15_price": 2700, "day_30_price": 2750, "trend": "UPWARD",
+        "confidence": "MEDIUM", "peak_day": 25, "lowest_day": 2,
+        "key_factors": ["Off-season supply is low"], "recommendation": "Hold half the crop."
+    })
+
+    prediction = predictor._predict_with_ai("Wheat", 2500.0, "Pune", 30, None, {'current_price': None})
+
+    assert models.configs[0].response_json_schema == PricePrediction.model_json_schema()
+    assert prediction['predictions'] == {'day_7': 2600, 'day_15': 2700, 'day_30': 2750}
+    assert prediction['price_change_30d'] == 10.0
+    assert predictor.cache.get_prediction_cache("Wheat", "Pune", 2500.0)['trend'] == "UPWARD"
+
+
+def test_invalid_prediction_is_rejected(predictor):
+    use_payload(predictor, {"day_7_price": 2600, "trend": "SIDEWAYS"})
+
+    prediction = predictor._predict_with_ai("Wheat", 2500.0, "Pune", 30, None, {'current_price': None})
+
+    assert prediction['success'] is False
+
+
+def test_selling_advice_from_schema(predictor):
+    models = use_payload(predictor, {
+        "best_month": "October", "best_reason": "Festival demand.", "sell_now_score": 4, "wait_score": 8,
+        "storage_advice": "Keep dry.", "expected_peak_price": 2900, "risk_factors": ["Rain"],
+        "action": "SELL_PARTIALLY", "timeline": "Sell 40% now."
+    })
+
+    advice = predictor.get_best_selling_time("Wheat", 2500.0)
+
+    assert models.configs[0].response_json_schema == SellingAdvice.model_json_schema()
+    assert advice['action'] == "SELL_PARTIALLY"
+    assert advice['reason'] == "Festival demand."
+
+
+def test_profit_analysis_falls_back_on_bad_output(predictor):
+    use_payload(predictor, "not json")
+
+    result = predictor.calculate_profit("Wheat", 2500.0, 2400.0, 10)
+
+    assert result['profit_loss'] == -1000.0
+    assert result['verdict'] == 'LOSS'
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-q']))
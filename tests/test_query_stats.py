@@ -0,0 +1,113 @@
+# test_query_stats.py
+"""Test per-statement query statistics and the slow query log"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pytest
+
+from database import db_functions, query_stats
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'test.db')
+    monkeypatch.setattr(db_functions, 'DB_NAME', path)
+    db_functions.init_db()
+    query_stats.reset_query_stats()
+    yield path
+    query_stats.reset_query_stats()
+
+
+def stats_for(fragment):
+    return [s for s in query_stats.get_query_stats() if fragment in s['statement']]
+
+
+def test_statements_are_attributed_to_the_calling_module(db_path):
+    db_functions.add_data('farmers', ('Ramesh', 'Pune', 2, 'acre', '9876543210', 'Pune', None, None, 'pw'))
+    for _ in range(3):
+        db_functions.get_farmer_profile('ramesh')
+
+    profile, = stats_for('SELECT ROWID as id, * FROM farmers')
+    assert profile['module'] == 'database.db_functions'
+    assert profile['calls'] == 3
+    assert profile['rows'] == 3
+    assert sum(profile['histogram'].values()) == 3
+
+    insert, = stats_for('INSERT OR REPLACE INTO farmers')
+    assert insert['rows'] == 1
+
+
+def test_pandas_reads_are_counted(db_path):
+    conn = query_stats.connect(db_path)
+    conn.executemany("INSERT INTO tools (Farmer, Location, Tool, Rate, Contact) VALUES (?, ?, ?, ?, ?)",
+                     [('Ramesh', 'Pune', f'Tool {n}', 100, '1') for n in range(5)])
+    conn.commit()
+    df = pd.read_sql_query("SELECT * FROM tools", conn)
+    conn.close()
+
+    assert len(df) == 5
+    read, = stats_for('SELECT * FROM tools')
+    assert (read['module'], read['rows']) == (__name__, 5)
+    assert stats_for('INSERT INTO tools')[0]['rows'] == 5
+
+
+def test_slow_statements_are_logged_with_their_plan(db_path, monkeypatch):
+    monkeypatch.setattr(query_stats, 'SLOW_QUERY_MS', 0)
+    db_functions.get_farmer_events('Ramesh')
+    db_functions.get_farmer_events('Suresh')
+
+    slow = [s for s in query_stats.get_slow_queries(db_path) if 'FROM calendar_events' in s['statement']]
+    assert len(slow) == 1
+    assert slow[0]['count'] == 2
+    assert slow[0]['module'] == 'database.db_functions'
+    assert 'idx_calendar_farmer_date' in slow[0]['query_plan']
+
+
+def test_fetch_time_counts_toward_latency(db_path):
+    conn = query_stats.connect(db_path)
+    conn.create_function('pause', 1, lambda x: time.sleep(0.01) or x)
+    conn.executemany("INSERT INTO tools (Farmer, Location, Tool, Rate, Contact) VALUES (?, ?, ?, ?, ?)",
+                     [('Ramesh', 'Pune', f'Tool {n}', 100, '1') for n in range(10)])
+    rows = conn.execute("SELECT pause(Tool) FROM tools").fetchall()
+    conn.close()
+
+    assert len(rows) == 10
+    read, = stats_for('SELECT pause(Tool)')
+    # execute() only stepped to the first row; the other nine were read by fetchall()
+    assert read['calls'] == 1 and read['rows'] == 10
+    assert read['max_ms'] >= 90
+    assert read['histogram']['≤100ms'] + read['histogram']['≤500ms'] == 1
+
+
+def test_unfinished_reads_are_recorded_on_close(db_path):
+    for name in ('Ramesh', 'Suresh'):
+        db_functions.add_data('farmers', (name, 'Pune', 2, 'acre', '9876543210', 'Pune', None, None, 'pw'))
+    conn = query_stats.connect(db_path)
+    cursor = conn.execute("SELECT * FROM farmers")
+    cursor.fetchone()
+    assert stats_for('SELECT * FROM farmers') == []
+    conn.close()
+    assert stats_for('SELECT * FROM farmers')[0]['calls'] == 1
+
+    # A dropped cursor records its statement too
+    conn = query_stats.connect(db_path)
+    conn.execute("SELECT * FROM farmers").fetchone()
+    assert stats_for('SELECT * FROM farmers')[0]['calls'] == 2
+    conn.close()
+
+
+def test_slow_log_is_flushed_without_closing(db_path, monkeypatch):
+    monkeypatch.setattr(query_stats, 'SLOW_QUERY_MS', 0)
+    monkeypatch.setattr(query_stats, 'SLOW_FLUSH_SIZE', 3)
+    conn = query_stats.connect(db_path)
+    for _ in range(3):
+        conn.execute("SELECT COUNT(*) FROM crops").fetchall()
+
+    assert query_stats.get_slow_queries(db_path)[0]['count'] == 3
+    assert query_stats._pending_slow == []
+    conn.close()
@@ -0,0 +1,158 @@
+# test_sync_engine.py
+"""Test offline sync replay: batching, idempotency, coalescing, retry/backoff"""
+
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from database import db_functions
+from components import simple_finance_page, sync_engine
+from components.offline_manager import OfflineManager
+from components.sync_engine import SyncEngine
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'test.db')
+    monkeypatch.setattr(db_functions, 'DB_NAME', db_path)
+    monkeypatch.setattr(simple_finance_page, 'DB_NAME', db_path)
+    db_functions.init_db()
+    simple_finance_page.init_simple_finance_db()
+    db_functions.add_data('farmers', ('Ramesh', 'Pune', 2, 'acre', '9876543210', 'Pune', None, None, 'x'))
+    return OfflineManager(db_path)
+
+
+def count(db_path, table):
+    conn = sqlite3.connect(db_path)
+    n = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    conn.close()
+    return n
+
+
+def money(i):
+    return {'farmer_name': 'Ramesh', 'entry_type': 'out', 'amount': 100 + i,
+            'reason': 'Seeds', 'entry_date': '2025-06-01'}
+
+
+def test_hundreds_of_actions_in_one_pass(manager):
+    for i in range(300):
+        manager.add_to_sync_queue('add_money_entry', money(i))
+    manager.add_to_sync_queue('create_crop_listing', {'Farmer': 'Ramesh', 'Location': 'Pune', 'Crop': 'Onion',
+                                                      'Quantity': '10 quintal', 'Expected_Price': 2000,
+                                                      'Contact': '9876543210', 'Listing_Date': '2025-06-01'})
+    manager.add_to_sync_queue('add_calendar_event', {'farmer_name': 'Ramesh', 'event_date': '2025-06-05',
+                                                     'event_title': 'Sow onion'})
+
+    result = manager.sync_pending(batch_size=200)
+
+    assert result['applied'] == 302
+    assert len(result['batches']) == 2
+    assert result['actions_per_second'] > 0
+    assert count(manager.db_path, 'simple_money_tracker') == 300
+    assert count(manager.db_path, 'crops') == 1
+    assert count(manager.db_path, 'calendar_events') == 1
+    assert manager.get_pending_syncs() == []
+
+
+def test_requeued_key_is_applied_once(manager):
+    key = manager.add_to_sync_queue('add_money_entry', money(1))
+    manager.sync_pending()
+    manager.add_to_sync_queue('add_money_entry', money(1), idempotency_key=key)
+
+    result = manager.sync_pending()
+    assert result['duplicates'] == 1 and result['applied'] == 0
+    assert count(manager.db_path, 'simple_money_tracker') == 1
+
+
+def test_coalescing(manager):
+    for location in ('Nashik', 'Satara', 'Sangli'):
+        manager.add_to_sync_queue('update_profile', {'name': 'ramesh', 'location': location, 'farm_size': 3,
+                                                     'farm_unit': 'acre', 'contact': '9876543210'})
+    event = {'farmer_name': 'Ramesh', 'event_date': '2025-06-05', 'event_title': 'Spray'}
+    key = manager.add_to_sync_queue('add_calendar_event', event)
+    manager.add_to_sync_queue('add_calendar_event', event, idempotency_key=key)
+
+    result = manager.sync_pending()
+    assert result['applied'] == 2 and result['coalesced'] == 3
+    assert db_functions.get_farmer_profile('Ramesh')['location'] == 'Sangli'
+    assert count(manager.db_path, 'calendar_events') == 1
+
+
+def test_identical_actions_are_both_applied(manager):
+    manager.add_to_sync_queue('add_money_entry', money(1))
+    manager.add_to_sync_queue('add_money_entry', money(1))
+
+    result = manager.sync_pending()
+    assert result['applied'] == 2 and result['coalesced'] == 0
+    assert count(manager.db_path, 'simple_money_tracker') == 2
+
+
+def test_partial_profile_updates_keep_stored_fields(manager):
+    manager.add_to_sync_queue('update_profile', {'name': 'Ramesh', 'location': 'Nashik'})
+    manager.add_to_sync_queue('update_profile', {'name': 'Ramesh', 'contact': '9000000000'})
+
+    result = manager.sync_pending()
+    assert result['applied'] == 1 and result['coalesced'] == 1
+    profile = db_functions.get_farmer_profile('Ramesh')
+    assert (profile['location'], profile['contact']) == ('Nashik', '9000000000')
+    assert (profile['farm_size'], profile['farm_unit'], profile['weather_location']) == (2, 'acre', 'Pune')
+
+
+def test_failed_merge_keeps_every_update_queued(manager):
+    calls = []
+
+    def flaky_once(conn, data):
+        calls.append(data)
+        if len(calls) == 1:
+            raise RuntimeError("locked")
+        sync_engine._update_profile(conn, data)
+
+    handlers = dict(sync_engine.HANDLERS, update_profile=flaky_once)
+    manager.add_to_sync_queue('update_profile', {'name': 'Ramesh', 'location': 'Nashik'})
+    manager.add_to_sync_queue('update_profile', {'name': 'Ramesh', 'contact': '111'})
+
+    assert SyncEngine(manager.db_path, handlers=handlers).run()['failed'] == 1
+    conn = sqlite3.connect(manager.db_path)
+    assert conn.execute("SELECT COUNT(*) FROM sync_queue WHERE synced = 0").fetchone()[0] == 2
+    conn.execute("UPDATE sync_queue SET next_attempt_at = NULL")
+    conn.commit()
+    conn.close()
+
+    result = SyncEngine(manager.db_path, handlers=handlers).run()
+    assert result['applied'] == 1 and result['coalesced'] == 1
+    profile = db_functions.get_farmer_profile('Ramesh')
+    assert (profile['location'], profile['contact']) == ('Nashik', '111')
+
+
+def test_failure_rolls_back_and_backs_off(manager, monkeypatch):
+    def flaky(conn, data):
+        conn.execute("INSERT INTO simple_money_tracker (farmer_name, entry_type, amount, reason, entry_date) "
+                     "VALUES ('x', 'in', 1, 'partial', '2025-01-01')")
+        raise RuntimeError("disk full")
+
+    handlers = dict(sync_engine.HANDLERS, add_money_entry=flaky)
+    manager.add_to_sync_queue('add_money_entry', money(1))
+    manager.add_to_sync_queue('add_calendar_event', {'farmer_name': 'Ramesh', 'event_date': '2025-06-05',
+                                                     'event_title': 'Weed'})
+
+    result = SyncEngine(manager.db_path, handlers=handlers).run()
+    assert result['failed'] == 1 and result['applied'] == 1
+    assert count(manager.db_path, 'simple_money_tracker') == 0  # partial write rolled back
+
+    # Not due yet: backoff keeps it out of the next run
+    assert SyncEngine(manager.db_path, handlers=handlers).run()['size'] == 0
+
+    conn = sqlite3.connect(manager.db_path)
+    attempts, error = conn.execute("SELECT attempts, last_error FROM sync_queue WHERE synced = 0").fetchone()
+    conn.close()
+    assert attempts == 1 and error == 'disk full'
+
+
+def test_unknown_action_is_parked(manager):
+    manager.add_to_sync_queue('launch_rocket', {})
+    assert manager.sync_pending()['failed'] == 1
+    assert manager.get_cache_stats()['failed_syncs'] == 1
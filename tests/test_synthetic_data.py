@@ -0,0 +1,66 @@
+# test_synthetic_data.py
+"""Test the seeded synthetic data generator used by the scenario benchmarks"""
+
+import os
+import random
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts import populate_database, synthetic_data
+
+TABLES = ('farmers', 'tools', 'crops', 'ratings', 'calendar_events', 'simple_money_tracker',
+          'farm_transactions', 'weather_cache', 'market_price_cache', 'money_month_rollup')
+
+
+def dump(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = {table: sorted(conn.execute(f"SELECT * FROM {table}").fetchall(), key=repr) for table in TABLES}
+    conn.close()
+    return rows
+
+
+def test_same_seed_gives_the_same_database(tmp_path, monkeypatch):
+    monkeypatch.setattr(synthetic_data, 'BATCH_FARMERS', 150)
+    first = synthetic_data.build_database(str(tmp_path / 'a.db'), farmers=400, seed=7, progress=lambda msg: None)
+    synthetic_data.build_database(str(tmp_path / 'b.db'), farmers=400, seed=7, progress=lambda msg: None)
+    synthetic_data.build_database(str(tmp_path / 'c.db'), farmers=400, seed=8, progress=lambda msg: None)
+
+    assert first['farmers'] == 400
+    assert first['cache_entries'] == 400
+    assert dump(str(tmp_path / 'a.db')) == dump(str(tmp_path / 'b.db'))
+    assert dump(str(tmp_path / 'a.db')) != dump(str(tmp_path / 'c.db'))
+
+
+def test_rows_are_consistent_with_the_app_schema(tmp_path):
+    db_path = str(tmp_path / 'bench.db')
+    counts = synthetic_data.build_database(db_path, farmers=300, seed=1, progress=lambda msg: None)
+    conn = sqlite3.connect(db_path)
+
+    # Ratings point at real listings and never at the rater's own
+    assert conn.execute("""SELECT COUNT(*) FROM ratings r JOIN tools t ON r.listing_type = 'tool'
+                           AND t.id = r.listing_id AND t.Farmer = r.seller_name""").fetchone()[0] + \
+        conn.execute("""SELECT COUNT(*) FROM ratings r JOIN crops c ON r.listing_type = 'crop'
+                        AND c.id = r.listing_id AND c.Farmer = r.seller_name""").fetchone()[0] == counts['ratings']
+    assert conn.execute("SELECT COUNT(*) FROM ratings WHERE rater_name = seller_name").fetchone()[0] == 0
+
+    # Seller summaries match the ratings, as update_farmer_rating would leave them
+    assert conn.execute("""SELECT COUNT(*) FROM farmers f
+                           WHERE total_ratings != (SELECT COUNT(*) FROM ratings WHERE seller_name = f.name)
+                        """).fetchone()[0] == 0
+
+    # Farm transactions belong to farmers by rowid, and rollups were maintained
+    assert conn.execute("""SELECT COUNT(*) FROM farm_transactions t
+                           JOIN farmers f ON f.rowid = t.farmer_id""").fetchone()[0] == counts['farm_transactions']
+    assert conn.execute("SELECT SUM(entries) FROM money_month_rollup").fetchone()[0] == counts['simple_money_tracker']
+    conn.close()
+
+
+def test_farmer_names_stay_unique_past_every_name_pair():
+    pairs = len(populate_database.MALE_NAMES) * len(populate_database.SURNAMES)
+    used = {}
+    farmers = populate_database.create_farmers(pairs, random.Random(3), used) + \
+        populate_database.create_farmers(pairs, random.Random(4), used)
+
+    assert len({f['name'] for f in farmers}) == 2 * pairs
@@ -0,0 +1,120 @@
+# test_tracing.py
+"""Test per-rerun tracing, the trace store and the page performance dashboard"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+import requests
+
+from database import migrations, query_stats, tracing
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'test.db')
+    migrations.migrate(path)
+    return path
+
+
+class StubAdapter(requests.adapters.BaseAdapter):
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def test_spans_are_noops_outside_a_trace():
+    with tracing.span('db', 'SELECT 1'):
+        pass
+    assert tracing.current_trace() is None
+    assert tracing.record_span('db', 'SELECT 1', 1.0) is None
+
+
+def test_rerun_records_db_http_and_nested_spans(db_path):
+    with tracing.trace_rerun('🏠 Home', db_path=db_path, sample_rate=1) as trace:
+        conn = query_stats.connect(db_path)
+        conn.execute("SELECT * FROM tools").fetchall()
+        conn.close()
+        session = requests.Session()
+        session.mount('http://stub/', StubAdapter())
+        with tracing.span('translation', 'en->hi'):
+            session.get('http://stub/translate', params={'key': 'secret'})
+
+    stored = tracing.get_trace(tracing.get_recent_traces(db_path)[0]['id'], db_path)
+    assert stored['page'] == '🏠 Home'
+    assert [(s['kind'], s['depth']) for s in stored['spans']] == [('db', 0), ('translation', 0), ('http', 1)]
+    assert stored['spans'][2]['name'] == 'GET stub/translate'
+
+    totals = trace.totals()
+    top_level = totals['db'][0] + totals['translation'][0]
+    assert totals['render'][0] == pytest.approx(trace.duration_ms - top_level)
+
+
+def test_only_sampled_or_profiled_reruns_are_stored(db_path):
+    with tracing.trace_rerun('🏠 Home', db_path=db_path, sample_rate=0) as trace:
+        assert trace is None
+    assert tracing.get_recent_traces(db_path) == []
+
+    def busy_page():
+        return sum(range(1000))
+
+    with tracing.trace_rerun('🏠 Home', db_path=db_path, sample_rate=0, profile=True):
+        busy_page()
+    stored = tracing.get_trace(tracing.get_recent_traces(db_path)[0]['id'], db_path)
+    assert 'busy_page' in stored['profile']
+
+
+def test_interrupted_reruns_are_still_stored(db_path):
+    class RerunException(Exception):
+        pass
+
+    with pytest.raises(RerunException):
+        with tracing.trace_rerun('📦 My Listings', db_path=db_path, sample_rate=1):
+            raise RerunException()
+    assert [t['page'] for t in tracing.get_recent_traces(db_path)] == ['📦 My Listings']
+
+
+def test_percentiles_per_page_and_kind(db_path):
+    for duration in range(1, 101):
+        trace = tracing.Trace('🌤️ Weather Forecast')
+        trace.duration_ms = float(duration)
+        if duration % 2 == 0:
+            trace.add_span('http', 'GET api', trace.start, duration / 2)
+        tracing.save_trace(trace, db_path)
+
+    rows = {row['kind']: row for row in tracing.get_latency_summary(db_path)}
+    assert (rows['total']['p50_ms'], rows['total']['p95_ms'], rows['total']['p99_ms']) == (50, 95, 99)
+    assert rows['http']['traces'] == 100
+    assert rows['http']['avg_spans'] == 0.5
+    assert 'llm' not in rows
+    assert tracing.percentile([], 50) is None
+
+
+def test_dashboard_shows_traced_pages(tmp_path, monkeypatch):
+    from streamlit.testing.v1 import AppTest
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(tracing, 'TRACE_SAMPLE_RATE', 1.0)
+
+    app = AppTest.from_file(APP_PATH, default_timeout=60)
+    app.session_state['logged_in'] = True
+    app.session_state['role'] = 'Admin'
+    app.session_state['farmer_name'] = 'Admin'
+    app.session_state['selected_menu'] = "📒 My Money Diary"
+    app.run()
+    assert not app.exception
+
+    app.session_state['selected_menu'] = "⏱️ Page Performance"
+    app.run()
+    assert not app.exception
+    pages = app.dataframe[0].value['Page'].tolist()
+    assert "📒 My Money Diary" in pages
@@ -0,0 +1,51 @@
+# test_translation_catalog.py
+"""Test compiled translation catalogs"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from translations import catalog, hi, mr
+
+
+def test_catalog_matches_source_modules(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog, 'CATALOG_DIR', str(tmp_path))
+    catalog.clear_registry()
+
+    assert catalog.get_catalog('hi') == hi.TRANSLATIONS
+    assert catalog.get_catalog('mr') == mr.TRANSLATIONS
+    assert os.path.exists(tmp_path / 'hi.pickle')
+    catalog.clear_registry()
+
+
+def test_catalog_loaded_once_per_language(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog, 'CATALOG_DIR', str(tmp_path))
+    catalog.clear_registry()
+
+    first = catalog.get_catalog('hi')
+    assert catalog.get_catalog('hi') is first
+
+    # Registry serves the cached dict even if the file disappears
+    os.remove(tmp_path / 'hi.pickle')
+    assert catalog.get_catalog('hi') is first
+    catalog.clear_registry()
+
+
+def test_stale_catalog_is_recompiled(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog, 'CATALOG_DIR', str(tmp_path))
+    catalog.compile_catalog('mr')
+    monkeypatch.setattr(catalog, '_source_stamp', lambda lang: (0, 0))
+
+    assert catalog._read_catalog('mr') is None
+
+
+def test_unknown_language_is_empty():
+    catalog.clear_registry()
+    assert catalog.get_catalog('xx') == {}
+    catalog.clear_registry()
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,104 @@
+# test_tts_engine.py
+"""Test sentence-chunked TTS: splitting, disk cache, LRU eviction, concurrent synthesis, streamed playback"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from components import text_to_speech_widget
+from components.tts_engine import TTSCache, TTSEngine, split_sentences
+
+
+class FakeSynth:
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.delay = delay
+
+    def __call__(self, text, language):
+        self.calls.append((text, language))
+        time.sleep(self.delay)
+        return f"[{language}:{text}]".encode()
+
+
+def test_split_sentences_handles_danda_and_long_text():
+    assert split_sentences("पानी दें। खाद डालें।  Check soil!") == ["पानी दें।", "खाद डालें।", "Check soil!"]
+    chunks = split_sentences("word " * 100, max_chars=50)
+    assert all(len(c) <= 50 for c in chunks)
+    assert split_sentences("") == []
+
+
+def test_repeat_narration_hits_cache(tmp_path):
+    synth = FakeSynth()
+    engine = TTSEngine(cache=TTSCache(str(tmp_path)), synthesize=synth)
+
+    first = engine.synthesize("Water the crops. Check prices.", "en")
+    second = engine.synthesize("Water the crops. Check prices.", "en")
+
+    assert first == second == b"[en:Water the crops.][en:Check prices.]"
+    assert len(synth.calls) == 2
+    assert engine.hits == 2
+
+
+def test_cache_survives_new_engine_and_is_keyed_by_language(tmp_path):
+    synth = FakeSynth()
+    TTSEngine(cache=TTSCache(str(tmp_path)), synthesize=synth).synthesize("Namaste.", "hi")
+    engine = TTSEngine(cache=TTSCache(str(tmp_path)), synthesize=synth)
+
+    engine.synthesize("Namaste.", "hi")
+    engine.synthesize("Namaste.", "mr")
+    assert synth.calls == [("Namaste.", "hi"), ("Namaste.", "mr")]
+
+
+def test_lru_eviction_drops_least_recent(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=25)
+    cache.put('a', b'x' * 10)
+    cache.put('b', b'x' * 10)
+    cache.get('a')
+    cache.put('c', b'x' * 10)
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.stats()['bytes'] <= 25
+    assert not os.path.exists(os.path.join(str(tmp_path), 'b.mp3'))
+
+
+def test_sentences_are_synthesized_concurrently_in_order(tmp_path):
+    synth = FakeSynth(delay=0.2)
+    engine = TTSEngine(cache=TTSCache(str(tmp_path)), synthesize=synth, max_workers=4)
+
+    start = time.perf_counter()
+    audio = engine.synthesize("One. Two. Three. Four.", "en")
+    elapsed = time.perf_counter() - start
+
+    assert audio == b"[en:One.][en:Two.][en:Three.][en:Four.]"
+    assert elapsed < 0.6
+    assert (engine.hits, engine.misses) == (0, 4)
+
+
+def test_first_chunk_ready_after_one_synthesis(tmp_path):
+    synth = FakeSynth(delay=0.2)
+    engine = TTSEngine(cache=TTSCache(str(tmp_path)), synthesize=synth, max_workers=2)
+
+    start = time.perf_counter()
+    chunks = engine.stream("One. Two. Three. Four. Five. Six.", "en")
+    assert next(chunks) == b"[en:One.]"
+    assert time.perf_counter() - start < 0.35
+    assert list(chunks)[-1] == b"[en:Six.]"
+
+
+def test_widget_renders_first_chunk_before_the_rest_are_ready(tmp_path, monkeypatch):
+    engine = TTSEngine(cache=TTSCache(str(tmp_path)), synthesize=FakeSynth(delay=0.2), max_workers=1)
+    monkeypatch.setattr(text_to_speech_widget, 'get_tts_engine', lambda: engine)
+    start = time.perf_counter()
+    rendered = []
+    monkeypatch.setattr(text_to_speech_widget.components, 'html',
+                        lambda html, height: rendered.append((time.perf_counter() - start, html)))
+
+    audio = text_to_speech_widget.stream_audio("One. Two. Three.", "en")
+
+    assert audio == b"[en:One.][en:Two.][en:Three.]"
+    assert len(rendered) == 3
+    assert rendered[0][0] < 0.35 and rendered[2][0] >= 0.55
+    assert "player.chunks[0]" in rendered[0][1] and "player.chunks[2]" in rendered[2][1]
@@ -0,0 +1,101 @@
+# test_unified_cache.py
+"""Test the shared cache schema: legacy table migration and the offline stale policy"""
+
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from database import cache_manager
+from database.cache_manager import CacheManager
+from components.offline_manager import OfflineManager
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'test.db')
+    monkeypatch.setattr(cache_manager, 'DB_NAME', path)
+    return path
+
+
+def create_legacy_tables(db_path):
+    """The tables OfflineManager created before the caches were unified."""
+    conn = sqlite3.connect(db_path)
+    conn.execute('''CREATE TABLE weather_cache (
+        location TEXT PRIMARY KEY, data TEXT NOT NULL,
+        cached_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, expires_at TIMESTAMP NOT NULL)''')
+    conn.execute('''CREATE TABLE price_cache (
+        commodity TEXT, market TEXT, state TEXT, data TEXT NOT NULL,
+        cached_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, expires_at TIMESTAMP NOT NULL,
+        PRIMARY KEY (commodity, market, state))''')
+    expires = (datetime.now() + timedelta(hours=5)).strftime('%Y-%m-%d %H:%M:%S.%f')
+    conn.execute("INSERT INTO weather_cache (location, data, expires_at) VALUES (?, ?, ?)",
+                 ('Pune', '{"temp": 31}', expires))
+    conn.execute("INSERT INTO price_cache (commodity, market, state, data, expires_at) VALUES (?, ?, ?, ?, ?)",
+                 ('Onion', 'Lasalgaon', 'Maharashtra', '{"modal_price": 1800}', expires))
+    conn.commit()
+    conn.close()
+
+
+def tables(db_path):
+    conn = sqlite3.connect(db_path)
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    conn.close()
+    return names
+
+
+def test_legacy_offline_tables_are_merged(db_path):
+    create_legacy_tables(db_path)
+    cache = CacheManager(db_path)
+
+    assert cache.get_weather_cache('Pune') == {'temp': 31}
+    assert cache.get_market_price_cache('Onion', 'Lasalgaon, Maharashtra') == {'modal_price': 1800}
+    assert 'price_cache' not in tables(db_path)
+    assert 'weather_cache_legacy' not in tables(db_path)
+
+    # Idempotent on the next start
+    CacheManager(db_path)
+    assert cache.get_weather_cache('Pune') == {'temp': 31}
+
+
+def test_offline_manager_first_no_longer_breaks_cache_manager(db_path):
+    offline = OfflineManager(db_path)
+    offline.cache_weather('Nashik', {'temp': 28})
+
+    assert CacheManager(db_path).get_weather_cache('Nashik') == {'temp': 28}
+
+
+def test_stale_entries_served_only_when_offline(db_path):
+    offline = OfflineManager(db_path)
+    offline.cache_weather('Pune', {'temp': 30}, hours=-1)
+    offline.cache_market_price('Tomato', 'Pune', 'Maharashtra', {'modal_price': 900}, hours=-1)
+
+    assert offline.cache.get_weather_cache('Pune') is None
+    assert offline.get_cached_weather('Pune', offline=False) is None
+
+    stale = offline.get_cached_weather('Pune', offline=True)
+    assert stale['temp'] == 30
+    assert stale['_cached'] and stale['_stale']
+    assert offline.get_cached_price('Tomato', 'Pune', 'Maharashtra', offline=True)['modal_price'] == 900
+
+
+def test_fresh_entries_carry_cached_flag(db_path):
+    offline = OfflineManager(db_path)
+    offline.cache_weather('Pune', {'temp': 30})
+
+    data = offline.get_cached_weather('Pune', offline=False)
+    assert data['_cached'] and not data['_stale']
+    assert offline.get_cache_stats()['weather_cached'] == 1
+
+
+def test_sweep_keeps_stale_entries_for_retention_window(db_path):
+    cache = CacheManager(db_path)
+    cache.set_weather_cache('Pune', {'temp': 30}, hours=-1)
+    cache.set_weather_cache('Satara', {'temp': 29}, hours=-(cache_manager.STALE_RETENTION_HOURS + 1))
+
+    assert cache.clear_expired_cache()['weather_deleted'] == 1
+    assert cache.get_weather_cache('Pune', allow_stale=True)['temp'] == 30
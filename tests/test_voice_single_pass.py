@@ -0,0 +1,70 @@
+# test_voice_single_pass.py
+"""Test single-pass voice listing extraction (one model call, Files API for large audio)"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from components import voice_listing_creator as vlc
+
+
+class FakeFiles:
+    def __init__(self):
+        self.uploaded = []
+        self.deleted = []
+
+    def upload(self, file, config=None):
+        self.uploaded.append(len(file.read()))
+        return type('UploadedFile', (), {'name': 'files/abc', 'uri': 'https://files/abc',
+                                         'mime_type': 'audio/wav'})()
+
+    def delete(self, name):
+        self.deleted.append(name)
+
+
+class FakeModels:
+    def __init__(self):
+        self.calls = []
+
+    def generate_content(self, model, contents, config=None):
+        self.calls.append(contents)
+        payload = {'transcript': 'Mere paas 10 quintal gehu hai', 'crop_name': 'Wheat',
+                   'quantity': 10, 'farmer_name': None}
+        return type('Response', (), {'text': json.dumps(payload)})()
+
+
+class FakeClient:
+    def __init__(self):
+        self.models = FakeModels()
+        self.files = FakeFiles()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeClient()
+    monkeypatch.setattr(vlc, 'get_gemini_client', lambda: fake)
+    return fake
+
+
+def test_single_call_returns_transcript_and_listing(client):
+    result = vlc.transcribe_and_extract_listing(b'RIFF' + b'\0' * 1000, 'crop')
+
+    assert result['success']
+    assert len(client.models.calls) == 1
+    assert result['transcript'] == 'Mere paas 10 quintal gehu hai'
+    assert 'transcript' not in result['extracted_data']
+    assert result['extracted_data']['crop_name'] == 'Wheat'
+    assert client.files.uploaded == []
+
+
+def test_large_audio_goes_through_files_api(client):
+    audio = b'\0' * (vlc.INLINE_AUDIO_LIMIT_BYTES + 1)
+    result = vlc.transcribe_and_extract_listing(audio, 'crop')
+
+    assert result['success']
+    assert client.files.uploaded == [len(audio)]
+    assert client.files.deleted == ['files/abc']
@@ -0,0 +1,143 @@
+# test_worker.py
+"""Test the background worker scheduler: intervals, jitter, concurrency, run log"""
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from database import db_functions
+from scripts import worker
+from scripts.worker import Job, Scheduler, parse_interval
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_functions, 'DB_NAME', str(tmp_path / 'test.db'))
+    db_functions.init_db()
+
+
+def test_parse_interval():
+    assert parse_interval('30s') == 30
+    assert parse_interval('every 15m') == 900
+    assert parse_interval('1d') == 86400
+    with pytest.raises(ValueError):
+        parse_interval('hourly')
+
+
+def test_jobs_run_on_interval_and_are_logged():
+    clock = FakeClock()
+    calls = []
+    scheduler = Scheduler([Job('sweep', lambda: calls.append(1) or {'deleted': 3}, every='1h', jitter=0)],
+                          clock=clock)
+
+    clock.now += 1
+    for future in scheduler.run_pending():
+        future.result()
+    assert calls == [1]
+
+    clock.now += 1800
+    assert scheduler.run_pending() == []
+
+    clock.now += 1800
+    for future in scheduler.run_pending():
+        future.result()
+    assert calls == [1, 1]
+
+    runs = db_functions.get_job_runs('sweep')
+    assert list(runs['status']) == ['success', 'success']
+    assert runs['result'].iloc[0] == '{"deleted": 3}'
+
+
+def test_jitter_stays_within_bounds():
+    clock = FakeClock()
+    scheduler = Scheduler([Job('digest', lambda: None, every='1h', jitter=0.2)], clock=clock, stub=True)
+    clock.now += 100
+    for future in scheduler.run_pending():
+        future.result()
+    delay = scheduler.next_run['digest'] - clock.now
+    assert 0.8 * 3600 <= delay <= 1.2 * 3600
+
+
+def test_concurrency_limit_skips_overlapping_runs():
+    release = threading.Event()
+    scheduler = Scheduler([Job('slow', release.wait, every='1s', max_concurrency=1)])
+
+    first = scheduler.submit('slow')
+    assert scheduler.submit('slow') is None
+    assert scheduler.skipped['slow'] == 1
+    release.set()
+    first.result()
+    assert scheduler.submit('slow') is not None
+
+
+def test_failures_are_logged():
+    def boom():
+        raise RuntimeError("API down")
+
+    results = Scheduler([Job('alerts', boom, every='1d')]).run_once()
+    assert results == {'alerts': None}
+    run = db_functions.get_job_runs('alerts').iloc[0]
+    assert run['status'] == 'failed' and run['error'] == 'API down'
+
+
+def test_locked_run_log_does_not_leak_the_slot(monkeypatch):
+    import sqlite3
+
+    def locked(*args):
+        raise sqlite3.OperationalError("database is locked")
+
+    scheduler = Scheduler([Job('sweep', lambda: {'deleted': 0}, every='1h', max_concurrency=1)])
+    start_job_run = db_functions.start_job_run
+    monkeypatch.setattr(db_functions, 'start_job_run', locked)
+    assert scheduler.submit('sweep').result() is None
+
+    monkeypatch.setattr(db_functions, 'start_job_run', start_job_run)
+    assert scheduler.submit('sweep').result() == {'deleted': 0}
+
+
+def test_schedule_resumes_from_run_log():
+    clock = FakeClock()
+    Scheduler([Job('sweep', lambda: None, every='1h')], stub=True).run_once()
+
+    resumed = Scheduler([Job('sweep', lambda: None, every='1h')], clock=clock)
+    last_start = db_functions.get_job_runs('sweep')['started_at'].iloc[0]
+    from datetime import datetime
+    assert resumed.next_run['sweep'] == pytest.approx(datetime.fromisoformat(last_start).timestamp() + 3600)
+
+
+def test_stub_mode_runs_every_registered_job():
+    assert worker.main(['--stub', '--once']) == 0
+    runs = db_functions.get_job_runs()
+    assert set(runs['job_name']) == {job.name for job in worker.JOBS}
+    assert set(runs['status']) == {'success'}
+
+
+def test_scheme_refresh_warms_the_page_cache_keys(monkeypatch):
+    from components import government_schemes_page
+
+    calls = []
+
+    class FakeHelper:
+        def search_government_schemes(self, location, crop_type=None, force_refresh=False, language="English"):
+            calls.append((location, crop_type, language))
+
+    monkeypatch.setattr(government_schemes_page, 'GovernmentSchemesHelper', FakeHelper)
+    db_functions.add_data('farmers', ('Ramesh', 'Haveli, Pune, Maharashtra, India', 2, 'acre', '9876543210',
+                                      'Pune', None, None, 'x'))
+
+    assert worker.scheme_refresh() == {'locations_refreshed': 1, 'entries_refreshed': 3}
+    # The page searches "City, State" with no crop in the UI language
+    assert calls == [('Pune, Maharashtra', None, language) for language in ('English', 'Hindi', 'Marathi')]
+    assert government_schemes_page.schemes_location('Haveli, Pune, Maharashtra, India') == 'Pune, Maharashtra'
@@ -0,0 +1,136 @@
+# translations/catalog.py
+"""
+Compiled translation catalogs
+
+The translations/<lang>.py modules are large dict literals. This module
+compiles each one into a pickle under translations/compiled/ and keeps the
+loaded dictionaries in a module-level registry, so every language is read
+from disk at most once per process and each lookup is a plain dict access.
+"""
+
+import importlib
+import os
+import pickle
+import threading
+from typing import Dict
+
+CATALOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'compiled')
+CATALOG_FORMAT = 1
+SUPPORTED_LANGUAGES = ('en', 'hi', 'mr')
+
+# lang_code -> translations dict, filled on first use
+_CATALOGS: Dict[str, Dict[str, str]] = {}
+_lock = threading.Lock()
+
+
+def _source_path(lang_code: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), f'{lang_code}.py')
+
+
+def _catalog_path(lang_code: str) -> str:
+    return os.path.join(CATALOG_DIR, f'{lang_code}.pickle')
+
+
+def _source_stamp(lang_code: str):
+    """Return (mtime_ns, size) of the source module, or None if it is missing."""
+    try:
+        stat = os.stat(_source_path(lang_code))
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def compile_catalog(lang_code: str) -> Dict[str, str]:
+    """
+    Compile translations/<lang_code>.py into a pickled catalog.
+
+    Args:
+        lang_code: Language code ('en', 'hi', 'mr')
+
+    Returns:
+        The compiled translations dictionary
+    """
+    module = importlib.import_module(f'translations.{lang_code}')
+    translations = dict(module.TRANSLATIONS)
+
+    payload = {
+        'format': CATALOG_FORMAT,
+        'lang': lang_code,
+        'source_stamp': _source_stamp(lang_code),
+        'translations': translations,
+    }
+
+    try:
+        os.makedirs(CATALOG_DIR, exist_ok=True)
+        tmp_path = _catalog_path(lang_code) + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, _catalog_path(lang_code))
+    except OSError as e:
+        # Read-only deployments still work, they just recompile per process
+        print(f"Could not write translation catalog for {lang_code}: {e}")
+
+    return translations
+
+
+def compile_all() -> Dict[str, int]:
+    """Compile catalogs for every supported language. Returns entry counts."""
+    return {lang: len(compile_catalog(lang)) for lang in SUPPORTED_LANGUAGES}
+
+
+def _read_catalog(lang_code: str):
+    """Read a compiled catalog, returning None if it is missing or stale."""
+    try:
+        with open(_catalog_path(lang_code), 'rb') as f:
+            payload = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+    if payload.get('format') != CATALOG_FORMAT:
+        return None
+
+    # Source stamp only matters when the source module ships alongside
+    stamp = _source_stamp(lang_code)
+    if stamp is not None and tuple(payload.get('source_stamp') or ()) != stamp:
+        return None
+
+    return payload.get('translations')
+
+
+def get_catalog(lang_code: str) -> Dict[str, str]:
+    """
+    Get the translations dictionary for a language.
+
+    Loaded from the compiled catalog on first use (compiling it if missing or
+    stale) and served from the in-process registry afterwards.
+
+    Args:
+        lang_code: Language code ('en', 'hi', 'mr')
+
+    Returns:
+        Translations dictionary (empty for unknown languages)
+    """
+    catalog = _CATALOGS.get(lang_code)
+    if catalog is not None:
+        return catalog
+
+    with _lock:
+        catalog = _CATALOGS.get(lang_code)
+        if catalog is not None:
+            return catalog
+
+        catalog = _read_catalog(lang_code)
+        if catalog is None:
+            try:
+                catalog = compile_catalog(lang_code)
+            except Exception:
+                catalog = {}
+
+        _CATALOGS[lang_code] = catalog
+        return catalog
+
+
+def clear_registry():
+    """Drop loaded catalogs (used after recompiling and in tests)."""
+    with _lock:
+        _CATALOGS.clear()
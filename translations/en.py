@@ -69,6 +69,7 @@ TRANSLATIONS = {
     "Manage Farmers": "Manage Farmers",
     "Database Viewer": "Database Viewer",
     "Cache Management": "Cache Management",
+    "Page Performance": "Page Performance",
     
     # Finance
     "Financial Overview": "Financial Overview",
@@ -92,6 +92,7 @@ TRANSLATIONS = {
     "Manage Farmers": "किसानों को प्रबंधित करें",
     "Database Viewer": "डेटाबेस व्यूअर",
     "Cache Management": "कैश प्रबंधन",
+    "Page Performance": "पेज प्रदर्शन",
     
     # Finance
     "Financial Overview": "वित्तीय अवलोकन",
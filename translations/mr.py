@@ -92,6 +92,7 @@ TRANSLATIONS = {
     "Manage Farmers": "शेतकरी व्यवस्थापित करा",
     "Database Viewer": "डेटाबेस व्हिज्युअर",
     "Cache Management": "कॅशे व्यवस्थापन",
+    "Page Performance": "पृष्ठ कार्यक्षमता",
     
     # Finance
     "Financial Overview": "आर्थिक विहंगावलोकन",